@@ -0,0 +1,102 @@
+"""
+Benchmark du cache des réponses devant le graphe d'agent.
+
+Rejoue un flux de questions répétées (popularité décroissante de type Zipf,
+avec des variantes de casse, d'accents et de ponctuation, et quelques
+reformulations) contre un LLM factice à latence simulée et un serveur
+Open-Meteo local. Trois configurations: sans cache, correspondance exacte,
+correspondance exacte puis sémantique.
+
+Usage: python benchmarks/bench_answer_cache.py [--questions 300] [--latency 0.05] [--threshold 0.85]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.answer_cache import answer_cache
+from modules.config import configure
+from modules.forecast import forecast_cache
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+# Questions de base et leurs variantes (les deux dernières: reformulations)
+QUESTIONS = [
+    ["Quelle est la météo à Paris ?", "quelle est la meteo a paris", "Quelle est la MÉTÉO à Paris?!",
+     "Quelle est la météo à Paris aujourd'hui ?"],
+    ["Combien font 12*7 ?", "combien font 12*7", "Combien font 12*7?", "Combien font 12*7 stp ?"],
+    ["Quel temps fait-il à Lyon ?", "quel temps fait il a lyon", "Quel temps fait-il à Lyon maintenant ?"],
+    ["Qui a écrit Les Misérables ?", "qui a ecrit les miserables", "Qui a écrit Les Misérables, déjà ?"],
+    ["Quelle est la capitale de l'Italie ?", "quelle est la capitale de l italie ?"],
+    ["Calcule (3 + 4) * 2", "calcule (3 + 4) * 2."],
+    ["Quelle est la météo à Marseille ?", "Météo à Marseille ?", "quelle est la météo à marseille"],
+    ["Combien font 365 * 24 ?", "combien font 365 * 24"],
+]
+
+
+def build_stream(count: int, seed: int):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    return [rng.choice(rng.choices(QUESTIONS, weights)[0]) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=300, help="longueur du flux de questions")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--threshold", type=float, default=0.85, help="seuil du niveau sémantique")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency)
+    llm_registry.set_factory(factory)
+    prompt_registry.clear()
+    stream = build_stream(args.questions, args.seed)
+
+    configs = [
+        ("sans cache", False, 0.0),
+        ("exact", True, 0.0),
+        ("exact + sémantique", True, args.threshold),
+    ]
+    rows = []
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as directory:
+        for label, enabled, threshold in configs:
+            configure(
+                geocoding_url=stub.url,
+                forecast_url=stub.url,
+                answer_cache_path=os.path.join(directory, f"{len(rows)}.sqlite"),
+                answer_cache_semantic_threshold=threshold
+            )
+            answer_cache.reset()
+            forecast_cache.reset()
+            factory.counter.reset()
+            app = build_agent_graph(answer_cache=enabled)
+
+            durations = []
+            for question in stream:
+                start = time.perf_counter()
+                result = app.invoke({"question": question})
+                durations.append(time.perf_counter() - start)
+                assert result.get("answer"), result
+            stats = summarize(durations)
+            hit_rate = answer_cache.stats()["hit_rate"] if enabled else 0.0
+            rows.append([
+                label, factory.counter.total / len(stream), f"{hit_rate:.0%}",
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"], sum(durations),
+            ])
+            if enabled:
+                print(f"{label}: {answer_cache.stats()}")
+
+    print(f"\n{len(stream)} questions ({len(QUESTIONS)} distinctes, avec variantes), "
+          f"latence LLM simulée {args.latency * 1000:.0f} ms par appel")
+    print_table(["cache", "appels LLM/question", "taux de succès", "moyenne ms", "p50 ms", "p95 ms", "total s"], rows)
+
+
+if __name__ == "__main__":
+    main()
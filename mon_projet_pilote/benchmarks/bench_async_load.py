@@ -0,0 +1,98 @@
+"""
+Benchmark de charge: graphe synchrone vs graphe asynchrone.
+
+Envoie un lot de questions (météo, calcul, réponse directe) à l'agent, avec un
+LLM factice et un serveur Open-Meteo local, tous deux à latence simulée:
+- synchrone, une question à la fois
+- synchrone, dans un pool de threads
+- asynchrone, toutes les questions concurremment via ``app.ainvoke``
+
+Les doublures tournent dans le même processus que l'agent et partagent donc le
+GIL: au-delà de quelques centaines de questions, le débit est limité par le
+coût CPU du framework (quelques ms par question), pas par les attentes d'E/S.
+
+Usage: python benchmarks/bench_async_load.py [--questions 300] [--llm-latency 0.05]
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = [
+    "Quelle est la météo à Paris?",
+    "Quel temps fait-il à Lyon ?",
+    "Combien font 12*7 ?",
+    "Calcule (3 + 4) * 2",
+    "Qui a écrit Les Misérables ?",
+]
+
+
+def timed(func, question):
+    start = time.perf_counter()
+    result = func({"question": question})
+    assert result.get("answer"), result
+    return time.perf_counter() - start
+
+
+async def atimed(app, question):
+    start = time.perf_counter()
+    result = await app.ainvoke({"question": question})
+    assert result.get("answer"), result
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=300, help="nombre de questions concurrentes")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--http-latency", type=float, default=0.01, help="latence simulée par requête HTTP (s)")
+    parser.add_argument("--threads", type=int, default=16, help="taille du pool de threads synchrone")
+    parser.add_argument("--sequential", type=int, default=20, help="questions pour la mesure séquentielle")
+    args = parser.parse_args()
+    quiet_logs()
+
+    llm_registry.set_factory(fake_llm_factory(latency=args.llm_latency))
+    prompt_registry.clear()
+    questions = list(itertools.islice(itertools.cycle(QUESTIONS), args.questions))
+
+    rows = []
+    with OpenMeteoStub(delay=args.http_latency) as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url)
+        app = build_agent_graph()
+        async_app = build_agent_graph(use_async=True)
+
+        start = time.perf_counter()
+        durations = [timed(app.invoke, q) for q in questions[:args.sequential]]
+        elapsed = time.perf_counter() - start
+        rows.append(["synchrone séquentiel", len(durations), len(durations) / elapsed, *summarize(durations).values()])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            durations = list(pool.map(lambda q: timed(app.invoke, q), questions))
+        elapsed = time.perf_counter() - start
+        rows.append([f"synchrone, {args.threads} threads", len(durations), len(durations) / elapsed,
+                     *summarize(durations).values()])
+
+        async def run_all():
+            return await asyncio.gather(*(atimed(async_app, q) for q in questions))
+
+        start = time.perf_counter()
+        durations = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+        rows.append(["asynchrone (ainvoke)", len(durations), len(durations) / elapsed, *summarize(durations).values()])
+
+    print(f"Latence simulée: LLM {args.llm_latency * 1000:.0f} ms/appel, HTTP {args.http_latency * 1000:.0f} ms/requête")
+    print_table(["exécution", "questions", "questions/s", "moyenne ms", "p50 ms", "p95 ms", "p99 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
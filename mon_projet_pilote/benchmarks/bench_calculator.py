@@ -0,0 +1,101 @@
+"""
+Benchmark du moteur arithmétique de la calculatrice contre l'ancien ``eval``.
+
+- corpus d'expressions réalistes: ``eval`` (analyse et compilation à chaque
+  appel), moteur à froid (cache vidé avant chaque appel) et moteur avec cache
+- entrées pathologiques: chaque évaluation ``eval`` tourne dans un processus
+  séparé, interrompu après ``--timeout`` secondes
+
+Usage: python benchmarks/bench_calculator.py [--repeat 2000] [--timeout 2]
+"""
+import argparse
+import multiprocessing
+import time
+
+from common import print_table, quiet_logs, summarize, time_calls
+
+from modules.arithmetic import ArithmeticEngine
+from modules.errors import ExpressionError
+
+CORPUS = [
+    "12*7", "(3 + 4) * 2", "15 % 4", "2**10", "100 / 7", "3.14159 * 2 * 2",
+    "(1250 * 0,2) + 1250", "1 + 2 + 3 + 4 + 5 + 6 + 7 + 8 + 9 + 10", "((2 + 3) * (7 - 4)) / 5",
+    "19,99 * 3", "1000 * (1 + 0.05)**10", "365 * 24 * 60 * 60", "-(5 - 12) * 3", "7 // 2",
+]
+PATHOLOGICAL = ["9**9**9", "2**2**2**2**2", "(10**10)**(10**10)", "99999**99999", "1.5**99999"]
+
+
+def eval_path(expression: str):
+    """Ancienne évaluation de ``calculatrice``."""
+    return eval(expression.replace(",", "."))
+
+
+def _eval_in_child(expression: str) -> None:
+    try:
+        eval_path(expression)
+    except Exception:
+        pass
+
+
+def eval_with_timeout(expression: str, timeout: float) -> str:
+    """Durée de ``eval`` dans un processus séparé, ou interruption au-delà du délai."""
+    process = multiprocessing.Process(target=_eval_in_child, args=(expression,), daemon=True)
+    start = time.perf_counter()
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        process.join()
+        return f"> {timeout:.0f} s (interrompu)"
+    return f"{(time.perf_counter() - start) * 1000:.1f} ms (avec démarrage du processus)"
+
+
+def engine_outcome(engine: ArithmeticEngine, expression: str) -> str:
+    start = time.perf_counter()
+    try:
+        engine.evaluate(expression)
+        outcome = "évalué"
+    except ExpressionError as e:
+        outcome = f"refusé ({e})"
+    return f"{(time.perf_counter() - start) * 1000:.3f} ms, {outcome}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="passes sur le corpus")
+    parser.add_argument("--timeout", type=float, default=2.0, help="délai maximal d'un eval pathologique (s)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    engine = ArithmeticEngine()
+
+    def run_eval():
+        for expression in CORPUS:
+            eval_path(expression)
+
+    def run_cold():
+        for expression in CORPUS:
+            engine.clear()
+            engine.evaluate(expression)
+
+    def run_warm():
+        for expression in CORPUS:
+            engine.evaluate(expression)
+
+    rows = []
+    for label, func in (("eval", run_eval), ("moteur, à froid", run_cold), ("moteur, avec cache", run_warm)):
+        stats = summarize(time_calls(func, args.repeat))
+        per_expression = stats["mean_ms"] * 1000 / len(CORPUS)
+        rows.append([label, per_expression, stats["p50_ms"], stats["p95_ms"]])
+
+    print(f"Corpus de {len(CORPUS)} expressions, {args.repeat} passes")
+    print_table(["évaluation", "µs/expression", "p50 ms/passe", "p95 ms/passe"], rows)
+
+    print()
+    rows = [[expression, eval_with_timeout(expression, args.timeout), engine_outcome(engine, expression)]
+            for expression in PATHOLOGICAL]
+    print_table(["entrée pathologique", "eval", "moteur"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark du calcul par lots de la calculatrice contre la boucle scalaire.
+
+Le lot contient ``--size`` expressions construites à partir de quelques formes
+courantes (pourcentages, moyennes, conversions...) avec des constantes
+aléatoires, dont une petite part de divisions par zéro. On compare:
+
+- ``calculatrice`` appelée une fois par expression (outil LangChain complet)
+- le moteur arithmétique appelé une fois par expression, messages compris
+- ``calculatrice_lot`` (regroupement par forme, évaluation NumPy)
+
+Les messages obtenus par les trois chemins sont vérifiés identiques.
+
+Usage: python benchmarks/bench_calculator_batch.py [--size 100000] [--seed 0]
+"""
+import argparse
+import random
+import time
+
+from common import print_table, quiet_logs
+
+from modules.arithmetic import arithmetic_engine
+from modules.arithmetic_batch import batch_evaluator
+from modules.tools import _erreur_calcul, _résultat_calcul, calculatrice, calculatrice_lot
+
+TEMPLATES = [
+    "{} * {} / 100", "({} + {} + {}) / 3", "{} * 1,2", "{} - {} * {}", "({} - {}) / {} * 100",
+    "{} // {}", "{} % {}", "{}**2 + {}**2", "-{} + {}", "{} * (1 + 0.05)**{}",
+]
+
+
+def build_batch(size: int, seed: int):
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        values = [rng.choice([0, rng.randint(1, 5000)]) if rng.random() < 0.02 else rng.randint(1, 5000)
+                  for _ in range(template.count("{}"))]
+        expressions.append(template.format(*values))
+    return expressions
+
+
+def engine_loop(expressions):
+    """Boucle scalaire sur le moteur, avec les messages de la calculatrice."""
+    messages = []
+    for expression in expressions:
+        try:
+            messages.append(_résultat_calcul(arithmetic_engine.evaluate(expression)))
+        except Exception as e:
+            messages.append(_erreur_calcul(e))
+    return messages
+
+
+def timed(func, expressions):
+    start = time.perf_counter()
+    messages = func(expressions)
+    return messages, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="nombre d'expressions du lot")
+    parser.add_argument("--seed", type=int, default=0, help="graine du générateur")
+    args = parser.parse_args()
+    quiet_logs()
+
+    expressions = build_batch(args.size, args.seed)
+    runs = [
+        ("calculatrice, une par une", lambda batch: [calculatrice(expression) for expression in batch]),
+        ("moteur, une par une", engine_loop),
+        ("calculatrice_lot", calculatrice_lot),
+    ]
+
+    rows = []
+    reference = None
+    baseline = None
+    for label, func in runs:
+        arithmetic_engine.clear()
+        batch_evaluator.clear()
+        messages, elapsed = timed(func, expressions)
+        if reference is None:
+            reference, baseline = messages, elapsed
+        assert messages == reference, f"résultats différents pour {label}"
+        rows.append([label, elapsed, elapsed * 1e6 / len(expressions), baseline / elapsed])
+
+    print(f"Lot de {len(expressions)} expressions, {len(TEMPLATES)} formes")
+    print_table(["évaluation", "durée (s)", "µs/expression", "accélération"], rows)
+    print(f"Évaluateur par lots: {batch_evaluator.stats()}")
+
+
+if __name__ == "__main__":
+    main()
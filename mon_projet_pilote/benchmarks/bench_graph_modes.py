@@ -0,0 +1,64 @@
+"""
+Benchmark de bout en bout des topologies du graphe d'agent.
+
+Exécute le graphe compilé dans chaque mode de ``build_agent_graph`` (avec et
+sans voie rapide) contre un LLM factice qui compte ses appels et simule une
+latence par appel.
+
+Usage: python benchmarks/bench_graph_modes.py [--latency 0.05] [--repeat 3]
+"""
+import argparse
+import itertools
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.graph import GRAPH_MODES, build_agent_graph
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from tests.fakes import fake_llm_factory
+
+QUESTIONS = [
+    "Combien font 12*7 ?",
+    "Calcule (3 + 4) * 2",
+    "Qui a écrit Les Misérables ?",
+    "Quelle est la capitale de l'Italie ?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency)
+    llm_registry.set_factory(factory)
+    prompt_registry.clear()
+
+    rows = []
+    for fast_path, mode in itertools.product((False, True), GRAPH_MODES):
+        app = build_agent_graph(mode=mode, fast_path=fast_path)
+        factory.counter.reset()
+        durations = []
+        for _ in range(args.repeat):
+            for question in QUESTIONS:
+                start = time.perf_counter()
+                result = app.invoke({"question": question})
+                durations.append(time.perf_counter() - start)
+                assert result.get("answer"), result
+        stats = summarize(durations)
+        simulated = factory.counter.total * args.latency / len(durations) * 1000
+        rows.append([
+            mode + (" + voie rapide" if fast_path else ""), factory.counter.total / len(durations), simulated,
+            stats["mean_ms"], stats["p50_ms"], stats["p95_ms"],
+        ])
+
+    print(f"Graphe complet, latence LLM simulée {args.latency * 1000:.0f} ms par appel, "
+          f"{len(QUESTIONS)} questions x {args.repeat}")
+    print_table(["mode", "appels LLM/question", "latence LLM ms", "moyenne ms", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
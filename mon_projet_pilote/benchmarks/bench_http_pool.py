@@ -0,0 +1,72 @@
+"""
+Benchmark de la couche HTTP partagée de l'outil météo.
+
+Compare, contre un serveur Open-Meteo local, l'ancien comportement (un
+``requests.get`` par requête, donc une connexion neuve à chaque fois) et le
+client mutualisé de ``modules/http_client.py`` (pools keep-alive). Le coût
+d'ouverture d'une connexion est simulé par ``--connect-delay`` (poignée de main
+TCP+TLS vers un serveur distant); le serveur compte les connexions acceptées.
+
+Usage: python benchmarks/bench_http_pool.py [--lookups 200] [--connect-delay 0.02] [--threads 8]
+"""
+import argparse
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.http_client import http_client
+from modules.tools import _forecast_request, _geocoding_request, _parse_geocoding
+from tests.fakes import OpenMeteoStub
+
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Bordeaux", "Lille"]
+
+
+def lookup(get, city):
+    """Géocodage puis prévisions, comme ``recherche_météo``; renvoie la durée."""
+    start = time.perf_counter()
+    url, params = _geocoding_request(city)
+    lat, lon, _ = _parse_geocoding(get(url, params=params, timeout=10).json())
+    url, params = _forecast_request(lat, lon)
+    get(url, params=params, timeout=10).raise_for_status()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=200, help="recherches météo par scénario")
+    parser.add_argument("--connect-delay", type=float, default=0.02, help="coût simulé d'ouverture de connexion (s)")
+    parser.add_argument("--delay", type=float, default=0.002, help="latence simulée par requête (s)")
+    parser.add_argument("--threads", type=int, default=8, help="threads du scénario concurrent")
+    args = parser.parse_args()
+    quiet_logs()
+
+    cities = list(itertools.islice(itertools.cycle(CITIES), args.lookups))
+    clients = [("requests.get (sans pool)", requests.get), ("client mutualisé", http_client.get)]
+
+    rows = []
+    for threads, (label, get) in itertools.product((1, args.threads), clients):
+        with OpenMeteoStub(delay=args.delay, connect_delay=args.connect_delay) as stub:
+            configure(geocoding_url=stub.url, forecast_url=stub.url)
+            http_client.reset()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                durations = list(pool.map(lambda city: lookup(get, city), cities))
+            elapsed = time.perf_counter() - start
+            stats = summarize(durations)
+            rows.append([
+                label, threads, stub.counts["connections"], len(durations) / elapsed,
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"],
+            ])
+
+    print(f"{args.lookups} recherches météo (2 requêtes chacune), ouverture de connexion "
+          f"{args.connect_delay * 1000:.0f} ms, requête {args.delay * 1000:.0f} ms")
+    print_table(["client", "threads", "connexions", "recherches/s", "moyenne ms", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark du classifieur local du choix d'outil.
+
+1. Journalise du trafic: des questions variées (gabarits) passent par
+   ``run_batch`` avec le graphe standard et l'LLM factice, dont les choix
+   d'outil servent d'étiquettes, comme les résultats d'une exécution réelle;
+2. entraîne le classifieur sur ces résultats;
+3. traite le jeu de questions étiquetées ``data/labelled_questions.jsonl``
+   sans puis avec le classifieur, pour plusieurs seuils: exactitude du
+   routage, appels de choix d'outil évités, durée par question.
+
+Usage: python benchmarks/bench_intent.py [--latency 0.05] [--token-latency 0.005]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from common import print_table, quiet_logs, summarize
+
+from modules.batch import run_batch
+from modules.config import configure
+from modules.graph import build_agent_graph
+from modules.intent import evaluate_intent_model, intent_classifier, read_examples, train_intent_model
+from modules.llm import llm_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS_PATH = Path(__file__).resolve().parent / "data" / "labelled_questions.jsonl"
+
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Bordeaux", "Lille"]
+EXPRESSIONS = ["12*7", "3 + 4", "(8-2)/3", "100 / 4", "2 ** 8", "1.5 * 6", "81 - 19", "7 % 3"]
+WEATHER = [
+    "Quelle est la météo à {} ?", "Quel temps fait-il à {} ?", "Est-ce qu'il pleut à {} ?",
+    "Donne-moi la température à {}", "Météo à {} aujourd'hui", "Va-t-il pleuvoir à {} ?",
+]
+CALCULATOR = ["Combien font {} ?", "Calcule {}", "Que vaut {} ?", "Quel est le résultat de {} ?", "{} = ?"]
+DIRECT = [
+    "Qui a écrit Germinal ?", "Quelle est la capitale de l'Espagne ?", "Raconte-moi une blague",
+    "Explique la photosynthèse", "Qui a peint la Joconde ?", "Comment faire du pain ?",
+    "Quelle est la hauteur de la tour Eiffel ?", "Donne-moi un synonyme de rapide",
+    "Pourquoi le ciel est-il bleu ?", "Qui était Victor Hugo ?", "Résume l'histoire de Rome",
+    "Conseille-moi un livre", "Comment dit-on merci en allemand ?", "Qu'est-ce qu'un nombre premier ?",
+]
+
+THRESHOLDS = (0.99, 0.9, 0.7)
+
+
+def traffic_questions():
+    return (
+        [template.format(city) for template in WEATHER for city in CITIES]
+        + [template.format(expression) for template in CALCULATOR for expression in EXPRESSIONS]
+        + DIRECT
+    )
+
+
+def run(app, items):
+    durations, routed = [], 0
+    for item in items:
+        start = time.perf_counter()
+        result = app.invoke({"question": item["question"]})
+        durations.append(time.perf_counter() - start)
+        routed += result.get("tool_name") == item["tool"]
+    return durations, routed / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée jusqu'au premier jeton (s)")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="délai simulé par jeton suivant (s)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency, token_latency=args.token_latency)
+    llm_registry.set_factory(factory)
+    with open(QUESTIONS_PATH, encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+
+    rows = []
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as tmp:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        configure(intent_model_path="")
+        intent_classifier.reset()
+        app = build_agent_graph()
+
+        # 1. Trafic journalisé par run_batch, choix d'outil du LLM comme étiquettes
+        traffic, results = Path(tmp) / "trafic.jsonl", Path(tmp) / "resultats.jsonl"
+        traffic.write_text("".join(json.dumps({"question": q}, ensure_ascii=False) + "\n"
+                                   for q in traffic_questions()), encoding="utf-8")
+        run_batch(app, str(traffic), str(results), concurrency=16)
+
+        # 2. Entraînement
+        questions, labels = read_examples([str(results)])
+        start = time.perf_counter()
+        model = train_intent_model(questions, labels)
+        training_ms = (time.perf_counter() - start) * 1000
+        model_path = str(Path(tmp) / "intent.npz")
+        model.save(model_path)
+
+        # 3. Questions étiquetées, sans puis avec le classifieur
+        factory.counter.reset()
+        durations, accuracy = run(app, items)
+        baseline = summarize(durations)
+        choices = factory.counter.by_kind["choix_outil"]
+        rows.append(["LLM seul", f"{accuracy:.0%}", "-", choices / len(items), "-",
+                     baseline["mean_ms"], baseline["p50_ms"], baseline["p95_ms"]])
+        for threshold in THRESHOLDS:
+            configure(intent_model_path=model_path, intent_threshold=threshold)
+            intent_classifier.reset()
+            factory.counter.reset()
+            durations, accuracy = run(app, items)
+            stats = summarize(durations)
+            evaluation = evaluate_intent_model(model, [i["question"] for i in items], [i["tool"] for i in items], threshold)
+            rows.append([
+                f"classifieur, seuil {threshold:g}", f"{accuracy:.0%}", f"{evaluation['coverage']:.0%}",
+                factory.counter.by_kind["choix_outil"] / len(items),
+                f"{stats['mean_ms'] - baseline['mean_ms']:+.1f}",
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"],
+            ])
+
+    print(f"Trafic journalisé: {len(questions)} questions, entraînement en {training_ms:.0f} ms, "
+          f"prédiction en {evaluation['mean_us']:.0f} µs; {len(items)} questions étiquetées, "
+          f"LLM simulé {args.latency * 1000:.0f} ms + {args.token_latency * 1000:.0f} ms par jeton")
+    print_table(
+        ["configuration", "routage", "choix locaux", "appels choix_outil/question", "écart ms",
+         "moyenne ms", "p50 ms", "p95 ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark de la mémoïsation des appels LLM.
+
+Rejoue un flux de questions répétées dans le graphe (sans cache des réponses)
+contre un LLM factice à latence simulée, avec le cache des appels LLM:
+
+- désactivé
+- en mode memo (prompts de ``AGENT_LLM_CACHE_PROMPTS``)
+- en mode memo sur tous les prompts
+- en rejeu d'un enregistrement (aucun appel au modèle)
+
+Usage: python benchmarks/bench_llm_cache.py [--questions 200] [--latency 0.05]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import AgentConfig, configure
+from modules.forecast import forecast_cache
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.llm_cache import llm_cache
+from modules.prompts import PROMPT_TEMPLATES, prompt_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = [
+    "Quelle est la météo à Paris ?", "Combien font 12*7 ?", "Quel temps fait-il à Lyon ?",
+    "Qui a écrit Les Misérables ?", "Calcule (3 + 4) * 2", "Quelle est la capitale de l'Italie ?",
+    "Quelle est la météo à Marseille ?", "Combien font 365 * 24 ?", "Météo à Nantes ?", "Calcule 2**10",
+]
+
+
+def run(app, stream):
+    durations = []
+    for question in stream:
+        start = time.perf_counter()
+        result = app.invoke({"question": question})
+        durations.append(time.perf_counter() - start)
+        assert result.get("answer"), result
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200, help="longueur du flux de questions")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency)
+    llm_registry.set_factory(factory)
+    rng = random.Random(args.seed)
+    stream = [rng.choice(QUESTIONS) for _ in range(args.questions)]
+
+    configs = [
+        ("désactivé", "off", AgentConfig.llm_cache_prompts),
+        ("memo, prompts par défaut", "memo", AgentConfig.llm_cache_prompts),
+        ("memo, tous les prompts", "memo", ",".join(PROMPT_TEMPLATES)),
+        ("rejeu", "replay", AgentConfig.llm_cache_prompts),
+    ]
+    rows = []
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as directory:
+        configure(geocoding_url=stub.url, forecast_url=stub.url)
+        for label, mode, prompts in configs:
+            path = os.path.join(directory, "replay.sqlite" if mode == "replay" else f"{len(rows)}.sqlite")
+            if mode == "replay":
+                # Enregistrement préalable des réponses, non chronométré
+                configure(llm_cache_mode="record", llm_cache_path=path)
+                llm_cache.reset()
+                run(build_agent_graph(), QUESTIONS)
+            configure(llm_cache_mode=mode, llm_cache_prompts=prompts, llm_cache_path=path)
+            llm_cache.reset()
+            forecast_cache.reset()
+            prompt_registry.clear()
+            factory.counter.reset()
+
+            stats = summarize(run(build_agent_graph(), stream))
+            rows.append([label, factory.counter.total / len(stream), stats["mean_ms"], stats["p50_ms"], stats["p95_ms"]])
+
+    print(f"{len(stream)} questions ({len(QUESTIONS)} distinctes), latence LLM simulée {args.latency * 1000:.0f} ms")
+    print_table(["cache LLM", "appels LLM/question", "moyenne ms", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
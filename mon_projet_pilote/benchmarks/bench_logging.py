@@ -0,0 +1,119 @@
+"""
+Benchmark du coût de la journalisation par question.
+
+Exécute le graphe standard (LLM factice sans latence, serveur Open-Meteo
+local, caches chauds) avec différentes configurations de journalisation:
+
+- ancienne configuration: ``basicConfig`` avec ``FileHandler`` et
+  ``StreamHandler`` synchrones, écriture dans le thread de la question;
+- file d'attente (``configure_logging``): mêmes destinations, écrites par le
+  thread ``QueueListener``;
+- file d'attente avec échantillonnage des INFO, puis niveau WARNING;
+- sans journalisation, comme référence.
+
+La sortie console est redirigée vers ``os.devnull``. Un second tableau mesure
+le coût d'un message sous le niveau configuré: f-string (mise en forme
+systématique) contre formatage paresseux.
+
+Usage: python benchmarks/bench_logging.py [--questions 200] [--repeat 3]
+"""
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from common import print_table, summarize, time_calls
+
+from modules.config import configure
+from modules.errors import logger
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.logging_setup import LOG_FORMAT, configure_logging, shutdown_logging
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = ["Quelle est la météo à Paris ?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+
+
+def legacy_logging(path: str) -> None:
+    """Configuration d'origine de errors.py: écriture synchrone dans le fichier et sur la console."""
+    logging.basicConfig(
+        level=logging.INFO, format=LOG_FORMAT, force=True,
+        handlers=[logging.FileHandler(path), logging.StreamHandler()]
+    )
+
+
+def no_logging(path: str) -> None:
+    logging.basicConfig(level=logging.CRITICAL, force=True, handlers=[logging.NullHandler()])
+
+
+CONFIGS = [
+    ("ancienne (basicConfig synchrone)", legacy_logging),
+    ("file d'attente", lambda path: configure_logging(level="INFO", file=path, console=True)),
+    ("file d'attente, 1 INFO sur 10", lambda path: configure_logging(level="INFO", file=path, console=True,
+                                                                        info_sampling=0.1)),
+    ("file d'attente, WARNING", lambda path: configure_logging(level="WARNING", file=path, console=True)),
+    ("sans journalisation", no_logging),
+]
+
+
+def teardown() -> None:
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200, help="questions par mesure")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    llm_registry.set_factory(fake_llm_factory())
+    rows = []
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stderr(devnull):
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        app = build_agent_graph()
+        for question in QUESTIONS:
+            app.invoke({"question": question})  # Caches et clients chauds
+
+        # Configurations alternées à chaque répétition, pour ne pas favoriser l'ordre de passage
+        durations = {label: [] for label, _ in CONFIGS}
+        for _ in range(args.repeat):
+            for index, (label, setup) in enumerate(CONFIGS):
+                setup(str(Path(tmp) / f"agent-{index}.log"))
+                start = time.perf_counter()
+                for i in range(args.questions):
+                    app.invoke({"question": QUESTIONS[i % len(QUESTIONS)]})
+                durations[label].append((time.perf_counter() - start) / args.questions)
+                teardown()
+
+        for index, (label, _) in enumerate(CONFIGS):
+            path = Path(tmp) / f"agent-{index}.log"
+            lines = sum(1 for _ in open(path, encoding="utf-8")) if path.exists() else 0
+            stats = summarize(durations[label])
+            rows.append([label, lines / (args.questions * args.repeat), stats["mean_ms"], stats["p50_ms"]])
+
+        # Message sous le niveau configuré: mise en forme inutile avec une f-string
+        configure_logging(level="WARNING", file="", console=False)
+        state = {"question": QUESTIONS[0], "observation": "À Paris, il fait 18 °C. " * 10}
+        eager = summarize(time_calls(lambda: [logger.info(f"Résultat obtenu: {state}") for _ in range(1000)], 20))
+        lazy = summarize(time_calls(lambda: [logger.info("Résultat obtenu: %s", state) for _ in range(1000)], 20))
+        teardown()
+
+    print(f"{args.questions} questions x {args.repeat}, LLM factice sans latence, console vers os.devnull")
+    print_table(["journalisation", "lignes/question", "moyenne ms/question", "p50 ms/question"], rows)
+    print()
+    print_table(
+        ["message INFO sous le niveau WARNING", "µs/appel"],
+        [["f-string", eager["mean_ms"]], ["formatage paresseux", lazy["mean_ms"]]]
+    )
+
+
+if __name__ == "__main__":
+    main()
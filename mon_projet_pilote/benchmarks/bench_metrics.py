@@ -0,0 +1,123 @@
+"""
+Benchmark des métriques.
+
+1. Contention: N threads incrémentent un compteur et alimentent un
+   histogramme, avec les valeurs partitionnées par thread du registre, puis
+   avec un dictionnaire unique protégé par un verrou (implémentation naïve);
+2. surcoût par question du graphe standard (LLM factice sans latence,
+   serveur Open-Meteo local), instrumentation désactivée puis activée.
+
+Usage: python benchmarks/bench_metrics.py [--updates 20000] [--questions 200]
+"""
+import argparse
+import bisect
+import threading
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.metrics import DEFAULT_BUCKETS, MetricsRegistry
+from modules.prompts import prompt_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = ["Quelle est la météo à Paris ?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+THREADS = (1, 4, 16, 64)
+
+
+class LockedMetrics:
+    """Compteur et histogramme dans des dictionnaires partagés, sous un verrou unique."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.rows = {}
+
+    def inc(self, *labels: str) -> None:
+        with self.lock:
+            self.counts[labels] = self.counts.get(labels, 0) + 1
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self.lock:
+            row = self.rows.setdefault(labels, [0] * (len(DEFAULT_BUCKETS) + 1) + [0.0, 0])
+            row[bisect.bisect_left(DEFAULT_BUCKETS, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+
+def hammer(inc, observe, threads: int, updates: int) -> float:
+    """Mises à jour par seconde, ``updates`` (incrément + observation) par thread."""
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        barrier.wait()
+        for i in range(updates):
+            inc("analyser")
+            observe(0.001 * (i % 100), "analyser")
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * updates / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=20000, help="mises à jour par thread")
+    parser.add_argument("--questions", type=int, default=200, help="questions par mesure")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logs()
+
+    rows = []
+    for threads in THREADS:
+        registry = MetricsRegistry()
+        counter = registry.counter("bench_total", "", ("node",))
+        histogram = registry.histogram("bench_seconds", "", ("node",))
+        sharded = hammer(counter.inc, histogram.observe, threads, args.updates)
+        assert counter.value("analyser") == threads * args.updates
+        locked_metrics = LockedMetrics()
+        locked = hammer(locked_metrics.inc, locked_metrics.observe, threads, args.updates)
+        rows.append([threads, sharded / 1000, locked / 1000, f"x{sharded / locked:.2f}"])
+
+    print(f"{args.updates} mises à jour (incrément + observation) par thread")
+    print_table(["threads", "partitionné k/s", "verrou unique k/s", "gain"], rows)
+
+    llm_registry.set_factory(fake_llm_factory())
+    durations = {False: [], True: []}
+    with OpenMeteoStub() as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        apps = {}
+        for enabled in durations:
+            configure(metrics_enabled=enabled)
+            prompt_registry.clear()
+            apps[enabled] = build_agent_graph()
+            for question in QUESTIONS:
+                apps[enabled].invoke({"question": question})  # Caches et clients chauds
+        for _ in range(args.repeat):
+            for enabled, app in apps.items():
+                configure(metrics_enabled=enabled)
+                prompt_registry.clear()
+                start = time.perf_counter()
+                for i in range(args.questions):
+                    app.invoke({"question": QUESTIONS[i % len(QUESTIONS)]})
+                durations[enabled].append((time.perf_counter() - start) / args.questions)
+
+    print()
+    baseline = summarize(durations[False])["mean_ms"]
+    print_table(
+        ["instrumentation", "moyenne ms/question", "p50 ms/question", "écart ms"],
+        [[label, summarize(durations[enabled])["mean_ms"], summarize(durations[enabled])["p50_ms"],
+          f"{summarize(durations[enabled])['mean_ms'] - baseline:+.3f}"]
+         for label, enabled in (("désactivée", False), ("activée", True))]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark des modèles par nœud: latence, appels par modèle et exactitude du routage.
+
+Chaque configuration attribue un modèle aux nœuds du graphe (syntaxe de
+``AGENT_LLM_MODELS``, voir ``modules/model_tiers.py``) et traite le jeu de
+questions étiquetées ``data/labelled_questions.jsonl`` (outil attendu et son
+entrée). Le routage est exact si l'outil choisi est celui attendu, l'entrée
+si elle l'est aussi.
+
+Par défaut, les modèles sont simulés par l'LLM factice: chaque profil a sa
+latence et un taux d'erreur sur le choix de l'outil (réponse remplacée de
+façon déterministe pour une part des questions), ce qui reproduit le
+compromis entre un petit modèle rapide et un grand modèle lent. Avec
+``--live``, les vrais modèles Gemini sont appelés (clé API requise); la météo
+reste servie par le serveur Open-Meteo local.
+
+Usage: python benchmarks/bench_model_tiers.py [--mode standard] [--live] [--models "choisir_outil=..."]
+"""
+import argparse
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.forecast import forecast_cache
+from modules.geocoding import geocoding_cache
+from modules.graph import GRAPH_MODES, build_agent_graph
+from modules.llm import default_llm_factory, llm_registry
+from modules.model_tiers import model_tiers
+from modules.prompts import prompt_registry
+from modules.reasoning import OUTILS
+from tests.fakes import FakeChatModel, OpenMeteoStub, default_responder, extract_question, prompt_kind
+
+QUESTIONS_PATH = Path(__file__).resolve().parent / "data" / "labelled_questions.jsonl"
+
+SMALL, MEDIUM, LARGE = "gemini-1.5-flash-8b", "gemini-1.5-flash", "gemini-1.5-pro"
+
+# Modèles simulés: latence jusqu'au premier jeton, délai par jeton, taux d'erreur du choix d'outil
+PROFILES = {
+    SMALL: (0.02, 0.004, 0.15),
+    MEDIUM: (0.05, 0.01, 0.05),
+    LARGE: (0.15, 0.02, 0.0),
+}
+
+# Prompts de routage (choix de l'outil et extraction de son entrée), quel que soit le mode du graphe
+ROUTING = ("choisir_outil", "choix_outil_spéculatif")
+ANSWERS = ("formuler_réponse", "réponse_directe")
+
+CONFIGS = [
+    ("uniforme flash", ""),
+    ("routage 8b", ",".join(f"{name}={SMALL}" for name in ROUTING)),
+    ("routage 8b, réponse pro", ",".join(
+        [f"{name}={SMALL}" for name in ROUTING] + [f"{name}={LARGE}" for name in ANSWERS]
+    )),
+    ("uniforme pro", f"default={LARGE}"),
+]
+
+
+def simulated_responder(model: str, error_rate: float) -> Callable[[str], str]:
+    """Réponses de l'LLM factice, avec un choix d'outil erroné pour ``error_rate`` des questions."""
+    def respond(prompt: str) -> str:
+        text = default_responder(prompt)
+        if prompt_kind(prompt) != "choix_outil" or text not in OUTILS:
+            return text
+        draw = zlib.crc32(f"{model}|{extract_question(prompt)}".encode()) % 1000 / 1000
+        return OUTILS[(OUTILS.index(text) + 1) % len(OUTILS)] if draw < error_rate else text
+    return respond
+
+
+def simulated_factory(model: str, temperature: float, **kwargs: Any) -> FakeChatModel:
+    latency, token_latency, error_rate = PROFILES.get(model, PROFILES[MEDIUM])
+    return FakeChatModel(
+        model=model, temperature=temperature, latency=latency, token_latency=token_latency,
+        responder=simulated_responder(model, error_rate)
+    )
+
+
+def load_questions(path: Path) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def same_input(actual: Any, expected: Any) -> bool:
+    """Compare deux entrées d'outil à la casse et aux espaces près."""
+    def normalize(value: Any) -> Any:
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return "".join(str(value or "").lower().split())
+    return normalize(actual) == normalize(expected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=GRAPH_MODES, default="standard", help="topologie du graphe")
+    parser.add_argument("--live", action="store_true", help="appeler les vrais modèles au lieu de les simuler")
+    parser.add_argument("--models", action="append", default=[],
+                        help="configuration supplémentaire, syntaxe de AGENT_LLM_MODELS (répétable)")
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_PATH, help="questions étiquetées (JSONL)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    questions = load_questions(args.questions)
+    configs = CONFIGS + [(spec, spec) for spec in args.models]
+    llm_registry.set_factory(default_llm_factory if args.live else simulated_factory)
+
+    rows = []
+    with OpenMeteoStub() as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        for label, models in configs:
+            configure(llm_models=models)
+            model_tiers.reset()
+            prompt_registry.clear()
+            geocoding_cache.reset()
+            forecast_cache.reset()
+            app = build_agent_graph(mode=args.mode)
+
+            durations, routed, extracted = [], 0, 0
+            for item in questions:
+                start = time.perf_counter()
+                result = app.invoke({"question": item["question"]})
+                durations.append(time.perf_counter() - start)
+                if result.get("tool_name") == item["tool"]:
+                    routed += 1
+                    extracted += same_input(result.get("tool_input"), item["input"])
+
+            stats = summarize(durations)
+            calls = model_tiers.stats()
+            per_model = " ".join(
+                f"{model.removeprefix('gemini-1.5-')}:{count / len(questions):.2f}"
+                for model, count in sorted(calls.items())
+            )
+            rows.append([
+                label, f"{100 * routed / len(questions):.0f} %", f"{100 * extracted / len(questions):.0f} %",
+                sum(calls.values()) / len(questions), per_model,
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"],
+            ])
+
+    source = "modèles Gemini" if args.live else "modèles simulés " + ", ".join(
+        f"{model} ({latency * 1000:.0f} ms, {error_rate:.0%} d'erreurs de routage)"
+        for model, (latency, _, error_rate) in PROFILES.items()
+    )
+    print(f"{len(questions)} questions étiquetées, mode {args.mode}, {source}")
+    print_table(
+        ["configuration", "routage", "entrée", "appels LLM/question", "par modèle", "moyenne ms", "p50 ms", "p95 ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de la prélecture météo.
+
+Questions météo sur des villes jamais vues (caches de géocodage et de
+prévisions vidés avant chaque question), contre un LLM factice à latence
+simulée et un serveur Open-Meteo local lent. Pour les modes standard et
+spéculatif: sans prélecture, avec prélecture (effective en mode spéculatif
+seulement), et avec en plus le géocodage anticipé des lieux repérés localement.
+
+Usage: python benchmarks/bench_prefetch.py [--latency 0.05] [--token-latency 0.01] [--http-delay 0.05]
+"""
+import argparse
+import itertools
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.forecast import forecast_cache
+from modules.geocoding import geocoding_cache
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prefetch import weather_prefetcher
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Bordeaux", "Lille", "La Rochelle"]
+
+CONFIGS = [
+    ("sans prélecture", False, False),
+    ("prélecture", True, False),
+    ("prélecture + candidats", True, True),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée jusqu'au premier jeton (s)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="délai simulé par jeton suivant (s)")
+    parser.add_argument("--http-delay", type=float, default=0.05, help="latence simulée de chaque requête Open-Meteo (s)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency, token_latency=args.token_latency)
+    llm_registry.set_factory(factory)
+    rows = []
+    with OpenMeteoStub(delay=args.http_delay) as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        for mode, (label, prefetch, candidates) in itertools.product(("standard", "speculative"), CONFIGS):
+            configure(weather_prefetch=prefetch, weather_prefetch_candidates=candidates)
+            weather_prefetcher.reset()
+            stub.counts.clear()
+            app = build_agent_graph(mode=mode)
+            durations = []
+            for city in CITIES:
+                geocoding_cache.reset()
+                forecast_cache.reset()
+                start = time.perf_counter()
+                result = app.invoke({"question": f"Quelle est la météo à {city} ?"})
+                durations.append(time.perf_counter() - start)
+                assert result["observation"].startswith(f"À {city}"), result
+            stats = summarize(durations)
+            requests = (stub.counts["geocoding"] + stub.counts["forecast"]) / len(CITIES)
+            rows.append([f"{mode}, {label}", requests, stats["mean_ms"], stats["p50_ms"], stats["p95_ms"]])
+
+    print(f"Latence LLM simulée {args.latency * 1000:.0f} ms + {args.token_latency * 1000:.0f} ms par jeton, "
+          f"Open-Meteo {args.http_delay * 1000:.0f} ms par requête, {len(CITIES)} villes jamais vues")
+    print_table(["configuration", "requêtes HTTP/question", "moyenne ms", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark du cache de prompts/chaînes.
+
+Compare, pour chaque prompt des nœuds de raisonnement, le surcoût par appel
+(hors aller-retour LLM, grâce à un modèle factice en mémoire) entre:
+- avant: ``ChatPromptTemplate.from_template(...)`` puis ``prompt | llm`` à chaque appel
+- après: chaîne précompilée obtenue via ``get_chain``
+
+Usage: python benchmarks/bench_prompt_cache.py [--repeat N]
+"""
+import argparse
+
+from common import print_table, quiet_logs, summarize, time_calls
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from modules.prompts import PROMPT_TEMPLATES, get_chain
+from tests.fakes import FakeChatModel
+
+VARIABLES = {
+    "question": "Quelle est la météo à Paris?",
+    "thoughts": "Il faut chercher la météo.",
+    "outils": "recherche_météo, calculatrice, réponse_directe",
+    "observation": "À Paris, il fait 18°C avec ciel dégagé.",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    quiet_logs()
+
+    llm = FakeChatModel()
+    rows = []
+    for name, text in PROMPT_TEMPLATES.items():
+        # Construction seule: c'est le surcoût supprimé par le registre
+        build_before = summarize(time_calls(lambda: ChatPromptTemplate.from_template(text) | llm, args.repeat))
+        build_after = summarize(time_calls(lambda: get_chain(name, llm), args.repeat))
+
+        # Appel complet du nœud contre le modèle factice (latence LLM nulle)
+        call_before = summarize(time_calls(
+            lambda: (ChatPromptTemplate.from_template(text) | llm).invoke(VARIABLES), args.repeat
+        ))
+        call_after = summarize(time_calls(lambda: get_chain(name, llm).invoke(VARIABLES), args.repeat))
+
+        rows.append([
+            name,
+            build_before["mean_ms"] * 1000, build_after["mean_ms"] * 1000,
+            call_before["mean_ms"] * 1000, call_after["mean_ms"] * 1000,
+            call_before["mean_ms"] / call_after["mean_ms"],
+        ])
+
+    print(f"Surcoût par appel, moyenne sur {args.repeat} appels (µs)")
+    print_table(
+        ["prompt", "construction avant", "construction après", "appel avant", "appel après", "gain x"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark du serveur pré-fork: débit selon le nombre de workers.
+
+Le parent prépare le graphe standard (LLM factice, serveur Open-Meteo local,
+caches sur disque dans un dossier temporaire) puis crée 1, 2, 4… workers;
+des clients HTTP (connexions persistantes, répartis sur plusieurs processus
+pour ne pas être eux-mêmes limités par le GIL) envoient des questions
+variées pendant une durée fixe. Avec ``--latency 0`` le graphe est limité
+par le processeur (le gain suit le nombre de cœurs); avec une latence LLM
+simulée, il est limité par l'attente et un seul worker en threads suffit
+à en masquer une partie.
+
+Usage: python benchmarks/bench_server.py [--max-workers 8] [--clients 32] [--seconds 5] [--latency 0]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from common import percentile, print_table, quiet_logs
+
+from modules.config import configure
+from modules.graph import get_agent_graph
+from modules.llm import llm_registry
+from modules.server import PreforkServer
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Lille", "Bordeaux"]
+
+
+def question(i: int) -> str:
+    """Questions variées: météo, calcul (expressions toutes différentes), réponse directe."""
+    kind = i % 3
+    if kind == 0:
+        return f"Quelle est la météo à {CITIES[i % len(CITIES)]} ?"
+    if kind == 1:
+        return f"Combien font {i}*7 ?"
+    return f"Qui a écrit le livre numéro {i} ?"
+
+
+def client(url: str, threads: int, seconds: float, offset: int, results) -> None:
+    """Processus client: ``threads`` connexions persistantes, latences renvoyées par ``results``."""
+    parts = urlsplit(url)
+    latencies: List[float] = []
+    workers = set()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(thread: int) -> None:
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        i = offset + thread * 1_000_000
+        local, seen = [], set()
+        while time.perf_counter() < deadline:
+            body = json.dumps({"question": question(i)})
+            start = time.perf_counter()
+            connection.request("POST", "/ask", body, {"Content-Type": "application/json"})
+            record = json.loads(connection.getresponse().read())
+            local.append(time.perf_counter() - start)
+            seen.add(record["worker"])
+            i += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            workers.update(seen)
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((latencies, sorted(workers)))
+
+
+def measure(url: str, clients: int, processes: int, seconds: float) -> Dict[str, float]:
+    """Débit et latences de ``clients`` connexions réparties sur ``processes`` processus clients."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    per_process = [clients // processes + (1 if p < clients % processes else 0) for p in range(processes)]
+    procs = [context.Process(target=client, args=(url, n, seconds, p * 100_000_000, results))
+             for p, n in enumerate(per_process) if n]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    latencies, workers = [], set()
+    for _ in procs:
+        values, seen = results.get()
+        latencies.extend(values)
+        workers.update(seen)
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "workers": len(workers),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=32, help="connexions simultanées")
+    parser.add_argument("--client-processes", type=int, default=0, help="processus clients (0: un par cœur)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="durée de chaque mesure")
+    parser.add_argument("--latency", type=float, default=0.0, help="latence simulée de chaque appel LLM (s)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    counts = sorted({min(2 ** k, args.max_workers) for k in range(args.max_workers.bit_length() + 1)})
+    processes = args.client_processes or os.cpu_count() or 1
+    llm_registry.set_factory(fake_llm_factory(latency=args.latency))
+    rows = []
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as tmp:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_preload=False,
+                  geocoding_cache_path=str(Path(tmp) / "geocoding.sqlite"),
+                  answer_cache_path=str(Path(tmp) / "answers.sqlite"), llm_cache_path=str(Path(tmp) / "llm.sqlite"))
+        app = get_agent_graph()
+        baseline = None
+        for workers in counts:
+            with PreforkServer(app, workers=workers, port=0) as server:
+                measure(server.url, args.clients, processes, min(1.0, args.seconds))  # Caches et clients chauds
+                stats = measure(server.url, args.clients, processes, args.seconds)
+            baseline = baseline or stats["qps"]
+            rows.append([workers, stats["workers"], stats["qps"], f"x{stats['qps'] / baseline:.2f}",
+                         stats["p50_ms"], stats["p95_ms"]])
+
+    print(f"{os.cpu_count()} cœurs, {args.clients} connexions sur {processes} processus clients, "
+          f"latence LLM simulée {args.latency * 1000:.0f} ms, {args.seconds:.0f} s par mesure")
+    print_table(["workers", "workers actifs", "questions/s", "gain", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
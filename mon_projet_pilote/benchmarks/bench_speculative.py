@@ -0,0 +1,88 @@
+"""
+Benchmark du mode spéculatif: chemin critique et appels LLM supplémentaires.
+
+Compare les topologies standard, fusionnée et spéculative du graphe, en
+synchrone et en asynchrone, contre un LLM factice à latence simulée et un
+serveur Open-Meteo local. Le mode spéculatif lance l'analyse, le choix de
+l'outil et les deux extractions en parallèle: la durée baisse d'environ deux
+latences LLM, au prix des extractions inutiles (ignorées, ou annulées si elles
+n'ont pas encore abouti).
+
+Usage: python benchmarks/bench_speculative.py [--latency 0.05] [--repeat 5]
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.forecast import forecast_cache
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from modules.speculative import speculative_runner
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = [
+    "Quelle est la météo à Paris ?",
+    "Combien font 12*7 ?",
+    "Qui a écrit Les Misérables ?",
+    "Quel temps fait-il à Lyon et Marseille ?",
+]
+
+
+def run(app, use_async: bool, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            if use_async:
+                result = asyncio.run(app.ainvoke({"question": question}))
+            else:
+                result = app.invoke({"question": question})
+            durations.append(time.perf_counter() - start)
+            assert result.get("answer"), result
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency)
+    llm_registry.set_factory(factory)
+    prompt_registry.clear()
+
+    rows = []
+    baseline = {}
+    with OpenMeteoStub() as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url)
+        for use_async, mode in itertools.product((False, True), ("standard", "fused", "speculative")):
+            forecast_cache.reset()
+            speculative_runner.reset()
+            factory.counter.reset()
+            durations = run(build_agent_graph(mode=mode, use_async=use_async), use_async, args.repeat)
+            stats = summarize(durations)
+            calls = factory.counter.total / len(durations)
+            baseline.setdefault(use_async, calls)
+            speculation = speculative_runner.stats()
+            rows.append([
+                mode + (" (async)" if use_async else ""), calls, f"{calls - baseline[use_async]:+.2f}",
+                speculation["discarded"], speculation["cancelled"],
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"],
+            ])
+
+    print(f"Latence LLM simulée {args.latency * 1000:.0f} ms par appel, {len(QUESTIONS)} questions x {args.repeat}")
+    print_table(
+        ["mode", "appels LLM/question", "vs standard", "ignorés", "annulés", "moyenne ms", "p50 ms", "p95 ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
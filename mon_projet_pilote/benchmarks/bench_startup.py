@@ -0,0 +1,124 @@
+"""
+Benchmark du démarrage à froid d'un worker.
+
+1. Rapport ``python -X importtime``: modules les plus coûteux à l'import du
+   package, de ``modules.graph`` et de ``modules.llm``, et présence des
+   dépendances lourdes chargées à la demande;
+2. temps jusqu'à la première réponse, chaque mesure dans un processus neuf
+   (LLM factice sans latence, serveur Open-Meteo local): imports, compilation
+   du graphe, première question, puis une seconde sur le graphe déjà compilé.
+   Le scénario « imports anticipés » charge d'abord les dépendances lourdes,
+   comme le faisait l'import du package avant leur chargement paresseux.
+   « processus complet » inclut en plus le démarrage et la sortie de
+   l'interpréteur, et l'arrêt du serveur local.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from common import PROJECT_DIR, SRC_DIR, print_table, summarize
+
+# Dépendances chargées à la demande (client Gemini, rendu du graphe, HTTP, calcul vectoriel)
+HEAVY = ("langchain_google_genai", "graphviz", "requests", "httpx", "numpy", "langgraph", "langchain_core")
+
+IMPORT_TARGETS = ("modules", "modules.llm", "modules.graph")
+
+# Exécuté dans un processus neuf; affiche les instants (s) de chaque étape en JSON
+FIRST_ANSWER = """
+import json, logging, sys, time
+start = time.perf_counter()
+{preload}
+from modules import get_agent_graph, llm_registry
+from modules.config import configure
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+imported = time.perf_counter()
+logging.getLogger("agent").setLevel(logging.WARNING)
+llm_registry.set_factory(fake_llm_factory())
+with OpenMeteoStub() as stub:
+    configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False,
+              metrics_enabled=True)
+    app = get_agent_graph()
+    built = time.perf_counter()
+    app.invoke({{"question": "Quelle est la météo à Paris ?"}})
+    first = time.perf_counter()
+    get_agent_graph().invoke({{"question": "Combien font 12*7 ?"}})
+    second = time.perf_counter()
+print(json.dumps({{"imports": imported - start, "graphe": built - imported, "première réponse": first - built,
+                  "seconde réponse": second - first, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+PRELOAD = "import graphviz, httpx, langchain_google_genai, numpy, requests"
+
+SCENARIOS = [("paresseux", ""), ("imports anticipés", PRELOAD)]
+
+
+def run_python(*args: str) -> Tuple[str, str]:
+    """Lance l'interpréteur courant avec ``src/`` et le projet (doublures de ``tests/``) dans le chemin d'import."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC_DIR), str(PROJECT_DIR)]), PYTHONWARNINGS="ignore",
+               AGENT_LOG_FILE="")
+    result = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+    return result.stdout, result.stderr
+
+
+def import_times(target: str) -> List[Tuple[str, int, int]]:
+    """(module, µs propres, µs cumulées) de chaque import, d'après ``-X importtime``."""
+    _, stderr = run_python("-X", "importtime", "-c", f"import {target}")
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="processus par scénario")
+    parser.add_argument("--top", type=int, default=15, help="modules affichés par cible")
+    args = parser.parse_args()
+
+    for target in IMPORT_TARGETS:
+        rows = import_times(target)
+        total = next(cumulative for name, _, cumulative in reversed(rows) if name == target)
+        # Coût d'un paquet: le plus gros import cumulé parmi ses sous-modules
+        loaded = {}
+        for name, _, cumulative in rows:
+            package = name.split(".")[0]
+            if package in HEAVY:
+                loaded[package] = max(loaded.get(package, 0), cumulative)
+        print(f"import {target}: {total / 1000:.1f} ms, {len(rows)} modules")
+        print("  chargés: " + (", ".join(f"{m} ({loaded[m] / 1000:.0f} ms)" for m in HEAVY if m in loaded) or "aucun"))
+        top = sorted(rows, key=lambda row: -row[1])
+        print_table(["module", "propre ms", "cumulé ms"],
+                    [[name, self_us / 1000, cumulative_us / 1000] for name, self_us, cumulative_us in top[:args.top]])
+        print()
+
+    timings: Dict[str, Dict[str, List[float]]] = {label: {} for label, _ in SCENARIOS}
+    modules = {}
+    for _ in range(args.repeat):
+        for label, preload in SCENARIOS:
+            start = time.perf_counter()
+            stdout, _ = run_python("-c", FIRST_ANSWER.format(preload=preload, heavy=HEAVY))
+            elapsed = time.perf_counter() - start
+            result = json.loads(stdout.strip().splitlines()[-1])
+            modules[label] = result.pop("modules")
+            for step, seconds in (*result.items(), ("processus complet", elapsed)):
+                timings[label].setdefault(step, []).append(seconds)
+
+    steps = list(timings[SCENARIOS[0][0]])
+    print(f"Temps jusqu'à la première réponse, p50 sur {args.repeat} processus (ms)")
+    print_table(["scénario", *steps],
+                [[label, *(summarize(timings[label][step])["p50_ms"] for step in steps)] for label, _ in SCENARIOS])
+    for label, _ in SCENARIOS:
+        print(f"  {label}: {', '.join(modules[label])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark du streaming de la réponse finale: délai avant le premier jeton.
+
+Avec ``app.invoke``, l'utilisateur ne voit rien avant la fin de la génération
+complète de la réponse. Avec ``stream_answer``, le premier fragment s'affiche
+dès que le nœud de réponse finale produit son premier jeton. Le LLM factice
+simule une latence jusqu'au premier jeton puis un délai par jeton; les appels
+météo passent par un serveur Open-Meteo local.
+
+Usage: python benchmarks/bench_streaming.py [--repeat 10] [--latency 0.05] [--token-latency 0.01]
+"""
+import argparse
+import time
+
+from common import print_table, quiet_logs, summarize
+
+from modules.config import configure
+from modules.forecast import forecast_cache
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.streaming import time_to_first_token
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = {
+    "météo": "Quelle est la météo à Paris ?",
+    "calcul": "Combien font 12*7 ?",
+    "directe": "Qui a écrit Les Misérables ?",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="exécutions par question et par méthode")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée jusqu'au premier jeton (s)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="délai simulé entre deux jetons (s)")
+    args = parser.parse_args()
+    quiet_logs()
+
+    llm_registry.set_factory(fake_llm_factory(latency=args.latency, token_latency=args.token_latency))
+    rows = []
+    with OpenMeteoStub() as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url)
+        forecast_cache.reset()
+        app = build_agent_graph()
+        for label, question in QUESTIONS.items():
+            invoke_durations, ttfts, totals = [], [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                app.invoke({"question": question})
+                invoke_durations.append(time.perf_counter() - start)
+
+                measure = time_to_first_token(app, question)
+                ttfts.append(measure["ttft"])
+                totals.append(measure["total"])
+            invoke_ms = summarize(invoke_durations)["p50_ms"]
+            ttft_ms = summarize(ttfts)["p50_ms"]
+            rows.append([
+                label, measure["tokens"], invoke_ms, ttft_ms, summarize(totals)["p50_ms"],
+                f"{1 - ttft_ms / invoke_ms:.0%}",
+            ])
+
+    print(f"Latence LLM simulée {args.latency * 1000:.0f} ms jusqu'au premier jeton, "
+          f"{args.token_latency * 1000:.0f} ms par jeton suivant; médianes sur {args.repeat} exécutions")
+    print_table(
+        ["question", "jetons", "invoke ms (1er affichage)", "stream 1er jeton ms", "stream total ms", "attente évitée"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
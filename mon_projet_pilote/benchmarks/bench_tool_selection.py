@@ -0,0 +1,56 @@
+"""
+Benchmark A/B des modes de sélection d'outil de ``choisir_outil``.
+
+Compare le mode "two_step" (choix de l'outil puis extraction de l'entrée) et le
+mode "structured" (un seul appel JSON) contre un LLM factice à latence simulée.
+
+Usage: python benchmarks/bench_tool_selection.py [--latency 0.05] [--repeat 5]
+"""
+import argparse
+
+from common import print_table, quiet_logs, summarize, time_calls
+
+from modules.config import TOOL_SELECTION_MODES, configure
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from modules.reasoning import choisir_outil
+from tests.fakes import fake_llm_factory
+
+QUESTIONS = [
+    "Quelle est la météo à Paris?",
+    "Quel temps fait-il à Lyon aujourd'hui?",
+    "Combien font 12*7 ?",
+    "Calcule (3 + 4) * 2",
+    "Qui a écrit Les Misérables ?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée par appel LLM (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logs()
+
+    factory = fake_llm_factory(latency=args.latency)
+    llm_registry.set_factory(factory)
+    prompt_registry.clear()
+
+    rows = []
+    for mode in TOOL_SELECTION_MODES:
+        configure(tool_selection=mode)
+        factory.counter.reset()
+        durations = []
+        for question in QUESTIONS:
+            state = {"question": question, "thoughts": "Réflexion préalable."}
+            durations += time_calls(lambda: choisir_outil(state), args.repeat)
+        stats = summarize(durations)
+        calls = factory.counter.total / len(durations)
+        rows.append([mode, calls, stats["mean_ms"], stats["p50_ms"], stats["p95_ms"]])
+
+    print(f"choisir_outil, latence LLM simulée {args.latency * 1000:.0f} ms, {len(QUESTIONS)} questions x {args.repeat}")
+    print_table(["mode", "appels LLM/question", "moyenne ms", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
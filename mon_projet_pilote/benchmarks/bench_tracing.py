@@ -0,0 +1,90 @@
+"""
+Benchmark du coût du traçage par question.
+
+Exécute le graphe standard (LLM factice sans latence, serveur Open-Meteo
+local, caches chauds) avec le traçage désactivé, en mémoire et vers un
+fichier JSONL, configurations alternées à chaque répétition. Un second
+tableau mesure le coût unitaire d'un span, désactivé et actif.
+
+Usage: python benchmarks/bench_tracing.py [--questions 200] [--repeat 5]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import print_table, quiet_logs, summarize, time_calls
+
+from modules.config import configure
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prompts import prompt_registry
+from modules.tracing import tracer
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+QUESTIONS = ["Quelle est la météo à Paris ?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+
+MODES = [("désactivé", "off"), ("collecteur en mémoire", "memory"), ("fichier JSONL", "jsonl")]
+
+
+def set_mode(mode: str, path: str):
+    """Active le mode de traçage et reconstruit le graphe (les nœuds sont enveloppés à la construction)."""
+    configure(trace_mode=mode, trace_path=path)
+    tracer.reset()
+    prompt_registry.clear()
+    return build_agent_graph()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200, help="questions par mesure")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logs()
+
+    llm_registry.set_factory(fake_llm_factory())
+    durations = {label: [] for label, _ in MODES}
+    spans = {}
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as tmp:
+        configure(geocoding_url=stub.url, forecast_url=stub.url, geocoding_cache_path="", geocoding_preload=False)
+        path = str(Path(tmp) / "traces.jsonl")
+        for _, mode in MODES:
+            app = set_mode(mode, path)
+            for question in QUESTIONS:
+                app.invoke({"question": question})  # Caches et clients chauds
+
+        for _ in range(args.repeat):
+            for label, mode in MODES:
+                app = set_mode(mode, path)
+                start = time.perf_counter()
+                for i in range(args.questions):
+                    with tracer.span("question", "question"):
+                        app.invoke({"question": QUESTIONS[i % len(QUESTIONS)]})
+                durations[label].append((time.perf_counter() - start) / args.questions)
+                spans[label] = sum(v for k, v in tracer.stats().items() if k != "mode") / args.questions
+
+        # Coût unitaire d'un span
+        def one_thousand_spans():
+            for _ in range(1000):
+                with tracer.span("/v1/forecast", "http", host="localhost") as span:
+                    span.set(status=200)
+
+        unit = {}
+        for label, mode in MODES:
+            set_mode(mode, path)
+            unit[label] = summarize(time_calls(one_thousand_spans, 20))["mean_ms"]  # ms/1000 = µs par span
+        set_mode("off", path)
+
+    baseline = summarize(durations[MODES[0][0]])["mean_ms"]
+    rows = []
+    for label, _ in MODES:
+        stats = summarize(durations[label])
+        rows.append([label, spans[label], stats["mean_ms"], stats["p50_ms"],
+                     f"{stats['mean_ms'] - baseline:+.3f}", unit[label]])
+
+    print(f"{args.questions} questions x {args.repeat}, LLM factice sans latence")
+    print_table(["traçage", "spans/question", "moyenne ms/question", "p50 ms/question", "écart ms", "µs/span"], rows)
+
+
+if __name__ == "__main__":
+    main()
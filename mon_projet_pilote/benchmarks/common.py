@@ -0,0 +1,56 @@
+"""
+Utilitaires partagés par les benchmarks de l'agent.
+"""
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+# Les benchmarks importent le package `modules` depuis src/, et les doublures (LLM factice,
+# serveur Open-Meteo local) depuis tests/fakes.py
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_DIR / "src"
+for path in (PROJECT_DIR, SRC_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Percentiles: implémentation unique, celle du bilan des lots
+from modules.batch import percentile
+
+
+def quiet_logs() -> None:
+    """Réduit le bruit des logs de l'agent pendant les mesures."""
+    for name in ("agent", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> List[float]:
+    """Exécute ``func`` ``repeat`` fois et renvoie les durées en secondes."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: Sequence[float]) -> Dict[str, float]:
+    """Résumé (en millisecondes) d'une série de durées."""
+    return {
+        "mean_ms": statistics.fmean(durations) * 1000 if durations else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+    }
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]) -> None:
+    """Affiche un tableau aligné en texte brut."""
+    cells = [[f"{c:.3f}" if isinstance(c, float) else str(c) for c in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)))
@@ -1,69 +1,89 @@
 """
 Point d'entrée principal pour l'agent LangGraph.
+
+Usage: python src/main.py ["question"] [--stream]
 """
+import argparse
 import sys
 import time
 from dotenv import load_dotenv
-from langgraph.graph import StateGraph, END
 
-from modules import (
-    AgentState,
-    build_agent_graph,
-    print_graph_structure,
-    visualize_graph
-)
-from modules.reasoning import (
-    analyser,
-    choisir_outil,
-    appeler_météo,
-    appeler_calculatrice,
-    réponse_directe,
-    formuler_réponse,
-    router
-)
-from modules.errors import logger, GraphExecutionError, safe_execute
+from modules import get_agent_graph, llm_registry, model_tiers, intent_classifier
+from modules.errors import logger
+from modules.logging_setup import configure_logging
+from modules.streaming import stream_answer
+from modules.tracing import tracer
 
 # Charger les variables d'environnement
 load_dotenv()
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("question", nargs="?", default="Quelle est la météo à Paris?", help="question posée à l'agent")
+    parser.add_argument("--stream", action="store_true",
+                        help="afficher la progression puis la réponse jeton par jeton, au fil de la génération")
+    return parser.parse_args(argv)
+
+def afficher_en_continu(app, question: str) -> str:
+    """Affiche la progression des nœuds puis les jetons de la réponse dès leur arrivée.
+    
+    Returns:
+        Réponse complète
+    """
+    parts = []
+    start_time = time.perf_counter()
+    first_token_time = None
+    for event in stream_answer(app, question):
+        if event.kind == "progress":
+            print(f"[{event.text}]", flush=True)
+            continue
+        if first_token_time is None:
+            first_token_time = time.perf_counter() - start_time
+            print("Réponse: ", end="", flush=True)
+        print(event.text, end="", flush=True)
+        parts.append(event.text)
+    print()
+    if first_token_time is not None:
+        print(f"Premier jeton après {first_token_time:.2f} secondes")
+    return "".join(parts)
+
+def main(argv=None):
     """Point d'entrée principal du programme."""
+    args = parse_args(argv)
+    configure_logging()
     try:
         logger.info("Démarrage de l'agent")
         
-        # Construire un graph simple pour le test
-        workflow = StateGraph(AgentState)
-        workflow.add_node("analyser", analyser)
-        workflow.add_node("choisir_outil", choisir_outil)
-        workflow.add_node("appeler_météo", appeler_météo)
-        workflow.add_node("appeler_calculatrice", appeler_calculatrice)
-        workflow.add_node("réponse_directe", réponse_directe)
-        workflow.add_node("formuler_réponse", formuler_réponse)
+        # Préchauffage des clients LLM des modèles utilisés par les nœuds
+        llm_registry.warm_up(model_tiers.configs())
+        intent_classifier.load()
         
-        workflow.set_entry_point("analyser")
-        workflow.add_edge("analyser", "choisir_outil")
-        workflow.add_conditional_edges("choisir_outil", router)
-        workflow.add_edge("appeler_météo", "formuler_réponse")
-        workflow.add_edge("appeler_calculatrice", "formuler_réponse")
-        workflow.add_edge("réponse_directe", END)
-        workflow.add_edge("formuler_réponse", END)
-        
-        app = workflow.compile()
+        # Graphe standard, compilé une seule fois par processus
+        app = get_agent_graph()
         
         # Test simple
-        question = "Quelle est la météo à Paris?"
+        question = args.question
         print(f"Test avec la question: {question}")
         
         start_time = time.time()
-        result = app.invoke({"question": question})
-        execution_time = time.time() - start_time
-        
-        print(f"Exécution en {execution_time:.2f} secondes")
-        print(f"Réponse: {result.get('answer', 'Pas de réponse')}")
+        if args.stream:
+            with tracer.span("question", "question"):
+                afficher_en_continu(app, question)
+            execution_time = time.time() - start_time
+            print(f"Exécution en {execution_time:.2f} secondes")
+        else:
+            with tracer.span("question", "question"):
+                result = app.invoke({"question": question})
+            execution_time = time.time() - start_time
+            
+            print(f"Exécution en {execution_time:.2f} secondes")
+            print(f"Réponse: {result.get('answer', 'Pas de réponse')}")
+        logger.info("Statistiques du registre LLM: %s", llm_registry.stats())
         
         return 0
     except Exception as e:
-        logger.error(f"Erreur: {str(e)}")
+        logger.error("Erreur: %s", e)
         print(f"Une erreur s'est produite: {str(e)}")
         return 1
 
@@ -1,23 +1,69 @@
 """
 Package modules pour l'agent LangGraph.
+
+Les noms exportés sont chargés à la première utilisation (PEP 562): importer
+le package, ou l'un de ses sous-modules légers comme ``modules.config``,
+n'importe ni LangGraph ni les clients LLM et HTTP.
 """
+import importlib
+import sys
+import types
+
+# Sous-module de définition de chaque nom exporté
+_EXPORTS = {
+    'AgentState': 'state',
+    **dict.fromkeys((
+        'recherche_météo', 'recherche_météo_multi', 'calculatrice', 'calculatrice_lot',
+        'arecherche_météo', 'arecherche_météo_multi', 'acalculatrice'
+    ), 'tools'),
+    **dict.fromkeys(('build_agent_graph', 'get_agent_graph', 'CompiledGraphs', 'compiled_graphs'), 'graph'),
+    **dict.fromkeys(('FastPathClassifier', 'fast_path_classifier'), 'fast_path'),
+    **dict.fromkeys(('IntentClassifier', 'IntentModel', 'intent_classifier'), 'intent'),
+    **dict.fromkeys(('SpeculativeRunner', 'speculative_runner'), 'speculative'),
+    **dict.fromkeys(('WeatherPrefetcher', 'weather_prefetcher'), 'prefetch'),
+    **dict.fromkeys(('AnswerCache', 'answer_cache'), 'answer_cache'),
+    **dict.fromkeys(('AgentConfig', 'get_config', 'configure'), 'config'),
+    **dict.fromkeys(('LLMRegistry', 'llm_registry', 'get_llm', 'aget_llm'), 'llm'),
+    **dict.fromkeys(('LLMCache', 'llm_cache'), 'llm_cache'),
+    **dict.fromkeys(('ModelTiers', 'model_tiers'), 'model_tiers'),
+    **dict.fromkeys(('StreamEvent', 'stream_answer', 'astream_answer'), 'streaming'),
+    **dict.fromkeys(('print_graph_structure', 'visualize_graph'), 'visualization'),
+    **dict.fromkeys((
+        'AgentError', 'ToolExecutionError', 'LLMResponseError', 'GraphExecutionError',
+        'InputValidationError', 'LLMCacheMissError', 'logger', 'handle_tool_errors',
+        'handle_state_errors', 'validate_input', 'safe_execute', 'asafe_execute'
+    ), 'errors'),
+    **dict.fromkeys(('configure_logging', 'shutdown_logging'), 'logging_setup'),
+    **dict.fromkeys(('Tracer', 'tracer', 'trace_node'), 'tracing'),
+    **dict.fromkeys(('MetricsRegistry', 'MetricsServer', 'metrics', 'start_metrics_server'), 'metrics'),
+    **dict.fromkeys(('PreforkServer', 'answer_question'), 'server'),
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    setattr(sys.modules[__name__], name, value)
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    """Module du package: un sous-module homonyme d'un export (``answer_cache``,
+    ``metrics``) ne remplace pas l'objet exporté à son import."""
 
-from .state import AgentState
-from .tools import recherche_météo, calculatrice
-from .graph import build_agent_graph
-from .visualization import print_graph_structure, visualize_graph
-from .errors import (
-    AgentError, 
-    ToolExecutionError, 
-    LLMResponseError, 
-    GraphExecutionError,
-    InputValidationError,
-    logger,
-    handle_tool_errors,
-    handle_state_errors,
-    validate_input,
-    safe_execute
-)
+    def __setattr__(self, name, value):
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == name:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
 
 __all__ = [
     # Types et structures
@@ -26,9 +72,46 @@ __all__ = [
     # Outils
     'recherche_météo',
     'calculatrice',
+    'calculatrice_lot',
+    'arecherche_météo',
+    'recherche_météo_multi',
+    'arecherche_météo_multi',
+    'acalculatrice',
+    
+    # Configuration
+    'AgentConfig',
+    'get_config',
+    'configure',
+    
+    # LLM mutualisés
+    'LLMRegistry',
+    'llm_registry',
+    'get_llm',
+    'aget_llm',
+    'LLMCache',
+    'llm_cache',
+    'ModelTiers',
+    'model_tiers',
     
     # Fonctions principales
     'build_agent_graph',
+    'get_agent_graph',
+    'CompiledGraphs',
+    'compiled_graphs',
+    'FastPathClassifier',
+    'fast_path_classifier',
+    'IntentClassifier',
+    'IntentModel',
+    'intent_classifier',
+    'SpeculativeRunner',
+    'speculative_runner',
+    'WeatherPrefetcher',
+    'weather_prefetcher',
+    'AnswerCache',
+    'answer_cache',
+    'StreamEvent',
+    'stream_answer',
+    'astream_answer',
     'print_graph_structure',
     'visualize_graph',
     
@@ -38,9 +121,30 @@ __all__ = [
     'LLMResponseError',
     'GraphExecutionError',
     'InputValidationError',
+    'LLMCacheMissError',
     'logger',
     'handle_tool_errors',
     'handle_state_errors',
     'validate_input',
-    'safe_execute'
-] 
\ No newline at end of file
+    'safe_execute',
+    'asafe_execute',
+
+    # Journalisation
+    'configure_logging',
+    'shutdown_logging',
+
+    # Traçage
+    'Tracer',
+    'tracer',
+    'trace_node',
+
+    # Métriques
+    'MetricsRegistry',
+    'MetricsServer',
+    'metrics',
+    'start_metrics_server',
+
+    # Serveur pré-fork
+    'PreforkServer',
+    'answer_question'
+]
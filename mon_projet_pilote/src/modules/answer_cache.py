@@ -0,0 +1,429 @@
+"""
+Cache des réponses de l'agent, en tête du graphe compilé.
+
+Une question déjà posée (« Quelle est la météo à Paris ? », « quelle est la
+meteo a paris ») est servie sans repasser par les nœuds LLM ni par les outils:
+
+- correspondance exacte: la question normalisée (casse, accents, ponctuation)
+  sert de clé à un LRU en mémoire borné en octets, devant une base SQLite
+  partagée par les processus de la machine, bornée elle aussi en octets;
+- correspondance sémantique (optionnelle): les questions en cache sont
+  représentées par des vecteurs calculés localement (mots et trigrammes de
+  caractères hachés) dans un index en mémoire. Une question proche au-delà du
+  seuil réutilise la réponse d'un outil si les deux questions ne diffèrent
+  que par le vocabulaire neutre de la voie rapide (« quel temps fait-il »,
+  « météo », « combien font »): mêmes mots entiers, nombres et opérateurs
+  par ailleurs. Les réponses directes ne sont servies qu'à l'identique.
+
+La durée de vie d'une réponse dépend de l'outil qui l'a produite: courte pour
+la météo, illimitée pour un calcul, longue pour une réponse directe.
+"""
+import functools
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import MISS, TTLCache
+from .config import get_config
+from .errors import logger
+
+# Champs de l'état conservés avec la réponse
+CACHED_FIELDS = ("answer", "tool_name", "tool_input", "observation")
+
+EMBEDDING_DIM = 512
+
+_PUNCTUATION = re.compile(r"[^\w+\-*/%().,]+")
+_DECIMAL_COMMA = re.compile(r"(?<=\d),(?=\d)")
+_LOOSE_POINTS = re.compile(r"(?<!\d)[.,]|[.,](?!\d)")
+_WORD_HYPHENS = re.compile(r"(?<=[^\W\d])-|-(?=[^\W\d])")
+# Nombres, opérateurs et mots entiers d'une question normalisée
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[+\-*/%()]|[^\W\d_]+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalise une question pour l'utiliser comme clé de cache.
+
+    Args:
+        question: Question telle que posée
+
+    Returns:
+        Question sans accents, en minuscules, sans ponctuation; chiffres,
+        opérateurs et séparateurs décimaux conservés (« 2+2 » et « 2*2 »
+        restent distincts, « 1,5 » devient « 1.5 »)
+    """
+    text = unicodedata.normalize("NFKD", question)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = _DECIMAL_COMMA.sub(".", _PUNCTUATION.sub(" ", text))
+    text = _WORD_HYPHENS.sub(" ", _LOOSE_POINTS.sub(" ", text))
+    return " ".join(text.split())
+
+
+@functools.lru_cache(maxsize=None)
+def _neutral_words() -> frozenset:
+    """Vocabulaire de la voie rapide autour d'un calcul ou d'une météo, sans effet sur la réponse."""
+    from .fast_path import CALCULATOR_WORDS, WEATHER_WORDS  # Importe les outils (langchain_core)
+
+    return frozenset(
+        word for text in CALCULATOR_WORDS | WEATHER_WORDS for word in _TOKEN.findall(normalize_question(text))
+    )
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Vecteur unitaire d'une question normalisée: mots et trigrammes de caractères hachés.
+
+    Le hachage (CRC32) est stable d'un processus à l'autre.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in text.split():
+        vector[zlib.crc32(f"w:{word}".encode()) % dim] += 1.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % dim] += 0.5
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Index en mémoire de vecteurs unitaires, recherche exhaustive du plus proche voisin.
+
+    Au-delà de ``capacity`` vecteurs, les plus anciens sont remplacés.
+    """
+
+    def __init__(self, capacity: int, dim: int = EMBEDDING_DIM):
+        if capacity < 1:
+            raise ValueError("capacity doit être >= 1")
+        self.capacity = capacity
+        self._vectors = np.zeros((min(capacity, 64), dim), dtype=np.float32)
+        self._keys: List[Optional[str]] = []
+        self._positions: Dict[str, int] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        """Ajoute (ou remplace) le vecteur d'une clé."""
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                if len(self._keys) < self.capacity:
+                    position = len(self._keys)
+                    self._keys.append(key)
+                    if position >= len(self._vectors):
+                        grown = np.zeros((min(self.capacity, 2 * len(self._vectors)), self._vectors.shape[1]),
+                                         dtype=np.float32)
+                        grown[:position] = self._vectors
+                        self._vectors = grown
+                else:
+                    position = self._next
+                    self._next = (self._next + 1) % self.capacity
+                    replaced = self._keys[position]
+                    if replaced is not None:
+                        del self._positions[replaced]
+                    self._keys[position] = key
+                self._positions[key] = position
+            self._vectors[position] = vector
+
+    def remove(self, key: str) -> None:
+        """Retire une clé de l'index (entrée expirée ou évincée)."""
+        with self._lock:
+            position = self._positions.pop(key, None)
+            if position is not None:
+                self._keys[position] = None
+                self._vectors[position] = 0.0
+
+    def search(self, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Renvoie la clé la plus proche et sa similarité cosinus, ou None si l'index est vide."""
+        with self._lock:
+            if not self._positions:
+                return None
+            scores = self._vectors[:len(self._keys)] @ vector
+            best = int(np.argmax(scores))
+            key = self._keys[best]
+            return None if key is None else (key, float(scores[best]))
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+def _entities(question: str) -> Tuple[str, ...]:
+    """Ce qui détermine la réponse d'une question normalisée: nombres, opérateurs et mots hors vocabulaire neutre.
+
+    « météo à paris », « météo à paris et à lyon », « météo à parisot » et
+    « météo à paris demain » donnent (paris), (paris, et, lyon), (parisot)
+    et (paris, demain).
+    """
+    neutral = _neutral_words()
+    return tuple(token for token in _TOKEN.findall(question) if token not in neutral)
+
+
+def _same_entities(question: str, cached_question: str, entry: Dict[str, Any]) -> bool:
+    """Garde-fou du niveau sémantique: réponse d'un outil, et mêmes entités dans les deux questions.
+
+    Les réponses directes n'ont pas d'entrée d'outil à comparer: elles ne
+    sont servies que par le niveau exact.
+    """
+    if not entry.get("tool_name") or not entry.get("tool_input"):
+        return False
+    return _entities(question) == _entities(cached_question)
+
+
+class AnswerCache:
+    """Cache des réponses: mémoire puis SQLite, correspondance exacte puis sémantique.
+
+    Les paramètres (chemin de la base, budget en octets, durées de vie par
+    outil, seuil sémantique) sont lus dans la configuration à la première
+    utilisation; ``reset()`` les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: Optional[TTLCache] = None
+        self._index: Optional[VectorIndex] = None
+        self._path = ""
+        self._max_bytes = 0
+        self._ttls: Dict[Optional[str], float] = {}
+        self._direct_ttl = 0.0
+        self._threshold = 0.0
+        # Une seule connexion SQLite par processus, sérialisée par son propre verrou
+        self._database_lock = threading.Lock()
+        self._database_connection: Optional[sqlite3.Connection] = None
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> TTLCache:
+        with self._lock:
+            if self._memory is not None:
+                return self._memory
+            config = get_config()
+            self._path = config.answer_cache_path
+            self._max_bytes = config.answer_cache_max_bytes
+            self._ttls = {
+                "recherche_météo": config.answer_cache_weather_ttl,
+                "calculatrice": config.answer_cache_calculator_ttl,
+            }
+            self._direct_ttl = config.answer_cache_direct_ttl
+            self._threshold = config.answer_cache_semantic_threshold
+            self._index = VectorIndex(config.answer_cache_semantic_size) if self._threshold else None
+            memory = self._memory = TTLCache(capacity=sys.maxsize, max_bytes=self._max_bytes)
+        if self._index is not None:
+            self._load_index()
+        return memory
+
+    @contextmanager
+    def _database(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """Prête la connexion SQLite du processus (None si le disque est désactivé).
+
+        Partagée par tous les threads et utilisée sous verrou, pour que les
+        threads éphémères du serveur n'ouvrent pas chacun la leur.
+        """
+        self._setup()
+        if not self._path:
+            yield None
+            return
+        with self._database_lock:
+            if self._database_connection is None:
+                directory = os.path.dirname(self._path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = sqlite3.connect(self._path, timeout=5.0, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")  # Lectures concurrentes entre processus
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, size INTEGER, last_access REAL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access)")
+                connection.commit()
+                self._database_connection = connection
+            yield self._database_connection
+
+    def _load_index(self) -> None:
+        """Indexe les questions encore valides de la base (réponses écrites par d'autres processus)."""
+        with self._database() as connection:
+            if connection is None:
+                return
+            try:
+                rows = connection.execute(
+                    "SELECT key FROM answers WHERE expires_at IS NULL OR expires_at > ? "
+                    "ORDER BY last_access DESC LIMIT ?",
+                    (time.time(), self._index.capacity)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Lecture du cache des réponses impossible: %s", e)
+                return
+        for (key,) in reversed(rows):
+            self._index.add(key, embed(key))
+
+    def _record(self, event: str, count: int = 1) -> None:
+        with self._lock:
+            self._counts[event] += count
+
+    def ttl_for(self, tool_name: Optional[str]) -> float:
+        """Durée de vie d'une réponse produite par cet outil (inf: pas d'expiration, 0: pas de cache)."""
+        self._setup()
+        return self._ttls.get(tool_name, self._direct_ttl)
+
+    def _read(self, key: str) -> Any:
+        """Cherche une entrée en mémoire puis sur disque; renvoie (entrée, niveau) ou ``MISS``."""
+        memory = self._setup()
+        entry = memory.get(key)
+        if entry is not MISS:
+            return entry, "memory_hits"
+
+        with self._database() as connection:
+            if connection is None:
+                return MISS
+            try:
+                row = connection.execute("SELECT value, expires_at, size FROM answers WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return MISS
+                value, expires_at, size = row
+                ttl = None if expires_at is None else expires_at - time.time()
+                if ttl is not None and ttl <= 0:
+                    return MISS
+                with connection:
+                    connection.execute("UPDATE answers SET last_access = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                logger.warning("Lecture du cache des réponses impossible: %s", e)
+                return MISS
+        entry = json.loads(value)
+        memory.set(key, entry, ttl=ttl, size=size)
+        return entry, "disk_hits"
+
+    def lookup(self, question: str) -> Optional[Dict[str, Any]]:
+        """Cherche une réponse en cache pour une question.
+
+        Args:
+            question: Question de l'utilisateur
+
+        Returns:
+            Champs d'état de la réponse (``answer``, ``tool_name``, ``tool_input``,
+            ``observation``) et ``cache_hit`` ("exact" ou "semantic"), ou None
+        """
+        key = normalize_question(question)
+        if not key:
+            return None
+        self._setup()
+        found = self._read(key)
+        if found is not MISS:
+            entry, level = found
+            self._record(level)
+            return {**entry, "cache_hit": "exact"}
+
+        if self._index is not None:
+            match = self._index.search(embed(key))
+            if match is not None and match[1] >= self._threshold:
+                candidate, score = match
+                found = self._read(candidate)
+                if found is MISS:
+                    self._index.remove(candidate)
+                elif _same_entities(key, candidate, found[0]):
+                    self._record("semantic_hits")
+                    logger.info("Réponse en cache pour une question proche (%.2f): %s", score, candidate)
+                    return {**found[0], "cache_hit": "semantic"}
+
+        self._record("misses")
+        return None
+
+    def store(self, question: str, state: Dict[str, Any]) -> bool:
+        """Met en cache la réponse finale d'une exécution réussie.
+
+        Args:
+            question: Question de l'utilisateur
+            state: État final du graphe
+
+        Returns:
+            True si la réponse a été mise en cache
+        """
+        if state.get("error") or state.get("fallback_used") or not state.get("answer"):
+            return False
+        key = normalize_question(question)
+        ttl = self.ttl_for(state.get("tool_name"))
+        if not key or ttl <= 0:
+            return False
+        ttl = None if math.isinf(ttl) else ttl
+
+        entry = {field: state.get(field) for field in CACHED_FIELDS}
+        value = json.dumps(entry, ensure_ascii=False)
+        size = len(key.encode()) + len(value.encode())
+        self._setup().set(key, entry, ttl=ttl, size=size)
+        if self._index is not None:
+            self._index.add(key, embed(key))
+        self._record("stores")
+
+        now = time.time()
+        with self._database() as connection:
+            if connection is None:
+                return True
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                        (key, value, None if ttl is None else now + ttl, size, now)
+                    )
+                    self._enforce_budget(connection, now)
+            except sqlite3.Error as e:
+                logger.warning("Écriture du cache des réponses impossible: %s", e)
+        return True
+
+    def _enforce_budget(self, connection: sqlite3.Connection, now: float) -> None:
+        """Ramène la base sous le budget: entrées expirées, puis les moins récemment lues."""
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        expired = connection.execute(
+            "DELETE FROM answers WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        excess = connection.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0] - self._max_bytes
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM answers ORDER BY last_access"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        connection.executemany("DELETE FROM answers WHERE key = ?", victims)
+        self._record("disk_evictions", expired + len(victims))
+
+    def stats(self) -> Dict[str, Any]:
+        """Renvoie les compteurs du cache et le taux de réponses servies depuis le cache."""
+        with self._lock:
+            counts = dict(self._counts)
+            memory = self._memory.stats() if self._memory is not None else {}
+        hits = sum(counts.get(level, 0) for level in ("memory_hits", "disk_hits", "semantic_hits"))
+        lookups = hits + counts.get("misses", 0)
+        return {
+            "memory_hits": counts.get("memory_hits", 0),
+            "disk_hits": counts.get("disk_hits", 0),
+            "semantic_hits": counts.get("semantic_hits", 0),
+            "misses": counts.get("misses", 0),
+            "stores": counts.get("stores", 0),
+            "memory_evictions": memory.get("evictions", 0),
+            "disk_evictions": counts.get("disk_evictions", 0),
+            "entries": memory.get("entries", 0),
+            "bytes": memory.get("bytes", 0),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    def reset(self) -> None:
+        """Vide le cache mémoire et l'index, ferme la base; la configuration sera relue à la prochaine utilisation."""
+        with self._database_lock:
+            if self._database_connection is not None:
+                self._database_connection.close()
+                self._database_connection = None
+        with self._lock:
+            self._memory = None
+            self._index = None
+            self._counts.clear()
+
+
+# Cache partagé par les graphes du processus
+answer_cache = AnswerCache()
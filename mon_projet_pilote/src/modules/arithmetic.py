@@ -0,0 +1,218 @@
+"""
+Moteur d'évaluation arithmétique sûr pour la calculatrice.
+
+Remplace ``eval``: l'expression est analysée une seule fois en AST, seuls les
+nombres et les opérateurs arithmétiques sont acceptés, puis l'arbre est compilé
+en fonctions Python imbriquées. Les expressions compilées sont gardées dans un
+LRU indexé par le texte normalisé. Des limites (nombre de nœuds, taille des
+exposants, magnitude des résultats) empêchent une entrée comme ``9**9**9`` de
+monopoliser un cœur.
+"""
+import ast
+import math
+import operator
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Union
+
+from .errors import ExpressionError, ExpressionLimitError
+
+Number = Union[int, float]
+
+BINARY_OPERATORS: Dict[type, Callable[[Number, Number], Number]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATORS: Dict[type, Callable[[Number], Number]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def normalize_expression(expression: str) -> str:
+    """Forme canonique d'une expression: espaces réduits, virgule décimale remplacée par un point.
+
+    Les espaces internes sont conservés (réduits à un seul): « 1 2 » reste une erreur de syntaxe.
+    """
+    return " ".join(expression.split()).replace(",", ".")
+
+
+class CompiledExpression:
+    """Expression analysée et validée, prête à être évaluée."""
+
+    __slots__ = ("text", "tree", "_evaluate")
+
+    def __init__(self, text: str, tree: ast.expr, evaluate: Callable[[], Number]):
+        self.text = text
+        self.tree = tree
+        self._evaluate = evaluate
+
+    def evaluate(self) -> Number:
+        """Évalue l'expression.
+
+        Raises:
+            ZeroDivisionError: Division ou modulo par zéro
+            ExpressionLimitError: Résultat intermédiaire hors limites
+        """
+        return self._evaluate()
+
+
+class ArithmeticEngine:
+    """Évaluateur arithmétique à base d'AST avec limites et cache de compilation."""
+
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        max_nodes: int = 100,
+        max_result_bits: int = 4096,
+        max_exponent: int = 10_000
+    ):
+        """Initialise le moteur.
+
+        Args:
+            cache_size: Nombre d'expressions compilées conservées (LRU)
+            max_nodes: Nombre maximal de nœuds de l'AST (borne le nombre d'étapes d'évaluation)
+            max_result_bits: Taille maximale, en bits, d'un entier intermédiaire ou final
+            max_exponent: Valeur absolue maximale d'un exposant
+        """
+        self.cache_size = cache_size
+        self.max_nodes = max_nodes
+        self.max_result_bits = max_result_bits
+        self.max_exponent = max_exponent
+        self._cache: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def parse(self, expression: str) -> ast.expr:
+        """Analyse une expression et vérifie qu'elle ne contient que de l'arithmétique.
+
+        Raises:
+            SyntaxError: Expression mal formée
+            ExpressionError: Construction non autorisée (nom, appel, attribut...)
+            ExpressionLimitError: Expression trop grande
+        """
+        tree = ast.parse(expression, mode="eval").body
+        nodes = 0
+        for node in ast.walk(tree):
+            nodes += 1
+            if isinstance(node, ast.Constant):
+                if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                    raise ExpressionError(f"Constante non numérique: {node.value!r}")
+            elif isinstance(node, ast.BinOp):
+                if type(node.op) not in BINARY_OPERATORS:
+                    raise ExpressionError(f"Opérateur non autorisé: {type(node.op).__name__}")
+            elif isinstance(node, ast.UnaryOp):
+                if type(node.op) not in UNARY_OPERATORS:
+                    raise ExpressionError(f"Opérateur non autorisé: {type(node.op).__name__}")
+            elif not isinstance(node, (ast.operator, ast.unaryop)):
+                raise ExpressionError(f"Élément non autorisé: {type(node).__name__}")
+        if nodes > self.max_nodes:
+            raise ExpressionLimitError(f"Expression trop complexe ({nodes} nœuds, max {self.max_nodes})")
+        return tree
+
+    def _check(self, value: Number) -> Number:
+        """Vérifie la magnitude d'un résultat intermédiaire."""
+        if isinstance(value, int):
+            if value.bit_length() > self.max_result_bits:
+                raise ExpressionLimitError("Résultat trop grand")
+        elif isinstance(value, float) and math.isinf(value):
+            raise ExpressionLimitError("Résultat trop grand")
+        return value
+
+    def power(self, base: Number, exponent: Number) -> Number:
+        """Puissance bornée: l'exposant et la taille estimée du résultat sont vérifiés avant le calcul."""
+        if abs(exponent) > self.max_exponent:
+            raise ExpressionLimitError(f"Exposant trop grand ({exponent})")
+        if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+            if (abs(base).bit_length() - 1) * exponent > self.max_result_bits:
+                raise ExpressionLimitError("Résultat trop grand")
+        try:
+            return base ** exponent
+        except OverflowError as e:
+            raise ExpressionLimitError("Résultat trop grand") from e
+
+    def _compile(self, node: ast.expr) -> Callable[[], Number]:
+        """Compile un nœud validé en fonction sans argument."""
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda: value
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self._compile(node.operand)
+            op = UNARY_OPERATORS[type(node.op)]
+            return lambda: op(operand())
+
+        left, right = self._compile(node.left), self._compile(node.right)
+        check = self._check
+        if isinstance(node.op, ast.Pow):
+            power = self.power
+            return lambda: check(power(left(), right()))
+        op = BINARY_OPERATORS[type(node.op)]
+
+        def binary() -> Number:
+            try:
+                return check(op(left(), right()))
+            except OverflowError as e:
+                raise ExpressionLimitError("Résultat trop grand") from e
+        return binary
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Renvoie l'expression compilée, depuis le cache si elle a déjà été vue.
+
+        Raises:
+            SyntaxError: Expression mal formée
+            ExpressionError: Construction non autorisée ou limite dépassée
+        """
+        text = normalize_expression(expression)
+        with self._lock:
+            compiled = self._cache.get(text)
+            if compiled is not None:
+                self._cache.move_to_end(text)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+
+        tree = self.parse(text)
+        compiled = CompiledExpression(text, tree, self._compile(tree))
+        with self._lock:
+            self._cache[text] = compiled
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def evaluate(self, expression: str) -> Number:
+        """Compile (ou retrouve) puis évalue une expression.
+
+        Args:
+            expression: Expression arithmétique (virgule ou point décimal)
+
+        Returns:
+            Résultat numérique
+
+        Raises:
+            SyntaxError: Expression mal formée
+            ZeroDivisionError: Division ou modulo par zéro
+            ExpressionError: Construction non autorisée ou limite dépassée
+        """
+        return self.compile(expression).evaluate()
+
+    def clear(self) -> None:
+        """Vide le cache de compilation et remet les compteurs à zéro."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs du cache de compilation."""
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self._hits, "misses": self._misses}
+
+
+# Moteur partagé par la calculatrice
+arithmetic_engine = ArithmeticEngine()
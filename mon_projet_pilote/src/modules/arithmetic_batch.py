@@ -0,0 +1,274 @@
+"""
+Évaluation vectorisée de lots d'expressions pour la calculatrice.
+
+Les expressions d'un lot sont regroupées par forme: mêmes opérateurs et mêmes
+parenthèses, seules les constantes changent (« 12*7 + 3 » et « 5*2 + 1 »). La
+forme est obtenue en remplaçant chaque nombre par un marqueur typé (``0`` pour
+un entier, ``0.0`` pour un décimal); elle n'est analysée et compilée qu'une
+fois, puis appliquée à des colonnes NumPy contenant les constantes du groupe.
+
+Le résultat de chaque élément est identique à celui du moteur scalaire: toute
+ligne dont le calcul vectoriel n'est pas garanti exact (division par zéro,
+valeur non finie, entier au-delà de 2**53, exposant négatif ou hors limites)
+est recalculée par ``ArithmeticEngine``, qui produit le résultat ou l'erreur
+habituels. Les groupes trop petits et les écritures que le découpage rapide ne
+reconnaît pas (``1_000``, ``0x10``...) passent aussi par le moteur scalaire.
+"""
+import ast
+import math
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .arithmetic import ArithmeticEngine, Number, arithmetic_engine, normalize_expression
+
+# Tous les entiers sont exacts en float64 sous 2**53; au-delà (2**53 inclus, qui est aussi
+# l'arrondi de 2**53 + 1), le résultat est ambigu et confié au moteur scalaire
+EXACT_INT_LIMIT = float(2 ** 53)
+
+NUMBER_RE = re.compile(r"((?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+)|(0|[1-9]\d*)")
+FLOAT_RE = re.compile(r"(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+")
+# Entiers canoniques: « 01 » donne deux constantes, donc une forme invalide laissée au moteur scalaire
+INT_RE = re.compile(r"0|[1-9]\d*")
+EXPRESSION_CHARS = frozenset("0123456789eE.+-*/%() ")
+TEMPLATE_CHARS = frozenset("0f.+-*/%() ")
+
+# Fonction vectorielle d'un nœud: colonnes de constantes -> (valeurs, lignes à recalculer)
+Columns = Sequence[np.ndarray]
+VectorFunction = Callable[[Columns], Tuple[np.ndarray, np.ndarray]]
+
+BatchResult = Union[Number, Exception]
+
+
+def split_constants(expression: str) -> Tuple[str, List[Number]]:
+    """Sépare une expression normalisée en forme et constantes (dans l'ordre du texte).
+
+    Returns:
+        La forme (nombres remplacés par ``0`` ou ``0.0``) et les constantes,
+        ou une forme vide si l'écriture n'est pas reconnue
+    """
+    if not EXPRESSION_CHARS.issuperset(expression):
+        return "", []
+    template = INT_RE.sub(" 0 ", FLOAT_RE.sub(" f ", expression))
+    if not TEMPLATE_CHARS.issuperset(template):
+        return "", []
+    constants = [float(f) if f else int(i) for f, i in NUMBER_RE.findall(expression)]
+    return template.replace("f", "0.0").strip(), constants
+
+
+def _libm_power(base: np.ndarray, exponent: np.ndarray) -> np.ndarray:
+    """Puissance décimale élément par élément via ``math.pow``.
+
+    ``np.power`` sur des float64 peut différer d'une unité sur le dernier chiffre
+    de la fonction ``pow`` de la libm, utilisée par l'opérateur ``**`` de Python.
+    Les cas que Python refuse ou rend complexes donnent ``nan`` (ligne recalculée).
+    """
+    def power(a: float, b: float) -> float:
+        try:
+            return math.pow(a, b)
+        except (ValueError, OverflowError):
+            return math.nan
+    return np.fromiter(map(power, base.tolist(), exponent.tolist()), dtype=np.float64, count=len(base))
+
+
+class BatchEvaluator:
+    """Évaluateur par lots regroupant les expressions de même forme."""
+
+    def __init__(self, engine: ArithmeticEngine, cache_size: int = 256, min_group: int = 8):
+        """Initialise l'évaluateur.
+
+        Args:
+            engine: Moteur scalaire (validation des formes, limites, recalcul des cas particuliers)
+            cache_size: Nombre de formes compilées conservées (LRU)
+            min_group: Taille minimale d'un groupe pour l'évaluation vectorielle
+        """
+        self.engine = engine
+        self.cache_size = cache_size
+        self.min_group = min_group
+        self._cache: "OrderedDict[str, Tuple[str, VectorFunction]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"vectorized": 0, "scalar": 0, "fallback": 0}
+
+    def _compile_node(self, node: ast.expr, index: List[int]) -> Tuple[VectorFunction, bool]:
+        """Compile un nœud de forme validé; renvoie la fonction et le type entier du résultat."""
+        if isinstance(node, ast.Constant):
+            position = index[0]
+            index[0] += 1
+            if isinstance(node.value, int):
+                def constant(columns: Columns):
+                    values = columns[position]
+                    return values, np.abs(values) >= EXACT_INT_LIMIT
+                return constant, True
+            return lambda columns: (columns[position], ~np.isfinite(columns[position])), False
+
+        if isinstance(node, ast.UnaryOp):
+            operand, is_int = self._compile_node(node.operand, index)
+            if isinstance(node.op, ast.UAdd):
+                return operand, is_int
+
+            def negative(columns: Columns):
+                values, fallback = operand(columns)
+                return -values, fallback
+            return negative, is_int
+
+        left, left_int = self._compile_node(node.left, index)
+        right, right_int = self._compile_node(node.right, index)
+        is_int = left_int and right_int and not isinstance(node.op, ast.Div)
+        max_exponent = self.engine.max_exponent
+
+        if isinstance(node.op, ast.Pow):
+            def power(columns: Columns):
+                base, base_fallback = left(columns)
+                exponent, exponent_fallback = right(columns)
+                fallback = base_fallback | exponent_fallback | (np.abs(exponent) > max_exponent)
+                if is_int:
+                    # Entier ** entier négatif donne un décimal: laissé au moteur scalaire
+                    fallback |= exponent < 0
+                    exponent = np.where(fallback, 0.0, exponent)
+                values = np.power(base, exponent) if is_int else _libm_power(base, exponent)
+                fallback |= ~np.isfinite(values)
+                if is_int:
+                    # Marge d'un bit sur l'estimation flottante, puis calcul exact en entiers 64 bits
+                    fallback |= np.abs(values) > EXACT_INT_LIMIT / 2
+                    safe = ~fallback
+                    exact = np.power(np.where(safe, base, 0.0).astype(np.int64),
+                                     np.where(safe, exponent, 0.0).astype(np.int64))
+                    values = np.where(safe, exact.astype(np.float64), values)
+                return values, fallback
+            return power, is_int
+
+        op = {
+            ast.Add: np.add,
+            ast.Sub: np.subtract,
+            ast.Mult: np.multiply,
+            ast.Div: np.true_divide,
+            ast.FloorDiv: np.floor_divide,
+            ast.Mod: np.remainder,
+        }[type(node.op)]
+
+        divides = isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod))
+
+        def binary(columns: Columns):
+            a, a_fallback = left(columns)
+            b, b_fallback = right(columns)
+            values = op(a, b)
+            # Division par zéro et dépassements: le moteur scalaire produit l'erreur exacte
+            fallback = a_fallback | b_fallback | ~np.isfinite(values)
+            if divides:
+                fallback |= b == 0
+            if is_int:
+                fallback |= np.abs(values) >= EXACT_INT_LIMIT
+            return values, fallback
+        return binary, is_int
+
+    def _compile_template(self, template: str) -> Tuple[str, VectorFunction]:
+        """Valide et compile une forme; renvoie sa clé structurelle et sa fonction vectorielle.
+
+        Raises:
+            SyntaxError, ExpressionError: Forme invalide (ses lignes sont confiées au moteur scalaire)
+        """
+        with self._lock:
+            cached = self._cache.get(template)
+            if cached is not None:
+                self._cache.move_to_end(template)
+                return cached
+
+        tree = self.engine.parse(template)
+        function, is_int = self._compile_node(tree, [0])
+
+        def evaluate(columns: Columns):
+            values, fallback = function(columns)
+            return (values.astype(np.int64) if is_int else values), fallback
+
+        compiled = (ast.dump(tree), evaluate)
+        with self._lock:
+            self._cache[template] = compiled
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def _scalar(self, expression: str) -> BatchResult:
+        try:
+            return self.engine.evaluate(expression)
+        except Exception as e:
+            return e
+
+    def evaluate(self, expressions: Sequence[str]) -> List[BatchResult]:
+        """Évalue un lot d'expressions.
+
+        Args:
+            expressions: Expressions arithmétiques (virgule ou point décimal)
+
+        Returns:
+            Pour chaque expression, dans l'ordre d'entrée, son résultat ou l'exception
+            qu'aurait levée ``ArithmeticEngine.evaluate``
+        """
+        results: List[BatchResult] = [None] * len(expressions)
+        groups: Dict[str, List[Tuple[int, List[Number]]]] = defaultdict(list)
+        functions: Dict[str, VectorFunction] = {}
+        scalar: List[int] = []
+
+        shapes: Dict[str, str] = {}
+        for index, expression in enumerate(expressions):
+            template, constants = split_constants(normalize_expression(expression))
+            shape = shapes.get(template)
+            if shape is None and template:
+                try:
+                    shape, function = self._compile_template(template)
+                    functions.setdefault(shape, function)
+                except Exception:
+                    shape = ""
+                shapes[template] = shape
+            if shape:
+                groups[shape].append((index, constants))
+            else:
+                scalar.append(index)
+
+        vectorized = fallback_count = 0
+        with np.errstate(all="ignore"):
+            for shape, members in groups.items():
+                if len(members) < self.min_group:
+                    scalar.extend(index for index, _ in members)
+                    continue
+                table = np.array([constants for _, constants in members], dtype=np.float64)
+                values, fallback = functions[shape](table.T)
+                for (index, _), value, recompute in zip(members, values.tolist(), fallback.tolist()):
+                    if recompute:
+                        results[index] = self._scalar(expressions[index])
+                        fallback_count += 1
+                    else:
+                        results[index] = value
+                vectorized += len(members)
+
+        for index in scalar:
+            results[index] = self._scalar(expressions[index])
+
+        with self._lock:
+            self._counts["vectorized"] += vectorized - fallback_count
+            self._counts["fallback"] += fallback_count
+            self._counts["scalar"] += len(scalar)
+        return results
+
+    def clear(self) -> None:
+        """Vide le cache des formes et remet les compteurs à zéro."""
+        with self._lock:
+            self._cache.clear()
+            self._counts = {"vectorized": 0, "scalar": 0, "fallback": 0}
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs: éléments vectorisés, évalués un à un et recalculés, formes en cache."""
+        with self._lock:
+            return {**self._counts, "shapes": len(self._cache)}
+
+
+# Évaluateur par lots partagé par la calculatrice
+batch_evaluator = BatchEvaluator(arithmetic_engine)
+
+
+def evaluate_batch(expressions: Sequence[str], engine: ArithmeticEngine = arithmetic_engine) -> List[BatchResult]:
+    """Évalue un lot d'expressions avec l'évaluateur partagé (ou un évaluateur dédié au moteur fourni)."""
+    evaluator = batch_evaluator if engine is arithmetic_engine else BatchEvaluator(engine)
+    return evaluator.evaluate(expressions)
@@ -0,0 +1,349 @@
+"""
+Exécution par lots de fichiers de questions.
+
+Les questions sont lues au fil de l'eau (JSONL ou CSV), envoyées au graphe
+compilé avec une concurrence bornée (pool de threads ou boucle asyncio) et les
+résultats sont écrits ligne par ligne en JSONL: la mémoire reste constante quelle
+que soit la taille du fichier, et une exécution interrompue reprend là où elle
+s'était arrêtée.
+"""
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+from .errors import logger
+from .metrics import track_question
+from .tracing import tracer
+
+# Champs de l'état final recopiés dans chaque ligne de résultat
+RESULT_FIELDS = ("answer", "tool_name", "tool_input", "fast_path")
+
+# (numéro de ligne, question)
+Question = Tuple[int, str]
+
+# Latences conservées pour les percentiles du bilan; au-delà, échantillon uniforme
+LATENCY_SAMPLE_SIZE = 10_000
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (0 <= pct <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def read_questions(path: str, column: str = "question") -> Iterator[Question]:
+    """Lit un fichier de questions au fil de l'eau.
+
+    Format déduit de l'extension: ``.csv`` (colonne ``column``), sinon JSONL
+    (champ ``column`` de chaque objet, ou chaîne JSON brute). Les lignes vides
+    sont ignorées mais conservent leur numéro, pour que la reprise reste stable.
+
+    Args:
+        path: Chemin du fichier
+        column: Nom de la colonne ou du champ contenant la question
+
+    Yields:
+        Couples (index, question), l'index étant la position dans le fichier
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for index, row in enumerate(csv.DictReader(f)):
+                question = (row.get(column) or "").strip()
+                if question:
+                    yield index, question
+            return
+
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger.warning("Ligne %s ignorée: JSON invalide (%s)", index + 1, e)
+                continue
+            question = record.get(column) if isinstance(record, dict) else record
+            if isinstance(question, str) and question.strip():
+                yield index, question.strip()
+            else:
+                logger.warning("Ligne %s ignorée: pas de champ '%s'", index + 1, column)
+
+
+def completed_indices(path: str) -> Set[int]:
+    """Renvoie les index déjà traités dans un fichier de résultats JSONL.
+
+    Une dernière ligne incomplète (écriture interrompue par un arrêt brutal) est
+    tronquée pour que les résultats suivants soient ajoutés proprement.
+
+    Args:
+        path: Chemin du fichier de résultats
+
+    Returns:
+        Ensemble des index présents dans le fichier
+    """
+    if not os.path.exists(path):
+        return set()
+
+    done: Set[int] = set()
+    valid_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(int(json.loads(line)["index"]))
+            except (ValueError, KeyError, TypeError):
+                break
+            valid_size += len(line)
+
+    if valid_size < os.path.getsize(path):
+        logger.warning("Fin de fichier incomplète tronquée dans %s", path)
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+    return done
+
+
+@dataclass
+class BatchReport:
+    """Bilan d'une exécution par lots.
+
+    La mémoire reste bornée quelle que soit la taille du lot: la moyenne est
+    exacte, les percentiles sont calculés sur un échantillon uniforme d'au plus
+    ``LATENCY_SAMPLE_SIZE`` latences (exacts en deçà).
+    """
+    processed: int = 0
+    skipped: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list, repr=False)  # Échantillon, en secondes
+    latency_count: int = 0
+    latency_total: float = 0.0
+    _random: random.Random = field(default_factory=lambda: random.Random(0), init=False, repr=False, compare=False)
+
+    def record_latency(self, seconds: float) -> None:
+        """Compte une latence; au-delà de l'échantillon, elle y remplace une latence au hasard (algorithme R)."""
+        self.latency_count += 1
+        self.latency_total += seconds
+        if len(self.latencies) < LATENCY_SAMPLE_SIZE:
+            self.latencies.append(seconds)
+        else:
+            slot = self._random.randrange(self.latency_count)
+            if slot < LATENCY_SAMPLE_SIZE:
+                self.latencies[slot] = seconds
+
+    @property
+    def throughput(self) -> float:
+        """Questions traitées par seconde."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Débit et latences (en millisecondes) de l'exécution."""
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "elapsed_s": self.elapsed,
+            "questions_per_s": self.throughput,
+            "mean_ms": self.latency_total / self.latency_count * 1000 if self.latency_count else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+        }
+
+
+class BatchRunner:
+    """Exécute un graphe compilé sur un flux de questions avec une concurrence bornée.
+
+    Au plus ``concurrency`` questions sont en cours à un instant donné et aucune
+    question n'est lue tant qu'une place ne s'est pas libérée. En mode ordonné,
+    les résultats sont écrits dans l'ordre du fichier d'entrée (un résultat en
+    avance attend ceux qui le précèdent); sinon ils sont écrits dès qu'ils sont prêts.
+    """
+
+    def __init__(self, app: Any, concurrency: int = 8, ordered: bool = True):
+        """Initialise l'exécuteur.
+
+        Args:
+            app: Graphe compilé (``invoke`` ou ``ainvoke`` selon le mode d'exécution)
+            concurrency: Nombre maximal de questions traitées simultanément
+            ordered: Écrire les résultats dans l'ordre d'entrée plutôt qu'à la fin de chacun
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency doit être >= 1")
+        self.app = app
+        self.concurrency = concurrency
+        self.ordered = ordered
+
+    def _result(self, index: int, question: str, state: Optional[Dict[str, Any]],
+                error: Optional[Exception], latency: float) -> Dict[str, Any]:
+        """Construit la ligne de résultat d'une question."""
+        record: Dict[str, Any] = {"index": index, "question": question}
+        if error is not None:
+            record["error"] = str(error)
+        else:
+            record.update({key: state.get(key) for key in RESULT_FIELDS})
+            record["error"] = state.get("error_message") if state.get("error") else None
+        record["latency_ms"] = round(latency * 1000, 3)
+        return record
+
+    def _invoke(self, index: int, question: str) -> Dict[str, Any]:
+        """Exécute une question dans le graphe synchrone."""
+        start = time.perf_counter()
+        try:
+            with tracer.span("question", "question", index=index), track_question():
+                state, error = self.app.invoke({"question": question}), None
+        except Exception as e:
+            state, error = None, e
+        return self._result(index, question, state, error, time.perf_counter() - start)
+
+    async def _ainvoke(self, index: int, question: str) -> Dict[str, Any]:
+        """Exécute une question dans le graphe asynchrone."""
+        start = time.perf_counter()
+        try:
+            with tracer.span("question", "question", index=index), track_question():
+                state, error = await self.app.ainvoke({"question": question}), None
+        except Exception as e:
+            state, error = None, e
+        return self._result(index, question, state, error, time.perf_counter() - start)
+
+    @staticmethod
+    def _write(out: TextIO, record: Dict[str, Any], report: BatchReport) -> None:
+        """Écrit un résultat et met à jour le bilan."""
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        report.processed += 1
+        report.record_latency(record["latency_ms"] / 1000)
+        if record.get("error"):
+            report.errors += 1
+
+    def run(self, questions: Iterable[Question], out: TextIO) -> BatchReport:
+        """Traite les questions dans un pool de threads.
+
+        Args:
+            questions: Couples (index, question), typiquement ``read_questions``
+            out: Flux texte recevant les résultats JSONL
+
+        Returns:
+            Bilan de l'exécution
+        """
+        report = BatchReport()
+        start = time.perf_counter()
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for index, question in questions:
+                if len(pending) >= self.concurrency:
+                    self._drain(pending, out, report, wait_all=False)
+                pending.append(pool.submit(self._invoke, index, question))
+            self._drain(pending, out, report, wait_all=True)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _drain(self, pending: deque, out: TextIO, report: BatchReport, wait_all: bool) -> None:
+        """Écrit les résultats terminés jusqu'à libérer au moins une place (ou tous)."""
+        while pending:
+            if self.ordered:
+                self._write(out, pending.popleft().result(), report)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    self._write(out, future.result(), report)
+            if not wait_all:
+                return
+
+    async def arun(self, questions: Iterable[Question], out: TextIO) -> BatchReport:
+        """Traite les questions sur la boucle d'évènements (graphe asynchrone).
+
+        Args:
+            questions: Couples (index, question), typiquement ``read_questions``
+            out: Flux texte recevant les résultats JSONL
+
+        Returns:
+            Bilan de l'exécution
+        """
+        report = BatchReport()
+        start = time.perf_counter()
+        pending: deque = deque()
+        for index, question in questions:
+            if len(pending) >= self.concurrency:
+                await self._adrain(pending, out, report, wait_all=False)
+            pending.append(asyncio.ensure_future(self._ainvoke(index, question)))
+        await self._adrain(pending, out, report, wait_all=True)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    async def _adrain(self, pending: deque, out: TextIO, report: BatchReport, wait_all: bool) -> None:
+        """Version asynchrone de ``_drain``."""
+        while pending:
+            if self.ordered:
+                self._write(out, await pending.popleft(), report)
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.remove(task)
+                    self._write(out, task.result(), report)
+            if not wait_all:
+                return
+
+
+def run_batch(
+    app: Any,
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    ordered: bool = True,
+    use_async: bool = False,
+    resume: bool = True,
+    column: str = "question"
+) -> BatchReport:
+    """Traite un fichier de questions et ajoute les résultats à un fichier JSONL.
+
+    Args:
+        app: Graphe compilé (construit avec ``use_async=True`` pour le mode asynchrone)
+        input_path: Fichier de questions (JSONL ou CSV)
+        output_path: Fichier de résultats JSONL
+        concurrency: Nombre maximal de questions traitées simultanément
+        ordered: Écrire les résultats dans l'ordre d'entrée
+        use_async: Utiliser ``ainvoke`` et une boucle asyncio plutôt qu'un pool de threads
+        resume: Ignorer les questions déjà présentes dans le fichier de résultats
+        column: Nom de la colonne ou du champ contenant la question
+
+    Returns:
+        Bilan de l'exécution
+    """
+    done = completed_indices(output_path) if resume else set()
+    if done:
+        logger.info("Reprise: %s questions déjà traitées dans %s", len(done), output_path)
+
+    skipped = 0
+
+    def remaining() -> Iterator[Question]:
+        nonlocal skipped
+        for index, question in read_questions(input_path, column):
+            if index in done:
+                skipped += 1
+                continue
+            yield index, question
+
+    runner = BatchRunner(app, concurrency=concurrency, ordered=ordered)
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        if use_async:
+            report = asyncio.run(runner.arun(remaining(), out))
+        else:
+            report = runner.run(remaining(), out)
+
+    report.skipped = skipped
+    logger.info("Lot terminé: %s", report.summary())
+    return report
@@ -0,0 +1,176 @@
+"""
+Caches en mémoire partagés par les outils de l'agent.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Valeur renvoyée par ``get`` en cas d'absence (``None`` est une valeur cachable)
+MISS = object()
+
+
+class TTLCache:
+    """Cache LRU thread-safe avec durée de vie par entrée.
+
+    Au-delà de ``capacity`` entrées, ou de ``max_bytes`` octets déclarés à
+    l'écriture, les moins récemment utilisées sont évincées (une entrée plus
+    grande que le budget n'est donc pas conservée). Une entrée expirée
+    est traitée comme absente et supprimée à la lecture.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        """Initialise le cache.
+
+        Args:
+            capacity: Nombre maximal d'entrées
+            ttl: Durée de vie par défaut en secondes (None: pas d'expiration)
+            max_bytes: Budget total des tailles passées à ``set`` (None: pas de budget)
+        """
+        if capacity < 1:
+            raise ValueError("capacity doit être >= 1")
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Renvoie la valeur associée à ``key``, ou ``MISS``."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+                self._bytes -= size
+            self._misses += 1
+            return MISS
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0) -> None:
+        """Enregistre une valeur.
+
+        Args:
+            key: Clé hachable
+            value: Valeur (``None`` compris)
+            ttl: Durée de vie de cette entrée; celle du cache si absente
+            size: Taille de l'entrée en octets, décomptée de ``max_bytes``
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._data) > self.capacity or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs d'utilisation du cache."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions
+            }
+
+
+# Résultat transmis aux appelants en attente quand l'appel en cours a été annulé: ils le relancent
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """Fusion des appels concurrents portant sur la même clé.
+
+    Tant qu'un appel pour une clé est en cours, les appelants suivants attendent
+    son résultat (ou son exception) au lieu de relancer le travail. Les appels
+    synchrones (threads) et asynchrones (par boucle d'évènements) sont fusionnés
+    séparément.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._acalls: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Exécute ``fn`` une seule fois pour tous les appels concurrents sur ``key``.
+
+        Returns:
+            (résultat, True si le résultat vient d'un appel déjà en cours)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result(), True
+
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return call.result(), False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Version asynchrone de ``do`` pour une coroutine ``fn()``.
+
+        Si l'appelant qui exécute ``fn()`` est annulé, les autres ne le sont
+        pas: ils sont réveillés et relancent l'appel, l'un d'eux l'exécutant.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        while True:
+            call = self._acalls.get(slot)
+            if call is None:
+                break
+            # shield: l'annulation d'un appelant ne doit pas annuler les autres
+            result = await asyncio.shield(call)
+            if result is not _ABANDONED:
+                return result, True
+
+        call = self._acalls[slot] = loop.create_future()
+        try:
+            result = await fn()
+            call.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            call.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            call.exception()  # Marque l'exception comme récupérée s'il n'y a pas d'autre appelant
+            raise
+        finally:
+            del self._acalls[slot]
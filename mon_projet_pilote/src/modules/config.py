@@ -0,0 +1,200 @@
+"""
+Configuration d'exécution de l'agent.
+
+Les valeurs par défaut peuvent être surchargées par variables d'environnement
+au démarrage, puis par ``configure(...)`` (tests, benchmarks).
+"""
+import os
+from dataclasses import dataclass, fields, replace
+
+# Modes de sélection d'outil dans choisir_outil
+TOOL_SELECTION_MODES = ("two_step", "structured")
+
+# Modes du cache des appels LLM (modules/llm_cache.py)
+LLM_CACHE_MODES = ("off", "memo", "record", "replay")
+
+# Modes du traçage (modules/tracing.py)
+TRACE_MODES = ("off", "jsonl", "memory")
+
+
+def _parse_env(raw: str, kind: type):
+    """Convertit la valeur textuelle d'une variable d'environnement."""
+    if kind is bool:
+        return raw.strip().lower() in ("1", "true", "yes", "oui", "on")
+    return kind(raw)
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    """Paramètres d'exécution de l'agent."""
+
+    # "two_step": un appel pour l'outil puis un pour son entrée;
+    # "structured": un seul appel renvoyant {tool_name, tool_input} en JSON
+    tool_selection: str = "two_step"
+
+    # Voie rapide: confiance minimale pour court-circuiter les nœuds LLM, et
+    # réponse finale par gabarit (sans LLM) pour les calculs réussis
+    fast_path_threshold: float = 0.8
+    fast_path_template_answer: bool = True
+
+    # Services Open-Meteo (surchargeables pour pointer vers un serveur local)
+    geocoding_url: str = "https://geocoding-api.open-meteo.com"
+    forecast_url: str = "https://api.open-meteo.com"
+
+    # Couche HTTP partagée (modules/http_client.py): timeouts de connexion et de
+    # lecture, pools de connexions par hôte, retry des GET avec attente exponentielle
+    http_connect_timeout: float = 3.05
+    http_timeout: float = 10.0
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 20
+    http_retries: int = 3
+    http_backoff: float = 0.3
+    http_backoff_jitter: float = 0.2
+
+    # Cache de géocodage (modules/geocoding.py): base SQLite partagée entre
+    # processus (chaîne vide: mémoire seule), taille du LRU, durée de vie des
+    # villes introuvables, préchargement des principales villes
+    geocoding_cache_path: str = ".cache/geocoding.sqlite"
+    geocoding_cache_size: int = 4096
+    geocoding_negative_ttl: float = 3600.0
+    geocoding_preload: bool = True
+
+    # Cache des prévisions (modules/forecast.py): durée de vie en secondes
+    # (0: désactivé), taille, décimales conservées dans les coordonnées de la clé
+    forecast_cache_ttl: float = 600.0
+    forecast_cache_size: int = 1024
+    forecast_cache_precision: int = 2
+
+    # Cache des réponses (modules/answer_cache.py): base SQLite partagée entre
+    # processus (chaîne vide: mémoire seule), budget en octets de chaque niveau,
+    # durées de vie selon l'outil utilisé (inf: pas d'expiration, 0: pas de
+    # cache), similarité minimale du niveau sémantique (0: désactivé)
+    answer_cache_path: str = ".cache/answers.sqlite"
+    answer_cache_max_bytes: int = 8 * 1024 * 1024
+    answer_cache_weather_ttl: float = 600.0
+    answer_cache_calculator_ttl: float = float("inf")
+    answer_cache_direct_ttl: float = 86400.0
+    answer_cache_semantic_threshold: float = 0.0
+    answer_cache_semantic_size: int = 10_000
+
+    # Cache des appels LLM (modules/llm_cache.py): "off", "memo" (prompts listés
+    # seulement), "record" (tous les prompts, réponses enregistrées) ou "replay"
+    # (tous les prompts servis depuis la base, sans appel au modèle)
+    llm_cache_mode: str = "off"
+    llm_cache_prompts: str = "analyse,extraction_ville,extraction_expression"
+    llm_cache_path: str = ".cache/llm.sqlite"
+    llm_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Modèles LLM (modules/model_tiers.py): modèle et température par défaut,
+    # surcharges par nœud ou par prompt ("nœud=modèle[@température],...") et
+    # fichier JSON équivalent (chaîne vide: aucun)
+    llm_model: str = "gemini-1.5-flash"
+    llm_temperature: float = 0.2
+    llm_models: str = ""
+    llm_models_path: str = ""
+
+    # Classifieur local du choix d'outil (modules/intent.py): modèle entraîné
+    # par train_intent.py (chaîne vide: désactivé), confiance minimale pour se
+    # passer de l'appel LLM
+    intent_model_path: str = ""
+    intent_threshold: float = 0.9
+
+    # Journalisation (modules/logging_setup.py), appliquée au démarrage par
+    # configure_logging(): niveau, fichier (chaîne vide: aucun), sortie
+    # d'erreur, part des évènements INFO/DEBUG conservés pour chaque gabarit
+    log_level: str = "INFO"
+    log_file: str = "agent_errors.log"
+    log_console: bool = True
+    log_info_sampling: float = 1.0
+
+    # Métriques (modules/metrics.py): instrumentation des nœuds et des appels
+    # LLM (lue à la construction du graphe), port du serveur /metrics (0: aucun)
+    metrics_enabled: bool = True
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+
+    # Serveur pré-fork (modules/server.py, src/serve.py): adresse d'écoute
+    # partagée par les workers, nombre de workers créés par fork() (0: un
+    # par cœur)
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_workers: int = 0
+
+    # Traçage (modules/tracing.py): "off", "jsonl" (spans ajoutés au fichier
+    # trace_path) ou "memory" (collecteur en mémoire, export OTLP/JSON)
+    trace_mode: str = "off"
+    trace_path: str = "traces.jsonl"
+
+    # Mode spéculatif du graphe (modules/speculative.py): threads partagés par
+    # les branches lancées en parallèle (version synchrone)
+    speculative_max_workers: int = 32
+
+    # Prélecture météo (modules/prefetch.py): recherche lancée en tâche de fond
+    # pendant l'analyse du mode spéculatif, géocodage anticipé des lieux
+    # repérés localement dans la question, oubli des résultats non consommés
+    weather_prefetch: bool = True
+    weather_prefetch_candidates: bool = False
+    weather_prefetch_ttl: float = 60.0
+
+    def __post_init__(self):
+        if self.tool_selection not in TOOL_SELECTION_MODES:
+            raise ValueError(
+                f"Mode de sélection d'outil inconnu: {self.tool_selection} "
+                f"(attendu: {', '.join(TOOL_SELECTION_MODES)})"
+            )
+        if self.llm_cache_mode not in LLM_CACHE_MODES:
+            raise ValueError(
+                f"Mode de cache LLM inconnu: {self.llm_cache_mode} (attendu: {', '.join(LLM_CACHE_MODES)})"
+            )
+        if self.trace_mode not in TRACE_MODES:
+            raise ValueError(f"Mode de traçage inconnu: {self.trace_mode} (attendu: {', '.join(TRACE_MODES)})")
+        if not 0 <= self.metrics_port <= 65535:
+            raise ValueError("metrics_port doit être compris entre 0 et 65535")
+        if not 0 <= self.server_port <= 65535:
+            raise ValueError("server_port doit être compris entre 0 et 65535")
+        if self.server_workers < 0:
+            raise ValueError("server_workers doit être positif ou nul")
+        if self.http_pool_connections < 1 or self.http_pool_maxsize < 1:
+            raise ValueError("Les pools HTTP doivent contenir au moins une connexion")
+        if self.speculative_max_workers < 1:
+            raise ValueError("speculative_max_workers doit être >= 1")
+        if self.http_retries < 0:
+            raise ValueError("http_retries doit être >= 0")
+        if not 0.0 < self.log_info_sampling <= 1.0:
+            raise ValueError("log_info_sampling doit être compris entre 0 (exclu) et 1")
+        if not 0.0 <= self.intent_threshold <= 1.0:
+            raise ValueError("intent_threshold doit être compris entre 0 et 1")
+        if not 0.0 <= self.answer_cache_semantic_threshold <= 1.0:
+            raise ValueError("answer_cache_semantic_threshold doit être compris entre 0 et 1")
+
+    @classmethod
+    def from_env(cls) -> "AgentConfig":
+        """Construit la configuration à partir des variables d'environnement ``AGENT_*``."""
+        values = {}
+        for field in fields(cls):
+            raw = os.getenv(f"AGENT_{field.name.upper()}")
+            if raw is not None:
+                values[field.name] = _parse_env(raw, field.type)
+        return cls(**values)
+
+
+_config = AgentConfig.from_env()
+
+
+def get_config() -> AgentConfig:
+    """Renvoie la configuration courante."""
+    return _config
+
+
+def configure(**overrides) -> AgentConfig:
+    """Met à jour la configuration courante et la renvoie.
+
+    Args:
+        overrides: Champs de ``AgentConfig`` à remplacer
+
+    Returns:
+        Nouvelle configuration
+    """
+    global _config
+    _config = replace(_config, **overrides)
+    return _config
@@ -2,20 +2,14 @@
 Module de gestion des erreurs pour l'agent LangGraph.
 Définit les exceptions personnalisées et les gestionnaires d'erreurs.
 """
+import inspect
 import logging
-import traceback
+import time
 from typing import Any, Dict, Callable, TypeVar, Optional
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("agent_errors.log"),
-        logging.StreamHandler()
-    ]
-)
+from .metrics import exceptions_total, tool_calls_total, tool_duration
 
+# Logger de l'agent; les destinations sont configurées au démarrage (logging_setup.configure_logging)
 logger = logging.getLogger("agent")
 
 # Type générique pour les fonctions décorées
@@ -34,6 +28,10 @@ class LLMResponseError(AgentError):
     """Erreur lors de la génération de réponse par le LLM."""
     pass
 
+class LLMCacheMissError(LLMResponseError):
+    """Prompt absent de l'enregistrement des réponses LLM en mode rejeu."""
+    pass
+
 class GraphExecutionError(AgentError):
     """Erreur lors de l'exécution du graphe."""
     pass
@@ -42,6 +40,24 @@ class InputValidationError(AgentError):
     """Erreur de validation des entrées."""
     pass
 
+class ExpressionError(AgentError):
+    """Expression arithmétique contenant une construction non autorisée."""
+    pass
+
+class ExpressionLimitError(ExpressionError):
+    """Expression arithmétique dépassant une limite d'évaluation (taille, exposant, magnitude)."""
+    pass
+
+def _nom_fonction(func: Callable) -> str:
+    """Renvoie le nom d'une fonction ou d'un outil LangChain (qui n'a pas de ``__name__``)."""
+    return getattr(func, "__name__", None) or getattr(func, "name", repr(func))
+
+def _copier_metadonnees(wrapper: Callable, func: Callable) -> None:
+    """Copie le nom, la documentation et les annotations de ``func`` sur ``wrapper``."""
+    wrapper.__name__ = _nom_fonction(func)
+    wrapper.__doc__ = getattr(func, "__doc__", None) or getattr(func, "description", None)
+    wrapper.__annotations__ = getattr(func, "__annotations__", {})
+
 # Décorateurs de gestion d'erreurs
 def handle_tool_errors(fallback_response: str = "Une erreur s'est produite lors de l'exécution de l'outil."):
     """Décorateur pour gérer les erreurs dans les outils.
@@ -50,27 +66,51 @@ def handle_tool_errors(fallback_response: str = "Une erreur s'est produite lors
         fallback_response: Réponse à renvoyer en cas d'erreur
         
     Returns:
-        Fonction décorée avec gestion d'erreurs
+        Fonction décorée avec gestion d'erreurs (asynchrone si la fonction l'est)
     """
     def decorator(func: F) -> F:
+        name = _nom_fonction(func)
+        
+        def tool_error(e: Exception) -> ToolExecutionError:
+            error_id = logger.error(
+                "Erreur dans l'outil %s: %s", name, e, exc_info=True
+            )
+            exceptions_total.inc(name, type(e).__name__)
+            return ToolExecutionError(f"{fallback_response} (ID: {error_id})")
+        
+        def record(start: float, status: str) -> None:
+            tool_duration.observe(time.perf_counter() - start, name)
+            tool_calls_total.inc(name, status)
+        
+        if inspect.iscoroutinefunction(func):
+            async def async_wrapper(*args, **kwargs) -> Any:
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    record(start, "error")
+                    raise tool_error(e) from e
+                record(start, "ok")
+                return result
+            
+            _copier_metadonnees(async_wrapper, func)
+            return async_wrapper
+        
         # Pour les outils LangChain, on retourne une nouvelle fonction au lieu de wrapper
         # afin d'éviter les problèmes avec l'avertissement de dépréciation de BaseTool.__call__
         # La fonction originale devrait toujours être utilisée, cette fonction n'est qu'une couche de sécurité
         def wrapper(*args, **kwargs) -> Any:
+            start = time.perf_counter()
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
             except Exception as e:
-                error_id = logger.error(
-                    f"Erreur dans l'outil {func.__name__}: {str(e)}\n{traceback.format_exc()}"
-                )
-                raise ToolExecutionError(
-                    f"{fallback_response} (ID: {error_id})"
-                ) from e
+                record(start, "error")
+                raise tool_error(e) from e
+            record(start, "ok")
+            return result
         
         # Copier les attributs importants
-        wrapper.__name__ = func.__name__
-        wrapper.__doc__ = func.__doc__
-        wrapper.__annotations__ = func.__annotations__
+        _copier_metadonnees(wrapper, func)
         
         return wrapper
     return decorator
@@ -82,21 +122,36 @@ def handle_state_errors(func: F) -> F:
         func: Fonction à décorer
         
     Returns:
-        Fonction décorée avec gestion d'erreurs
+        Fonction décorée avec gestion d'erreurs (asynchrone si la fonction l'est)
     """
+    def error_state(e: Exception) -> Dict[str, Any]:
+        error_message = f"Erreur dans {func.__name__}: {str(e)}"
+        logger.error("%s", error_message, exc_info=True)
+        exceptions_total.inc(func.__name__, type(e).__name__)
+        
+        # Mise à jour de l'état avec l'erreur
+        return {
+            "error": True,
+            "error_message": error_message,
+            "answer": f"Je suis désolé, j'ai rencontré une erreur: {str(e)}. Veuillez réessayer."
+        }
+    
+    if inspect.iscoroutinefunction(func):
+        async def async_wrapper(state: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+            try:
+                return await func(state, *args, **kwargs)
+            except Exception as e:
+                return error_state(e)
+        
+        _copier_metadonnees(async_wrapper, func)
+        return async_wrapper
+    
     def wrapper(state: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
         try:
             return func(state, *args, **kwargs)
         except Exception as e:
-            error_message = f"Erreur dans {func.__name__}: {str(e)}"
-            logger.error(f"{error_message}\n{traceback.format_exc()}")
-            
-            # Mise à jour de l'état avec l'erreur
-            return {
-                "error": True,
-                "error_message": error_message,
-                "answer": f"Je suis désolé, j'ai rencontré une erreur: {str(e)}. Veuillez réessayer."
-            }
+            return error_state(e)
+    _copier_metadonnees(wrapper, func)
     return wrapper
 
 def validate_input(validation_func: Callable[[Any], bool], error_message: str = "Entrée invalide"):
@@ -107,19 +162,28 @@ def validate_input(validation_func: Callable[[Any], bool], error_message: str =
         error_message: Message d'erreur à afficher
         
     Returns:
-        Fonction décorée avec validation d'entrée
+        Fonction décorée avec validation d'entrée (asynchrone si la fonction l'est)
     """
     def decorator(func: F) -> F:
-        def wrapper(input_value: Any, *args, **kwargs) -> Any:
+        def validate(input_value: Any) -> None:
             if not validation_func(input_value):
-                logger.warning(f"Validation d'entrée échouée pour {func.__name__}: {input_value}")
+                logger.warning("Validation d'entrée échouée pour %s: %s", _nom_fonction(func), input_value)
                 raise InputValidationError(error_message)
+        
+        if inspect.iscoroutinefunction(func):
+            async def async_wrapper(input_value: Any, *args, **kwargs) -> Any:
+                validate(input_value)
+                return await func(input_value, *args, **kwargs)
+            
+            _copier_metadonnees(async_wrapper, func)
+            return async_wrapper
+        
+        def wrapper(input_value: Any, *args, **kwargs) -> Any:
+            validate(input_value)
             return func(input_value, *args, **kwargs)
         
         # Préserver les métadonnées
-        wrapper.__name__ = func.__name__
-        wrapper.__doc__ = func.__doc__
-        wrapper.__annotations__ = func.__annotations__
+        _copier_metadonnees(wrapper, func)
         
         return wrapper
     return decorator
@@ -140,5 +204,23 @@ def safe_execute(func: Callable, fallback: Any, *args, **kwargs) -> Any:
     try:
         return func(*args, **kwargs)
     except Exception as e:
-        logger.error(f"Erreur dans safe_execute pour {func.__name__}: {str(e)}")
-        return fallback 
\ No newline at end of file
+        logger.error("Erreur dans safe_execute pour %s: %s", _nom_fonction(func), e)
+        return fallback
+
+async def asafe_execute(func: Callable, fallback: Any, *args, **kwargs) -> Any:
+    """Version asynchrone de ``safe_execute`` pour une fonction coroutine.
+    
+    Args:
+        func: Fonction asynchrone à exécuter
+        fallback: Valeur à retourner en cas d'erreur
+        args: Arguments positionnels pour la fonction
+        kwargs: Arguments nommés pour la fonction
+        
+    Returns:
+        Résultat de la fonction ou fallback en cas d'erreur
+    """
+    try:
+        return await func(*args, **kwargs)
+    except Exception as e:
+        logger.error("Erreur dans asafe_execute pour %s: %s", _nom_fonction(func), e)
+        return fallback
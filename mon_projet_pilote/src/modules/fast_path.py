@@ -0,0 +1,157 @@
+"""
+Voie rapide déterministe pour les questions triviales.
+
+Un classifieur à base d'expressions régulières compilées (réutilisant les motifs
+des outils) reconnaît les questions évidentes de calcul et de météo et permet au
+graphe d'appeler directement l'outil, sans passer par les nœuds LLM d'analyse
+et de choix d'outil.
+"""
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .tools import EXPRESSION_CHARS, is_valid_expression, is_valid_location
+
+# Expression candidate: suite de caractères autorisés contenant au moins un opérateur entre deux opérandes
+EXPRESSION_CANDIDATE = re.compile(rf"[{EXPRESSION_CHARS}]+")
+OPERATION = re.compile(r"[\d\)]\s*[\+\-\*\/\%]\s*[\d\(\.]")
+# Écritures qui ressemblent à un calcul sans en être: dates (12/05/2024), numéros (06-12-34-56-78)
+NOT_AN_EXPRESSION = re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b\d+(?:-\d+){2,}\b")
+
+# Ville introduite par une préposition, avec majuscule initiale
+CITY_CANDIDATE = re.compile(r"\b(?:à|a|au|sur|pour|de|en)\s+([A-ZÀ-Ý][\w'\-]*(?:\s[A-ZÀ-Ý][\w'\-]*)*)")
+
+WEATHER_KEYWORDS = re.compile(
+    r"\b(?:météo|meteo|quel temps|temps fait|température|temperature|pleut|pleuvoir|pluie|neige|vent)\b",
+    re.IGNORECASE
+)
+
+# Mots attendus autour d'une question de calcul ou de météo; les autres font baisser la confiance
+CALCULATOR_WORDS = {
+    "combien", "font", "fait", "faire", "calcule", "calculez", "calculer", "calcul", "quel", "quelle",
+    "est", "le", "la", "résultat", "resultat", "de", "du", "égal", "egal", "égale", "vaut", "donne",
+    "moi", "stp", "svp", "s'il", "te", "vous", "plaît", "plait",
+}
+WEATHER_WORDS = {
+    "quelle", "quel", "est", "la", "le", "les", "à", "a", "au", "sur", "pour", "de", "en", "il", "fait",
+    "fait-il", "aujourd'hui", "maintenant", "actuelle", "actuellement", "donne", "moi", "donne-moi",
+    "météo", "meteo", "temps", "température", "temperature", "pleut", "pleut-il", "va-t-il", "pleuvoir",
+    "y", "a-t-il", "du", "vent", "neige", "pluie", "prévisions", "previsions", "quelles", "sont",
+}
+WORD = re.compile(r"[\w'\-]+")
+
+
+def _confidence_with_unexpected(unexpected: List[str]) -> float:
+    """Confiance d'une route malgré des mots inattendus: toujours sous le seuil par défaut (0.8).
+
+    Un seul mot suffit à changer la question (« demain », « jour »): le LLM décide.
+    """
+    return max(0.5, 0.9 - 0.1 * (len(unexpected) + 1))
+
+
+@dataclass(frozen=True)
+class FastRoute:
+    """Route déterminée par la voie rapide."""
+
+    tool_name: str
+    tool_input: str
+    confidence: float
+
+
+class FastPathClassifier:
+    """Classifieur déterministe calcul/météo avec compteurs par route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def score(self, question: str) -> Optional[FastRoute]:
+        """Propose une route et sa confiance, sans appliquer de seuil.
+
+        Args:
+            question: Question de l'utilisateur
+
+        Returns:
+            Route candidate, ou None si la question n'a rien d'évident
+        """
+        if not question:
+            return None
+        route = self._score_calculator(question)
+        if route is None:
+            route = self._score_weather(question)
+        return route
+
+    def _score_calculator(self, question: str) -> Optional[FastRoute]:
+        candidates = [m.group(0).strip(" .,") for m in EXPRESSION_CANDIDATE.finditer(question)]
+        candidates = [c for c in candidates
+                      if OPERATION.search(c) and is_valid_expression(c) and not NOT_AN_EXPRESSION.search(c)]
+        if not candidates:
+            return None
+        expression = max(candidates, key=len)
+
+        rest = question.replace(expression, " ")
+        words = [w.lower() for w in WORD.findall(rest)]
+        unexpected = [w for w in words if w not in CALCULATOR_WORDS]
+        if len(candidates) > 1 or WEATHER_KEYWORDS.search(question):
+            confidence = 0.4
+        elif not unexpected:
+            confidence = 1.0 if not words else 0.95
+        else:
+            confidence = _confidence_with_unexpected(unexpected)
+        return FastRoute("calculatrice", expression, confidence)
+
+    def _score_weather(self, question: str) -> Optional[FastRoute]:
+        if not WEATHER_KEYWORDS.search(question):
+            return None
+        cities = [m.group(1).strip() for m in CITY_CANDIDATE.finditer(question)]
+        cities = [c for c in cities if is_valid_location(c)]
+        if len(cities) != 1 or re.search(r"\bet\b|,", question.split(cities[0], 1)[1]):
+            # Aucune ville, ou plusieurs villes: on laisse le LLM décider
+            return None
+        city = cities[0]
+
+        rest = question.replace(city, " ")
+        unexpected = [w for w in (w.lower() for w in WORD.findall(rest)) if w not in WEATHER_WORDS]
+        confidence = 0.95 if not unexpected else _confidence_with_unexpected(unexpected)
+        return FastRoute("recherche_météo", city, confidence)
+
+    def classify(self, question: str, threshold: float = 0.8) -> Optional[FastRoute]:
+        """Renvoie la route si sa confiance atteint le seuil, et met à jour les compteurs.
+
+        Args:
+            question: Question de l'utilisateur
+            threshold: Confiance minimale pour court-circuiter les nœuds LLM
+
+        Returns:
+            Route à suivre, ou None pour passer par le chemin LLM
+        """
+        route = self.score(question)
+        if route is None:
+            self.record("llm")
+            return None
+        if route.confidence < threshold:
+            self.record("sous_le_seuil")
+            return None
+        self.record(route.tool_name)
+        return route
+
+    def record(self, event: str) -> None:
+        """Incrémente le compteur d'un évènement de la voie rapide."""
+        with self._lock:
+            self._counts[event] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs par route (et les questions laissées au LLM)."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        """Remet les compteurs à zéro."""
+        with self._lock:
+            self._counts.clear()
+
+
+# Classifieur partagé par le graphe
+fast_path_classifier = FastPathClassifier()
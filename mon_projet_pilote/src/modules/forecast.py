@@ -0,0 +1,120 @@
+"""
+Cache des prévisions météo de l'outil météo.
+
+Les conditions actuelles d'Open-Meteo ne changent qu'environ toutes les 15
+minutes: les réponses sont gardées en mémoire pendant ``forecast_cache_ttl``
+secondes, par coordonnées arrondies (deux décimales, environ 1 km). Lors d'un
+pic de questions sur la même ville, les demandes simultanées non encore en
+cache sont fusionnées en une seule requête dont le résultat est partagé.
+"""
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .cache import MISS, SingleFlight, TTLCache
+from .config import get_config
+
+ForecastKey = Tuple[float, float]
+
+
+class ForecastCache:
+    """Cache TTL des prévisions avec fusion des requêtes concurrentes.
+
+    Les paramètres (durée de vie, taille, précision de l'arrondi) sont lus dans
+    la configuration à la première utilisation; ``reset()`` les relit. Une durée
+    de vie nulle désactive le cache mais conserve la fusion des requêtes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: Optional[TTLCache] = None
+        self._precision = 2
+        self._flights = SingleFlight()
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> TTLCache:
+        with self._lock:
+            if self._memory is None:
+                config = get_config()
+                self._memory = TTLCache(capacity=config.forecast_cache_size, ttl=config.forecast_cache_ttl)
+                self._precision = config.forecast_cache_precision
+            return self._memory
+
+    def key(self, lat: float, lon: float) -> ForecastKey:
+        """Clé de cache: coordonnées arrondies à la précision configurée."""
+        self._setup()
+        return round(lat, self._precision), round(lon, self._precision)
+
+    def _record(self, event: str) -> None:
+        with self._lock:
+            self._counts[event] += 1
+
+    def _lookup(self, key: ForecastKey) -> Any:
+        memory = self._setup()
+        if not memory.ttl:
+            return MISS
+        value = memory.get(key)
+        if value is not MISS:
+            self._record("hits")
+        return value
+
+    def _store(self, key: ForecastKey, value: Any, shared: bool) -> Any:
+        self._record("coalesced" if shared else "misses")
+        if not shared and self._memory.ttl:
+            self._memory.set(key, value)
+        return value
+
+    def lookup(self, lat: float, lon: float) -> Any:
+        """Renvoie les prévisions en cache pour ces coordonnées, ou ``MISS``."""
+        return self._lookup(self.key(lat, lon))
+
+    def store(self, lat: float, lon: float, value: Dict[str, Any]) -> None:
+        """Enregistre des prévisions obtenues hors de ``get`` (requête groupée)."""
+        self._store(self.key(lat, lon), value, shared=False)
+
+    def get(self, lat: float, lon: float, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Renvoie les prévisions en cache, ou les obtient via ``fetch()``.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            fetch: Fonction effectuant la requête en cas d'absence
+
+        Returns:
+            Réponse de l'API de prévisions
+        """
+        key = self.key(lat, lon)
+        value = self._lookup(key)
+        if value is not MISS:
+            return value
+        value, shared = self._flights.do(key, fetch)
+        return self._store(key, value, shared)
+
+    async def aget(self, lat: float, lon: float, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Version asynchrone de ``get`` pour une coroutine ``fetch()``."""
+        key = self.key(lat, lon)
+        value = self._lookup(key)
+        if value is not MISS:
+            return value
+        value, shared = await self._flights.ado(key, fetch)
+        return self._store(key, value, shared)
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs: succès, absences (requêtes émises) et requêtes fusionnées."""
+        with self._lock:
+            return {
+                "hits": self._counts["hits"],
+                "misses": self._counts["misses"],
+                "coalesced": self._counts["coalesced"],
+                "entries": len(self._memory) if self._memory is not None else 0
+            }
+
+    def reset(self) -> None:
+        """Vide le cache et ses compteurs; la configuration sera relue à la prochaine utilisation."""
+        with self._lock:
+            self._memory = None
+            self._counts.clear()
+
+
+# Cache partagé par les outils du processus
+forecast_cache = ForecastCache()
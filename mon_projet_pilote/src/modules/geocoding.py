@@ -0,0 +1,219 @@
+"""
+Cache de géocodage (nom de ville -> coordonnées) de l'outil météo.
+
+Deux niveaux: un LRU en mémoire devant une base SQLite partagée par tous les
+processus de la machine. Les noms sont normalisés (casse, accents, espaces,
+tirets) pour que « Saint-Étienne » et « saint etienne » tombent sur la même
+entrée. Les villes inconnues sont aussi mises en cache, avec une durée de vie
+plus courte. Un fichier des principales villes est préchargé en mémoire pour
+qu'un démarrage à froid n'interroge pas le réseau.
+"""
+import csv
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .cache import MISS, TTLCache
+from .config import get_config
+from .errors import logger
+
+# (latitude, longitude, nom canonique), ou None pour une ville inconnue
+Coordinates = Optional[Tuple[float, float, str]]
+
+# Principales villes préchargées (colonnes name, latitude, longitude)
+BUNDLED_CITIES = os.path.join(os.path.dirname(__file__), "data", "villes.csv")
+
+_SEPARATORS = re.compile(r"[\s\-'’]+")
+
+
+def normalize_city(name: str) -> str:
+    """Normalise un nom de ville pour l'utiliser comme clé de cache.
+
+    Args:
+        name: Nom tel que saisi
+
+    Returns:
+        Nom sans accents, en minuscules, séparateurs réduits à une espace
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", text.casefold()).strip()
+
+
+class GeocodingCache:
+    """Cache de géocodage à deux niveaux (mémoire puis SQLite).
+
+    Les paramètres (chemin de la base, taille, durée de vie des résultats
+    négatifs, préchargement) sont lus dans la configuration à la première
+    utilisation; ``reset()`` les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: Optional[TTLCache] = None
+        self._path = ""
+        self._negative_ttl = 0.0
+        # Une seule connexion SQLite par processus, sérialisée par son propre verrou
+        self._database_lock = threading.Lock()
+        self._database_connection: Optional[sqlite3.Connection] = None
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> TTLCache:
+        with self._lock:
+            if self._memory is not None:
+                return self._memory
+            config = get_config()
+            memory = TTLCache(capacity=config.geocoding_cache_size)
+            self._path = config.geocoding_cache_path
+            self._negative_ttl = config.geocoding_negative_ttl
+            self._memory = memory
+        if config.geocoding_preload:
+            self.preload()
+        return memory
+
+    @contextmanager
+    def _database(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """Prête la connexion SQLite du processus (None si le disque est désactivé).
+
+        La connexion est partagée par tous les threads et utilisée sous
+        verrou: des threads éphémères (pool des géocodages parallèles,
+        serveur) n'ouvrent pas chacun la leur.
+        """
+        self._setup()
+        if not self._path:
+            yield None
+            return
+        with self._database_lock:
+            if self._database_connection is None:
+                directory = os.path.dirname(self._path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = sqlite3.connect(self._path, timeout=5.0, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")  # Lectures concurrentes entre processus
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS geocoding ("
+                    "key TEXT PRIMARY KEY, latitude REAL, longitude REAL, name TEXT, expires_at REAL)"
+                )
+                connection.commit()
+                self._database_connection = connection
+            yield self._database_connection
+
+    def _record(self, event: str) -> None:
+        with self._lock:
+            self._counts[event] += 1
+
+    def lookup(self, name: str) -> Any:
+        """Cherche une ville dans le cache.
+
+        Args:
+            name: Nom de la ville
+
+        Returns:
+            Coordonnées, None pour une ville connue comme inexistante, ou ``MISS``
+        """
+        key = normalize_city(name)
+        memory = self._setup()
+        value = memory.get(key)
+        if value is not MISS:
+            self._record("negative_hits" if value is None else "memory_hits")
+            return value
+
+        with self._database() as connection:
+            try:
+                row = None if connection is None else connection.execute(
+                    "SELECT latitude, longitude, name, expires_at FROM geocoding WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Lecture du cache de géocodage impossible: %s", e)
+                row = None
+        if row is not None:
+            latitude, longitude, city_name, expires_at = row
+            ttl = None if expires_at is None else expires_at - time.time()
+            if ttl is None or ttl > 0:
+                value = None if city_name is None else (latitude, longitude, city_name)
+                memory.set(key, value, ttl=ttl)
+                self._record("negative_hits" if value is None else "disk_hits")
+                return value
+
+        self._record("misses")
+        return MISS
+
+    def store(self, name: str, coordinates: Coordinates) -> None:
+        """Enregistre le résultat d'un géocodage (None pour une ville inconnue).
+
+        Args:
+            name: Nom de la ville tel que demandé
+            coordinates: Coordonnées trouvées, ou None
+        """
+        key = normalize_city(name)
+        ttl = self._negative_ttl if coordinates is None else None
+        self._setup().set(key, coordinates, ttl=ttl)
+        self._record("stores")
+
+        latitude, longitude, city_name = coordinates or (None, None, None)
+        with self._database() as connection:
+            if connection is None:
+                return
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO geocoding VALUES (?, ?, ?, ?, ?)",
+                        (key, latitude, longitude, city_name, None if ttl is None else time.time() + ttl)
+                    )
+            except sqlite3.Error as e:
+                logger.warning("Écriture du cache de géocodage impossible: %s", e)
+
+    def preload(self, path: str = BUNDLED_CITIES) -> int:
+        """Charge en mémoire un fichier CSV de villes (colonnes name, latitude, longitude).
+
+        Args:
+            path: Chemin du fichier; par défaut les principales villes fournies avec l'agent
+
+        Returns:
+            Nombre de villes chargées
+        """
+        memory = self._setup()
+        count = 0
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                memory.set(normalize_city(row["name"]), (float(row["latitude"]), float(row["longitude"]), row["name"]))
+                count += 1
+        with self._lock:
+            self._counts["preloaded"] += count
+        logger.info("%s villes préchargées dans le cache de géocodage", count)
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs du cache (succès mémoire/disque, négatifs, absences)."""
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._memory) if self._memory is not None else 0
+        return {
+            "memory_hits": counts.get("memory_hits", 0),
+            "disk_hits": counts.get("disk_hits", 0),
+            "negative_hits": counts.get("negative_hits", 0),
+            "misses": counts.get("misses", 0),
+            "stores": counts.get("stores", 0),
+            "preloaded": counts.get("preloaded", 0),
+            "entries": entries
+        }
+
+    def reset(self) -> None:
+        """Vide le cache mémoire et ferme la base; la configuration sera relue à la prochaine utilisation."""
+        with self._database_lock:
+            if self._database_connection is not None:
+                self._database_connection.close()
+                self._database_connection = None
+        with self._lock:
+            self._memory = None
+            self._counts.clear()
+
+
+# Cache partagé par les outils du processus
+geocoding_cache = GeocodingCache()
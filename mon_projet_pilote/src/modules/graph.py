@@ -2,20 +2,45 @@
 Construction et compilation du graphe d'agent.
 """
 from langgraph.graph import StateGraph, END
-from typing import Dict, Any, Optional, Callable, Annotated
+from typing import Dict, Any, Optional, Callable, Annotated, Tuple
+import threading
 import time
 
 from .state import AgentState
 from .reasoning import (
     analyser, 
     choisir_outil, 
+    analyser_et_choisir, 
+    analyser_en_parallèle,
     appeler_météo, 
+    appeler_météo_multi, 
     appeler_calculatrice, 
     réponse_directe, 
     formuler_réponse, 
-    router
+    pré_routage,
+    réponse_calcul,
+    consulter_cache,
+    mémoriser_réponse,
+    router,
+    router_pré_routage,
+    router_après_calcul,
+    router_cache
+)
+from .reasoning_async import (
+    aanalyser,
+    achoisir_outil,
+    aanalyser_et_choisir,
+    aanalyser_en_parallèle,
+    aappeler_météo,
+    aappeler_météo_multi,
+    aappeler_calculatrice,
+    aréponse_directe,
+    aformuler_réponse
 )
 from .errors import logger, GraphExecutionError, safe_execute
+from .config import get_config
+from .metrics import measure_node
+from .tracing import trace_node, tracer
 
 def nœud_de_récupération(state: Dict[str, Any]) -> Dict[str, Any]:
     """Nœud de récupération en cas d'erreur dans le graphe.
@@ -26,7 +51,7 @@ def nœud_de_récupération(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         État mis à jour avec une réponse d'erreur
     """
-    logger.warning(f"Activation du nœud de récupération. Erreur: {state.get('error_message', 'inconnue')}")
+    logger.warning("Activation du nœud de récupération. Erreur: %s", state.get('error_message', 'inconnue'))
     # Ajout d'un champ error_handled pour éviter les conflits d'état
     return {
         "error_handled": True,
@@ -36,11 +61,49 @@ def nœud_de_récupération(state: Dict[str, Any]) -> Dict[str, Any]:
         )
     }
 
-def build_agent_graph(max_retries: int = 3) -> Any:
+# Topologies disponibles pour build_agent_graph
+GRAPH_MODES = ("standard", "fused", "speculative")
+
+# Implémentations (synchrone, asynchrone) de chaque nœud; les nœuds sans
+# entrée/sortie sont partagés par les deux versions du graphe
+NŒUDS = {
+    "analyser": (analyser, aanalyser),
+    "choisir_outil": (choisir_outil, achoisir_outil),
+    "analyser_et_choisir": (analyser_et_choisir, aanalyser_et_choisir),
+    "analyser_en_parallèle": (analyser_en_parallèle, aanalyser_en_parallèle),
+    "appeler_météo": (appeler_météo, aappeler_météo),
+    "appeler_météo_multi": (appeler_météo_multi, aappeler_météo_multi),
+    "appeler_calculatrice": (appeler_calculatrice, aappeler_calculatrice),
+    "réponse_directe": (réponse_directe, aréponse_directe),
+    "formuler_réponse": (formuler_réponse, aformuler_réponse),
+    "pré_routage": (pré_routage, pré_routage),
+    "réponse_calcul": (réponse_calcul, réponse_calcul),
+    "consulter_cache": (consulter_cache, consulter_cache),
+    "mémoriser_réponse": (mémoriser_réponse, mémoriser_réponse),
+    "récupération": (nœud_de_récupération, nœud_de_récupération),
+}
+
+def build_agent_graph(
+    max_retries: int = 3,
+    mode: str = "standard",
+    fast_path: bool = False,
+    use_async: bool = False,
+    answer_cache: bool = False
+) -> Any:
     """Construit et compile le graphe d'agent avec gestion des erreurs.
     
     Args:
         max_retries: Nombre maximum de tentatives de compilation
+        mode: Topologie du graphe: "standard" (``analyser`` puis ``choisir_outil``),
+            "fused" (un seul nœud ``analyser_et_choisir``, un appel LLM de moins) ou
+            "speculative" (nœud ``analyser_en_parallèle``: analyse, choix de l'outil et
+            extractions lancés simultanément, une latence LLM au lieu de trois)
+        fast_path: Ajoute un nœud ``pré_routage`` déterministe qui envoie les questions
+            évidentes de calcul et de météo directement vers l'outil
+        use_async: Enregistre les versions asynchrones des nœuds, pour ``app.ainvoke`` /
+            ``app.astream`` sans blocage de la boucle d'évènements
+        answer_cache: Ajoute en tête un nœud ``consulter_cache`` qui sert directement les
+            questions déjà posées, et un nœud ``mémoriser_réponse`` avant la fin
         
     Returns:
         Graphe compilé
@@ -48,7 +111,25 @@ def build_agent_graph(max_retries: int = 3) -> Any:
     Raises:
         GraphExecutionError: Si la compilation échoue après le nombre maximum de tentatives
     """
-    logger.info("Construction du graphe d'agent")
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"Mode de graphe inconnu: {mode} (attendu: {', '.join(GRAPH_MODES)})")
+    
+    logger.info(
+        "Construction du graphe d'agent (mode %s, voie rapide: %s, asynchrone: %s, cache des réponses: %s)",
+        mode, fast_path, use_async, answer_cache
+    )
+    
+    # Nœuds mesurés et enveloppés dans un span selon la configuration à la construction
+    measured = get_config().metrics_enabled
+    traced = tracer.enabled
+    
+    def add_node(workflow: StateGraph, name: str) -> None:
+        node = NŒUDS[name][1 if use_async else 0]
+        if measured:
+            node = measure_node(name, node)
+        if traced:
+            node = trace_node(name, node)
+        workflow.add_node(name, node)
     
     # Tentatives de compilation avec backoff exponentiel
     for attempt in range(max_retries):
@@ -57,32 +138,75 @@ def build_agent_graph(max_retries: int = 3) -> Any:
             workflow = StateGraph(AgentState)
             
             # Ajout des nœuds principaux
-            workflow.add_node("analyser", analyser)
-            workflow.add_node("choisir_outil", choisir_outil)
-            workflow.add_node("appeler_météo", appeler_météo)
-            workflow.add_node("appeler_calculatrice", appeler_calculatrice)
-            workflow.add_node("réponse_directe", réponse_directe)
-            workflow.add_node("formuler_réponse", formuler_réponse)
+            if mode == "fused":
+                add_node(workflow, "analyser_et_choisir")
+            elif mode == "speculative":
+                add_node(workflow, "analyser_en_parallèle")
+            else:
+                add_node(workflow, "analyser")
+                add_node(workflow, "choisir_outil")
+            add_node(workflow, "appeler_météo")
+            add_node(workflow, "appeler_météo_multi")
+            add_node(workflow, "appeler_calculatrice")
+            add_node(workflow, "réponse_directe")
+            add_node(workflow, "formuler_réponse")
             
             # Ajout du nœud de récupération
-            workflow.add_node("récupération", nœud_de_récupération)
+            add_node(workflow, "récupération")
+            
+            # Les nœuds qui produisent la réponse finale passent par la mise en cache
+            fin = "mémoriser_réponse" if answer_cache else END
             
             # Définition des arêtes avec routage dynamique
-            workflow.set_entry_point("analyser")
+            llm_entry = {"fused": "analyser_et_choisir", "speculative": "analyser_en_parallèle"}.get(mode, "analyser")
+            if mode != "standard":
+                workflow.add_conditional_edges(llm_entry, router)
+            else:
+                workflow.add_edge("analyser", "choisir_outil")
+                workflow.add_conditional_edges("choisir_outil", router)
+            
+            if fast_path:
+                # Pré-routage: outil direct pour les questions évidentes, chemin LLM sinon
+                add_node(workflow, "pré_routage")
+                add_node(workflow, "réponse_calcul")
+                entry = "pré_routage"
+                workflow.add_conditional_edges(
+                    "pré_routage",
+                    router_pré_routage,
+                    {
+                        "llm": llm_entry,
+                        "appeler_météo": "appeler_météo",
+                        "appeler_calculatrice": "appeler_calculatrice",
+                        "réponse_directe": llm_entry
+                    }
+                )
+                workflow.add_conditional_edges("appeler_calculatrice", router_après_calcul)
+                workflow.add_edge("réponse_calcul", fin)
+            else:
+                entry = llm_entry
+                workflow.add_edge("appeler_calculatrice", "formuler_réponse")
+            
+            if answer_cache:
+                # Cache des réponses: une question déjà posée termine le graphe immédiatement
+                add_node(workflow, "consulter_cache")
+                add_node(workflow, "mémoriser_réponse")
+                workflow.set_entry_point("consulter_cache")
+                workflow.add_conditional_edges("consulter_cache", router_cache, {"trouvé": END, "absent": entry})
+                workflow.add_edge("mémoriser_réponse", END)
+            else:
+                workflow.set_entry_point(entry)
             
             # Arêtes standards
-            workflow.add_edge("analyser", "choisir_outil")
-            workflow.add_conditional_edges("choisir_outil", router)
             workflow.add_edge("appeler_météo", "formuler_réponse")
-            workflow.add_edge("appeler_calculatrice", "formuler_réponse")
-            workflow.add_edge("réponse_directe", END)
-            workflow.add_edge("formuler_réponse", END)
+            workflow.add_edge("appeler_météo_multi", "formuler_réponse")
+            workflow.add_edge("réponse_directe", fin)
+            workflow.add_edge("formuler_réponse", fin)
             
             # Arêtes de récupération d'erreur
             def détecteur_erreur(state: Dict[str, Any]) -> str:
                 """Détecte si une erreur s'est produite et route vers le nœud approprié."""
                 if state.get("error", False):
-                    logger.warning(f"Erreur détectée, routage vers récupération: {state.get('error_message', '')}")
+                    logger.warning("Erreur détectée, routage vers récupération: %s", state.get('error_message', ''))
                     return "récupération"
                 return "normal"
             
@@ -94,19 +218,90 @@ def build_agent_graph(max_retries: int = 3) -> Any:
             compiled_graph = workflow.compile()
             compilation_time = time.time() - start_time
             
-            logger.info(f"Graphe compilé avec succès en {compilation_time:.2f} secondes")
+            logger.info("Graphe compilé avec succès en %.2f secondes", compilation_time)
             return compiled_graph
             
         except Exception as e:
-            logger.error(f"Erreur lors de la compilation du graphe (tentative {attempt+1}/{max_retries}): {str(e)}")
+            logger.error("Erreur lors de la compilation du graphe (tentative %s/%s): %s", attempt+1, max_retries, e)
             if attempt < max_retries - 1:
                 # Backoff exponentiel
                 wait_time = 2 ** attempt
-                logger.info(f"Nouvelle tentative dans {wait_time} secondes...")
+                logger.info("Nouvelle tentative dans %s secondes...", wait_time)
                 time.sleep(wait_time)
             else:
-                logger.critical(f"Échec de la compilation du graphe après {max_retries} tentatives")
+                logger.critical("Échec de la compilation du graphe après %s tentatives", max_retries)
                 raise GraphExecutionError(f"Impossible de compiler le graphe: {str(e)}")
     
     # Cette ligne ne devrait jamais être atteinte
-    raise GraphExecutionError("Erreur inattendue lors de la compilation du graphe") 
\ No newline at end of file
+    raise GraphExecutionError("Erreur inattendue lors de la compilation du graphe")
+
+
+class CompiledGraphs:
+    """Graphes compilés une seule fois par processus, indexés par options.
+
+    La compilation (construction des nœuds, validation des arêtes) coûte de
+    l'ordre de la dizaine de millisecondes et le graphe compilé est sans état:
+    toutes les requêtes d'un processus partagent la même instance. La clé
+    inclut les réglages lus à la construction (métriques, traçage), pour qu'un
+    ``configure()`` ultérieur produise un nouveau graphe au lieu de servir
+    l'ancien.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graphs: Dict[Tuple[Any, ...], Any] = {}
+        self._hits = 0
+        self._builds = 0
+
+    def get(
+        self,
+        mode: str = "standard",
+        fast_path: bool = False,
+        use_async: bool = False,
+        answer_cache: bool = False
+    ) -> Any:
+        """Renvoie le graphe compilé pour ces options, construit au premier appel.
+
+        Args:
+            mode, fast_path, use_async, answer_cache: Voir ``build_agent_graph``
+
+        Returns:
+            Graphe compilé partagé
+        """
+        key = (mode, fast_path, use_async, answer_cache, get_config().metrics_enabled, tracer.enabled)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                # Construction sous le verrou: les appels concurrents attendent le même graphe
+                graph = build_agent_graph(mode=mode, fast_path=fast_path, use_async=use_async,
+                                          answer_cache=answer_cache)
+                self._graphs[key] = graph
+                self._builds += 1
+            else:
+                self._hits += 1
+            return graph
+
+    def reset(self) -> None:
+        """Oublie les graphes compilés et remet les compteurs à zéro."""
+        with self._lock:
+            self._graphs.clear()
+            self._hits = self._builds = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs du cache de graphes."""
+        with self._lock:
+            return {"graphs": len(self._graphs), "hits": self._hits, "builds": self._builds}
+
+
+# Graphes compilés partagés par tout le processus
+compiled_graphs = CompiledGraphs()
+
+
+def get_agent_graph(
+    mode: str = "standard",
+    fast_path: bool = False,
+    use_async: bool = False,
+    answer_cache: bool = False
+) -> Any:
+    """Graphe d'agent compilé une fois par processus (voir ``CompiledGraphs``)."""
+    return compiled_graphs.get(mode=mode, fast_path=fast_path, use_async=use_async, answer_cache=answer_cache)
@@ -0,0 +1,209 @@
+"""
+Couche HTTP partagée par les outils de l'agent.
+
+Toutes les requêtes sortantes passent par des pools de connexions par hôte
+(keep-alive): une question météo ne paie plus l'établissement de deux connexions
+TCP+TLS. Les GET, idempotents, sont réessayés au niveau transport avec une
+attente exponentielle et une gigue aléatoire.
+
+- synchrone: une ``requests.Session`` par thread, toutes montées sur le même
+  ``HTTPAdapter`` (dont le pool urllib3 est thread-safe)
+- asynchrone: un ``httpx.AsyncClient`` par boucle d'évènements
+
+``requests``, ``urllib3`` et ``httpx`` ne sont importés qu'à la première
+requête, pas à l'import du module.
+"""
+import asyncio
+import random
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import get_config
+from .errors import logger
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+    from requests.adapters import HTTPAdapter
+
+# Statuts HTTP transitoires pour lesquels un GET est réessayé
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+
+
+def backoff_delay(attempt: int, backoff: float, jitter: float, maximum: float = 10.0) -> float:
+    """Attente avant la tentative ``attempt`` (1 pour la première reprise).
+
+    Même règle qu'urllib3: ``backoff * 2 ** (attempt - 1)`` plafonné à ``maximum``,
+    plus une gigue uniforme dans ``[0, jitter]`` pour désynchroniser les clients.
+    """
+    return min(maximum, backoff * 2 ** (attempt - 1)) + random.uniform(0, jitter)
+
+
+def _request_span(url: str) -> Any:
+    """Span ``http`` d'une requête, nommé par son chemin (sans les paramètres)."""
+    parts = urlsplit(url)
+    return tracer.span(parts.path or "/", "http", host=parts.netloc)
+
+
+class HTTPClient:
+    """Client HTTP mutualisé (pools de connexions, keep-alive, retry des GET).
+
+    Les paramètres (taille des pools, timeouts, retry) sont lus dans la
+    configuration à la première utilisation; ``reset()`` les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapter: Optional["HTTPAdapter"] = None
+        self._generation = 0
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _build_adapter(self) -> "HTTPAdapter":
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        config = get_config()
+        retry = Retry(
+            total=config.http_retries,
+            backoff_factor=config.http_backoff,
+            backoff_jitter=config.http_backoff_jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,  # La dernière réponse est renvoyée, raise_for_status() décide
+            respect_retry_after_header=True
+        )
+        return HTTPAdapter(
+            pool_connections=config.http_pool_connections,
+            pool_maxsize=config.http_pool_maxsize,
+            max_retries=retry,
+            pool_block=False
+        )
+
+    def _shared_adapter(self) -> Tuple["HTTPAdapter", int]:
+        with self._lock:
+            if self._adapter is None:
+                self._adapter = self._build_adapter()
+                self._generation += 1
+            return self._adapter, self._generation
+
+    @staticmethod
+    def timeout() -> Tuple[float, float]:
+        """Timeouts (connexion, lecture) de la configuration courante."""
+        config = get_config()
+        return config.http_connect_timeout, config.http_timeout
+
+    def session(self) -> "requests.Session":
+        """Renvoie la session du thread courant, montée sur l'adaptateur partagé."""
+        import requests
+
+        adapter, generation = self._shared_adapter()
+        session = getattr(self._local, "session", None)
+        if session is None or self._local.generation != generation:
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session, self._local.generation = session, generation
+        return session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> "requests.Response":
+        """GET via le pool partagé, avec retry transport.
+
+        Raises:
+            requests.exceptions.ReadTimeout: Si la dernière tentative expire en lecture
+            requests.exceptions.RequestException: Pour les autres erreurs de transport
+        """
+        kwargs.setdefault("timeout", self.timeout())
+        with _request_span(url) as span:
+            response = self._get(url, params, **kwargs)
+            span.set(status=response.status_code)
+            return response
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]], **kwargs) -> "requests.Response":
+        import requests
+        from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+
+        try:
+            return self.session().get(url, params=params, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            # Après épuisement des tentatives, requests présente un timeout de lecture
+            # comme une erreur de connexion: on rétablit le type d'origine
+            reason = e.args[0] if e.args else None
+            if isinstance(reason, MaxRetryError) and isinstance(reason.reason, ReadTimeoutError):
+                raise requests.exceptions.ReadTimeout(e, request=e.request) from e
+            raise
+
+    def async_client(self) -> "httpx.AsyncClient":
+        """Renvoie le client asynchrone de la boucle d'évènements courante."""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            config = get_config()
+            connect, read = self.timeout()
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(
+                    max_connections=config.http_pool_connections * config.http_pool_maxsize,
+                    max_keepalive_connections=config.http_pool_maxsize
+                )
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def aget(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> "httpx.Response":
+        """Version asynchrone de ``get``, avec la même politique de retry.
+
+        Raises:
+            httpx.TransportError: Si toutes les tentatives échouent au niveau transport
+        """
+        import httpx
+
+        config = get_config()
+        client = self.async_client()
+        attempt = 0
+        with _request_span(url) as span:
+            while True:
+                try:
+                    response = await client.get(url, params=params, **kwargs)
+                    if response.status_code not in RETRY_STATUSES or attempt >= config.http_retries:
+                        span.set(status=response.status_code, retries=attempt)
+                        return response
+                except httpx.TransportError:
+                    if attempt >= config.http_retries:
+                        raise
+                attempt += 1
+                logger.warning("Nouvelle tentative HTTP (%s/%s): %s", attempt, config.http_retries, url)
+                await asyncio.sleep(backoff_delay(attempt, config.http_backoff, config.http_backoff_jitter))
+
+    def stats(self) -> Dict[str, int]:
+        """Connexions ouvertes et requêtes émises par les pools synchrones."""
+        with self._lock:
+            adapter = self._adapter
+        if adapter is None:
+            return {"pools": 0, "connections": 0, "requests": 0}
+        pools = adapter.poolmanager.pools
+        counts = [(pool.num_connections, pool.num_requests) for pool in (pools[key] for key in pools.keys())]
+        return {
+            "pools": len(counts),
+            "connections": sum(c for c, _ in counts),
+            "requests": sum(r for _, r in counts)
+        }
+
+    def reset(self) -> None:
+        """Ferme les connexions synchrones; les paramètres seront relus à la prochaine requête."""
+        with self._lock:
+            if self._adapter is not None:
+                self._adapter.close()
+            self._adapter = None
+
+
+# Client partagé par tous les outils du processus
+http_client = HTTPClient()
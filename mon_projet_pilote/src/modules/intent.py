@@ -0,0 +1,226 @@
+"""
+Classifieur local de l'outil à utiliser.
+
+Le premier appel de ``choisir_outil`` (mode en deux étapes) n'obtient du LLM
+qu'un libellé parmi trois (``recherche_météo``, ``calculatrice``,
+``réponse_directe``). Un modèle linéaire entraîné sur le trafic journalisé
+(résultats de ``run_batch.py``, champ ``tool_name``) le remplace lorsque sa
+confiance atteint ``AGENT_INTENT_THRESHOLD``; en dessous, le LLM est appelé
+comme avant.
+
+Les questions sont normalisées comme pour le cache des réponses, les nombres
+remplacés par ``0`` (« 12*7 » et « 3*4 » ont la même forme), puis représentées
+par le vecteur de mots et trigrammes de caractères hachés de
+``answer_cache.embed``. Le modèle (régression logistique multinomiale
+entraînée par descente de gradient, numpy seul) tient dans un fichier ``.npz``
+(``AGENT_INTENT_MODEL_PATH``), chargé une seule fois par processus; une
+prédiction prend quelques dizaines de microsecondes.
+"""
+import csv
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .answer_cache import embed, normalize_question
+from .config import get_config
+from .errors import logger
+
+INTENT_DIM = 1024
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def featurize(question: str, dim: int = INTENT_DIM) -> np.ndarray:
+    """Vecteur d'une question: forme normalisée (nombres remplacés par 0), mots et trigrammes hachés."""
+    return embed(_NUMBER.sub("0", normalize_question(question or "")), dim)
+
+
+@dataclass
+class IntentModel:
+    """Régression logistique multinomiale sur les vecteurs de ``featurize``."""
+
+    labels: Tuple[str, ...]
+    weights: np.ndarray  # (libellés, dimension)
+    bias: np.ndarray     # (libellés,)
+
+    @property
+    def dim(self) -> int:
+        return self.weights.shape[1]
+
+    def _scores(self, features: np.ndarray) -> np.ndarray:
+        logits = features @ self.weights.T + self.bias
+        logits -= logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, question: str) -> Tuple[str, float]:
+        """Renvoie le libellé le plus probable et sa probabilité."""
+        probabilities = self._scores(featurize(question, self.dim))
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str) -> None:
+        """Enregistre le modèle au format ``.npz`` (répertoire créé si besoin)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, labels=np.array(self.labels), weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        """Charge un modèle enregistré par ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(tuple(str(label) for label in data["labels"]), data["weights"], data["bias"])
+
+
+def train_intent_model(questions: Sequence[str], labels: Sequence[str], dim: int = INTENT_DIM,
+                       epochs: int = 300, learning_rate: float = 2.0, l2: float = 1e-4) -> IntentModel:
+    """Entraîne le classifieur par descente de gradient sur l'ensemble des exemples.
+
+    Args:
+        questions: Questions d'entraînement
+        labels: Outil retenu pour chaque question
+        dim: Dimension des vecteurs hachés
+        epochs: Nombre de passes
+        learning_rate: Pas de la descente de gradient
+        l2: Régularisation des poids
+
+    Returns:
+        Modèle entraîné (déterministe pour des exemples donnés)
+    """
+    if not questions or len(questions) != len(labels):
+        raise ValueError("Il faut autant de libellés que de questions, et au moins un exemple")
+    classes = tuple(sorted(set(labels)))
+    features = np.stack([featurize(q, dim) for q in questions])
+    targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+    targets[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1.0
+
+    model = IntentModel(classes, np.zeros((len(classes), dim), dtype=np.float32),
+                        np.zeros(len(classes), dtype=np.float32))
+    for _ in range(epochs):
+        error = (model._scores(features) - targets) / len(labels)
+        model.weights -= learning_rate * (error.T @ features + l2 * model.weights)
+        model.bias -= learning_rate * error.sum(axis=0)
+    return model
+
+
+def evaluate_intent_model(model: IntentModel, questions: Sequence[str], labels: Sequence[str],
+                          threshold: float) -> Dict[str, float]:
+    """Mesure l'exactitude du classifieur et la part des appels LLM qu'il remplace au seuil donné.
+
+    Returns:
+        Dictionnaire avec ``accuracy`` (toutes prédictions), ``coverage`` (part
+        des questions au-dessus du seuil), ``accuracy_above_threshold``
+        (exactitude de ces seules questions) et ``mean_us`` (durée moyenne d'une
+        prédiction, en microsecondes)
+    """
+    start = time.perf_counter()
+    predictions = [model.predict(question) for question in questions]
+    mean_us = (time.perf_counter() - start) / max(len(questions), 1) * 1e6
+    correct = [label == expected for (label, _), expected in zip(predictions, labels)]
+    confident = [confidence >= threshold for _, confidence in predictions]
+    covered = sum(confident)
+    return {
+        "accuracy": sum(correct) / max(len(labels), 1),
+        "coverage": covered / max(len(labels), 1),
+        "accuracy_above_threshold": sum(c for c, k in zip(correct, confident) if k) / covered if covered else 0.0,
+        "mean_us": mean_us,
+    }
+
+
+def read_examples(paths: Iterable[str], label_field: str = "tool_name",
+                  column: str = "question") -> Tuple[List[str], List[str]]:
+    """Lit des exemples (question, outil) dans des fichiers JSONL ou CSV.
+
+    Les lignes en erreur (champ ``error`` renseigné) ou sans libellé sont ignorées,
+    ce qui permet d'entraîner directement sur les résultats de ``run_batch.py``.
+    """
+    questions, labels = [], []
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as f:
+            records = csv.DictReader(f) if str(path).lower().endswith(".csv") else (
+                json.loads(line) for line in f if line.strip()
+            )
+            for record in records:
+                question, label = record.get(column), record.get(label_field)
+                if question and label and not record.get("error"):
+                    questions.append(str(question).strip())
+                    labels.append(str(label).strip())
+    return questions, labels
+
+
+class IntentClassifier:
+    """Classifieur partagé par les nœuds: modèle chargé à la première utilisation, compteurs par issue.
+
+    Sans ``AGENT_INTENT_MODEL_PATH`` (ou si le fichier est absent), ``classify``
+    renvoie toujours None et le choix d'outil reste confié au LLM.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._model: Optional[IntentModel] = None
+        self._threshold = 1.0
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> Optional[IntentModel]:
+        with self._lock:
+            if not self._loaded:
+                config = get_config()
+                self._threshold = config.intent_threshold
+                if config.intent_model_path:
+                    try:
+                        self._model = IntentModel.load(config.intent_model_path)
+                        logger.info("Classifieur d'intention chargé: %s", config.intent_model_path)
+                    except (OSError, KeyError, ValueError) as e:
+                        logger.warning("Classifieur d'intention indisponible (%s): %s", config.intent_model_path, e)
+                self._loaded = True
+            return self._model
+
+    def load(self) -> bool:
+        """Charge le modèle configuré (au démarrage); renvoie True s'il est disponible."""
+        return self._setup() is not None
+
+    def classify(self, question: str) -> Optional[str]:
+        """Outil prédit pour ``question`` si la confiance atteint le seuil, None sinon.
+
+        Args:
+            question: Question de l'utilisateur
+
+        Returns:
+            Nom de l'outil, ou None pour laisser le LLM choisir
+        """
+        model = self._setup()
+        if model is None or not question:
+            return None
+        label, confidence = model.predict(question)
+        outcome = "local" if confidence >= self._threshold else "llm"
+        with self._lock:
+            self._counts[outcome] += 1
+        if outcome == "llm":
+            logger.info("Classifieur d'intention peu sûr (%s, %.2f), choix confié au LLM", label, confidence)
+            return None
+        logger.info("Outil prédit par le classifieur d'intention: %s (confiance %.2f)", label, confidence)
+        return label
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie le nombre de choix faits localement et confiés au LLM."""
+        with self._lock:
+            return {"local": self._counts["local"], "llm": self._counts["llm"]}
+
+    def reset(self) -> None:
+        """Oublie le modèle chargé et les compteurs; la configuration sera relue à la prochaine utilisation."""
+        with self._lock:
+            self._loaded = False
+            self._model = None
+            self._counts.clear()
+
+
+# Classifieur partagé par choisir_outil
+intent_classifier = IntentClassifier()
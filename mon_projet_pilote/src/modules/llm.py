@@ -0,0 +1,243 @@
+"""
+Registre de clients LLM mutualisés pour l'agent.
+
+Chaque configuration (modèle, température, autres paramètres) n'est construite
+qu'une seule fois par processus : tous les nœuds et toutes les invocations
+concurrentes du graphe partagent ensuite le même client et son pool de connexions.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .errors import logger
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+DEFAULT_TEMPERATURE = 0.2
+
+# Clé de registre: (modèle, température, paramètres supplémentaires triés)
+LLMKey = Tuple[str, float, Tuple[Tuple[str, Any], ...]]
+
+
+def _freeze(value: Any) -> Any:
+    """Rend une valeur de configuration hachable pour l'utiliser dans une clé."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def make_llm_key(model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, **kwargs) -> LLMKey:
+    """Construit la clé de registre associée à une configuration de LLM.
+
+    Args:
+        model: Nom du modèle
+        temperature: Température d'échantillonnage
+        kwargs: Autres paramètres passés au constructeur du client
+
+    Returns:
+        Clé hachable identifiant la configuration
+    """
+    return (model, float(temperature), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+
+
+def default_llm_factory(model: str, temperature: float, **kwargs) -> Any:
+    """Construit un client Gemini pour la configuration demandée.
+
+    Le client Google GenAI (environ 0,5 s d'import) n'est chargé qu'à la
+    construction du premier client, pas à l'import du registre.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=model, temperature=temperature, **kwargs)
+
+
+class LLMRegistry:
+    """Registre thread-safe de clients LLM, indexé par configuration.
+
+    Le premier appel pour une configuration construit le client (avec retry et
+    attente exponentielle), les appels suivants renvoient l'instance existante.
+    Des compteurs permettent de vérifier que la construction n'a lieu qu'une fois.
+    """
+
+    def __init__(
+        self,
+        factory: Optional[Callable[..., Any]] = None,
+        retries: int = 2,
+        backoff: float = 1.5
+    ):
+        """Initialise le registre.
+
+        Args:
+            factory: Fonction de construction ``factory(model, temperature, **kwargs)``
+            retries: Nombre de tentatives supplémentaires en cas d'échec de construction
+            backoff: Facteur de multiplication pour le temps d'attente entre les tentatives
+        """
+        self._factory = factory or default_llm_factory
+        self.retries = retries
+        self.backoff = backoff
+        self._clients: Dict[LLMKey, Any] = {}
+        self._key_locks: Dict[LLMKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._constructions = 0
+        self._failures = 0
+
+    def get(self, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, **kwargs) -> Any:
+        """Renvoie le client mutualisé pour une configuration, en le construisant si besoin.
+
+        Args:
+            model: Nom du modèle
+            temperature: Température d'échantillonnage
+            kwargs: Autres paramètres passés au constructeur du client
+
+        Returns:
+            Instance du modèle LLM partagée
+        """
+        key = make_llm_key(model, temperature, **kwargs)
+
+        client = self._clients.get(key)
+        if client is not None:
+            with self._lock:
+                self._hits += 1
+            return client
+
+        # Verrou propre à la clé: la construction d'un modèle lent ne bloque pas les autres
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            client = self._clients.get(key)
+            if client is not None:
+                with self._lock:
+                    self._hits += 1
+                return client
+
+            client = self._construct(model, temperature, **kwargs)
+            with self._lock:
+                self._clients[key] = client
+                self._constructions += 1
+            logger.info("Client LLM construit: %s (température %s)", model, temperature)
+            return client
+
+    async def aget(self, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, **kwargs) -> Any:
+        """Version asynchrone de ``get``: l'attente entre les tentatives ne bloque pas la boucle.
+
+        La construction d'un client ne fait pas d'entrée/sortie; en cas de course avec un
+        autre thread, le premier client enregistré est conservé et l'autre est abandonné.
+        """
+        key = make_llm_key(model, temperature, **kwargs)
+
+        client = self._clients.get(key)
+        if client is not None:
+            with self._lock:
+                self._hits += 1
+            return client
+
+        attempt = 0
+        while True:
+            try:
+                client = self._factory(model, temperature, **kwargs)
+                break
+            except Exception as e:
+                attempt += 1
+                await asyncio.sleep(self._retry_delay(attempt, e))
+
+        with self._lock:
+            registered = self._clients.setdefault(key, client)
+            if registered is client:
+                self._constructions += 1
+            else:
+                self._hits += 1
+        if registered is client:
+            logger.info("Client LLM construit: %s (température %s)", model, temperature)
+        return registered
+
+    def _construct(self, model: str, temperature: float, **kwargs) -> Any:
+        """Construit un client avec retry et attente exponentielle."""
+        attempt = 0
+        while True:
+            try:
+                return self._factory(model, temperature, **kwargs)
+            except Exception as e:
+                attempt += 1
+                time.sleep(self._retry_delay(attempt, e))  # Attente exponentielle
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Comptabilise un échec de construction et renvoie l'attente avant la tentative suivante.
+
+        Raises:
+            Exception: L'erreur d'origine si le nombre de tentatives est épuisé
+        """
+        with self._lock:
+            self._failures += 1
+        if attempt > self.retries:
+            logger.error("Échec de l'initialisation du LLM après %s tentatives: %s", self.retries, error)
+            raise error
+        logger.warning("Erreur lors de l'initialisation du LLM (tentative %s): %s", attempt, error)
+        return self.backoff ** attempt
+
+    def warm_up(self, configs: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """Construit à l'avance les clients des configurations données.
+
+        Args:
+            configs: Configurations (arguments de ``get``); la configuration par défaut si absent
+
+        Returns:
+            Nombre de clients disponibles dans le registre après le préchauffage
+        """
+        for config in configs or [{}]:
+            self.get(**config)
+        return len(self._clients)
+
+    def set_factory(self, factory: Callable[..., Any]) -> None:
+        """Remplace la fonction de construction et vide le registre."""
+        with self._lock:
+            self._factory = factory
+            self._clients.clear()
+            self._key_locks.clear()
+
+    def clear(self) -> None:
+        """Vide le registre et remet les compteurs à zéro."""
+        with self._lock:
+            self._clients.clear()
+            self._key_locks.clear()
+            self._hits = self._constructions = self._failures = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs d'utilisation du registre."""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hits": self._hits,
+                "constructions": self._constructions,
+                "failures": self._failures
+            }
+
+
+# Registre partagé par tout le processus
+llm_registry = LLMRegistry()
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, **kwargs) -> Any:
+    """Obtient le client LLM mutualisé pour la configuration demandée.
+
+    Args:
+        model: Nom du modèle
+        temperature: Température d'échantillonnage
+        kwargs: Autres paramètres passés au constructeur du client
+
+    Returns:
+        Instance du modèle LLM
+    """
+    return llm_registry.get(model, temperature, **kwargs)
+
+
+async def aget_llm(model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, **kwargs) -> Any:
+    """Version asynchrone de ``get_llm`` (attente non bloquante entre les tentatives)."""
+    return await llm_registry.aget(model, temperature, **kwargs)
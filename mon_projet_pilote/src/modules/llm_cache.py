@@ -0,0 +1,298 @@
+"""
+Mémoïsation des appels LLM, par prompt rendu.
+
+Beaucoup d'appels intermédiaires se répètent: l'extraction de la ville reçoit
+souvent la même question, et la réflexion d'``analyser`` sur une question déjà
+vue est la même. Un client LLM mutualisé peut être enveloppé, prompt par prompt,
+par un ``MemoizedLLM`` dont la clé est (modèle, température, prompt rendu).
+Les réponses sont gardées dans un LRU en mémoire borné en octets, devant une
+base SQLite.
+
+Modes (``AGENT_LLM_CACHE_MODE``):
+
+- ``off``: aucun prompt n'est enveloppé;
+- ``memo``: seuls les prompts listés dans ``AGENT_LLM_CACHE_PROMPTS`` sont
+  mémoïsés (lecture puis appel au modèle en cas d'absence), la base est
+  bornée à ``AGENT_LLM_CACHE_MAX_BYTES`` octets;
+- ``record``: tous les prompts appellent le modèle et leur réponse est
+  enregistrée (sans éviction), pour constituer un enregistrement de référence;
+- ``replay``: tous les prompts sont servis depuis la base, sans jamais appeler
+  le modèle; une absence lève ``LLMCacheMissError``. Les tests et benchmarks
+  s'exécutent alors hors ligne et de façon déterministe.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from .cache import MISS, SingleFlight, TTLCache
+from .config import get_config
+from .errors import LLMCacheMissError, logger
+from .tracing import tracer
+
+
+def _messages(prompt: Any) -> List[Tuple[str, str]]:
+    """Messages rendus d'un prompt (``PromptValue``, liste de messages ou texte)."""
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, str):
+        return [("human", prompt)]
+    return [(message.type, str(message.content)) for message in prompt]
+
+
+def llm_identity(llm: Any) -> Tuple[str, float]:
+    """(modèle, température) d'un client LLM, pour la clé de cache."""
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+    return str(model), float(temperature or 0.0)
+
+
+def make_prompt_key(model: str, temperature: float, messages: List[Tuple[str, str]]) -> str:
+    """Clé de cache: empreinte SHA-256 du modèle, de la température et du prompt rendu."""
+    payload = json.dumps([model, temperature, messages], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """Stockage des réponses LLM (mémoire puis SQLite) et politique de mémoïsation.
+
+    Les paramètres (mode, prompts mémoïsés, chemin de la base, budget en
+    octets) sont lus dans la configuration à la première utilisation;
+    ``reset()`` les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: Optional[TTLCache] = None
+        self._mode = "off"
+        self._prompts: frozenset = frozenset()
+        self._path = ""
+        self._max_bytes = 0
+        # Une seule connexion SQLite par processus, sérialisée par son propre verrou
+        self._database_lock = threading.Lock()
+        self._database_connection: Optional[sqlite3.Connection] = None
+        self._flights = SingleFlight()
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> TTLCache:
+        with self._lock:
+            if self._memory is None:
+                config = get_config()
+                self._mode = config.llm_cache_mode
+                self._prompts = frozenset(p.strip() for p in config.llm_cache_prompts.split(",") if p.strip())
+                self._path = config.llm_cache_path
+                self._max_bytes = config.llm_cache_max_bytes
+                self._memory = TTLCache(capacity=sys.maxsize, max_bytes=self._max_bytes)
+            return self._memory
+
+    @property
+    def mode(self) -> str:
+        """Mode courant: "off", "memo", "record" ou "replay"."""
+        self._setup()
+        return self._mode
+
+    def covers(self, prompt_name: str) -> bool:
+        """Indique si les appels du prompt ``prompt_name`` passent par le cache."""
+        self._setup()
+        if self._mode == "memo":
+            return prompt_name in self._prompts
+        return self._mode != "off"
+
+    @contextmanager
+    def _database(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """Prête la connexion SQLite du processus (None si le disque est désactivé).
+
+        Partagée par tous les threads et utilisée sous verrou, pour que les
+        threads éphémères du serveur n'ouvrent pas chacun la leur.
+        """
+        self._setup()
+        if not self._path:
+            yield None
+            return
+        with self._database_lock:
+            if self._database_connection is None:
+                directory = os.path.dirname(self._path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = sqlite3.connect(self._path, timeout=5.0, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")  # Lectures concurrentes entre processus
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_calls ("
+                    "key TEXT PRIMARY KEY, prompt_name TEXT, model TEXT, temperature REAL, "
+                    "prompt TEXT, response TEXT, size INTEGER, last_access REAL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS llm_calls_last_access ON llm_calls (last_access)")
+                connection.commit()
+                self._database_connection = connection
+            yield self._database_connection
+
+    def _record(self, event: str, count: int = 1) -> None:
+        with self._lock:
+            self._counts[event] += count
+
+    def lookup(self, key: str) -> Any:
+        """Renvoie la réponse enregistrée pour une clé, ou ``MISS``."""
+        memory = self._setup()
+        response = memory.get(key)
+        if response is not MISS:
+            self._record("memory_hits")
+            return response
+
+        with self._database() as connection:
+            if connection is None:
+                return MISS
+            try:
+                row = connection.execute("SELECT response, size FROM llm_calls WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return MISS
+                if self._mode == "memo":
+                    with connection:
+                        connection.execute("UPDATE llm_calls SET last_access = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                logger.warning("Lecture du cache LLM impossible: %s", e)
+                return MISS
+        response, size = row
+        memory.set(key, response, size=size)
+        self._record("disk_hits")
+        return response
+
+    def store(self, key: str, prompt_name: str, identity: Tuple[str, float],
+              messages: List[Tuple[str, str]], response: str) -> None:
+        """Enregistre la réponse d'un appel LLM."""
+        prompt = json.dumps(messages, ensure_ascii=False)
+        size = len(prompt.encode()) + len(response.encode())
+        self._setup().set(key, response, size=size)
+        self._record("stores")
+
+        now = time.time()
+        with self._database() as connection:
+            if connection is None:
+                return
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, prompt_name, identity[0], identity[1], prompt, response, size, now)
+                    )
+                    if self._mode == "memo":
+                        self._enforce_budget(connection)
+            except sqlite3.Error as e:
+                logger.warning("Écriture du cache LLM impossible: %s", e)
+
+    def _enforce_budget(self, connection: sqlite3.Connection) -> None:
+        """Ramène la base sous le budget en supprimant les réponses les moins récemment lues."""
+        excess = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_calls").fetchone()[0] - self._max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM llm_calls ORDER BY last_access"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        connection.executemany("DELETE FROM llm_calls WHERE key = ?", victims)
+        self._record("disk_evictions", len(victims))
+
+    def _prepare(self, llm: Any, prompt: Any) -> Tuple[str, Tuple[str, float], List[Tuple[str, str]]]:
+        identity = llm_identity(llm)
+        messages = _messages(prompt)
+        return make_prompt_key(identity[0], identity[1], messages), identity, messages
+
+    def _cached(self, key: str, prompt_name: str) -> Any:
+        """Réponse disponible sans appel au modèle, ou ``MISS`` (lève une erreur en rejeu)."""
+        if self._mode != "record":
+            response = self.lookup(key)
+            if response is not MISS:
+                tracer.annotate(llm_cache="hit")
+                return response
+        tracer.annotate(llm_cache="miss")
+        if self._mode == "replay":
+            self._record("replay_misses")
+            raise LLMCacheMissError(f"Aucune réponse enregistrée pour le prompt {prompt_name} ({key[:12]})")
+        self._record("misses")
+        return MISS
+
+    def invoke(self, llm: Any, prompt_name: str, prompt: Any, config: Optional[RunnableConfig] = None) -> AIMessage:
+        """Appelle ``llm`` sur ``prompt`` en passant par le cache.
+
+        Les appels simultanés sur un même prompt absent du cache sont fusionnés.
+
+        Raises:
+            LLMCacheMissError: En mode ``replay``, si le prompt n'a pas été enregistré
+        """
+        key, identity, messages = self._prepare(llm, prompt)
+        response = self._cached(key, prompt_name)
+        if response is MISS:
+            def call() -> str:
+                text = str(llm.invoke(prompt, config).content)
+                self.store(key, prompt_name, identity, messages, text)
+                return text
+            response, _ = self._flights.do(key, call)
+        return AIMessage(content=response)
+
+    async def ainvoke(self, llm: Any, prompt_name: str, prompt: Any,
+                      config: Optional[RunnableConfig] = None) -> AIMessage:
+        """Version asynchrone de ``invoke``."""
+        key, identity, messages = self._prepare(llm, prompt)
+        response = self._cached(key, prompt_name)
+        if response is MISS:
+            async def call() -> str:
+                text = str((await llm.ainvoke(prompt, config)).content)
+                self.store(key, prompt_name, identity, messages, text)
+                return text
+            response, _ = await self._flights.ado(key, call)
+        return AIMessage(content=response)
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs: succès mémoire/disque, appels au modèle, absences en rejeu, évictions."""
+        with self._lock:
+            counts = dict(self._counts)
+            memory = self._memory.stats() if self._memory is not None else {}
+        return {
+            "memory_hits": counts.get("memory_hits", 0),
+            "disk_hits": counts.get("disk_hits", 0),
+            "misses": counts.get("misses", 0),
+            "replay_misses": counts.get("replay_misses", 0),
+            "stores": counts.get("stores", 0),
+            "disk_evictions": counts.get("disk_evictions", 0),
+            "entries": memory.get("entries", 0),
+            "bytes": memory.get("bytes", 0)
+        }
+
+    def reset(self) -> None:
+        """Vide le cache mémoire et ferme la base; la configuration sera relue à la prochaine utilisation."""
+        with self._database_lock:
+            if self._database_connection is not None:
+                self._database_connection.close()
+                self._database_connection = None
+        with self._lock:
+            self._memory = None
+            self._counts.clear()
+
+
+# Cache partagé par les chaînes du processus
+llm_cache = LLMCache()
+
+
+class MemoizedLLM(Runnable):
+    """Client LLM enveloppé par le cache pour un prompt donné (maillon ``prompt | MemoizedLLM``)."""
+
+    def __init__(self, llm: Any, prompt_name: str, cache: LLMCache = llm_cache):
+        self.llm = llm
+        self.prompt_name = prompt_name
+        self.cache = cache
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        return self.cache.invoke(self.llm, self.prompt_name, input, config)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        return await self.cache.ainvoke(self.llm, self.prompt_name, input, config)
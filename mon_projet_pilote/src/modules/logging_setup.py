@@ -0,0 +1,136 @@
+"""
+Journalisation de l'agent, hors du chemin critique.
+
+Chaque nœud écrit plusieurs lignes INFO par question. Plutôt que d'écrire
+directement dans le fichier et le terminal depuis le thread qui traite la
+question, ``configure_logging`` place un ``QueueHandler`` sur le logger
+racine: l'enregistrement est déposé dans une file, et un thread
+``QueueListener`` se charge de l'écriture. Rien n'est configuré à l'import:
+les points d'entrée (``main.py``, ``run_batch.py``) appellent
+``configure_logging()`` au démarrage, avec les réglages ``AGENT_LOG_*``.
+
+Les messages utilisent le formatage paresseux (``logger.info("… %s", x)``):
+un message sous le niveau configuré n'est jamais mis en forme. Les
+évènements INFO et DEBUG peuvent être échantillonnés
+(``AGENT_LOG_INFO_SAMPLING``): pour chaque gabarit de message, seule une
+occurrence sur N est conservée, la première toujours comprise; les
+avertissements et les erreurs ne sont jamais échantillonnés.
+
+Un processus créé par ``fork()`` (workers du serveur pré-fork) n'hérite pas
+du thread d'écriture: il en relance un sur une file neuve.
+"""
+import atexit
+import itertools
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, List, Optional
+
+from .config import get_config
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class SamplingFilter(logging.Filter):
+    """Conserve une occurrence sur ``period`` de chaque gabarit de message INFO ou DEBUG."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        if not 0.0 < rate <= 1.0:
+            raise ValueError("Le taux d'échantillonnage doit être compris entre 0 (exclu) et 1")
+        self.period = max(1, round(1 / rate))
+        self._counters: Dict[str, Iterator[int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.period == 1:
+            return True
+        key = record.msg if isinstance(record.msg, str) else type(record.msg).__name__
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.period == 0
+
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def configure_logging(level: Optional[str] = None, file: Optional[str] = None, console: Optional[bool] = None,
+                      info_sampling: Optional[float] = None) -> QueueListener:
+    """Installe la journalisation par file d'attente sur le logger racine (remplace une configuration précédente).
+
+    Args:
+        level: Niveau minimal ("DEBUG", "INFO", "WARNING"…); ``AGENT_LOG_LEVEL`` par défaut
+        file: Fichier de journal (chaîne vide: aucun); ``AGENT_LOG_FILE`` par défaut
+        console: Écrire aussi sur la sortie d'erreur; ``AGENT_LOG_CONSOLE`` par défaut
+        info_sampling: Part des évènements INFO/DEBUG conservés; ``AGENT_LOG_INFO_SAMPLING`` par défaut
+
+    Returns:
+        Le thread d'écriture démarré
+    """
+    global _listener, _queue_handler
+    config = get_config()
+    level = (level or config.log_level).upper()
+    file = config.log_file if file is None else file
+    console = config.log_console if console is None else console
+    info_sampling = config.log_info_sampling if info_sampling is None else info_sampling
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+    if file:
+        handlers.append(logging.FileHandler(file, encoding="utf-8"))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    if info_sampling < 1.0:
+        queue_handler.addFilter(SamplingFilter(info_sampling))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+
+    with _lock:
+        _stop()
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        listener.start()
+        _listener, _queue_handler = listener, queue_handler
+    return listener
+
+
+def _stop() -> None:
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    _listener = _queue_handler = None
+
+
+def shutdown_logging() -> None:
+    """Retire le ``QueueHandler`` et arrête le thread d'écriture après avoir vidé la file."""
+    with _lock:
+        _stop()
+
+
+def _restart_after_fork() -> None:
+    """Relance le thread d'écriture dans le processus enfant; les messages en attente restent au parent."""
+    global _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _queue_handler.queue = _listener.queue = queue.SimpleQueue()
+        _listener._thread = None
+        _listener.start()
+
+
+# Les derniers messages en file sont écrits à la sortie du programme
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,427 @@
+"""
+Métriques du processus de l'agent, au format d'exposition Prometheus.
+
+Le registre ``metrics`` tient des compteurs, des histogrammes à seuils fixes
+et des jauges, mis à jour par les nœuds du graphe, les appels LLM, les
+décorateurs d'erreurs et l'exécution des questions, et servis en texte par
+un petit serveur HTTP local (``GET /metrics``, ``AGENT_METRICS_PORT``).
+
+Les mises à jour ne prennent aucun verrou: chaque thread écrit dans ses
+propres valeurs (une partition par thread, enregistrée une seule fois), et
+la lecture additionne les partitions. Un thread ne contend donc jamais avec
+un autre, même à forte concurrence; une lecture concurrente peut seulement
+voir une observation en cours à moitié comptée. À la fin d'un thread, sa
+partition est versée dans un total des threads terminés: le nombre de
+partitions suit les threads vivants, pas tous ceux qui ont existé.
+
+Métriques de l'agent:
+
+- ``agent_questions_total{status}``, ``agent_questions_in_flight``,
+  ``agent_question_duration_seconds``: questions traitées, en cours, durée;
+- ``agent_node_duration_seconds{node}``, ``agent_node_errors_total{node}``:
+  durée de chaque nœud et états renvoyés avec le drapeau ``error``;
+- ``agent_tool_choices_total{tool}``: répartition des outils choisis;
+- ``agent_tool_calls_total{function,status}``,
+  ``agent_tool_duration_seconds{function}``: exécutions des outils;
+- ``agent_exceptions_total{function,exception}``: exceptions interceptées
+  par ``handle_tool_errors`` et ``handle_state_errors``;
+- ``agent_llm_calls_total{prompt,model,status}``,
+  ``agent_llm_duration_seconds{prompt,model}``: appels réels au modèle, en
+  succès, en erreur ou annulés (branches spéculatives abandonnées); les
+  réponses servies par le cache des appels LLM ne sont pas comptées.
+"""
+import asyncio
+import bisect
+import contextlib
+import functools
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import get_config
+
+# Seuils par défaut des histogrammes de durée (secondes), comme les clients Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_bound(bound: float) -> str:
+    """Seuil d'un histogramme, écrit comme par les clients Prometheus ("1.0", "+Inf")."""
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class _ThreadToken:
+    """Témoin de la vie d'un thread, rangé dans ses données locales."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Metric:
+    """Métrique nommée dont les valeurs sont partitionnées par thread."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Enregistrement et retrait des partitions seulement
+        self._shards: List[Dict[Labels, Any]] = []
+        self._retired: Dict[Labels, Any] = {}  # Valeurs des threads terminés
+
+    def _shard(self) -> Dict[Labels, Any]:
+        """Valeurs du thread courant (créées et enregistrées à sa première mise à jour)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[Labels, Any] = {}
+            with self._lock:
+                self._shards.append(values)
+            # Le témoin disparaît avec les données locales du thread, à sa fin
+            token = self._local.token = _ThreadToken()
+            weakref.finalize(token, self._retire, values)
+            self._local.values = values
+            return values
+
+    def _retire(self, values: Dict[Labels, Any]) -> None:
+        """Verse la partition d'un thread terminé dans le total des threads terminés."""
+        with self._lock:
+            self._shards = [shard for shard in self._shards if shard is not values]
+            self._merge(self._retired, values)
+
+    def _merge(self, totals: Dict[Labels, Any], shard: Dict[Labels, Any]) -> None:
+        """Ajoute les valeurs d'une partition à ``totals``."""
+        raise NotImplementedError
+
+    def _check(self, labels: Labels) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: étiquettes attendues {self.labelnames}, reçues {labels}")
+        return labels
+
+    def _snapshots(self) -> List[Dict[Labels, Any]]:
+        with self._lock:
+            shards = list(self._shards)
+            retired: Dict[Labels, Any] = {}
+            self._merge(retired, self._retired)
+        return [retired] + [shard.copy() for shard in shards]
+
+    def _label_text(self, labels: Labels, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        """(nom et étiquettes, valeur) de chaque série de la métrique."""
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+
+
+class Counter(_Metric):
+    """Compteur monotone."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Ajoute ``amount`` à la série ``labels`` (valeurs dans l'ordre de ``labelnames``)."""
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Valeur courante de la série ``labels``."""
+        return sum(shard.get(self._check(labels), 0.0) for shard in self._snapshots())
+
+    def _merge(self, totals: Dict[Labels, float], shard: Dict[Labels, float]) -> None:
+        for labels, value in list(shard.items()):
+            totals[labels] = totals.get(labels, 0.0) + value
+
+    def _totals(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in self._snapshots():
+            self._merge(totals, shard)
+        return totals
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        for labels, value in sorted(self._totals().items()):
+            yield self.name + self._label_text(labels), value
+
+
+class Gauge(Counter):
+    """Jauge (par exemple questions en cours), modifiée par incréments et décréments."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    @contextlib.contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        """Incrémente la jauge le temps du bloc."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    """Histogramme à seuils fixes: effectif par seuil, somme et nombre d'observations."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Enregistre une observation dans la série ``labels``."""
+        shard = self._shard()
+        row = shard.get(labels)
+        if row is None:
+            # Effectifs par seuil (le dernier pour +Inf), puis somme et nombre
+            row = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def _merge(self, totals: Dict[Labels, List[float]], shard: Dict[Labels, List[float]]) -> None:
+        for labels, row in list(shard.items()):
+            total = totals.setdefault(labels, [0] * len(row))
+            for i, value in enumerate(list(row)):
+                total[i] += value
+
+    def _totals(self) -> Dict[Labels, List[float]]:
+        totals: Dict[Labels, List[float]] = {}
+        for shard in self._snapshots():
+            self._merge(totals, shard)
+        return totals
+
+    def count(self, *labels: str) -> int:
+        """Nombre d'observations de la série ``labels``."""
+        row = self._totals().get(self._check(labels))
+        return int(row[-1]) if row else 0
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        for labels, row in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row):
+                cumulative += count
+                yield self.name + "_bucket" + self._label_text(labels, f'le="{_format_bound(bound)}"'), cumulative
+            yield self.name + "_sum" + self._label_text(labels), row[-2]
+            yield self.name + "_count" + self._label_text(labels), row[-1]
+
+
+class MetricsRegistry:
+    """Ensemble des métriques du processus, rendues au format texte de Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Métrique {name} déjà déclarée comme {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Déclare (ou renvoie) un compteur."""
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Déclare (ou renvoie) une jauge."""
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Déclare (ou renvoie) un histogramme."""
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """Toutes les métriques au format d'exposition texte de Prometheus (version 0.0.4).
+
+        Args:
+            labels: Étiquettes ajoutées en tête de chaque série (par exemple ``{"worker": pid}``)
+        """
+        with self._lock:
+            registered = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        extra = ",".join(f'{name}="{_escape(str(value))}"' for name, value in (labels or {}).items())
+        lines = []
+        for metric in registered:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for series, value in metric.samples():
+                if extra:
+                    name, brace, rest = series.partition("{")
+                    series = f"{name}{{{extra}{',' + rest if brace else '}'}"
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remet toutes les séries à zéro (tests, benchmarks)."""
+        with self._lock:
+            registered = list(self._metrics.values())
+        for metric in registered:
+            metric.reset()
+
+
+# Registre partagé par tout le processus
+metrics = MetricsRegistry()
+
+questions_total = metrics.counter("agent_questions_total", "Questions traitées, par statut", ("status",))
+questions_in_flight = metrics.gauge("agent_questions_in_flight", "Questions en cours de traitement")
+question_duration = metrics.histogram("agent_question_duration_seconds", "Durée de traitement d'une question")
+node_duration = metrics.histogram("agent_node_duration_seconds", "Durée d'exécution des nœuds", ("node",))
+node_errors_total = metrics.counter(
+    "agent_node_errors_total", "États renvoyés par un nœud avec le drapeau error", ("node",)
+)
+tool_choices_total = metrics.counter("agent_tool_choices_total", "Outils choisis pour les questions", ("tool",))
+tool_calls_total = metrics.counter(
+    "agent_tool_calls_total", "Exécutions des outils, par statut", ("function", "status")
+)
+tool_duration = metrics.histogram("agent_tool_duration_seconds", "Durée d'exécution des outils", ("function",))
+exceptions_total = metrics.counter(
+    "agent_exceptions_total", "Exceptions interceptées par les décorateurs d'erreurs", ("function", "exception")
+)
+llm_calls_total = metrics.counter(
+    "agent_llm_calls_total", "Appels au modèle LLM, par statut", ("prompt", "model", "status")
+)
+llm_duration = metrics.histogram("agent_llm_duration_seconds", "Durée des appels au modèle LLM", ("prompt", "model"))
+
+
+@contextlib.contextmanager
+def track_question() -> Iterator[None]:
+    """Compte une question (en cours, durée, statut selon qu'une exception sort du bloc)."""
+    questions_in_flight.inc()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        question_duration.observe(time.perf_counter() - start)
+        questions_in_flight.dec()
+        questions_total.inc(status)
+
+
+def _record_node(name: str, elapsed: float, result: Any) -> None:
+    node_duration.observe(elapsed, name)
+    if isinstance(result, dict):
+        if result.get("error"):
+            node_errors_total.inc(name)
+        tool = result.get("tool_name")
+        if tool:
+            tool_choices_total.inc(tool)
+
+
+def measure_node(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Enveloppe un nœud du graphe (synchrone ou asynchrone): durée, erreurs et outil choisi."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def ameasured(state: Dict[str, Any]) -> Any:
+            start = time.perf_counter()
+            result = await func(state)
+            _record_node(name, time.perf_counter() - start, result)
+            return result
+        return ameasured
+
+    @functools.wraps(func)
+    def measured(state: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        result = func(state)
+        _record_node(name, time.perf_counter() - start, result)
+        return result
+    return measured
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Sert ``GET /metrics``."""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MetricsServer:
+    """Serveur HTTP local exposant un registre sur ``/metrics``, dans un thread démon."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, registry: MetricsRegistry = metrics):
+        """Prépare le serveur.
+
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute (0 pour un port libre)
+            registry: Registre exposé
+        """
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler, bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.registry = registry
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="métriques")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[MetricsServer]:
+    """Démarre le serveur de métriques sur ``AGENT_METRICS_PORT`` (aucun si le port vaut 0).
+
+    Returns:
+        Le serveur démarré, ou None si l'exposition est désactivée
+    """
+    config = get_config()
+    port = config.metrics_port if port is None else port
+    if not port:
+        return None
+    return MetricsServer(host or config.metrics_host, port).start()
@@ -0,0 +1,171 @@
+"""
+Modèle LLM utilisé par chaque nœud du graphe.
+
+Tous les nœuds utilisaient le même modèle, alors que le choix de l'outil et
+les extractions sont de petites tâches de classement qu'un modèle plus léger
+traite plus vite et moins cher, et que la réponse finale gagne à un modèle
+plus capable. Le modèle de chaque prompt est résolu ici, à partir de:
+
+- ``AGENT_LLM_MODEL`` / ``AGENT_LLM_TEMPERATURE``: modèle par défaut;
+- ``AGENT_LLM_MODELS_PATH``: fichier JSON ``{"nœud ou prompt": "modèle"}``
+  (ou ``{"model": ..., "temperature": ...}`` comme valeur);
+- ``AGENT_LLM_MODELS``: ``"choisir_outil=gemini-1.5-flash-8b@0,formuler_réponse=gemini-1.5-pro"``,
+  prioritaire sur le fichier.
+
+Un nœud désigne tous les prompts qu'il utilise (``NODE_PROMPTS``); un nom de
+prompt l'emporte sur celui de son nœud. Les clients restent mutualisés par
+``llm_registry``: chaque modèle n'est construit qu'une fois.
+"""
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import get_config
+from .llm import aget_llm, get_llm
+
+# Prompts utilisés par chaque nœud; un prompt partagé (analyse, extractions)
+# reçoit le modèle du dernier nœud configuré dans cet ordre
+NODE_PROMPTS: Dict[str, Tuple[str, ...]] = {
+    "analyser": ("analyse",),
+    "choisir_outil": ("choix_outil", "choix_outil_structuré", "extraction_ville", "extraction_expression"),
+    "analyser_et_choisir": ("analyse_et_choix",),
+    "analyser_en_parallèle": ("analyse", "choix_outil_spéculatif", "extraction_ville", "extraction_expression"),
+    "réponse_directe": ("réponse_directe",),
+    "formuler_réponse": ("réponse_finale",),
+}
+
+PROMPT_NAMES = tuple(dict.fromkeys(name for prompts in NODE_PROMPTS.values() for name in prompts))
+
+# (modèle, température)
+ModelSpec = Tuple[str, float]
+
+
+def parse_model_spec(value: Any, default: ModelSpec) -> ModelSpec:
+    """Interprète ``"modèle"``, ``"modèle@température"`` ou ``{"model": ..., "temperature": ...}``.
+
+    Raises:
+        ValueError: Si la valeur n'a aucune de ces formes
+    """
+    if isinstance(value, dict):
+        model, temperature = value.get("model", default[0]), value.get("temperature", default[1])
+    elif isinstance(value, str):
+        model, _, temperature = value.strip().partition("@")
+        temperature = temperature or default[1]
+    else:
+        raise ValueError(f"Modèle invalide: {value!r}")
+    if not model:
+        raise ValueError(f"Modèle invalide: {value!r}")
+    try:
+        return str(model).strip(), float(temperature)
+    except (TypeError, ValueError):
+        raise ValueError(f"Température invalide pour {model}: {temperature!r}") from None
+
+
+def parse_model_overrides(text: str) -> Dict[str, str]:
+    """Découpe ``"nœud=modèle[@température],..."`` en dictionnaire nœud ou prompt -> modèle."""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        name, sep, spec = item.partition("=")
+        if not sep:
+            raise ValueError(f"Entrée AGENT_LLM_MODELS invalide (attendu nœud=modèle): {item}")
+        overrides[name.strip()] = spec.strip()
+    return overrides
+
+
+class ModelTiers:
+    """Résout le modèle de chaque prompt et renvoie le client mutualisé correspondant.
+
+    La configuration est lue à la première utilisation; ``reset()`` la relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._specs: Optional[Dict[str, ModelSpec]] = None
+        self._default: Optional[ModelSpec] = None
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> Dict[str, ModelSpec]:
+        with self._lock:
+            if self._specs is None:
+                self._default, self._specs = self._load()
+            return self._specs
+
+    @staticmethod
+    def _load() -> Tuple[ModelSpec, Dict[str, ModelSpec]]:
+        config = get_config()
+        default = (config.llm_model, config.llm_temperature)
+        entries: Dict[str, Any] = {}
+        if config.llm_models_path:
+            try:
+                entries.update(json.loads(Path(config.llm_models_path).read_text(encoding="utf-8")))
+            except (OSError, json.JSONDecodeError) as e:
+                raise ValueError(f"Fichier de modèles illisible ({config.llm_models_path}): {str(e)}") from e
+        entries.update(parse_model_overrides(config.llm_models))
+
+        if "default" in entries:
+            default = parse_model_spec(entries.pop("default"), default)
+        unknown = sorted(set(entries) - set(NODE_PROMPTS) - set(PROMPT_NAMES))
+        if unknown:
+            raise ValueError(
+                f"Nœud ou prompt inconnu dans la configuration des modèles: {', '.join(unknown)} "
+                f"(attendu: {', '.join([*NODE_PROMPTS, *PROMPT_NAMES])})"
+            )
+
+        specs = {name: default for name in PROMPT_NAMES}
+        for node, prompts in NODE_PROMPTS.items():
+            if node in entries:
+                spec = parse_model_spec(entries[node], default)
+                specs.update({name: spec for name in prompts})
+        for name in PROMPT_NAMES:
+            if name in entries:
+                specs[name] = parse_model_spec(entries[name], default)
+        return default, specs
+
+    def spec(self, prompt_name: str) -> ModelSpec:
+        """Renvoie (modèle, température) du prompt ``prompt_name`` (le modèle par défaut s'il est inconnu)."""
+        specs = self._setup()
+        return specs.get(prompt_name, self._default)
+
+    def _resolve(self, prompt_name: str) -> ModelSpec:
+        model, temperature = self.spec(prompt_name)
+        with self._lock:
+            self._counts[model] += 1
+        return model, temperature
+
+    def llm_for(self, prompt_name: str) -> Any:
+        """Renvoie le client LLM mutualisé du prompt ``prompt_name``."""
+        model, temperature = self._resolve(prompt_name)
+        return get_llm(model, temperature)
+
+    async def allm_for(self, prompt_name: str) -> Any:
+        """Version asynchrone de ``llm_for``."""
+        model, temperature = self._resolve(prompt_name)
+        return await aget_llm(model, temperature)
+
+    def configs(self) -> List[Dict[str, Any]]:
+        """Configurations distinctes utilisées (arguments de ``llm_registry.warm_up``)."""
+        prompts = self._setup()
+        specs = dict.fromkeys([self._default, *prompts.values()])
+        return [{"model": model, "temperature": temperature} for model, temperature in specs]
+
+    def table(self) -> Dict[str, str]:
+        """Modèle retenu pour chaque prompt, sous la forme ``modèle@température``."""
+        return {name: f"{model}@{temperature:g}" for name, (model, temperature) in self._setup().items()}
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie le nombre de chaînes servies par modèle."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        """Oublie la configuration lue et les compteurs; la configuration sera relue à la prochaine utilisation."""
+        with self._lock:
+            self._specs = None
+            self._default = None
+            self._counts.clear()
+
+
+# Modèles par prompt partagés par tous les nœuds
+model_tiers = ModelTiers()
@@ -0,0 +1,283 @@
+"""
+Prélecture des données météo.
+
+Les entrées/sorties de l'outil météo (géocodage puis prévisions) ne dépendent
+que de son entrée. Dans le mode spéculatif, celle-ci est connue avant la fin
+de l'analyse: la recherche est alors lancée en tâche de fond et
+``appeler_météo`` ou ``appeler_météo_multi`` attendent son résultat au lieu de
+refaire l'appel. Dans les autres modes, le nœud météo suit immédiatement le
+choix de l'outil: une prélecture n'y recouvrirait rien.
+
+En option (``AGENT_WEATHER_PREFETCH_CANDIDATES``), les noms de lieux repérés
+localement dans la question (préposition suivie de mots à majuscule) sont
+géocodés avant même que le LLM ait extrait la ville: un candidat erroné ne
+coûte qu'une requête de géocodage, dont le résultat reste en cache.
+
+Les résultats prélus qui ne sont pas consommés sont oubliés après
+``AGENT_WEATHER_PREFETCH_TTL`` secondes. Les prévisions restent soumises au
+cache des prévisions: une prélecture ne sert jamais de données plus anciennes
+que celles qu'aurait servies l'appel direct.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+from .cache import MISS
+from .config import get_config
+from .errors import logger
+from .fast_path import WEATHER_KEYWORDS
+from .geocoding import geocoding_cache, normalize_city
+from .speculative import speculative_runner
+from .tools import (
+    MAX_LOCATIONS,
+    _agéocoder_en_ligne,
+    _géocoder_en_ligne,
+    is_valid_location,
+    split_locations
+)
+
+WeatherInput = Union[str, List[str]]
+
+# Lieu candidat: préposition suivie de mots à majuscule, énumérations comprises (« à Paris, Lyon et Nice »)
+CITY = r"[A-ZÀ-Ý][\w'\-]*(?:\s[A-ZÀ-Ý][\w'\-]*)*"
+CITY_CANDIDATES = re.compile(rf"\b(?:à|a|au|sur|pour|de|en)\s+({CITY}(?:\s*(?:,|\bet\b)\s*{CITY})*)")
+
+
+def candidate_cities(question: str) -> List[str]:
+    """Noms de lieux candidats repérés localement dans la question, sans appel au LLM.
+
+    Args:
+        question: Question de l'utilisateur
+
+    Returns:
+        Candidats valides pour l'outil météo, dans l'ordre d'apparition
+    """
+    found: List[str] = []
+    for match in CITY_CANDIDATES.finditer(question or ""):
+        found.extend(split_locations(match.group(1)))
+    return [city for city in dict.fromkeys(found) if is_valid_location(city)][:MAX_LOCATIONS]
+
+
+def _locations(tool_input: WeatherInput) -> List[str]:
+    return list(tool_input) if isinstance(tool_input, (list, tuple)) else [tool_input]
+
+
+def _key(tool_input: WeatherInput) -> Hashable:
+    """Clé d'une recherche: une ville seule et une liste d'une ville appellent des outils différents."""
+    return (isinstance(tool_input, (list, tuple)), *(str(location) for location in _locations(tool_input)))
+
+
+class WeatherPrefetcher:
+    """Recherches météo et géocodages lancés en tâche de fond, consommés par les nœuds météo.
+
+    Les recherches synchrones passent par le pool de ``speculative_runner``,
+    les asynchrones par des tâches de la boucle courante. Les réglages sont lus
+    dans la configuration à la première utilisation; ``reset()`` les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._settings: Optional[Tuple[bool, bool, float]] = None
+        # Clé -> (date de lancement, Future ou tâche asyncio)
+        self._searches: Dict[Hashable, Tuple[float, Any]] = {}
+        self._geocodes: Dict[Hashable, Tuple[float, Any]] = {}
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> Tuple[bool, bool, float]:
+        with self._lock:
+            if self._settings is None:
+                config = get_config()
+                self._settings = (
+                    config.weather_prefetch, config.weather_prefetch_candidates, config.weather_prefetch_ttl
+                )
+            return self._settings
+
+    def _record(self, event: str, count: int = 1) -> None:
+        with self._lock:
+            self._counts[event] += count
+
+    def _register(self, table: Dict[Hashable, Tuple[float, Any]], key: Hashable, start: Callable[[], Any]) -> bool:
+        """Lance ``start()`` et l'enregistre sous ``key``, sauf si une opération y est déjà en cours."""
+        ttl = self._setup()[2]
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, (started, _) in table.items() if now - started > ttl]:
+                del table[stale]
+            if key in table:
+                return False
+            table[key] = (now, start())
+            return True
+
+    def _take(self, table: Dict[Hashable, Tuple[float, Any]], key: Hashable, kind: type) -> Any:
+        """Retire et renvoie l'opération enregistrée sous ``key`` si elle est récente et du bon type."""
+        with self._lock:
+            entry = table.pop(key, None)
+        if entry is None or time.monotonic() - entry[0] > self._setup()[2] or not isinstance(entry[1], kind):
+            return None
+        if kind is asyncio.Task and entry[1].get_loop() is not asyncio.get_running_loop():
+            return None
+        return entry[1]
+
+    @staticmethod
+    def _silence(task: asyncio.Task) -> None:
+        """Évite l'avertissement « exception never retrieved » d'une tâche jamais consommée."""
+        if not task.cancelled():
+            task.exception()
+
+    def _candidates(self, question: str, check_keywords: bool) -> List[str]:
+        _, candidates, _ = self._setup()
+        if not candidates or (check_keywords and not WEATHER_KEYWORDS.search(question or "")):
+            return []
+        return [city for city in candidate_cities(question) if geocoding_cache.lookup(city) is MISS]
+
+    def prefetch_candidates(self, question: str, check_keywords: bool = False) -> int:
+        """Géocode en tâche de fond les lieux candidats de la question absents du cache.
+
+        Args:
+            question: Question de l'utilisateur
+            check_keywords: N'agir que si la question parle de météo (outil pas encore choisi)
+
+        Returns:
+            Nombre de géocodages lancés
+        """
+        launched = sum(
+            self._register(self._geocodes, normalize_city(city), lambda city=city: speculative_runner.submit(
+                _géocoder_en_ligne, city
+            ))
+            for city in self._candidates(question, check_keywords)
+        )
+        self._record("candidates", launched)
+        return launched
+
+    async def aprefetch_candidates(self, question: str, check_keywords: bool = False) -> int:
+        """Version asynchrone de ``prefetch_candidates`` (tâches sur la boucle courante)."""
+        def start(city: str) -> asyncio.Task:
+            task = asyncio.create_task(_agéocoder_en_ligne(city))
+            task.add_done_callback(self._silence)
+            return task
+
+        launched = sum(
+            self._register(self._geocodes, normalize_city(city), lambda city=city: start(city))
+            for city in self._candidates(question, check_keywords)
+        )
+        self._record("candidates", launched)
+        return launched
+
+    def _wait_geocodes(self, tool_input: WeatherInput) -> None:
+        """Attend les géocodages candidats en cours pour les villes de la recherche."""
+        for location in _locations(tool_input):
+            future = self._take(self._geocodes, normalize_city(str(location)), Future)
+            if future is not None:
+                self._record("candidate_hits")
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("Géocodage anticipé en échec pour %s: %s", location, e)
+
+    async def _await_geocodes(self, tool_input: WeatherInput) -> None:
+        """Version asynchrone de ``_wait_geocodes``."""
+        for location in _locations(tool_input):
+            task = self._take(self._geocodes, normalize_city(str(location)), asyncio.Task)
+            if task is not None:
+                self._record("candidate_hits")
+                try:
+                    await task
+                except Exception as e:
+                    logger.warning("Géocodage anticipé en échec pour %s: %s", location, e)
+
+    def prefetch(self, tool_input: WeatherInput, search: Callable[[WeatherInput], str]) -> bool:
+        """Lance ``search(tool_input)`` en tâche de fond.
+
+        Args:
+            tool_input: Ville, ou liste de villes
+            search: Outil à appeler (``recherche_météo`` ou ``recherche_météo_multi``)
+
+        Returns:
+            True si la recherche a été lancée
+        """
+        if not self._setup()[0] or not tool_input:
+            return False
+
+        def run() -> str:
+            self._wait_geocodes(tool_input)
+            return search(tool_input)
+
+        launched = self._register(self._searches, _key(tool_input), lambda: speculative_runner.submit(run))
+        if launched:
+            logger.info("Prélecture météo lancée pour: %s", tool_input)
+            self._record("prefetched")
+        return launched
+
+    async def aprefetch(self, tool_input: WeatherInput, search: Callable[[WeatherInput], Awaitable[str]]) -> bool:
+        """Version asynchrone de ``prefetch`` (``search``: ``arecherche_météo`` ou ``arecherche_météo_multi``)."""
+        if not self._setup()[0] or not tool_input:
+            return False
+
+        async def run() -> str:
+            await self._await_geocodes(tool_input)
+            return await search(tool_input)
+
+        def start() -> asyncio.Task:
+            task = asyncio.create_task(run())
+            task.add_done_callback(self._silence)
+            return task
+
+        launched = self._register(self._searches, _key(tool_input), start)
+        if launched:
+            logger.info("Prélecture météo lancée pour: %s", tool_input)
+            self._record("prefetched")
+        return launched
+
+    def result(self, tool_input: WeatherInput, search: Callable[[WeatherInput], str]) -> str:
+        """Résultat de la recherche prélue pour ``tool_input``, ou de ``search(tool_input)`` à défaut.
+
+        Les erreurs de la recherche prélue sont relevées telles quelles, comme
+        celles d'un appel direct.
+        """
+        future = self._take(self._searches, _key(tool_input), Future)
+        if future is not None:
+            self._record("hits")
+            return future.result()
+        self._wait_geocodes(tool_input)
+        return search(tool_input)
+
+    async def aresult(self, tool_input: WeatherInput, search: Callable[[WeatherInput], Awaitable[str]]) -> str:
+        """Version asynchrone de ``result``."""
+        task = self._take(self._searches, _key(tool_input), asyncio.Task)
+        if task is not None:
+            self._record("hits")
+            return await task
+        await self._await_geocodes(tool_input)
+        return await search(tool_input)
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs: recherches prélues et consommées, géocodages candidats lancés et utiles."""
+        with self._lock:
+            counts = dict(self._counts)
+        return {name: counts.get(name, 0) for name in ("prefetched", "hits", "candidates", "candidate_hits")}
+
+    def reset(self) -> None:
+        """Attend la fin des opérations synchrones en cours, annule les tâches, puis oublie tout.
+
+        Aucune prélecture lancée avant l'appel ne se termine donc après (utile
+        entre deux tests qui changent de serveur). La configuration sera relue à
+        la prochaine utilisation.
+        """
+        with self._lock:
+            pending = [entry for _, entry in [*self._searches.values(), *self._geocodes.values()]]
+            self._settings = None
+            self._searches.clear()
+            self._geocodes.clear()
+            self._counts.clear()
+        for entry in pending:
+            if isinstance(entry, asyncio.Task):
+                entry.cancel()
+        wait([entry for entry in pending if isinstance(entry, Future)])
+
+
+# Prélecture partagée par les nœuds météo
+weather_prefetcher = WeatherPrefetcher()
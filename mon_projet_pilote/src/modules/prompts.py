@@ -0,0 +1,238 @@
+"""
+Registre des prompts et des chaînes précompilées pour les nœuds de raisonnement.
+
+Les modèles de prompt sont analysés une seule fois à l'import du module, et les
+chaînes ``prompt | llm`` sont composées une seule fois par client LLM mutualisé.
+Les prompts couverts par le cache des appels LLM sont composés avec le client
+enveloppé (``prompt | MemoizedLLM``), et, si le traçage est actif, dans un span
+(``prompt | TracedLLM``). Les appels réels au modèle sont comptés par un
+``MeteredLLM`` (``AGENT_METRICS_ENABLED``). Sans client imposé, chaque prompt utilise le modèle
+que lui attribue ``model_tiers``.
+
+Ces deux enveloppes, des ``Runnable``, sont définies ici plutôt que dans
+``metrics`` et ``tracing``: importer ces derniers (via ``errors``) ne charge
+pas ``langchain_core`` ni ``langsmith``.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from .config import get_config
+from .llm_cache import MemoizedLLM, llm_cache, llm_identity
+from .metrics import llm_calls_total, llm_duration
+from .model_tiers import model_tiers
+from .tracing import Span, tracer
+
+# Textes des prompts utilisés par les nœuds du graphe
+PROMPT_TEMPLATES: Dict[str, str] = {
+    "analyse": (
+        "Question: {question}\nRéfléchissez au problème."
+    ),
+    "choix_outil": (
+        "Question: {question}\nRéflexion: {thoughts}\n"
+        "Choisissez l'outil le plus approprié parmi: {outils}. "
+        "Répondez uniquement avec le nom de l'outil."
+    ),
+    "choix_outil_spéculatif": (
+        "Question: {question}\n"
+        "Choisissez l'outil le plus approprié parmi: {outils}. "
+        "Répondez uniquement avec le nom de l'outil."
+    ),
+    "choix_outil_structuré": (
+        "Question: {question}\nRéflexion: {thoughts}\n"
+        "Choisissez l'outil le plus approprié parmi: {outils}, et préparez son entrée. "
+        "Répondez uniquement avec un objet JSON de la forme "
+        "{{\"tool_name\": \"...\", \"tool_input\": \"...\"}} où tool_input est "
+        "le nom de la ville pour recherche_météo (ou la liste JSON des villes si la question "
+        "en compare plusieurs), l'expression mathématique seule pour "
+        "calculatrice, et une chaîne vide pour réponse_directe."
+    ),
+    "analyse_et_choix": (
+        "Question: {question}\n"
+        "Réfléchissez au problème, puis choisissez l'outil le plus approprié parmi: {outils}, "
+        "et préparez son entrée. "
+        "Répondez uniquement avec un objet JSON de la forme "
+        "{{\"thoughts\": \"...\", \"tool_name\": \"...\", \"tool_input\": \"...\"}} où "
+        "thoughts résume votre réflexion, et tool_input est le nom de la ville pour recherche_météo "
+        "(ou la liste JSON des villes si la question en compare plusieurs), "
+        "l'expression mathématique seule pour calculatrice, et une chaîne vide pour réponse_directe."
+    ),
+    "extraction_ville": (
+        "Extrayez le nom de la ville de la question: {question}. "
+        "S'il y en a plusieurs, séparez-les par des virgules."
+    ),
+    "extraction_expression": (
+        "Extrayez l'expression mathématique de la question: {question}. "
+        "Ne retournez que l'expression mathématique, sans texte supplémentaire."
+    ),
+    "réponse_directe": (
+        "Question: {question}\nRéflexion: {thoughts}\n"
+        "Donnez une réponse directe et utile."
+    ),
+    "réponse_finale": (
+        "Question: {question}\nRéflexion: {thoughts}\n"
+        "Observation: {observation}\n"
+        "Formulez une réponse complète, claire et utile."
+    ),
+}
+
+
+class MeteredLLM(Runnable):
+    """Client LLM dont les appels sont comptés et chronométrés pour un prompt donné.
+
+    Expose le modèle et la température du client, pour que les clés du cache
+    des appels LLM restent celles du client d'origine.
+    """
+
+    def __init__(self, llm: Any, prompt_name: str, model: str, temperature: float):
+        self.llm = llm
+        self.prompt_name = prompt_name
+        self.model = model
+        self.temperature = temperature
+
+    def _record(self, start: float, status: str) -> None:
+        llm_duration.observe(time.perf_counter() - start, self.prompt_name, self.model)
+        llm_calls_total.inc(self.prompt_name, self.model, status)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            response = self.llm.invoke(input, config, **kwargs)
+        except Exception:
+            self._record(start, "error")
+            raise
+        self._record(start, "ok")
+        return response
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            response = await self.llm.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            # Branche spéculative abandonnée
+            self._record(start, "cancelled")
+            raise
+        except Exception:
+            self._record(start, "error")
+            raise
+        self._record(start, "ok")
+        return response
+
+
+def _token_attributes(span: Span, prompt: Any, response: Any) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        span.set(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+        return
+    # Sans comptage du fournisseur (modèle factice, cache), estimation en mots
+    text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+    span.set(input_tokens=len(text.split()), output_tokens=len(str(getattr(response, "content", "")).split()),
+             tokens_estimated=True)
+
+
+class TracedLLM(Runnable):
+    """Client LLM enveloppé dans un span ``llm`` pour un prompt donné (maillon ``prompt | TracedLLM``)."""
+
+    def __init__(self, llm: Any, prompt_name: str, model: str, temperature: float):
+        self.llm = llm
+        self.prompt_name = prompt_name
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        with tracer.span(self.prompt_name, "llm", model=self.model, temperature=self.temperature) as span:
+            response = self.llm.invoke(input, config, **kwargs)
+            _token_attributes(span, input, response)
+            return response
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        with tracer.span(self.prompt_name, "llm", model=self.model, temperature=self.temperature) as span:
+            response = await self.llm.ainvoke(input, config, **kwargs)
+            _token_attributes(span, input, response)
+            return response
+
+
+class PromptRegistry:
+    """Registre thread-safe des prompts analysés et des chaînes composées."""
+
+    def __init__(self, templates: Dict[str, str]):
+        """Analyse tous les modèles de prompt une seule fois.
+
+        Args:
+            templates: Dictionnaire nom -> texte du modèle de prompt
+        """
+        self._prompts: Dict[str, ChatPromptTemplate] = {
+            name: ChatPromptTemplate.from_template(text) for name, text in templates.items()
+        }
+        # Clé (nom du prompt, id du client, mémoïsé, tracé, mesuré); le client est conservé pour que l'id reste valide
+        self._chains: Dict[Tuple[str, int, bool, bool, bool], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_prompt(self, name: str) -> ChatPromptTemplate:
+        """Renvoie le prompt analysé correspondant au nom donné."""
+        try:
+            return self._prompts[name]
+        except KeyError:
+            raise KeyError(f"Prompt inconnu: {name}") from None
+
+    def get_chain(self, name: str, llm: Optional[Any] = None) -> Any:
+        """Renvoie la chaîne ``prompt | llm`` prête à être invoquée.
+
+        Args:
+            name: Nom du prompt
+            llm: Client LLM à utiliser; le client du modèle de ce prompt si absent
+
+        Returns:
+            Chaîne composée une seule fois pour ce couple (prompt, client), avec le
+            client mesuré, enveloppé par le cache si ce prompt est mémoïsé, puis par
+            un span si le traçage est actif
+        """
+        if llm is None:
+            llm = model_tiers.llm_for(name)
+        memoized = llm_cache.covers(name)
+        traced = tracer.enabled
+        metered = get_config().metrics_enabled
+        key = (name, id(llm), memoized, traced, metered)
+
+        cached = self._chains.get(key)
+        if cached is not None and cached[0] is llm:
+            return cached[1]
+
+        with self._lock:
+            cached = self._chains.get(key)
+            if cached is None or cached[0] is not llm:
+                identity = llm_identity(llm)
+                model = MeteredLLM(llm, name, *identity) if metered else llm
+                if memoized:
+                    model = MemoizedLLM(model, name)
+                if traced:
+                    model = TracedLLM(model, name, *identity)
+                cached = (llm, self.get_prompt(name) | model)
+                self._chains[key] = cached
+            return cached[1]
+
+    def clear(self) -> None:
+        """Oublie les chaînes composées (par exemple après un changement de client LLM)."""
+        with self._lock:
+            self._chains.clear()
+
+
+# Registre partagé par tous les nœuds
+prompt_registry = PromptRegistry(PROMPT_TEMPLATES)
+
+
+def get_chain(name: str, llm: Optional[Any] = None) -> Any:
+    """Renvoie la chaîne précompilée pour le prompt ``name``.
+
+    Args:
+        name: Nom du prompt (clé de ``PROMPT_TEMPLATES``)
+        llm: Client LLM à utiliser; le client du modèle de ce prompt si absent
+
+    Returns:
+        Chaîne ``prompt | llm`` prête à être invoquée
+    """
+    return prompt_registry.get_chain(name, llm)
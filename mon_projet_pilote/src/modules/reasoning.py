@@ -1,13 +1,26 @@
 """
 Fonctions de raisonnement pour l'agent (nœuds du graphe).
 """
-from typing import Literal, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-import time
+import json
+import re
+from typing import Literal, Dict, Any, List, Optional, Tuple, Union
 
 from .state import AgentState
-from .tools import recherche_météo, calculatrice
+from .answer_cache import answer_cache
+from .config import get_config
+from .fast_path import fast_path_classifier
+from .intent import intent_classifier
+from .prefetch import weather_prefetcher
+from .prompts import get_chain
+from .speculative import speculative_runner
+from .tools import (
+    recherche_météo,
+    recherche_météo_multi,
+    calculatrice,
+    is_valid_location,
+    is_valid_expression,
+    split_locations
+)
 from .errors import (
     handle_state_errors, 
     logger, 
@@ -16,63 +29,203 @@ from .errors import (
     safe_execute
 )
 
-def get_llm(retries=2, backoff=1.5):
-    """Obtient une instance LLM avec gestion des erreurs et retry.
+@handle_state_errors
+def pré_routage(state: AgentState) -> Dict[str, Any]:
+    """Route les questions évidentes de calcul ou de météo directement vers l'outil."""
+    route = fast_path_classifier.classify(
+        state.get("question", ""), threshold=get_config().fast_path_threshold
+    )
+    if route is None:
+        logger.info("Voie rapide non applicable, passage par l'analyse LLM")
+        return {"fast_path": False}
     
-    Args:
-        retries: Nombre de tentatives en cas d'erreur
-        backoff: Facteur de multiplication pour le temps d'attente entre les tentatives
-        
-    Returns:
-        Instance du modèle LLM
-    """
-    attempt = 0
-    last_error = None
-    
-    while attempt <= retries:
-        try:
-            return ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.2)
-        except Exception as e:
-            last_error = e
-            attempt += 1
-            if attempt <= retries:
-                logger.warning(f"Erreur lors de l'initialisation du LLM (tentative {attempt}): {str(e)}")
-                time.sleep(backoff ** attempt)  # Attente exponentielle
-            else:
-                logger.error(f"Échec de l'initialisation du LLM après {retries} tentatives: {str(e)}")
-                raise
-    
-    # Ne devrait jamais arriver, mais au cas où
-    raise last_error
+    logger.info("Voie rapide: %s (%s), confiance %.2f", route.tool_name, route.tool_input, route.confidence)
+    return {
+        "fast_path": True,
+        "fast_path_confidence": route.confidence,
+        "thoughts": f"Question reconnue par la voie rapide: outil {route.tool_name}.",
+        "tool_name": route.tool_name,
+        "tool_input": route.tool_input
+    }
+
+def consulter_cache(state: AgentState) -> Dict[str, Any]:
+    """Sert la réponse en cache d'une question déjà posée (ou d'une question proche)."""
+    cached = answer_cache.lookup(state.get("question", ""))
+    if cached is None:
+        return {"cache_hit": None}
+    logger.info("Réponse servie depuis le cache (%s)", cached['cache_hit'])
+    return cached
+
+def mémoriser_réponse(state: AgentState) -> Dict[str, Any]:
+    """Met en cache la réponse finale, avec une durée de vie qui dépend de l'outil utilisé."""
+    answer_cache.store(state.get("question", ""), state)
+    return {}
+
+def router_cache(state: AgentState) -> str:
+    """Après la consultation du cache: fin du graphe si la réponse y était, traitement habituel sinon."""
+    return "trouvé" if state.get("cache_hit") else "absent"
 
 @handle_state_errors
 def analyser(state: AgentState) -> Dict[str, Any]:
     """Analyse la question initiale et génère des réflexions."""
-    logger.info(f"Analyse de la question: {state.get('question', '')}")
+    logger.info("Analyse de la question: %s", state.get('question', ''))
     
     if not state.get("question"):
         logger.warning("Tentative d'analyse sans question fournie")
         return {"thoughts": "Je n'ai pas reçu de question à analyser."}
     
     try:
-        llm = get_llm()
-        prompt = ChatPromptTemplate.from_template(
-            "Question: {question}\nRéfléchissez au problème."
-        )
-        chain = prompt | llm
+        chain = get_chain("analyse")
         thoughts = chain.invoke({"question": state["question"]})
         logger.info("Analyse réussie")
         return {"thoughts": thoughts.content}
     except Exception as e:
-        logger.error(f"Erreur lors de l'analyse: {str(e)}")
+        logger.error("Erreur lors de l'analyse: %s", e)
         return {
             "thoughts": "Je rencontre des difficultés à analyser cette question.",
             "error": True
         }
 
+# Liste des outils disponibles
+OUTILS = ["recherche_météo", "calculatrice", "réponse_directe"]
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Extrait le premier objet JSON d'une réponse LLM (éventuellement entourée de texte)."""
+    match = re.search(r"\{.*\}", text or "", re.S)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def entrée_météo(value: Any) -> Optional[Union[str, List[str]]]:
+    """Normalise l'entrée de l'outil météo: une ville, ou une liste s'il y en a plusieurs.
+    
+    Args:
+        value: Nom de ville, énumération (« Paris, Lyon et Marseille ») ou liste de villes
+        
+    Returns:
+        La ville seule, la liste des villes, ou None si une des villes est invalide
+    """
+    if isinstance(value, (list, tuple)):
+        locations = list(dict.fromkeys(str(v).strip() for v in value if str(v).strip()))
+    else:
+        locations = split_locations(str(value or ""))
+    if not locations or not all(is_valid_location(location) for location in locations):
+        return None
+    return locations[0] if len(locations) == 1 else locations
+
+def _validate_tool_selection(data: Dict[str, Any]) -> Optional[Tuple[str, Union[str, List[str]]]]:
+    """Valide un couple (tool_name, tool_input) contre les outils et leurs validateurs."""
+    tool_name = str(data.get("tool_name") or "").strip()
+    
+    if tool_name == "recherche_météo":
+        tool_input = entrée_météo(data.get("tool_input"))
+        return (tool_name, tool_input) if tool_input is not None else None
+    
+    tool_input = str(data.get("tool_input") or "").strip()
+    if tool_name not in OUTILS:
+        return None
+    if tool_name == "calculatrice" and not is_valid_expression(tool_input):
+        return None
+    if tool_name == "réponse_directe":
+        tool_input = ""
+    return tool_name, tool_input
+
+def parse_tool_selection(text: str) -> Optional[Tuple[str, Union[str, List[str]]]]:
+    """Analyse la réponse JSON du mode structuré et valide l'outil et son entrée.
+    
+    Args:
+        text: Réponse brute du LLM, éventuellement entourée de texte ou de balises de code
+        
+    Returns:
+        Couple (tool_name, tool_input) validé (liste de villes pour une recherche météo
+        groupée), ou None si la réponse est inexploitable
+    """
+    data = _extract_json_object(text)
+    return _validate_tool_selection(data) if data is not None else None
+
+def _interpréter_réponse_fusionnée(text: str) -> Tuple[str, Optional[Tuple[str, Union[str, List[str]]]]]:
+    """Extrait la réflexion et la sélection d'outil validée de la réponse du nœud fusionné."""
+    data = _extract_json_object(text)
+    if data is None:
+        return "", None
+    return str(data.get("thoughts") or "").strip(), _validate_tool_selection(data)
+
+def _prélire_sélection_spéculative(tool_name: str, tool_input: str) -> None:
+    """Lance la recherche météo en tâche de fond pendant que l'analyse spéculative se poursuit.
+    
+    La recherche est enregistrée sous l'entrée validée, celle que recevra
+    ``appeler_météo``; une entrée invalide n'est pas prélue.
+    """
+    if tool_name == "recherche_météo":
+        tool_input = entrée_météo(tool_input)
+        if tool_input is not None:
+            search = recherche_météo_multi if isinstance(tool_input, list) else recherche_météo
+            weather_prefetcher.prefetch(tool_input, search)
+
+def _variables_choix_outil(state: AgentState) -> Dict[str, Any]:
+    """Variables des prompts de choix d'outil."""
+    return {
+        "question": state["question"],
+        "thoughts": state["thoughts"],
+        "outils": ", ".join(OUTILS)
+    }
+
+def _choisir_outil_structuré(state: AgentState) -> Optional[Tuple[str, Union[str, List[str]]]]:
+    """Choisit l'outil et son entrée en un seul appel LLM (réponse JSON)."""
+    response = safe_execute(
+        get_chain("choix_outil_structuré").invoke,
+        None,
+        _variables_choix_outil(state)
+    )
+    if response is None:
+        return None
+    return parse_tool_selection(response.content)
+
+def _choisir_outil_en_deux_étapes(state: AgentState) -> Tuple[str, Union[str, List[str]]]:
+    """Choisit l'outil par un premier appel LLM, puis extrait son entrée par un second.
+    
+    Le premier appel est évité si le classifieur local est assez sûr de l'outil.
+    Une erreur LLM est propagée: ``choisir_outil`` la convertit en réponse
+    directe marquée ``error``.
+    """
+    tool_name = intent_classifier.classify(state["question"])
+    if tool_name is None:
+        # Choix de l'outil
+        tool_name = get_chain("choix_outil").invoke(_variables_choix_outil(state)).content
+    
+    # Validation du nom d'outil
+    if tool_name not in OUTILS:
+        logger.warning("Nom d'outil invalide: %s", tool_name)
+        tool_name = "réponse_directe"
+    
+    logger.info("Outil choisi: %s", tool_name)
+    
+    # Préparer l'entrée de l'outil
+    tool_input = ""
+    if tool_name == "recherche_météo":
+        # Géocodage anticipé des lieux repérés localement, pendant l'extraction par le LLM
+        weather_prefetcher.prefetch_candidates(state["question"])
+        tool_input = get_chain("extraction_ville").invoke({"question": state["question"]}).content
+        # Plusieurs villes énumérées: liste pour la recherche groupée
+        tool_input = entrée_météo(tool_input) or tool_input
+        
+    elif tool_name == "calculatrice":
+        tool_input = get_chain("extraction_expression").invoke({"question": state["question"]}).content
+    
+    return tool_name, tool_input
+
 @handle_state_errors
 def choisir_outil(state: AgentState) -> Dict[str, Any]:
-    """Choisit l'outil approprié et prépare l'entrée pour cet outil."""
+    """Choisit l'outil approprié et prépare l'entrée pour cet outil.
+    
+    En mode ``structured`` (voir ``config.tool_selection``), un seul appel LLM renvoie
+    l'outil et son entrée; si la réponse est inexploitable, on se replie sur
+    la sélection en deux étapes.
+    """
     logger.info("Choix de l'outil approprié")
     
     if not state.get("thoughts"):
@@ -84,70 +237,22 @@ def choisir_outil(state: AgentState) -> Dict[str, Any]:
         }
     
     try:
-        # Liste des outils disponibles
-        outils = ["recherche_météo", "calculatrice", "réponse_directe"]
+        # Chaque prompt utilise le modèle que lui attribue model_tiers
+        if get_config().tool_selection == "structured":
+            selection = _choisir_outil_structuré(state)
+            if selection is not None:
+                tool_name, tool_input = selection
+                logger.info("Outil choisi (mode structuré): %s", tool_name)
+                logger.info("Entrée de l'outil: %s", tool_input)
+                return {"tool_name": tool_name, "tool_input": tool_input}
+            logger.warning("Réponse structurée inexploitable, repli sur la sélection en deux étapes")
         
-        # Obtention du LLM avec retry
-        llm = get_llm()
-        
-        # Choix de l'outil
-        prompt = ChatPromptTemplate.from_template(
-            "Question: {question}\nRéflexion: {thoughts}\n"
-            "Choisissez l'outil le plus approprié parmi: {outils}. "
-            "Répondez uniquement avec le nom de l'outil."
-        )
-        chain = prompt | llm
-        
-        # Appel sécurisé au LLM
-        tool_name_response = safe_execute(
-            chain.invoke,
-            {"content": "réponse_directe"},  # Fallback en cas d'erreur
-            {
-                "question": state["question"], 
-                "thoughts": state["thoughts"],
-                "outils": ", ".join(outils)
-            }
-        )
-        
-        tool_name = tool_name_response.content
-        
-        # Validation du nom d'outil
-        if tool_name not in outils:
-            logger.warning(f"Nom d'outil invalide: {tool_name}")
-            tool_name = "réponse_directe"
-        
-        logger.info(f"Outil choisi: {tool_name}")
-        
-        # Préparer l'entrée de l'outil
-        tool_input = ""
-        if tool_name == "recherche_météo":
-            prompt_input = ChatPromptTemplate.from_template(
-                "Extrayez le nom de la ville de la question: {question}"
-            )
-            tool_input_response = safe_execute(
-                (prompt_input | llm).invoke,
-                {"content": ""},
-                {"question": state["question"]}
-            )
-            tool_input = tool_input_response.content
-            
-        elif tool_name == "calculatrice":
-            prompt_input = ChatPromptTemplate.from_template(
-                "Extrayez l'expression mathématique de la question: {question}. "
-                "Ne retournez que l'expression mathématique, sans texte supplémentaire."
-            )
-            tool_input_response = safe_execute(
-                (prompt_input | llm).invoke,
-                {"content": ""},
-                {"question": state["question"]}
-            )
-            tool_input = tool_input_response.content
-        
-        logger.info(f"Entrée de l'outil: {tool_input}")
+        tool_name, tool_input = _choisir_outil_en_deux_étapes(state)
+        logger.info("Entrée de l'outil: %s", tool_input)
         return {"tool_name": tool_name, "tool_input": tool_input}
         
     except Exception as e:
-        logger.error(f"Erreur lors du choix d'outil: {str(e)}")
+        logger.error("Erreur lors du choix d'outil: %s", e)
         # En cas d'erreur, on utilise la réponse directe comme fallback
         return {
             "tool_name": "réponse_directe", 
@@ -155,10 +260,98 @@ def choisir_outil(state: AgentState) -> Dict[str, Any]:
             "error": True
         }
 
+@handle_state_errors
+def analyser_et_choisir(state: AgentState) -> Dict[str, Any]:
+    """Analyse la question, choisit l'outil et prépare son entrée en un seul appel LLM.
+    
+    Renseigne les mêmes champs que ``analyser`` suivi de ``choisir_outil``
+    (``thoughts``, ``tool_name``, ``tool_input``). Si la réponse structurée est
+    inexploitable, on se replie sur le choix d'outil classique.
+    """
+    logger.info("Analyse et choix d'outil pour la question: %s", state.get('question', ''))
+    
+    if not state.get("question"):
+        logger.warning("Tentative d'analyse sans question fournie")
+        return {
+            "thoughts": "Je n'ai pas reçu de question à analyser.",
+            "tool_name": "réponse_directe",
+            "tool_input": ""
+        }
+    
+    try:
+        response = get_chain("analyse_et_choix").invoke({
+            "question": state["question"],
+            "outils": ", ".join(OUTILS)
+        })
+    except Exception as e:
+        logger.error("Erreur lors de l'analyse: %s", e)
+        return {
+            "thoughts": "Je rencontre des difficultés à analyser cette question.",
+            "tool_name": "réponse_directe",
+            "tool_input": "",
+            "error": True
+        }
+    
+    thoughts, selection = _interpréter_réponse_fusionnée(response.content)
+    
+    if thoughts and selection is not None:
+        tool_name, tool_input = selection
+        logger.info("Outil choisi (nœud fusionné): %s", tool_name)
+        logger.info("Entrée de l'outil: %s", tool_input)
+        return {"thoughts": thoughts, "tool_name": tool_name, "tool_input": tool_input}
+    
+    # Repli: la réponse brute sert de réflexion pour le choix d'outil classique
+    logger.warning("Réponse fusionnée inexploitable, repli sur le choix d'outil classique")
+    thoughts = thoughts or response.content
+    return {"thoughts": thoughts, **choisir_outil({**state, "thoughts": thoughts})}
+
+def _sélection_spéculative(analyse: Any, tool_name: str, tool_input: str) -> Dict[str, Any]:
+    """Champs d'état (réflexion, outil, entrée) à partir des branches spéculatives retenues."""
+    if isinstance(analyse, Exception):
+        logger.error("Erreur lors de l'analyse: %s", analyse)
+        update = {"thoughts": "Je rencontre des difficultés à analyser cette question.", "error": True}
+    else:
+        update = {"thoughts": analyse.content}
+    
+    if tool_name not in OUTILS:
+        logger.warning("Nom d'outil invalide: %s", tool_name)
+        tool_name, tool_input = "réponse_directe", ""
+    elif tool_name == "recherche_météo":
+        # Plusieurs villes énumérées: liste pour la recherche groupée
+        tool_input = entrée_météo(tool_input) or tool_input
+    
+    logger.info("Outil choisi (mode spéculatif): %s", tool_name)
+    logger.info("Entrée de l'outil: %s", tool_input)
+    return {**update, "tool_name": tool_name, "tool_input": tool_input}
+
+@handle_state_errors
+def analyser_en_parallèle(state: AgentState) -> Dict[str, Any]:
+    """Lance simultanément l'analyse, le choix de l'outil et les extractions possibles.
+    
+    Renseigne les mêmes champs que ``analyser`` suivi de ``choisir_outil``
+    (``thoughts``, ``tool_name``, ``tool_input``), en une latence LLM au lieu
+    de trois; l'extraction qui ne sert pas à l'outil choisi est abandonnée
+    (voir ``speculative.py``).
+    """
+    logger.info("Analyse spéculative de la question: %s", state.get('question', ''))
+    
+    if not state.get("question"):
+        logger.warning("Tentative d'analyse sans question fournie")
+        return {
+            "thoughts": "Je n'ai pas reçu de question à analyser.",
+            "tool_name": "réponse_directe",
+            "tool_input": ""
+        }
+    
+    weather_prefetcher.prefetch_candidates(state["question"], check_keywords=True)
+    return _sélection_spéculative(*speculative_runner.run(
+        state["question"], OUTILS, on_selection=_prélire_sélection_spéculative
+    ))
+
 @handle_state_errors
 def appeler_météo(state: AgentState) -> Dict[str, Any]:
     """Appelle l'outil de météo avec l'entrée préparée."""
-    logger.info(f"Appel de l'outil météo avec: {state.get('tool_input', '')}")
+    logger.info("Appel de l'outil météo avec: %s", state.get('tool_input', ''))
     
     if not state.get("tool_input"):
         logger.warning("Tentative d'appel à l'outil météo sans entrée")
@@ -168,18 +361,47 @@ def appeler_météo(state: AgentState) -> Dict[str, Any]:
         }
         
     try:
-        # Appeler la fonction recherche_météo directement
-        observation = recherche_météo(state["tool_input"])
-        logger.info(f"Résultat météo obtenu: {observation}")
+        # Résultat de la recherche prélue, ou appel direct de recherche_météo
+        observation = weather_prefetcher.result(state["tool_input"], recherche_météo)
+        logger.info("Résultat météo obtenu: %s", observation)
+        return {"observation": observation}
+    except ToolExecutionError as e:
+        logger.error("Erreur d'exécution de l'outil météo: %s", e)
+        return {
+            "observation": str(e),
+            "error": True
+        }
+    except Exception as e:
+        logger.error("Erreur inattendue lors de l'appel météo: %s", e)
+        return {
+            "observation": "Une erreur s'est produite lors de la recherche météo.",
+            "error": True
+        }
+
+@handle_state_errors
+def appeler_météo_multi(state: AgentState) -> Dict[str, Any]:
+    """Appelle la recherche météo groupée pour la liste de villes préparée."""
+    logger.info("Appel de l'outil météo groupé avec: %s", state.get('tool_input', ''))
+    
+    if not state.get("tool_input"):
+        logger.warning("Tentative d'appel à l'outil météo groupé sans entrée")
+        return {
+            "observation": "Je n'ai pas pu déterminer les villes pour lesquelles vous souhaitez la météo.",
+            "error": True
+        }
+    
+    try:
+        observation = weather_prefetcher.result(state["tool_input"], recherche_météo_multi)
+        logger.info("Résultat météo groupé obtenu: %s", observation)
         return {"observation": observation}
     except ToolExecutionError as e:
-        logger.error(f"Erreur d'exécution de l'outil météo: {str(e)}")
+        logger.error("Erreur d'exécution de l'outil météo groupé: %s", e)
         return {
             "observation": str(e),
             "error": True
         }
     except Exception as e:
-        logger.error(f"Erreur inattendue lors de l'appel météo: {str(e)}")
+        logger.error("Erreur inattendue lors de l'appel météo groupé: %s", e)
         return {
             "observation": "Une erreur s'est produite lors de la recherche météo.",
             "error": True
@@ -188,7 +410,7 @@ def appeler_météo(state: AgentState) -> Dict[str, Any]:
 @handle_state_errors
 def appeler_calculatrice(state: AgentState) -> Dict[str, Any]:
     """Appelle la calculatrice avec l'entrée préparée."""
-    logger.info(f"Appel de l'outil calculatrice avec: {state.get('tool_input', '')}")
+    logger.info("Appel de l'outil calculatrice avec: %s", state.get('tool_input', ''))
     
     if not state.get("tool_input"):
         logger.warning("Tentative d'appel à la calculatrice sans entrée")
@@ -200,16 +422,16 @@ def appeler_calculatrice(state: AgentState) -> Dict[str, Any]:
     try:
         # Appeler la fonction calculatrice directement
         observation = calculatrice(state["tool_input"])
-        logger.info(f"Résultat calculatrice obtenu: {observation}")
+        logger.info("Résultat calculatrice obtenu: %s", observation)
         return {"observation": observation}
     except ToolExecutionError as e:
-        logger.error(f"Erreur d'exécution de la calculatrice: {str(e)}")
+        logger.error("Erreur d'exécution de la calculatrice: %s", e)
         return {
             "observation": str(e),
             "error": True
         }
     except Exception as e:
-        logger.error(f"Erreur inattendue lors de l'appel calculatrice: {str(e)}")
+        logger.error("Erreur inattendue lors de l'appel calculatrice: %s", e)
         return {
             "observation": "Une erreur s'est produite lors du calcul.",
             "error": True
@@ -221,14 +443,8 @@ def réponse_directe(state: AgentState) -> Dict[str, Any]:
     logger.info("Génération d'une réponse directe")
     
     try:
-        llm = get_llm()
-        prompt = ChatPromptTemplate.from_template(
-            "Question: {question}\nRéflexion: {thoughts}\n"
-            "Donnez une réponse directe et utile."
-        )
-        
         response = safe_execute(
-            (prompt | llm).invoke,
+            get_chain("réponse_directe").invoke,
             {"content": "Je ne peux pas répondre à cette question pour le moment."},
             state
         )
@@ -237,7 +453,7 @@ def réponse_directe(state: AgentState) -> Dict[str, Any]:
         logger.info("Réponse directe générée avec succès")
         return {"observation": "Réponse directe", "answer": answer}
     except Exception as e:
-        logger.error(f"Erreur lors de la génération de réponse directe: {str(e)}")
+        logger.error("Erreur lors de la génération de réponse directe: %s", e)
         return {
             "observation": "Réponse directe",
             "answer": "Je suis désolé, mais je ne peux pas générer une réponse à cette question pour le moment.",
@@ -257,15 +473,8 @@ def formuler_réponse(state: AgentState) -> Dict[str, Any]:
         }
     
     try:
-        llm = get_llm()
-        prompt = ChatPromptTemplate.from_template(
-            "Question: {question}\nRéflexion: {thoughts}\n"
-            "Observation: {observation}\n"
-            "Formulez une réponse complète, claire et utile."
-        )
-        
         response = safe_execute(
-            (prompt | llm).invoke,
+            get_chain("réponse_finale").invoke,
             {"content": state.get("observation", "Je ne peux pas formuler de réponse pour le moment.")},
             state
         )
@@ -274,15 +483,42 @@ def formuler_réponse(state: AgentState) -> Dict[str, Any]:
         logger.info("Réponse finale formulée avec succès")
         return {"answer": answer}
     except Exception as e:
-        logger.error(f"Erreur lors de la formulation de la réponse: {str(e)}")
+        logger.error("Erreur lors de la formulation de la réponse: %s", e)
         return {
             "answer": f"Voici ce que j'ai trouvé: {state.get('observation', 'Aucune information disponible')}",
             "error": True
         }
 
-def router(state: AgentState) -> Literal["appeler_météo", "appeler_calculatrice", "réponse_directe"]:
+@handle_state_errors
+def réponse_calcul(state: AgentState) -> Dict[str, Any]:
+    """Formule la réponse d'un calcul réussi à partir d'un gabarit, sans appel LLM."""
+    result = state["observation"][len("Résultat: "):]
+    fast_path_classifier.record("réponse_gabarit")
+    logger.info("Réponse de calcul formulée par gabarit")
+    return {"answer": f"Le résultat de {state['tool_input']} est {result}."}
+
+def router_pré_routage(state: AgentState) -> str:
+    """Après le pré-routage: l'outil directement, ou le chemin LLM habituel."""
+    if state.get("fast_path") and not state.get("error"):
+        return router(state)
+    return "llm"
+
+def router_après_calcul(state: AgentState) -> Literal["réponse_calcul", "formuler_réponse"]:
+    """Après la calculatrice: réponse par gabarit pour un calcul réussi de la voie rapide."""
+    if (
+        state.get("fast_path")
+        and not state.get("error")
+        and get_config().fast_path_template_answer
+        and str(state.get("observation", "")).startswith("Résultat: ")
+    ):
+        return "réponse_calcul"
+    return "formuler_réponse"
+
+def router(state: AgentState) -> Literal[
+    "appeler_météo", "appeler_météo_multi", "appeler_calculatrice", "réponse_directe"
+]:
     """Détermine quel nœud appeler en fonction de l'outil choisi."""
-    logger.info(f"Routage basé sur l'outil: {state.get('tool_name', 'non défini')}")
+    logger.info("Routage basé sur l'outil: %s", state.get('tool_name', 'non défini'))
     
     # Vérifier s'il y a eu une erreur
     if state.get("error"):
@@ -290,6 +526,9 @@ def router(state: AgentState) -> Literal["appeler_météo", "appeler_calculatric
         return "réponse_directe"
     
     if state["tool_name"] == "recherche_météo":
+        # Une liste de villes passe par la recherche groupée
+        if isinstance(state.get("tool_input"), list):
+            return "appeler_météo_multi"
         return "appeler_météo"
     elif state["tool_name"] == "calculatrice":
         return "appeler_calculatrice"
@@ -0,0 +1,335 @@
+"""
+Versions asynchrones des nœuds de raisonnement.
+
+Mêmes entrées, mêmes sorties et même gestion d'erreurs que ``reasoning.py``,
+mais les appels LLM passent par ``ainvoke`` et la météo par un client HTTP
+asynchrone: ``app.ainvoke`` / ``app.astream`` ne bloquent jamais la boucle
+d'évènements. Les nœuds sans entrée/sortie (pré-routage, réponse par gabarit,
+routeurs) sont partagés avec la version synchrone.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .state import AgentState
+from .config import get_config
+from .intent import intent_classifier
+from .model_tiers import model_tiers
+from .prefetch import weather_prefetcher
+from .prompts import get_chain
+from .speculative import speculative_runner
+from .tools import arecherche_météo, arecherche_météo_multi, acalculatrice
+from .reasoning import (
+    OUTILS,
+    entrée_météo,
+    _interpréter_réponse_fusionnée,
+    _sélection_spéculative,
+    _variables_choix_outil,
+    parse_tool_selection
+)
+from .errors import (
+    handle_state_errors,
+    logger,
+    ToolExecutionError,
+    asafe_execute
+)
+
+async def _achain(name: str) -> Any:
+    """Renvoie la chaîne précompilée ``name`` pour le client LLM mutualisé de son modèle."""
+    return get_chain(name, await model_tiers.allm_for(name))
+
+@handle_state_errors
+async def aanalyser(state: AgentState) -> Dict[str, Any]:
+    """Analyse la question initiale et génère des réflexions."""
+    logger.info("Analyse de la question: %s", state.get('question', ''))
+
+    if not state.get("question"):
+        logger.warning("Tentative d'analyse sans question fournie")
+        return {"thoughts": "Je n'ai pas reçu de question à analyser."}
+
+    try:
+        chain = await _achain("analyse")
+        thoughts = await chain.ainvoke({"question": state["question"]})
+        logger.info("Analyse réussie")
+        return {"thoughts": thoughts.content}
+    except Exception as e:
+        logger.error("Erreur lors de l'analyse: %s", e)
+        return {
+            "thoughts": "Je rencontre des difficultés à analyser cette question.",
+            "error": True
+        }
+
+async def _aprélire_sélection_spéculative(tool_name: str, tool_input: str) -> None:
+    """Lance la recherche météo en tâche de fond pendant que l'analyse spéculative se poursuit."""
+    if tool_name == "recherche_météo":
+        tool_input = entrée_météo(tool_input)
+        if tool_input is not None:
+            search = arecherche_météo_multi if isinstance(tool_input, list) else arecherche_météo
+            await weather_prefetcher.aprefetch(tool_input, search)
+
+async def _achoisir_outil_structuré(state: AgentState) -> Optional[Tuple[str, Union[str, List[str]]]]:
+    """Choisit l'outil et son entrée en un seul appel LLM (réponse JSON)."""
+    chain = await _achain("choix_outil_structuré")
+    response = await asafe_execute(chain.ainvoke, None, _variables_choix_outil(state))
+    if response is None:
+        return None
+    return parse_tool_selection(response.content)
+
+async def _achoisir_outil_en_deux_étapes(state: AgentState) -> Tuple[str, Union[str, List[str]]]:
+    """Choisit l'outil par un premier appel LLM, puis extrait son entrée par un second.
+
+    Le premier appel est évité si le classifieur local est assez sûr de l'outil.
+    Une erreur LLM est propagée: ``achoisir_outil`` la convertit en réponse
+    directe marquée ``error``, comme en synchrone.
+    """
+    tool_name = intent_classifier.classify(state["question"])
+    if tool_name is None:
+        chain = await _achain("choix_outil")
+        tool_name = (await chain.ainvoke(_variables_choix_outil(state))).content
+
+    # Validation du nom d'outil
+    if tool_name not in OUTILS:
+        logger.warning("Nom d'outil invalide: %s", tool_name)
+        tool_name = "réponse_directe"
+
+    logger.info("Outil choisi: %s", tool_name)
+
+    # Préparer l'entrée de l'outil
+    extraction = {
+        "recherche_météo": "extraction_ville",
+        "calculatrice": "extraction_expression"
+    }.get(tool_name)
+    if extraction is None:
+        return tool_name, ""
+    if tool_name == "recherche_météo":
+        # Géocodage anticipé des lieux repérés localement, pendant l'extraction par le LLM
+        await weather_prefetcher.aprefetch_candidates(state["question"])
+
+    chain = await _achain(extraction)
+    tool_input = (await chain.ainvoke({"question": state["question"]})).content
+    if tool_name == "recherche_météo":
+        # Plusieurs villes énumérées: liste pour la recherche groupée
+        tool_input = entrée_météo(tool_input) or tool_input
+    return tool_name, tool_input
+
+@handle_state_errors
+async def achoisir_outil(state: AgentState) -> Dict[str, Any]:
+    """Choisit l'outil approprié et prépare l'entrée pour cet outil."""
+    logger.info("Choix de l'outil approprié")
+
+    if not state.get("thoughts"):
+        logger.warning("Tentative de choix d'outil sans pensées préalables")
+        return {
+            "tool_name": "réponse_directe",
+            "tool_input": "",
+            "error": True
+        }
+
+    try:
+        if get_config().tool_selection == "structured":
+            selection = await _achoisir_outil_structuré(state)
+            if selection is not None:
+                tool_name, tool_input = selection
+                logger.info("Outil choisi (mode structuré): %s", tool_name)
+                logger.info("Entrée de l'outil: %s", tool_input)
+                return {"tool_name": tool_name, "tool_input": tool_input}
+            logger.warning("Réponse structurée inexploitable, repli sur la sélection en deux étapes")
+
+        tool_name, tool_input = await _achoisir_outil_en_deux_étapes(state)
+        logger.info("Entrée de l'outil: %s", tool_input)
+        return {"tool_name": tool_name, "tool_input": tool_input}
+
+    except Exception as e:
+        logger.error("Erreur lors du choix d'outil: %s", e)
+        return {
+            "tool_name": "réponse_directe",
+            "tool_input": "",
+            "error": True
+        }
+
+@handle_state_errors
+async def aanalyser_et_choisir(state: AgentState) -> Dict[str, Any]:
+    """Analyse la question, choisit l'outil et prépare son entrée en un seul appel LLM."""
+    logger.info("Analyse et choix d'outil pour la question: %s", state.get('question', ''))
+
+    if not state.get("question"):
+        logger.warning("Tentative d'analyse sans question fournie")
+        return {
+            "thoughts": "Je n'ai pas reçu de question à analyser.",
+            "tool_name": "réponse_directe",
+            "tool_input": ""
+        }
+
+    try:
+        chain = await _achain("analyse_et_choix")
+        response = await chain.ainvoke({
+            "question": state["question"],
+            "outils": ", ".join(OUTILS)
+        })
+    except Exception as e:
+        logger.error("Erreur lors de l'analyse: %s", e)
+        return {
+            "thoughts": "Je rencontre des difficultés à analyser cette question.",
+            "tool_name": "réponse_directe",
+            "tool_input": "",
+            "error": True
+        }
+
+    thoughts, selection = _interpréter_réponse_fusionnée(response.content)
+
+    if thoughts and selection is not None:
+        tool_name, tool_input = selection
+        logger.info("Outil choisi (nœud fusionné): %s", tool_name)
+        logger.info("Entrée de l'outil: %s", tool_input)
+        return {"thoughts": thoughts, "tool_name": tool_name, "tool_input": tool_input}
+
+    # Repli: la réponse brute sert de réflexion pour le choix d'outil classique
+    logger.warning("Réponse fusionnée inexploitable, repli sur le choix d'outil classique")
+    thoughts = thoughts or response.content
+    return {"thoughts": thoughts, **await achoisir_outil({**state, "thoughts": thoughts})}
+
+@handle_state_errors
+async def aanalyser_en_parallèle(state: AgentState) -> Dict[str, Any]:
+    """Lance simultanément l'analyse, le choix de l'outil et les extractions possibles.
+
+    L'extraction qui ne sert pas à l'outil choisi est annulée si elle est encore en cours.
+    """
+    logger.info("Analyse spéculative de la question: %s", state.get('question', ''))
+
+    if not state.get("question"):
+        logger.warning("Tentative d'analyse sans question fournie")
+        return {
+            "thoughts": "Je n'ai pas reçu de question à analyser.",
+            "tool_name": "réponse_directe",
+            "tool_input": ""
+        }
+
+    await weather_prefetcher.aprefetch_candidates(state["question"], check_keywords=True)
+    return _sélection_spéculative(*await speculative_runner.arun(
+        state["question"], OUTILS, on_selection=_aprélire_sélection_spéculative
+    ))
+
+@handle_state_errors
+async def aappeler_météo(state: AgentState) -> Dict[str, Any]:
+    """Appelle l'outil de météo avec l'entrée préparée."""
+    logger.info("Appel de l'outil météo avec: %s", state.get('tool_input', ''))
+
+    if not state.get("tool_input"):
+        logger.warning("Tentative d'appel à l'outil météo sans entrée")
+        return {
+            "observation": "Je n'ai pas pu déterminer la ville pour laquelle vous souhaitez la météo.",
+            "error": True
+        }
+
+    try:
+        observation = await weather_prefetcher.aresult(state["tool_input"], arecherche_météo)
+        logger.info("Résultat météo obtenu: %s", observation)
+        return {"observation": observation}
+    except ToolExecutionError as e:
+        logger.error("Erreur d'exécution de l'outil météo: %s", e)
+        return {
+            "observation": str(e),
+            "error": True
+        }
+    except Exception as e:
+        logger.error("Erreur inattendue lors de l'appel météo: %s", e)
+        return {
+            "observation": "Une erreur s'est produite lors de la recherche météo.",
+            "error": True
+        }
+
+@handle_state_errors
+async def aappeler_météo_multi(state: AgentState) -> Dict[str, Any]:
+    """Appelle la recherche météo groupée pour la liste de villes préparée."""
+    logger.info("Appel de l'outil météo groupé avec: %s", state.get('tool_input', ''))
+
+    if not state.get("tool_input"):
+        logger.warning("Tentative d'appel à l'outil météo groupé sans entrée")
+        return {
+            "observation": "Je n'ai pas pu déterminer les villes pour lesquelles vous souhaitez la météo.",
+            "error": True
+        }
+
+    try:
+        observation = await weather_prefetcher.aresult(state["tool_input"], arecherche_météo_multi)
+        logger.info("Résultat météo groupé obtenu: %s", observation)
+        return {"observation": observation}
+    except ToolExecutionError as e:
+        logger.error("Erreur d'exécution de l'outil météo groupé: %s", e)
+        return {
+            "observation": str(e),
+            "error": True
+        }
+    except Exception as e:
+        logger.error("Erreur inattendue lors de l'appel météo groupé: %s", e)
+        return {
+            "observation": "Une erreur s'est produite lors de la recherche météo.",
+            "error": True
+        }
+
+@handle_state_errors
+async def aappeler_calculatrice(state: AgentState) -> Dict[str, Any]:
+    """Appelle la calculatrice avec l'entrée préparée."""
+    logger.info("Appel de l'outil calculatrice avec: %s", state.get('tool_input', ''))
+
+    if not state.get("tool_input"):
+        logger.warning("Tentative d'appel à la calculatrice sans entrée")
+        return {
+            "observation": "Je n'ai pas pu déterminer l'expression mathématique à calculer.",
+            "error": True
+        }
+
+    try:
+        observation = await acalculatrice(state["tool_input"])
+        logger.info("Résultat calculatrice obtenu: %s", observation)
+        return {"observation": observation}
+    except ToolExecutionError as e:
+        logger.error("Erreur d'exécution de la calculatrice: %s", e)
+        return {
+            "observation": str(e),
+            "error": True
+        }
+    except Exception as e:
+        logger.error("Erreur inattendue lors de l'appel calculatrice: %s", e)
+        return {
+            "observation": "Une erreur s'est produite lors du calcul.",
+            "error": True
+        }
+
+@handle_state_errors
+async def aréponse_directe(state: AgentState) -> Dict[str, Any]:
+    """Génère une réponse directe sans utiliser d'outils."""
+    logger.info("Génération d'une réponse directe")
+
+    chain = await _achain("réponse_directe")
+    response = await asafe_execute(chain.ainvoke, None, state)
+    if response is None:
+        return {
+            "observation": "Réponse directe",
+            "answer": "Je suis désolé, mais je ne peux pas générer une réponse à cette question pour le moment.",
+            "error": True
+        }
+
+    logger.info("Réponse directe générée avec succès")
+    return {"observation": "Réponse directe", "answer": response.content}
+
+@handle_state_errors
+async def aformuler_réponse(state: AgentState) -> Dict[str, Any]:
+    """Formule une réponse finale basée sur l'observation de l'outil."""
+    logger.info("Formulation de la réponse finale")
+
+    if not state.get("observation"):
+        logger.warning("Tentative de formulation de réponse sans observation")
+        return {
+            "answer": "Je n'ai pas pu générer une réponse car je n'ai pas d'observation à interpréter.",
+            "error": True
+        }
+
+    chain = await _achain("réponse_finale")
+    response = await asafe_execute(chain.ainvoke, None, state)
+    if response is None:
+        return {
+            "answer": f"Voici ce que j'ai trouvé: {state.get('observation', 'Aucune information disponible')}",
+            "error": True
+        }
+
+    logger.info("Réponse finale formulée avec succès")
+    return {"answer": response.content}
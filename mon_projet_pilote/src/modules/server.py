@@ -0,0 +1,256 @@
+"""
+Serveur HTTP de l'agent en mode pré-fork (plusieurs processus).
+
+Un processus CPython sert le graphe sous le GIL: le rendu des prompts,
+l'analyse JSON et la journalisation d'une question bloquent toutes les
+autres. ``PreforkServer`` prépare tout dans le processus parent (imports,
+clients LLM, modèle du classifieur local, graphe compilé, socket d'écoute),
+puis crée N workers par ``fork()``: ils héritent de cet état chaud (copie à
+l'écriture) et acceptent les connexions sur le même socket, que le noyau
+leur répartit. Chaque worker sert ses connexions dans des threads.
+
+Rien de ce qui ne survit pas à ``fork()`` n'est ouvert au moment du fork:
+le parent ferme auparavant les bases SQLite des caches, les pools HTTP, les
+pools de threads et le fichier de traces; chaque worker rouvre les siens à
+la première utilisation et construit ses propres clients LLM. Les caches de
+géocodage, des réponses et des appels LLM sont partagés entre les workers
+par leurs bases SQLite (mode WAL); les caches en mémoire, les prévisions et
+les métriques restent propres à chaque worker.
+
+API (JSON):
+
+- ``POST /ask`` ``{"question": "..."}``: réponse, outil, résultat du cache
+  des réponses, erreur, durée et pid du worker;
+- ``GET /health``: ``{"status": "ok", "worker": pid}``;
+- ``GET /metrics``: métriques du worker qui accepte la connexion, au format
+  texte de Prometheus, chaque série étiquetée ``worker="<pid>"``. Le noyau
+  choisit ce worker: un collecteur voit donc les workers tour à tour, et
+  additionne leurs dernières valeurs (``sum without (worker)``).
+"""
+import json
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .answer_cache import answer_cache
+from .batch import RESULT_FIELDS
+from .config import get_config
+from .errors import logger
+from .geocoding import geocoding_cache
+from .graph import get_agent_graph
+from .http_client import http_client
+from .intent import intent_classifier
+from .llm import llm_registry
+from .llm_cache import llm_cache
+from .logging_setup import shutdown_logging
+from .metrics import CONTENT_TYPE, metrics, track_question
+from .model_tiers import model_tiers
+from .prefetch import weather_prefetcher
+from .prompts import prompt_registry
+from .speculative import speculative_runner
+from .tracing import tracer
+
+# Champs de l'état renvoyés par POST /ask
+ANSWER_FIELDS = RESULT_FIELDS + ("cache_hit",)
+
+
+def answer_question(app: Any, question: str) -> Dict[str, Any]:
+    """Exécute une question dans le graphe compilé et renvoie la réponse sérialisable."""
+    start = time.perf_counter()
+    record: Dict[str, Any] = {"question": question}
+    try:
+        with tracer.span("question", "question"), track_question():
+            state = app.invoke({"question": question})
+        record.update({key: state.get(key) for key in ANSWER_FIELDS})
+        record["error"] = state.get("error_message") if state.get("error") else None
+    except Exception as e:
+        record["error"] = str(e)
+    record["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+class _AgentHandler(BaseHTTPRequestHandler):
+    """Sert ``POST /ask``, ``GET /health`` et ``GET /metrics`` dans un worker."""
+
+    protocol_version = "HTTP/1.1"  # Connexions persistantes
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "worker": os.getpid()})
+        elif path == "/metrics":
+            self._send(200, metrics.render({"worker": str(os.getpid())}).encode("utf-8"), CONTENT_TYPE)
+        else:
+            self._send_json(404, {"error": "Ressource inconnue"})
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.split("?", 1)[0] != "/ask":
+            self._send_json(404, {"error": "Ressource inconnue"})
+            return
+        try:
+            question = json.loads(body or b"{}").get("question")
+        except (ValueError, AttributeError):
+            question = None
+        if not isinstance(question, str) or not question.strip():
+            self._send_json(400, {"error": "Champ « question » manquant ou vide"})
+            return
+        record = answer_question(self.server.app, question)
+        record["worker"] = os.getpid()
+        self._send_json(200, record)
+
+
+def _release_before_fork() -> None:
+    """Ferme ce qui ne doit pas être hérité par les workers (connexions, threads, fichiers)."""
+    geocoding_cache.reset()
+    answer_cache.reset()
+    llm_cache.reset()
+    http_client.reset()
+    speculative_runner.reset()
+    weather_prefetcher.reset()
+    tracer.reset()
+    llm_registry.clear()
+    prompt_registry.clear()
+
+
+class PreforkServer:
+    """Serveur HTTP de l'agent: un processus parent qui prépare, N workers créés par ``fork()``.
+
+    Les réglages non fournis sont lus dans la configuration (``AGENT_SERVER_*``).
+    Le parent ne sert aucune requête: ``serve_forever()`` surveille les workers
+    et recrée ceux qui s'arrêtent, ``stop()`` les arrête.
+    """
+
+    def __init__(
+        self,
+        app: Any = None,
+        workers: Optional[int] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None
+    ):
+        """Prépare le serveur.
+
+        Args:
+            app: Graphe compilé servi (``get_agent_graph()`` si absent)
+            workers: Nombre de workers (0: un par cœur)
+            host: Adresse d'écoute
+            port: Port d'écoute (0 pour un port libre)
+
+        Raises:
+            RuntimeError: Si la plateforme ne fournit pas ``os.fork()``
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Le serveur pré-fork nécessite os.fork() (Linux, macOS)")
+        config = get_config()
+        workers = config.server_workers if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.app = app
+        self._address = (host or config.server_host, config.server_port if port is None else port)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._pids: Dict[int, int] = {}  # pid -> numéro du worker
+        self._stopping = False
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2] if self._server is not None else self._address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "PreforkServer":
+        """Prépare l'état chaud dans le parent, ouvre le socket et crée les workers."""
+        start = time.perf_counter()
+        # Construire les clients importe leurs modules; les workers construiront les leurs
+        llm_registry.warm_up(model_tiers.configs())
+        intent_classifier.load()
+        if self.app is None:
+            self.app = get_agent_graph()
+
+        self._server = ThreadingHTTPServer(self._address, _AgentHandler)
+        self._server.daemon_threads = True
+        self._server.app = self.app
+        # Un worker devancé par un autre à accept() retourne attendre au lieu de bloquer
+        self._server.socket.setblocking(False)
+
+        _release_before_fork()
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info("Serveur pré-fork prêt sur %s: %s workers, préparation en %.2f s",
+                    self.url, self.workers, time.perf_counter() - start)
+        return self
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._pids[pid] = index
+            return
+        code = 0
+        try:
+            self._run_worker(index)
+        except BaseException as e:
+            logger.error("Arrêt du worker %s sur erreur: %s", index, e)
+            code = 1
+        finally:
+            shutdown_logging()
+            os._exit(code)  # Ni les gestionnaires atexit ni le reste du programme du parent
+
+    def _run_worker(self, index: int) -> None:
+        server = self._server
+        # Le parent coordonne l'arrêt: SIGINT (Ctrl+C du terminal) est ignoré, SIGTERM arrête la boucle
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+        metrics.reset()
+        llm_registry.warm_up(model_tiers.configs())
+        logger.info("Worker %s prêt (pid %s)", index, os.getpid())
+        server.serve_forever()
+        server.server_close()
+
+    def serve_forever(self) -> None:
+        """Attend les workers et recrée ceux qui s'arrêtent, jusqu'à ``stop()``."""
+        while self._pids and not self._stopping:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self._pids.pop(pid, None)
+            if index is not None and not self._stopping:
+                logger.warning("Worker %s (pid %s) arrêté (code %s), redémarrage",
+                               index, pid, os.waitstatus_to_exitcode(status))
+                self._spawn(index)
+
+    def stop(self) -> None:
+        """Arrête les workers (SIGTERM), attend leur fin et ferme le socket."""
+        self._stopping = True
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self._pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._pids.pop(pid, None)
+        if self._server is not None:
+            self._server.server_close()
+
+    def __enter__(self) -> "PreforkServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
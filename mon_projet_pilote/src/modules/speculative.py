@@ -0,0 +1,183 @@
+"""
+Exécution spéculative de l'analyse et de la préparation de l'outil.
+
+En mode standard, ``analyser`` puis ``choisir_outil`` enchaînent trois appels
+LLM (réflexion, nom de l'outil, extraction de son entrée), alors que tous ne
+dépendent que de la question. Le mode ``speculative`` de ``build_agent_graph``
+les lance simultanément dès l'arrivée de la question:
+
+- ``analyse``: réflexion, utilisée ensuite par la réponse finale;
+- ``choix_outil_spéculatif``: nom de l'outil, sans attendre la réflexion;
+- ``extraction_ville`` et ``extraction_expression``: entrées possibles de l'outil.
+
+Dès que l'outil est connu, l'extraction inutile est abandonnée: annulée en
+asynchrone (la requête HTTP du client est interrompue), simplement ignorée en
+synchrone si elle a déjà démarré (un thread ne s'interrompt pas). Le chemin
+critique passe de trois latences LLM à une seule, au prix d'un ou deux appels
+supplémentaires; ``speculative_runner.stats()`` compte les appels lancés,
+utilisés, ignorés et annulés.
+"""
+import asyncio
+import contextvars
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import get_config
+from .errors import logger
+from .model_tiers import model_tiers
+from .prompts import get_chain
+
+# Extraction de l'entrée nécessaire à chaque outil
+EXTRACTIONS = {
+    "recherche_météo": "extraction_ville",
+    "calculatrice": "extraction_expression",
+}
+
+# Prompts lancés simultanément pour chaque question
+SPECULATIVE_PROMPTS = ("analyse", "choix_outil_spéculatif", "extraction_ville", "extraction_expression")
+
+
+class SpeculativeRunner:
+    """Lance les prompts de ``SPECULATIVE_PROMPTS`` en parallèle et ne garde que les branches utiles.
+
+    Le pool de threads (version synchrone) est créé à la première utilisation,
+    avec ``AGENT_SPECULATIVE_MAX_WORKERS`` threads; ``reset()`` le ferme.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=get_config().speculative_max_workers, thread_name_prefix="spéculation"
+                )
+            return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Exécute ``fn(*args)`` dans le pool partagé, avec le contexte de l'appelant
+        (callbacks de streaming et de traçage du nœud)."""
+        return self._setup().submit(contextvars.copy_context().run, fn, *args)
+
+    def _record(self, **counts: int) -> None:
+        with self._lock:
+            self._counts.update(counts)
+
+    @staticmethod
+    def _variables(name: str, question: str, outils: str) -> Dict[str, Any]:
+        if name == "choix_outil_spéculatif":
+            return {"question": question, "outils": outils}
+        return {"question": question}
+
+    @staticmethod
+    def _content(result: Any, default: str) -> str:
+        """Texte d'une branche terminée, ou ``default`` si elle a échoué."""
+        if isinstance(result, BaseException):
+            logger.warning("Branche spéculative en échec: %s", result)
+            return default
+        return str(result.content).strip()
+
+    def run(self, question: str, outils: List[str], llm: Optional[Any] = None,
+            on_selection: Optional[Callable[[str, str], Any]] = None) -> Tuple[Any, str, str]:
+        """Exécute les branches dans le pool de threads.
+
+        Args:
+            question: Question de l'utilisateur
+            outils: Noms des outils proposés au modèle
+            llm: Client LLM imposé à toutes les branches; à défaut, celui du modèle de chaque prompt
+            on_selection: Appelé avec (nom d'outil, entrée brute) dès qu'ils sont connus,
+                avant d'attendre la fin de l'analyse (prélecture des données de l'outil)
+
+        Returns:
+            (résultat de l'analyse ou exception, nom d'outil brut, entrée brute de l'outil)
+        """
+        futures: Dict[str, Future] = {
+            name: self.submit(get_chain(name, llm).invoke, self._variables(name, question, ", ".join(outils)))
+            for name in SPECULATIVE_PROMPTS
+        }
+
+        def result(name: str) -> Any:
+            try:
+                return futures[name].result()
+            except Exception as e:
+                return e
+
+        tool_name = self._content(result("choix_outil_spéculatif"), "réponse_directe")
+        needed = EXTRACTIONS.get(tool_name)
+        for name, future in futures.items():
+            if name.startswith("extraction_") and name != needed:
+                done = future.done()
+                self._abandon(future.cancel(), done)
+        tool_input = self._content(result(needed), "") if needed else ""
+        self._record(runs=1, launched=len(futures), used=3 if needed else 2)
+        if on_selection is not None:
+            on_selection(tool_name, tool_input)
+        return result("analyse"), tool_name, tool_input
+
+    async def arun(self, question: str, outils: List[str], llm: Optional[Any] = None,
+                   on_selection: Optional[Callable[[str, str], Awaitable[Any]]] = None) -> Tuple[Any, str, str]:
+        """Version asynchrone de ``run``: les branches inutiles encore en cours sont annulées.
+
+        ``on_selection`` est ici une coroutine.
+        """
+        chains = {
+            name: get_chain(name, llm if llm is not None else await model_tiers.allm_for(name))
+            for name in SPECULATIVE_PROMPTS
+        }
+        tasks: Dict[str, asyncio.Task] = {
+            name: asyncio.create_task(chain.ainvoke(self._variables(name, question, ", ".join(outils))))
+            for name, chain in chains.items()
+        }
+
+        async def result(name: str) -> Any:
+            try:
+                return await tasks[name]
+            except Exception as e:
+                return e
+
+        try:
+            tool_name = self._content(await result("choix_outil_spéculatif"), "réponse_directe")
+            needed = EXTRACTIONS.get(tool_name)
+            for name, task in tasks.items():
+                if name.startswith("extraction_") and name != needed:
+                    done = task.done()
+                    self._abandon(task.cancel(), done)
+            tool_input = self._content(await result(needed), "") if needed else ""
+            self._record(runs=1, launched=len(tasks), used=3 if needed else 2)
+            if on_selection is not None:
+                await on_selection(tool_name, tool_input)
+            return await result("analyse"), tool_name, tool_input
+        finally:
+            # Nœud lui-même annulé (délai dépassé, client déconnecté): aucune branche ne lui survit
+            for task in tasks.values():
+                task.cancel()
+
+    def _abandon(self, cancelled: bool, done: bool) -> None:
+        """Comptabilise une branche inutile: annulée avant la fin, ou terminée pour rien."""
+        if cancelled and not done:
+            self._record(cancelled=1)
+        else:
+            self._record(discarded=1)
+
+    def stats(self) -> Dict[str, int]:
+        """Renvoie les compteurs: exécutions, appels lancés, utilisés, ignorés et annulés."""
+        with self._lock:
+            counts = dict(self._counts)
+        return {name: counts.get(name, 0) for name in ("runs", "launched", "used", "discarded", "cancelled")}
+
+    def reset(self) -> None:
+        """Remet les compteurs à zéro et ferme le pool; la configuration sera relue à la prochaine utilisation."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._counts.clear()
+
+
+# Exécuteur partagé par les nœuds spéculatifs
+speculative_runner = SpeculativeRunner()
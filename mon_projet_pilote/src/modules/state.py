@@ -1,7 +1,7 @@
 """
 Définition de l'état de l'agent.
 """
-from typing import TypedDict, Optional, Any
+from typing import TypedDict, Optional, Any, List, Union
 
 class AgentState(TypedDict, total=False):
     """État typé pour l'agent.
@@ -13,10 +13,17 @@ class AgentState(TypedDict, total=False):
     question: str
     thoughts: Optional[str]
     tool_name: Optional[str]
-    tool_input: Optional[str]
+    tool_input: Optional[Union[str, List[str]]]  # Liste de villes pour la météo groupée
     observation: Optional[str]
     answer: Optional[str]
     
+    # Voie rapide (pré-routage déterministe)
+    fast_path: Optional[bool]
+    fast_path_confidence: Optional[float]
+    
+    # Cache des réponses: "exact", "semantic", ou None si la question n'y était pas
+    cache_hit: Optional[str]
+    
     # Champs de gestion d'erreurs
     error: Optional[bool]
     error_message: Optional[str]
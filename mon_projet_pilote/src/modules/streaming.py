@@ -0,0 +1,134 @@
+"""
+Diffusion en continu (streaming) de la réponse finale.
+
+``app.invoke`` ne rend la main qu'une fois la réponse entièrement générée.
+``stream_answer`` s'appuie sur ``app.stream`` en combinant deux modes de
+LangGraph:
+
+- ``messages``: les jetons produits par le modèle au fil de la génération,
+  dont on ne garde que ceux des nœuds de réponse finale;
+- ``debug``: le démarrage de chaque nœud, traduit en évènement de progression
+  ("Analyse de la question…", "Consultation de la météo…").
+
+Une réponse produite sans appel au modèle en streaming (cache des réponses,
+cache LLM, réponse de calcul par gabarit, repli en cas d'erreur) est émise
+d'un bloc à la fin du nœud.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+# Nœuds dont les jetons constituent la réponse visible
+FINAL_ANSWER_NODES = ("réponse_directe", "formuler_réponse")
+
+# Libellés de progression affichés au démarrage de chaque nœud
+PROGRESS_LABELS = {
+    "consulter_cache": "Recherche dans le cache des réponses…",
+    "pré_routage": "Pré-routage de la question…",
+    "analyser": "Analyse de la question…",
+    "choisir_outil": "Choix de l'outil…",
+    "analyser_et_choisir": "Analyse de la question et choix de l'outil…",
+    "analyser_en_parallèle": "Analyse de la question et préparation des outils en parallèle…",
+    "appeler_météo": "Consultation de la météo…",
+    "appeler_météo_multi": "Consultation de la météo de plusieurs villes…",
+    "appeler_calculatrice": "Calcul en cours…",
+    "réponse_calcul": "Mise en forme du résultat…",
+    "réponse_directe": "Rédaction de la réponse…",
+    "formuler_réponse": "Rédaction de la réponse…",
+    "mémoriser_réponse": "Mise en cache de la réponse…",
+    "récupération": "Récupération après erreur…",
+}
+
+STREAM_MODES = ["messages", "debug"]
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """Évènement de ``stream_answer``.
+
+    ``kind`` vaut "progress" (démarrage d'un nœud, ``text`` est le libellé),
+    "token" (fragment de la réponse finale) ou "answer" (réponse finale émise
+    d'un bloc, faute de jetons).
+    """
+
+    kind: str
+    node: str
+    text: str
+
+
+class _EventTranslator:
+    """Traduit les paires (mode, charge utile) de ``app.stream`` en ``StreamEvent``."""
+
+    def __init__(self):
+        self.streamed: set = set()
+
+    def translate(self, mode: str, payload: Any) -> List[StreamEvent]:
+        if mode == "messages":
+            chunk, metadata = payload
+            node = metadata.get("langgraph_node", "")
+            content = chunk.content if isinstance(chunk.content, str) else ""
+            if node in FINAL_ANSWER_NODES and content:
+                self.streamed.add(node)
+                return [StreamEvent("token", node, content)]
+            return []
+
+        node = payload["payload"].get("name", "")
+        if payload["type"] == "task":
+            label = PROGRESS_LABELS.get(node)
+            return [StreamEvent("progress", node, label)] if label else []
+        if payload["type"] == "task_result":
+            answer = self._answer(payload["payload"])
+            streamed = node in self.streamed
+            self.streamed.discard(node)
+            if answer and not streamed:
+                return [StreamEvent("answer", node, answer)]
+        return []
+
+    @staticmethod
+    def _answer(result: Dict[str, Any]) -> Optional[str]:
+        for channel, value in result.get("result", []):
+            if channel in ("answer", "recovery_message") and value:
+                return str(value)
+        return None
+
+
+def stream_answer(app: Any, question: str) -> Iterator[StreamEvent]:
+    """Exécute le graphe sur ``question`` en émettant progression et jetons de la réponse.
+
+    Args:
+        app: Graphe compilé (``build_agent_graph``)
+        question: Question de l'utilisateur
+
+    Yields:
+        Les évènements dans l'ordre d'arrivée
+    """
+    translator = _EventTranslator()
+    for mode, payload in app.stream({"question": question}, stream_mode=STREAM_MODES):
+        yield from translator.translate(mode, payload)
+
+
+async def astream_answer(app: Any, question: str) -> AsyncIterator[StreamEvent]:
+    """Version asynchrone de ``stream_answer`` (graphe construit avec ``use_async=True``)."""
+    translator = _EventTranslator()
+    async for mode, payload in app.astream({"question": question}, stream_mode=STREAM_MODES):
+        for event in translator.translate(mode, payload):
+            yield event
+
+
+def time_to_first_token(app: Any, question: str) -> Dict[str, Any]:
+    """Mesure le délai avant le premier fragment de réponse et la durée totale.
+
+    Returns:
+        Dictionnaire avec ``ttft`` et ``total`` (secondes), ``answer`` (texte
+        reconstitué) et ``tokens`` (nombre de fragments reçus)
+    """
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    for event in stream_answer(app, question):
+        if event.kind in ("token", "answer"):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(event.text)
+    total = time.perf_counter() - start
+    return {"ttft": total if ttft is None else ttft, "total": total, "answer": "".join(parts), "tokens": len(parts)}
@@ -2,11 +2,32 @@
 Outils disponibles pour l'agent.
 """
 from langchain_core.tools import tool
-import requests
+import asyncio
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .errors import handle_tool_errors, validate_input, logger
+from .config import get_config
+from .errors import handle_tool_errors, validate_input, logger, ExpressionError, ExpressionLimitError
+from .arithmetic import arithmetic_engine
+from .arithmetic_batch import evaluate_batch
+from .http_client import http_client
+from .cache import MISS
+from .geocoding import Coordinates, geocoding_cache
+from .forecast import forecast_cache
+from .metrics import exceptions_total
+
+# Caractères autorisés dans les entrées des outils (réutilisés par la voie rapide)
+LOCATION_CHARS = r"a-zA-Z\s\-éèêëàâäôöùûüç\'"
+EXPRESSION_CHARS = r"\d\s\+\-\*\/\(\)\.\,\%"
+
+# Motifs compilés une seule fois
+LOCATION_PATTERN = re.compile(rf"^[{LOCATION_CHARS}]+$")
+EXPRESSION_PATTERN = re.compile(rf"^[{EXPRESSION_CHARS}]+$")
+
+# Recherche météo groupée: séparateurs d'une liste de villes, nombre maximal de villes
+LOCATION_SEPARATORS = re.compile(r"\s*(?:[,;]|\bet\b|\band\b)\s*")
+MAX_LOCATIONS = 10
 
 def is_valid_location(location: str) -> bool:
     """Valide si une chaîne est un nom de ville potentiellement valide.
@@ -18,7 +39,34 @@ def is_valid_location(location: str) -> bool:
         bool: True si le nom semble valide, False sinon
     """
     # Vérifie que l'entrée n'est pas vide et contient des lettres
-    return bool(location) and bool(re.match(r'^[a-zA-Z\s\-éèêëàâäôöùûüç\']+$', location))
+    return bool(location) and bool(LOCATION_PATTERN.match(location))
+
+def split_locations(text: str) -> List[str]:
+    """Découpe une énumération de villes (« Paris, Lyon et Marseille ») en liste sans doublons.
+    
+    Args:
+        text: Texte contenant une ou plusieurs villes
+        
+    Returns:
+        Liste des villes, dans l'ordre d'apparition
+    """
+    locations = [part.strip() for part in LOCATION_SEPARATORS.split(text or "")]
+    return list(dict.fromkeys(part for part in locations if part))
+
+def is_valid_locations(locations: List[str]) -> bool:
+    """Valide une liste de villes pour la recherche météo groupée.
+    
+    Args:
+        locations: Noms de villes
+        
+    Returns:
+        bool: True si la liste est non vide, bornée et ne contient que des noms valides
+    """
+    return (
+        isinstance(locations, (list, tuple))
+        and 0 < len(locations) <= MAX_LOCATIONS
+        and all(isinstance(location, str) and is_valid_location(location) for location in locations)
+    )
 
 def is_valid_expression(expression: str) -> bool:
     """Valide si une chaîne est une expression mathématique potentiellement valide.
@@ -30,149 +78,465 @@ def is_valid_expression(expression: str) -> bool:
         bool: True si l'expression semble valide, False sinon
     """
     # Vérification basique que l'expression ne contient que des caractères autorisés
-    return bool(expression) and bool(re.match(r'^[\d\s\+\-\*\/\(\)\.\,\%]+$', expression))
+    return bool(expression) and bool(EXPRESSION_PATTERN.match(expression))
+
+# Interprétation des codes météo WMO renvoyés par Open-Meteo
+WEATHER_CODES = {
+    0: "ciel dégagé",
+    1: "principalement dégagé",
+    2: "partiellement nuageux",
+    3: "couvert",
+    45: "brouillard",
+    48: "brouillard givrant",
+    51: "bruine légère",
+    53: "bruine modérée",
+    55: "bruine dense",
+    56: "bruine verglaçante légère",
+    57: "bruine verglaçante dense",
+    61: "pluie légère",
+    63: "pluie modérée",
+    65: "pluie forte",
+    66: "pluie verglaçante légère",
+    67: "pluie verglaçante forte",
+    71: "chute de neige légère",
+    73: "chute de neige modérée",
+    75: "chute de neige forte",
+    77: "grains de neige",
+    80: "averses de pluie légères",
+    81: "averses de pluie modérées",
+    82: "averses de pluie violentes",
+    85: "averses de neige légères",
+    86: "averses de neige fortes",
+    95: "orage",
+    96: "orage avec grêle légère",
+    99: "orage avec grêle forte"
+}
+
+def _geocoding_request(location: str) -> Tuple[str, Dict[str, Any]]:
+    """URL et paramètres de la requête de géocodage d'une ville."""
+    url = f"{get_config().geocoding_url}/v1/search"
+    return url, {"name": location, "count": 1, "language": "fr", "format": "json"}
+
+def _forecast_request(lat: float, lon: float) -> Tuple[str, Dict[str, Any]]:
+    """URL et paramètres de la requête de conditions météo actuelles."""
+    url = f"{get_config().forecast_url}/v1/forecast"
+    return url, {
+        "latitude": lat,
+        "longitude": lon,
+        "current": "temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m",
+        "timezone": "auto",
+        "language": "fr"
+    }
+
+def _forecast_batch_request(points: List[Tuple[float, float]]) -> Tuple[str, Dict[str, Any]]:
+    """URL et paramètres d'une requête de prévisions groupée (listes de coordonnées séparées par des virgules)."""
+    url, params = _forecast_request(0.0, 0.0)
+    params["latitude"] = ",".join(str(lat) for lat, _ in points)
+    params["longitude"] = ",".join(str(lon) for _, lon in points)
+    return url, params
+
+def _parse_geocoding(geocoding_data: Dict[str, Any]) -> Optional[Tuple[float, float, str]]:
+    """Extrait (latitude, longitude, nom) de la réponse de géocodage, ou None si la ville est inconnue."""
+    if not geocoding_data.get("results"):
+        return None
+    result = geocoding_data["results"][0]
+    return result["latitude"], result["longitude"], result["name"]
+
+def _géocoder(location: str) -> Coordinates:
+    """Coordonnées d'une ville, via le cache de géocodage puis l'API en cas d'absence."""
+    coordinates = geocoding_cache.lookup(location)
+    if coordinates is not MISS:
+        return coordinates
+    return _géocoder_en_ligne(location)
+
+def _géocoder_en_ligne(location: str) -> Coordinates:
+    """Interroge l'API de géocodage et enregistre le résultat dans le cache."""
+    url, params = _geocoding_request(location)
+    response = http_client.get(url, params=params)
+    response.raise_for_status()  # Lève une exception en cas d'erreur HTTP
+    coordinates = _parse_geocoding(response.json())
+    geocoding_cache.store(location, coordinates)
+    return coordinates
+
+async def _agéocoder(location: str) -> Coordinates:
+    """Version asynchrone de ``_géocoder``."""
+    coordinates = geocoding_cache.lookup(location)
+    if coordinates is not MISS:
+        return coordinates
+    return await _agéocoder_en_ligne(location)
+
+async def _agéocoder_en_ligne(location: str) -> Coordinates:
+    """Version asynchrone de ``_géocoder_en_ligne``."""
+    url, params = _geocoding_request(location)
+    response = await http_client.aget(url, params=params)
+    response.raise_for_status()
+    coordinates = _parse_geocoding(response.json())
+    geocoding_cache.store(location, coordinates)
+    return coordinates
+
+def _prévisions(lat: float, lon: float) -> Dict[str, Any]:
+    """Conditions actuelles aux coordonnées données, via le cache des prévisions."""
+    def fetch() -> Dict[str, Any]:
+        url, params = _forecast_request(lat, lon)
+        response = http_client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+    return forecast_cache.get(lat, lon, fetch)
+
+async def _aprévisions(lat: float, lon: float) -> Dict[str, Any]:
+    """Version asynchrone de ``_prévisions``."""
+    async def fetch() -> Dict[str, Any]:
+        url, params = _forecast_request(lat, lon)
+        response = await http_client.aget(url, params=params)
+        response.raise_for_status()
+        return response.json()
+    return await forecast_cache.aget(lat, lon, fetch)
+
+def _géocoder_tout(locations: List[str]) -> Dict[str, Coordinates]:
+    """Géocode plusieurs villes: cache d'abord, puis requêtes parallèles pour les absentes."""
+    results = {location: geocoding_cache.lookup(location) for location in locations}
+    missing = [location for location, coordinates in results.items() if coordinates is MISS]
+    if len(missing) == 1:
+        results[missing[0]] = _géocoder_en_ligne(missing[0])
+    elif missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            results.update(zip(missing, pool.map(_géocoder_en_ligne, missing)))
+    return results
+
+async def _agéocoder_tout(locations: List[str]) -> Dict[str, Coordinates]:
+    """Version asynchrone de ``_géocoder_tout`` (requêtes concurrentes sur la boucle)."""
+    results = {location: geocoding_cache.lookup(location) for location in locations}
+    missing = [location for location, coordinates in results.items() if coordinates is MISS]
+    results.update(zip(missing, await asyncio.gather(*(_agéocoder_en_ligne(m) for m in missing))))
+    return results
+
+def _prévisions_absentes(points: List[Tuple[float, float]]) -> Tuple[List[Any], List[int]]:
+    """Prévisions en cache pour chaque point, et index des points à demander à l'API."""
+    data = [forecast_cache.lookup(lat, lon) for lat, lon in points]
+    return data, [i for i, item in enumerate(data) if item is MISS]
+
+def _compléter_prévisions(points: List[Tuple[float, float]], data: List[Any], missing: List[int], body: Any) -> List[Dict[str, Any]]:
+    """Répartit la réponse groupée (liste, ou objet pour un seul point) et la met en cache."""
+    items = body if isinstance(body, list) else [body]
+    if len(items) != len(missing):
+        raise ValueError("Réponse de prévisions groupée incomplète")
+    for index, item in zip(missing, items):
+        data[index] = item
+        forecast_cache.store(*points[index], item)
+    return data
+
+def _prévisions_groupées(points: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """Prévisions de plusieurs points en une seule requête (points déjà en cache exclus)."""
+    data, missing = _prévisions_absentes(points)
+    if not missing:
+        return data
+    url, params = _forecast_batch_request([points[i] for i in missing])
+    response = http_client.get(url, params=params)
+    response.raise_for_status()
+    return _compléter_prévisions(points, data, missing, response.json())
+
+async def _aprévisions_groupées(points: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """Version asynchrone de ``_prévisions_groupées``."""
+    data, missing = _prévisions_absentes(points)
+    if not missing:
+        return data
+    url, params = _forecast_batch_request([points[i] for i in missing])
+    response = await http_client.aget(url, params=params)
+    response.raise_for_status()
+    return _compléter_prévisions(points, data, missing, response.json())
+
+def _observations(coordinates: Dict[str, Coordinates], forecasts: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Observation de chaque ville demandée, dans l'ordre de la demande."""
+    forecasts_iter = iter(forecasts)
+    return {
+        location: (
+            _format_weather(found[2], next(forecasts_iter)) if found is not None
+            else f"Ville non trouvée: {location}"
+        )
+        for location, found in coordinates.items()
+    }
+
+def _format_weather(city_name: str, weather_data: Dict[str, Any]) -> str:
+    """Formule l'observation météo à partir de la réponse de l'API de prévisions."""
+    # Extraction des données météo actuelles avec vérification
+    current = weather_data.get("current", {})
+    temp = current.get("temperature_2m")
+    humidity = current.get("relative_humidity_2m")
+    weather_code = current.get("weather_code")
+    wind_speed = current.get("wind_speed_10m")
+    
+    # Vérification des données manquantes
+    if temp is None or humidity is None or weather_code is None or wind_speed is None:
+        logger.warning("Données météo incomplètes pour %s", city_name)
+        return f"Les données météo pour {city_name} sont incomplètes."
+    
+    weather_desc = WEATHER_CODES.get(weather_code, "conditions inconnues")
+    
+    logger.info("Météo récupérée avec succès pour %s", city_name)
+    return f"À {city_name}, il fait {temp}°C avec {weather_desc}. Humidité: {humidity}%, Vent: {wind_speed} km/h"
 
 @validate_input(is_valid_location, "Le nom de ville fourni n'est pas valide.")
 @handle_tool_errors(fallback_response="Je n'ai pas pu obtenir les informations météo.")
 @tool
 def recherche_météo(location: str) -> str:
     """Recherche la météo pour une ville donnée en utilisant l'API Open-Meteo (sans clé API nécessaire)"""
-    logger.info(f"Recherche météo pour: {location}")
+    logger.info("Recherche météo pour: %s", location)
     
     # Vérification supplémentaire de la longueur
     if len(location) < 2:
         raise ValueError("Le nom de ville est trop court.")
-        
+    
+    import requests  # Chargé avec le client HTTP, pas à l'import des outils
+    
     # D'abord, on doit géocoder la ville pour obtenir ses coordonnées
     try:
-        geocoding_url = f"https://geocoding-api.open-meteo.com/v1/search?name={location}&count=1&language=fr&format=json"
-        geocoding_response = requests.get(geocoding_url, timeout=10)
-        geocoding_response.raise_for_status()  # Lève une exception en cas d'erreur HTTP
-        geocoding_data = geocoding_response.json()
+        coordinates = _géocoder(location)
         
-        if not geocoding_data.get("results"):
-            logger.warning(f"Ville non trouvée: {location}")
+        if coordinates is None:
+            logger.warning("Ville non trouvée: %s", location)
             return f"Ville non trouvée: {location}"
-            
-        # Extraction des coordonnées
-        lat = geocoding_data["results"][0]["latitude"]
-        lon = geocoding_data["results"][0]["longitude"]
-        city_name = geocoding_data["results"][0]["name"]
+        lat, lon, city_name = coordinates
         
         # Requête météo avec les coordonnées
-        weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m&timezone=auto&language=fr"
-        weather_response = requests.get(weather_url, timeout=10)
-        weather_response.raise_for_status()
-        weather_data = weather_response.json()
-        
-        # Interprétation du code météo
-        weather_codes = {
-            0: "ciel dégagé",
-            1: "principalement dégagé",
-            2: "partiellement nuageux",
-            3: "couvert",
-            45: "brouillard",
-            48: "brouillard givrant",
-            51: "bruine légère",
-            53: "bruine modérée",
-            55: "bruine dense",
-            56: "bruine verglaçante légère",
-            57: "bruine verglaçante dense",
-            61: "pluie légère",
-            63: "pluie modérée",
-            65: "pluie forte",
-            66: "pluie verglaçante légère",
-            67: "pluie verglaçante forte",
-            71: "chute de neige légère",
-            73: "chute de neige modérée",
-            75: "chute de neige forte",
-            77: "grains de neige",
-            80: "averses de pluie légères",
-            81: "averses de pluie modérées",
-            82: "averses de pluie violentes",
-            85: "averses de neige légères",
-            86: "averses de neige fortes",
-            95: "orage",
-            96: "orage avec grêle légère",
-            99: "orage avec grêle forte"
-        }
-        
-        # Extraction des données météo actuelles avec vérification
-        current = weather_data.get("current", {})
-        temp = current.get("temperature_2m")
-        humidity = current.get("relative_humidity_2m")
-        weather_code = current.get("weather_code")
-        wind_speed = current.get("wind_speed_10m")
+        return _format_weather(city_name, _prévisions(lat, lon))
+    
+    except requests.exceptions.Timeout:
+        logger.error("Timeout lors de la connexion à l'API météo pour %s", location)
+        raise TimeoutError("Les serveurs météo mettent trop de temps à répondre, veuillez réessayer plus tard.")
+    
+    except requests.exceptions.HTTPError as e:
+        logger.error("Erreur HTTP lors de la requête météo: %s", e)
+        raise ValueError(f"Erreur lors de la connexion aux services météo: {e.response.status_code}")
+    
+    except requests.exceptions.ConnectionError:
+        logger.error("Erreur de connexion aux serveurs météo pour %s", location)
+        raise ConnectionError("Impossible de se connecter aux serveurs météo, vérifiez votre connexion internet.")
+    
+    except Exception as e:
+        logger.error("Erreur inattendue dans recherche_météo: %s", e)
+        raise
+
+@validate_input(is_valid_location, "Le nom de ville fourni n'est pas valide.")
+@handle_tool_errors(fallback_response="Je n'ai pas pu obtenir les informations météo.")
+async def arecherche_météo(location: str) -> str:
+    """Version asynchrone de ``recherche_météo`` (client HTTP non bloquant)."""
+    logger.info("Recherche météo asynchrone pour: %s", location)
+    
+    if len(location) < 2:
+        raise ValueError("Le nom de ville est trop court.")
+    
+    import httpx
+    
+    try:
+        coordinates = await _agéocoder(location)
         
-        # Vérification des données manquantes
-        if temp is None or humidity is None or weather_code is None or wind_speed is None:
-            logger.warning(f"Données météo incomplètes pour {city_name}")
-            return f"Les données météo pour {city_name} sont incomplètes."
+        if coordinates is None:
+            logger.warning("Ville non trouvée: %s", location)
+            return f"Ville non trouvée: {location}"
+        lat, lon, city_name = coordinates
         
-        weather_desc = weather_codes.get(weather_code, "conditions inconnues")
+        return _format_weather(city_name, await _aprévisions(lat, lon))
+    
+    except httpx.TimeoutException:
+        logger.error("Timeout lors de la connexion à l'API météo pour %s", location)
+        raise TimeoutError("Les serveurs météo mettent trop de temps à répondre, veuillez réessayer plus tard.")
+    
+    except httpx.HTTPStatusError as e:
+        logger.error("Erreur HTTP lors de la requête météo: %s", e)
+        raise ValueError(f"Erreur lors de la connexion aux services météo: {e.response.status_code}")
+    
+    except httpx.TransportError:
+        logger.error("Erreur de connexion aux serveurs météo pour %s", location)
+        raise ConnectionError("Impossible de se connecter aux serveurs météo, vérifiez votre connexion internet.")
+    
+    except Exception as e:
+        logger.error("Erreur inattendue dans arecherche_météo: %s", e)
+        raise
+
+@validate_input(is_valid_locations, "La liste de villes fournie n'est pas valide.")
+@handle_tool_errors(fallback_response="Je n'ai pas pu obtenir les informations météo.")
+def recherche_météo_multi(locations: List[str]) -> str:
+    """Recherche la météo de plusieurs villes avec une seule requête de prévisions Open-Meteo.
+    
+    Les villes absentes du cache de géocodage sont géocodées en parallèle, puis les
+    prévisions de toutes les coordonnées sont demandées en un seul appel (listes
+    ``latitude``/``longitude`` séparées par des virgules).
+    
+    Args:
+        locations: Noms des villes (au plus ``MAX_LOCATIONS``)
         
-        logger.info(f"Météo récupérée avec succès pour {city_name}")
-        return f"À {city_name}, il fait {temp}°C avec {weather_desc}. Humidité: {humidity}%, Vent: {wind_speed} km/h"
+    Returns:
+        Une observation par ville, une par ligne, dans l'ordre de la demande
+    """
+    logger.info("Recherche météo groupée pour: %s", ', '.join(locations))
+    import requests
+    
+    try:
+        coordinates = _géocoder_tout(list(dict.fromkeys(locations)))
+        points = [found[:2] for found in coordinates.values() if found is not None]
+        forecasts = _prévisions_groupées(points) if points else []
+        return "\n".join(_observations(coordinates, forecasts).values())
     
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout lors de la connexion à l'API météo pour {location}")
+        logger.error("Timeout lors de la connexion à l'API météo pour %s", locations)
         raise TimeoutError("Les serveurs météo mettent trop de temps à répondre, veuillez réessayer plus tard.")
     
     except requests.exceptions.HTTPError as e:
-        logger.error(f"Erreur HTTP lors de la requête météo: {str(e)}")
+        logger.error("Erreur HTTP lors de la requête météo: %s", e)
         raise ValueError(f"Erreur lors de la connexion aux services météo: {e.response.status_code}")
     
     except requests.exceptions.ConnectionError:
-        logger.error(f"Erreur de connexion aux serveurs météo pour {location}")
+        logger.error("Erreur de connexion aux serveurs météo pour %s", locations)
         raise ConnectionError("Impossible de se connecter aux serveurs météo, vérifiez votre connexion internet.")
+
+@validate_input(is_valid_locations, "La liste de villes fournie n'est pas valide.")
+@handle_tool_errors(fallback_response="Je n'ai pas pu obtenir les informations météo.")
+async def arecherche_météo_multi(locations: List[str]) -> str:
+    """Version asynchrone de ``recherche_météo_multi`` (géocodages concurrents sur la boucle)."""
+    logger.info("Recherche météo groupée asynchrone pour: %s", ', '.join(locations))
+    import httpx
     
-    except Exception as e:
-        logger.error(f"Erreur inattendue dans recherche_météo: {str(e)}")
-        raise
+    try:
+        coordinates = await _agéocoder_tout(list(dict.fromkeys(locations)))
+        points = [found[:2] for found in coordinates.values() if found is not None]
+        forecasts = await _aprévisions_groupées(points) if points else []
+        return "\n".join(_observations(coordinates, forecasts).values())
+    
+    except httpx.TimeoutException:
+        logger.error("Timeout lors de la connexion à l'API météo pour %s", locations)
+        raise TimeoutError("Les serveurs météo mettent trop de temps à répondre, veuillez réessayer plus tard.")
+    
+    except httpx.HTTPStatusError as e:
+        logger.error("Erreur HTTP lors de la requête météo: %s", e)
+        raise ValueError(f"Erreur lors de la connexion aux services météo: {e.response.status_code}")
+    
+    except httpx.TransportError:
+        logger.error("Erreur de connexion aux serveurs météo pour %s", locations)
+        raise ConnectionError("Impossible de se connecter aux serveurs météo, vérifiez votre connexion internet.")
+
+# Messages de la calculatrice, partagés avec le calcul par lots
+MESSAGE_DIVISION_PAR_ZÉRO = "Erreur: Division par zéro"
+MESSAGE_SYNTAXE = "Erreur: Syntaxe incorrecte dans l'expression mathématique"
+MESSAGE_LIMITE = "Erreur: Le calcul dépasse les limites autorisées"
+MESSAGE_NON_ÉVALUABLE = "Erreur: L'expression contient des éléments non évaluables"
+MESSAGE_ÉCHEC_CALCUL = "Je n'ai pas pu calculer cette expression."
+MAX_EXPRESSION_LENGTH = 100
+
+def _résultat_calcul(result: Any) -> str:
+    """Formule le résultat d'un calcul réussi."""
+    # Vérification du résultat
+    if isinstance(result, complex):
+        return f"Résultat: {result} (nombre complexe)"
+    
+    # Formater les nombres avec beaucoup de décimales
+    if isinstance(result, float):
+        # Limiter à 6 décimales pour la lisibilité
+        result = round(result, 6)
+    return f"Résultat: {result}"
+
+def _erreur_calcul(error: Exception) -> Optional[str]:
+    """Message d'erreur de la calculatrice pour une erreur d'évaluation, ou None si elle est inattendue."""
+    if isinstance(error, ZeroDivisionError):
+        return MESSAGE_DIVISION_PAR_ZÉRO
+    if isinstance(error, SyntaxError):
+        return MESSAGE_SYNTAXE
+    if isinstance(error, ExpressionLimitError):
+        return MESSAGE_LIMITE
+    if isinstance(error, (ExpressionError, NameError, TypeError)):
+        return MESSAGE_NON_ÉVALUABLE
+    return None
 
 @validate_input(is_valid_expression, "L'expression mathématique fournie n'est pas valide.")
-@handle_tool_errors(fallback_response="Je n'ai pas pu calculer cette expression.")
+@handle_tool_errors(fallback_response=MESSAGE_ÉCHEC_CALCUL)
 @tool
 def calculatrice(expression: str) -> str:
     """Calcule une expression mathématique"""
-    logger.info(f"Calcul de l'expression: {expression}")
+    logger.info("Calcul de l'expression: %s", expression)
     
     # Nettoyage de l'expression
     expression = expression.replace(',', '.')  # Remplace les virgules par des points
     
     # Limite la longueur de l'expression pour éviter les attaques
-    if len(expression) > 100:
-        logger.warning(f"Expression trop longue: {expression[:20]}...")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        logger.warning("Expression trop longue: %s...", expression[:20])
         raise ValueError("L'expression est trop longue (max 100 caractères).")
     
     try:
-        # Évaluation sécurisée avec vérification du résultat
-        result = eval(expression)
-        
-        # Vérification du résultat
-        if isinstance(result, complex):
-            return f"Résultat: {result} (nombre complexe)"
-        
-        # Formater les nombres avec beaucoup de décimales
-        if isinstance(result, float):
-            # Limiter à 6 décimales pour la lisibilité
-            result = round(result, 6)
-        
-        logger.info(f"Calcul réussi: {expression} = {result}")
-        return f"Résultat: {result}"
+        # Évaluation par le moteur arithmétique (AST validé, limites, cache de compilation)
+        result = arithmetic_engine.evaluate(expression)
+        logger.info("Calcul réussi: %s = %s", expression, result)
+        return _résultat_calcul(result)
     
     except ZeroDivisionError:
-        logger.warning(f"Division par zéro dans l'expression: {expression}")
-        return "Erreur: Division par zéro"
+        logger.warning("Division par zéro dans l'expression: %s", expression)
+        return MESSAGE_DIVISION_PAR_ZÉRO
     
     except SyntaxError:
-        logger.warning(f"Erreur de syntaxe dans l'expression: {expression}")
-        return "Erreur: Syntaxe incorrecte dans l'expression mathématique"
+        logger.warning("Erreur de syntaxe dans l'expression: %s", expression)
+        return MESSAGE_SYNTAXE
+    
+    except ExpressionLimitError as e:
+        logger.warning("Limite d'évaluation dépassée pour %s: %s", expression, e)
+        return MESSAGE_LIMITE
     
-    except (NameError, TypeError):
-        logger.warning(f"Expression non évaluable: {expression}")
-        return "Erreur: L'expression contient des éléments non évaluables"
+    except (ExpressionError, NameError, TypeError):
+        logger.warning("Expression non évaluable: %s", expression)
+        return MESSAGE_NON_ÉVALUABLE
     
     except Exception as e:
-        logger.error(f"Erreur inattendue dans calculatrice: {str(e)}")
-        raise 
\ No newline at end of file
+        logger.error("Erreur inattendue dans calculatrice: %s", e)
+        raise
+
+def calculatrice_lot(expressions: List[str]) -> List[str]:
+    """Calcule une liste d'expressions en une fois (évaluation vectorisée par forme d'expression).
+    
+    Les expressions de même structure (mêmes opérateurs, constantes différentes) sont
+    évaluées ensemble sous forme d'opérations NumPy. Un résultat, ou une erreur de
+    calcul (division par zéro, syntaxe, limites), reçoit le même message que
+    ``calculatrice``.
+    
+    Les autres échecs sont volontairement traités autrement, pour qu'une
+    expression ne fasse jamais échouer le lot: là où ``calculatrice`` lève
+    ``InputValidationError`` (expression invalide ou trop longue) ou
+    ``ToolExecutionError`` (erreur inattendue), l'élément reçoit un message
+    « Erreur: ... » et les autres expressions sont calculées normalement.
+    
+    Args:
+        expressions: Expressions mathématiques
+        
+    Returns:
+        Un résultat ou un message d'erreur par expression, dans l'ordre d'entrée
+    """
+    logger.info("Calcul par lots de %s expressions", len(expressions))
+    
+    messages: List[Optional[str]] = [None] * len(expressions)
+    valid: List[int] = []
+    for index, expression in enumerate(expressions):
+        if not is_valid_expression(expression):
+            messages[index] = "Erreur: L'expression mathématique fournie n'est pas valide."
+        elif len(expression) > MAX_EXPRESSION_LENGTH:
+            messages[index] = "Erreur: L'expression est trop longue (max 100 caractères)."
+        else:
+            valid.append(index)
+    
+    results = evaluate_batch([expressions[i] for i in valid], arithmetic_engine)
+    for index, result in zip(valid, results):
+        if isinstance(result, Exception):
+            message = _erreur_calcul(result)
+            if message is None:
+                logger.error("Erreur inattendue dans calculatrice_lot pour %s: %s",
+                             expressions[index], result, exc_info=result)
+                exceptions_total.inc("calculatrice_lot", type(result).__name__)
+                message = f"Erreur: {MESSAGE_ÉCHEC_CALCUL}"
+            messages[index] = message
+        else:
+            messages[index] = _résultat_calcul(result)
+    return messages
+
+async def acalculatrice(expression: str) -> str:
+    """Version asynchrone de ``calculatrice``.
+    
+    Le calcul est purement CPU et borné (100 caractères): il s'exécute directement
+    dans la boucle d'évènements, sans aller-retour par un thread.
+    """
+    return calculatrice(expression)
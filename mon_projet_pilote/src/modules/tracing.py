@@ -0,0 +1,341 @@
+"""
+Traçage des questions: nœuds du graphe, appels LLM et requêtes HTTP.
+
+Chaque étape mesurée produit un *span* (début, durée, parent, attributs):
+
+- ``question``: une question complète (``main.py``, exécution par lots);
+- ``node``: un nœud du graphe, avec l'outil choisi, le résultat du cache des
+  réponses et l'éventuelle erreur;
+- ``llm``: un appel de chaîne ``prompt | llm``, avec le modèle, la
+  température, les jetons (``usage_metadata`` du fournisseur, ou estimation
+  en mots) et le résultat du cache des appels LLM;
+- ``http``: une requête des outils, avec l'hôte et le statut.
+
+Le span courant est porté par une ``ContextVar``: les spans d'un nœud ont
+pour parent celui de la question, y compris dans les threads de LangGraph et
+du mode spéculatif, qui copient le contexte. Modes (``AGENT_TRACE_MODE``):
+
+- ``off``: les nœuds et les chaînes ne sont pas enveloppés du tout, et les
+  requêtes HTTP ne paient qu'un test;
+- ``jsonl``: chaque span terminé est ajouté au fichier ``AGENT_TRACE_PATH``,
+  que ``src/trace_report.py`` agrège en tableaux p50/p95/p99;
+- ``memory``: les spans sont gardés par ``tracer.collector``, qui les exporte
+  au format OTLP/JSON d'OpenTelemetry (``to_otlp()``).
+
+Le mode est lu à la construction du graphe: un graphe construit sans traçage
+n'est pas tracé, même si le traçage est activé ensuite.
+"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .config import get_config
+from .errors import logger
+
+# Type de span OTLP: interne (question, nœud) ou client (LLM, HTTP)
+OTLP_SPAN_KINDS = {"question": 1, "node": 1, "llm": 3, "http": 3}
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("agent_span", default=None)
+
+
+@dataclass
+class Span:
+    """Étape mesurée; ``start`` en secondes depuis l'epoch, ``duration_ms`` à la fin du span."""
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = 0.0
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        """Ajoute des attributs au span."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Ligne JSONL du span."""
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "kind": self.kind, "name": self.name, "start": self.start,
+            "duration_ms": round(self.duration_ms, 3), "status": self.status, "attributes": self.attributes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Span":
+        return cls(
+            name=data["name"], kind=data["kind"], trace_id=data["trace_id"], span_id=data["span_id"],
+            parent_id=data.get("parent_id"), start=data.get("start", 0.0),
+            duration_ms=data.get("duration_ms", 0.0), attributes=data.get("attributes") or {},
+            status=data.get("status", "ok")
+        )
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span au format OTLP/JSON d'OpenTelemetry."""
+        start_ns = int(self.start * 1e9)
+        attributes = {"agent.kind": self.kind, **self.attributes}
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": OTLP_SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(self.duration_ms * 1e6)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()
+                           if value is not None],
+            "status": {"code": 2 if self.status == "error" else 1},
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _NullSpan:
+    """Span inactif renvoyé quand le traçage est désactivé."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Gestionnaire de contexte qui ouvre un span, le rend courant puis l'exporte."""
+
+    __slots__ = ("tracer", "span", "token", "t0")
+
+    def __init__(self, tracer: "Tracer", name: str, kind: str, attributes: Dict[str, Any]):
+        parent = _current.get()
+        self.tracer = tracer
+        self.span = Span(
+            name=name, kind=kind,
+            trace_id=parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes
+        )
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        self.span.start = time.time()
+        self.t0 = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.span.duration_ms = (time.perf_counter() - self.t0) * 1000
+        if exc is not None:
+            self.span.status = "error"
+            self.span.attributes.setdefault("error", type(exc).__name__)
+        _current.reset(self.token)
+        self.tracer._export(self.span)
+
+
+class JSONLExporter:
+    """Ajoute chaque span terminé, en une ligne JSON, à un fichier.
+
+    Chaque ligne est écrite entière par un seul appel système, sans tampon,
+    sur un descripteur ouvert en ``O_APPEND``: les workers du serveur pré-fork
+    peuvent partager le fichier sans que leurs lignes s'entremêlent.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def export(self, span: Span) -> None:
+        line = (json.dumps(span.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class SpanCollector:
+    """Collecteur en mémoire des spans terminés (les plus anciens sont oubliés au-delà de ``max_spans``)."""
+
+    def __init__(self, max_spans: int = 100_000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self, kind: Optional[str] = None) -> List[Span]:
+        """Spans collectés, dans l'ordre de fin, éventuellement filtrés par type."""
+        return [span for span in list(self._spans) if kind is None or span.kind == kind]
+
+    def to_otlp(self, service_name: str = "agent-langgraph") -> Dict[str, Any]:
+        """Spans collectés au format OTLP/JSON (corps d'un POST ``/v1/traces``)."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in self.spans()]}],
+        }]}
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def close(self) -> None:
+        return None
+
+
+class Tracer:
+    """Création des spans et export selon ``AGENT_TRACE_MODE``.
+
+    Le mode et le fichier sont lus dans la configuration à la première
+    utilisation; ``reset()`` ferme le fichier et les relit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mode: Optional[str] = None
+        self._exporter: Any = None
+        self.collector = SpanCollector()
+        self._counts: Counter = Counter()
+
+    def _setup(self) -> str:
+        with self._lock:
+            if self._mode is None:
+                config = get_config()
+                if config.trace_mode == "jsonl":
+                    self._exporter = JSONLExporter(config.trace_path)
+                    logger.info("Traçage activé: %s", config.trace_path)
+                elif config.trace_mode == "memory":
+                    self._exporter = self.collector
+                self._mode = config.trace_mode
+            return self._mode
+
+    @property
+    def enabled(self) -> bool:
+        """Indique si les spans sont enregistrés."""
+        mode = self._mode
+        if mode is None:
+            mode = self._setup()
+        return mode != "off"
+
+    def span(self, name: str, kind: str, **attributes: Any) -> Any:
+        """Gestionnaire de contexte d'un span, enfant du span courant.
+
+        Renvoie un span inactif (dont ``set`` ne fait rien) si le traçage est désactivé.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, kind, attributes)
+
+    @staticmethod
+    def annotate(**attributes: Any) -> None:
+        """Ajoute des attributs au span courant, s'il y en a un."""
+        span = _current.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def _export(self, span: Span) -> None:
+        exporter = self._exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(span)
+        except Exception as e:
+            logger.warning("Export du span %s impossible: %s", span.name, e)
+        self._counts[span.kind] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode courant et nombre de spans exportés par type."""
+        with self._lock:
+            return {"mode": self._mode or "off", **dict(self._counts)}
+
+    def reset(self) -> None:
+        """Ferme le fichier de traces et vide le collecteur; la configuration sera relue."""
+        with self._lock:
+            if self._exporter is not None:
+                self._exporter.close()
+            self._exporter = None
+            self._mode = None
+            self.collector.clear()
+            self._counts.clear()
+
+
+# Traceur partagé par le graphe, les chaînes et le client HTTP
+tracer = Tracer()
+
+# Le fichier de traces est vidé et fermé à la sortie du programme
+atexit.register(tracer.reset)
+
+
+def _node_attributes(span: Span, state: Dict[str, Any], result: Any) -> None:
+    if not isinstance(result, dict):
+        return
+    tool = result.get("tool_name") or state.get("tool_name")
+    if tool:
+        span.attributes["tool"] = tool
+    if "cache_hit" in result:
+        span.attributes["cache_hit"] = result["cache_hit"] or "absent"
+    if result.get("error"):
+        span.status = "error"
+
+
+def trace_node(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Enveloppe un nœud du graphe (synchrone ou asynchrone) dans un span ``node``."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def atraced(state: Dict[str, Any]) -> Any:
+            with tracer.span(name, "node") as span:
+                result = await func(state)
+                _node_attributes(span, state, result)
+                return result
+        return atraced
+
+    @functools.wraps(func)
+    def traced(state: Dict[str, Any]) -> Any:
+        with tracer.span(name, "node") as span:
+            result = func(state)
+            _node_attributes(span, state, result)
+            return result
+    return traced
+
+
+def read_spans(paths: Iterable[str]) -> Iterator[Span]:
+    """Lit au fil de l'eau les spans de fichiers JSONL (les lignes illisibles sont ignorées)."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield Span.from_dict(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    logger.warning("Ligne %s de %s ignorée: %s", number, path, e)
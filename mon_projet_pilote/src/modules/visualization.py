@@ -1,7 +1,8 @@
 """
 Fonctions de visualisation du graphe d'agent.
+
+``graphviz`` n'est importé que par ``visualize_graph``.
 """
-from graphviz import Digraph
 
 def print_graph_structure(graph):
     """Affiche une représentation textuelle du graphe."""
@@ -15,6 +16,8 @@ def print_graph_structure(graph):
 
 def visualize_graph(graph):
     """Génère une visualisation graphique du graphe."""
+    from graphviz import Digraph
+    
     dot = Digraph(comment='Agent Workflow')
     
     # Définir les styles
@@ -35,7 +38,7 @@ def visualize_graph(graph):
     for edge in graph.edges:
         source, target = edge
         # Ajouter un style spécial pour les arêtes conditionnelles
-        if source == "choisir_outil":
+        if source in ("choisir_outil", "analyser_et_choisir", "pré_routage"):
             dot.edge(source, target, style='dashed', label='condition')
         else:
             dot.edge(source, target)
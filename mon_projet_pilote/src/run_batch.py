@@ -0,0 +1,79 @@
+"""
+Point d'entrée pour l'exécution par lots d'un fichier de questions.
+
+Usage: python src/run_batch.py questions.jsonl resultats.jsonl [--concurrency 16] [--async]
+"""
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+from modules import get_agent_graph, intent_classifier, llm_registry, model_tiers
+from modules.answer_cache import answer_cache
+from modules.batch import run_batch
+from modules.graph import GRAPH_MODES
+from modules.errors import logger
+from modules.logging_setup import configure_logging
+from modules.metrics import start_metrics_server
+
+# Charger les variables d'environnement
+load_dotenv()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="fichier de questions (.jsonl ou .csv)")
+    parser.add_argument("output", help="fichier de résultats JSONL (complété en cas de reprise)")
+    parser.add_argument("--column", default="question", help="colonne ou champ contenant la question")
+    parser.add_argument("--concurrency", type=int, default=8, help="questions traitées simultanément")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="graphe asynchrone sur une boucle asyncio plutôt qu'un pool de threads")
+    parser.add_argument("--unordered", action="store_true",
+                        help="écrire les résultats dès qu'ils sont prêts plutôt que dans l'ordre d'entrée")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="écraser le fichier de résultats au lieu de reprendre")
+    parser.add_argument("--mode", choices=GRAPH_MODES, default="standard", help="topologie du graphe")
+    parser.add_argument("--fast-path", action="store_true", help="activer la voie rapide")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="servir les questions déjà posées depuis le cache des réponses")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Traite le fichier de questions et affiche le bilan."""
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        llm_registry.warm_up(model_tiers.configs())
+        intent_classifier.load()
+        server = start_metrics_server()
+        if server is not None:
+            print(f"Métriques exposées sur {server.url}")
+        app = get_agent_graph(
+            mode=args.mode, fast_path=args.fast_path, use_async=args.use_async, answer_cache=args.answer_cache
+        )
+        report = run_batch(
+            app,
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            ordered=not args.unordered,
+            use_async=args.use_async,
+            resume=not args.no_resume,
+            column=args.column
+        )
+    except Exception as e:
+        logger.error("Erreur: %s", e)
+        print(f"Une erreur s'est produite: {str(e)}")
+        return 1
+
+    stats = report.summary()
+    print(f"{stats['processed']} questions traitées ({stats['skipped']} déjà faites, {stats['errors']} en erreur) "
+          f"en {stats['elapsed_s']:.2f} s")
+    print(f"Débit: {stats['questions_per_s']:.2f} questions/s")
+    print(f"Latence: p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+    if args.answer_cache:
+        print(f"Cache des réponses: {answer_cache.stats()['hit_rate']:.1%} de questions servies depuis le cache")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
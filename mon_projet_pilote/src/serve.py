@@ -0,0 +1,59 @@
+"""
+Point d'entrée du serveur HTTP de l'agent, en mode pré-fork (un worker par cœur par défaut).
+
+Usage: python src/serve.py [--workers 4] [--host 127.0.0.1] [--port 8000] [--fast-path]
+
+    curl -s http://127.0.0.1:8000/ask -d '{"question": "Quelle est la météo à Paris ?"}'
+"""
+import argparse
+import signal
+import sys
+
+from dotenv import load_dotenv
+
+from modules import get_agent_graph
+from modules.errors import logger
+from modules.graph import GRAPH_MODES
+from modules.logging_setup import configure_logging
+from modules.server import PreforkServer
+
+# Charger les variables d'environnement
+load_dotenv()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processus workers (défaut: AGENT_SERVER_WORKERS, 0 pour un par cœur)")
+    parser.add_argument("--host", default=None, help="adresse d'écoute (défaut: AGENT_SERVER_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="port d'écoute (défaut: AGENT_SERVER_PORT)")
+    parser.add_argument("--mode", choices=GRAPH_MODES, default="standard", help="topologie du graphe")
+    parser.add_argument("--fast-path", action="store_true", help="activer la voie rapide")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="servir les questions déjà posées depuis le cache des réponses (partagé par les workers)")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Prépare le graphe, crée les workers et les surveille jusqu'à SIGINT ou SIGTERM."""
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        app = get_agent_graph(mode=args.mode, fast_path=args.fast_path, answer_cache=args.answer_cache)
+        server = PreforkServer(app, workers=args.workers, host=args.host, port=args.port).start()
+    except Exception as e:
+        logger.error("Erreur: %s", e)
+        print(f"Une erreur s'est produite: {str(e)}")
+        return 1
+
+    print(f"Agent servi sur {server.url} par {server.workers} workers (POST /ask, GET /health, GET /metrics)")
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
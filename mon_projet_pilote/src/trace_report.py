@@ -0,0 +1,99 @@
+"""
+Agrégation d'un fichier de traces (``AGENT_TRACE_MODE=jsonl``) en tableaux de latence.
+
+Pour chaque type de span (questions, nœuds, appels LLM, requêtes HTTP), une
+ligne par nom: nombre d'appels, erreurs, moyenne et percentiles p50/p95/p99
+de la durée, temps cumulé; les appels LLM indiquent aussi les jetons moyens.
+
+Usage:
+    python src/trace_report.py traces.jsonl [autres.jsonl ...] [--kind node] [--by model]
+"""
+import argparse
+import statistics
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from modules.batch import percentile
+from modules.errors import logger
+from modules.logging_setup import configure_logging
+from modules.tracing import Span, read_spans
+
+# Types de span, dans l'ordre d'affichage
+KINDS = {"question": "Questions", "node": "Nœuds", "llm": "Appels LLM", "http": "Requêtes HTTP"}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="fichiers de traces JSONL")
+    parser.add_argument("--kind", choices=list(KINDS), action="append",
+                        help="types de span à afficher (tous par défaut; option répétable)")
+    parser.add_argument("--by", default="",
+                        help="attribut qui subdivise chaque ligne (par exemple model, tool, cache_hit)")
+    return parser.parse_args(argv)
+
+
+def aggregate(spans: Iterable[Span], by: str = "") -> Dict[str, List[List]]:
+    """Regroupe les spans par type puis par nom (et valeur de l'attribut ``by``).
+
+    Returns:
+        Lignes de tableau par type, triées par temps cumulé décroissant
+    """
+    groups: Dict[Tuple[str, str], List[Span]] = defaultdict(list)
+    for span in spans:
+        name = f"{span.name} [{span.attributes.get(by, '-')}]" if by else span.name
+        groups[(span.kind, name)].append(span)
+
+    tables: Dict[str, List[List]] = defaultdict(list)
+    for (kind, name), members in groups.items():
+        durations = [span.duration_ms for span in members]
+        row = [
+            name, len(members), sum(span.status == "error" for span in members),
+            statistics.fmean(durations), percentile(durations, 50), percentile(durations, 95),
+            percentile(durations, 99), sum(durations) / 1000,
+        ]
+        if kind == "llm":
+            tokens = [(span.attributes.get("input_tokens") or 0, span.attributes.get("output_tokens") or 0)
+                      for span in members]
+            row.append(f"{statistics.fmean(t[0] for t in tokens):.0f}/{statistics.fmean(t[1] for t in tokens):.0f}")
+        tables[kind].append(row)
+    for rows in tables.values():
+        rows.sort(key=lambda row: row[7], reverse=True)
+    return tables
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence]) -> str:
+    """Tableau texte aligné (flottants arrondis au centième)."""
+    cells = [[f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(h)), *(len(row[i]) for row in cells)) for i, h in enumerate(headers)]
+    lines = ["  ".join(str(h).ljust(w) for h, w in zip(headers, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines += ["  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """Lit les fichiers de traces et affiche un tableau par type de span."""
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        tables = aggregate(read_spans(args.inputs), by=args.by)
+    except OSError as e:
+        logger.error("Erreur: %s", e)
+        print(f"Une erreur s'est produite: {str(e)}")
+        return 1
+
+    headers = ["nom", "appels", "erreurs", "moyenne ms", "p50 ms", "p95 ms", "p99 ms", "cumul s"]
+    shown = False
+    for kind, title in KINDS.items():
+        if tables.get(kind) and (not args.kind or kind in args.kind):
+            print(f"{title}\n{format_table(headers + (['jetons'] if kind == 'llm' else []), tables[kind])}\n")
+            shown = True
+    if not shown:
+        print("Aucun span à afficher")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Entraînement et évaluation du classifieur local du choix d'outil.
+
+Les exemples sont lus dans des fichiers JSONL ou CSV (question et outil
+retenu), typiquement les résultats de ``run_batch.py``:
+
+Usage:
+    python src/train_intent.py train resultats.jsonl [--output .cache/intent.npz] [--holdout 0.2]
+    python src/train_intent.py evaluate questions_etiquetees.jsonl --label-field tool [--llm-latency 0.4]
+
+Le modèle est ensuite activé par ``AGENT_INTENT_MODEL_PATH=.cache/intent.npz``.
+"""
+import argparse
+import random
+import sys
+from collections import Counter
+
+from modules.config import get_config
+from modules.errors import logger
+from modules.logging_setup import configure_logging
+from modules.intent import IntentModel, evaluate_intent_model, read_examples, train_intent_model
+from modules.reasoning import OUTILS
+
+DEFAULT_MODEL_PATH = ".cache/intent.npz"
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("train", "entraîner un modèle"), ("evaluate", "évaluer un modèle enregistré")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("inputs", nargs="+", help="fichiers d'exemples (.jsonl ou .csv)")
+        command.add_argument("--column", default="question", help="colonne ou champ contenant la question")
+        command.add_argument("--label-field", default="tool_name", help="colonne ou champ contenant l'outil")
+        command.add_argument("--threshold", type=float, default=get_config().intent_threshold,
+                             help="confiance minimale pour se passer du LLM")
+        command.add_argument("--llm-latency", type=float, default=0.0,
+                             help="latence d'un appel de choix d'outil (s), pour estimer le temps économisé")
+
+    train = commands.choices["train"]
+    train.add_argument("--output", default=DEFAULT_MODEL_PATH, help="fichier du modèle (.npz)")
+    train.add_argument("--holdout", type=float, default=0.2, help="part des exemples réservée à l'évaluation")
+    train.add_argument("--epochs", type=int, default=300)
+    train.add_argument("--seed", type=int, default=0)
+
+    evaluate = commands.choices["evaluate"]
+    evaluate.add_argument("--model", default=get_config().intent_model_path or DEFAULT_MODEL_PATH,
+                          help="fichier du modèle (.npz)")
+    return parser.parse_args(argv)
+
+def load(args: argparse.Namespace):
+    """Lit les exemples et écarte les libellés qui ne sont pas des outils de l'agent."""
+    questions, labels = read_examples(args.inputs, label_field=args.label_field, column=args.column)
+    examples = [(q, label) for q, label in zip(questions, labels) if label in OUTILS]
+    if len(examples) < len(questions):
+        logger.warning("%s exemples ignorés: outil inconnu", len(questions) - len(examples))
+    if not examples:
+        raise ValueError(f"Aucun exemple exploitable (champs '{args.column}' et '{args.label_field}')")
+    return examples
+
+def report(model: IntentModel, examples, args: argparse.Namespace) -> None:
+    """Affiche exactitude, couverture au seuil et temps économisé."""
+    questions = [q for q, _ in examples]
+    labels = [label for _, label in examples]
+    stats = evaluate_intent_model(model, questions, labels, args.threshold)
+    print(f"{len(examples)} exemples évalués")
+    print(f"Exactitude: {stats['accuracy']:.1%}")
+    print(f"Au seuil {args.threshold:.2f}: {stats['coverage']:.1%} des choix d'outil faits localement, "
+          f"exacts à {stats['accuracy_above_threshold']:.1%}")
+    print(f"Prédiction: {stats['mean_us']:.0f} µs en moyenne")
+    if args.llm_latency:
+        saved = stats["coverage"] * args.llm_latency - stats["mean_us"] / 1e6
+        print(f"Temps économisé: {saved * 1000:.0f} ms par question en moyenne")
+
+    errors = Counter((expected, predicted) for (predicted, _), expected in zip(map(model.predict, questions), labels)
+                     if predicted != expected)
+    for (expected, predicted), count in errors.most_common():
+        print(f"  {expected} prédit {predicted}: {count}")
+
+def main(argv=None) -> int:
+    """Entraîne ou évalue le classifieur et affiche le bilan."""
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        examples = load(args)
+        if args.command == "evaluate":
+            report(IntentModel.load(args.model), examples, args)
+            return 0
+
+        random.Random(args.seed).shuffle(examples)
+        held = int(len(examples) * args.holdout)
+        train, test = examples[held:], examples[:held]
+        print(f"Entraînement sur {len(train)} exemples: "
+              + ", ".join(f"{label} {count}" for label, count in Counter(l for _, l in train).most_common()))
+        model = train_intent_model([q for q, _ in train], [label for _, label in train], epochs=args.epochs)
+        model.save(args.output)
+        print(f"Modèle enregistré: {args.output}")
+        if test:
+            report(model, test, args)
+    except Exception as e:
+        logger.error("Erreur: %s", e)
+        print(f"Une erreur s'est produite: {str(e)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
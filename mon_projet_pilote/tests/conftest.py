@@ -0,0 +1,67 @@
+import pytest
+
+from modules.answer_cache import answer_cache
+from modules.config import configure, get_config
+from modules.geocoding import geocoding_cache
+from modules.forecast import forecast_cache
+from modules.llm import llm_registry, default_llm_factory
+from modules.prefetch import weather_prefetcher
+from modules.prompts import prompt_registry
+from tests.fakes import OpenMeteoStub, fake_llm_factory
+
+
+@pytest.fixture
+def fake_llm():
+    """
+    Remplace le client Gemini par l'LLM factice et renvoie le compteur d'appels partagé.
+    """
+    factory = fake_llm_factory()
+    llm_registry.set_factory(factory)
+    prompt_registry.clear()
+    yield factory.counter
+    llm_registry.set_factory(default_llm_factory)
+    prompt_registry.clear()
+
+
+@pytest.fixture
+def open_meteo(tmp_path):
+    """
+    Démarre un serveur Open-Meteo local et y redirige les outils météo, avec un
+    cache de géocodage et un cache de prévisions vides et propres au test (et
+    sans prélecture météo d'un test précédent encore en cours).
+    """
+    previous = get_config()
+    with OpenMeteoStub() as stub:
+        configure(
+            geocoding_url=stub.url,
+            forecast_url=stub.url,
+            geocoding_cache_path=str(tmp_path / "geocoding.sqlite"),
+            geocoding_preload=False
+        )
+        weather_prefetcher.reset()
+        geocoding_cache.reset()
+        forecast_cache.reset()
+        yield stub
+        weather_prefetcher.reset()
+    configure(
+        geocoding_url=previous.geocoding_url,
+        forecast_url=previous.forecast_url,
+        geocoding_cache_path=previous.geocoding_cache_path,
+        geocoding_preload=previous.geocoding_preload
+    )
+    geocoding_cache.reset()
+    forecast_cache.reset()
+
+
+@pytest.fixture
+def answer_store(tmp_path):
+    """
+    Cache des réponses vide, avec une base SQLite propre au test; renvoie son chemin.
+    """
+    previous = get_config().answer_cache_path
+    path = str(tmp_path / "answers.sqlite")
+    configure(answer_cache_path=path)
+    answer_cache.reset()
+    yield path
+    configure(answer_cache_path=previous)
+    answer_cache.reset()
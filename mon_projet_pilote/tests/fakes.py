@@ -0,0 +1,422 @@
+"""
+Doublures locales pour les tests et les benchmarks.
+
+Fournit un modèle de chat factice, déterministe et sans réseau, qui répond aux
+prompts de l'agent à partir d'heuristiques simples, compte ses appels et peut
+simuler une latence, ainsi qu'un serveur HTTP local imitant les API Open-Meteo.
+Rangées avec les tests, hors du package ``modules``, pour que le code de
+production ne puisse pas les importer; les benchmarks les importent aussi
+(``tests.fakes``).
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Marqueurs permettant de reconnaître le type de prompt reçu
+PROMPT_MARKERS = [
+    ("analyse_et_choix", "Réfléchissez au problème, puis choisissez l'outil"),
+    ("choix_outil_structuré", "Répondez uniquement avec un objet JSON"),
+    ("choix_outil", "Choisissez l'outil"),
+    ("extraction_ville", "Extrayez le nom de la ville"),
+    ("extraction_expression", "Extrayez l'expression mathématique"),
+    ("réponse_directe", "Donnez une réponse directe"),
+    ("réponse_finale", "Formulez une réponse complète"),
+    ("analyse", "Réfléchissez au problème"),
+]
+
+WEATHER_KEYWORDS = ("météo", "meteo", "temps fait", "température", "temperature", "pleut", "pluie")
+EXPRESSION_RE = re.compile(r"[\d\.\,\(][\d\s\+\-\*\/\(\)\.\,\%]*")
+CITY = r"[A-ZÀ-Ý][\w\-']*(?:[\s\-][A-ZÀ-Ý][\w\-']*)*"
+CITY_RE = re.compile(rf"\b(?:à|a|de|pour|sur|en)\s+({CITY})")
+CITY_LIST_RE = re.compile(rf"\b(?:à|a|de|pour|sur|en)\s+({CITY}(?:\s*(?:,|\bet\b)\s*{CITY})*)")
+
+
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe une réponse en jetons (mots suivis de leurs espaces) pour le streaming simulé."""
+    return TOKEN_RE.findall(text) or [""]
+
+
+def prompt_kind(prompt: str) -> str:
+    """Identifie le type de prompt de l'agent à partir de son texte."""
+    for kind, marker in PROMPT_MARKERS:
+        if marker in prompt:
+            return kind
+    return "inconnu"
+
+
+def extract_question(prompt: str) -> str:
+    """Retrouve la question de l'utilisateur dans un prompt rendu."""
+    match = re.search(r"de la question: (.*?)(?:\. Ne retournez|\. S'il y en a plusieurs|$)", prompt, re.S)
+    if match:
+        return match.group(1).strip()
+    match = re.search(r"Question: (.*?)\n", prompt)
+    return match.group(1).strip() if match else prompt.strip()
+
+
+def guess_expression(question: str) -> str:
+    """Extrait la plus longue sous-chaîne arithmétique contenant un chiffre."""
+    candidates = [m.group(0).strip() for m in EXPRESSION_RE.finditer(question)]
+    candidates = [c.rstrip(".,") for c in candidates if any(ch.isdigit() for ch in c)]
+    return max(candidates, key=len) if candidates else ""
+
+
+def guess_city(question: str) -> str:
+    """Extrait un nom de ville introduit par une préposition."""
+    match = CITY_RE.search(question)
+    return match.group(1).strip() if match else ""
+
+
+def guess_cities(question: str) -> List[str]:
+    """Extrait la ville introduite par une préposition et celles qui lui sont énumérées (« , Lyon et Nice »)."""
+    match = CITY_LIST_RE.search(question)
+    if not match:
+        return []
+    return [city for city in re.split(r"\s*(?:,|\bet\b)\s*", match.group(1)) if city]
+
+
+def guess_tool(question: str) -> str:
+    """Devine l'outil adapté à une question."""
+    lowered = question.lower()
+    if any(keyword in lowered for keyword in WEATHER_KEYWORDS):
+        return "recherche_météo"
+    expression = guess_expression(question)
+    if expression and any(op in expression for op in "+-*/%"):
+        return "calculatrice"
+    return "réponse_directe"
+
+
+def default_responder(prompt: str) -> str:
+    """Réponse déterministe de l'LLM factice selon le type de prompt."""
+    kind = prompt_kind(prompt)
+    question = extract_question(prompt)
+    if kind == "analyse":
+        return f"La question « {question} » demande de choisir le bon outil."
+    if kind == "choix_outil":
+        return guess_tool(question)
+    if kind in ("choix_outil_structuré", "analyse_et_choix"):
+        tool_name = guess_tool(question)
+        cities = guess_cities(question)
+        tool_input = {
+            "recherche_météo": cities[0] if len(cities) == 1 else cities,
+            "calculatrice": guess_expression(question),
+        }.get(tool_name, "")
+        selection = {"tool_name": tool_name, "tool_input": tool_input}
+        if kind == "analyse_et_choix":
+            selection = {"thoughts": f"La question « {question} » relève de {tool_name}.", **selection}
+        return json.dumps(selection, ensure_ascii=False)
+    if kind == "extraction_ville":
+        return ", ".join(guess_cities(question))
+    if kind == "extraction_expression":
+        return guess_expression(question)
+    if kind == "réponse_finale":
+        match = re.search(r"Observation: (.*?)\n", prompt)
+        observation = match.group(1) if match else ""
+        return f"Voici la réponse à votre question. {observation}"
+    if kind == "réponse_directe":
+        return f"Voici une réponse directe à « {question} »."
+    return "Je ne sais pas."
+
+
+class CallCounter:
+    """Compteur thread-safe des appels à l'LLM factice, par type de prompt."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_kind: Counter = Counter()
+        self.by_model: Counter = Counter()
+
+    def record(self, kind: str, model: str) -> None:
+        with self._lock:
+            self.by_kind[kind] += 1
+            self.by_model[model] += 1
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.by_kind.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.by_kind.clear()
+            self.by_model.clear()
+
+
+class FakeChatModel(BaseChatModel):
+    """Modèle de chat factice, local et déterministe.
+
+    ``latency`` simule le délai avant le premier jeton; en streaming, chaque
+    jeton suivant (mot) arrive après ``token_latency`` secondes. Un appel non
+    streamé attend la génération complète.
+    """
+
+    model: str = "fake"
+    temperature: float = 0.0
+    latency: float = 0.0
+    token_latency: float = 0.0
+    responder: Optional[Callable[[str], str]] = None
+
+    _counter: CallCounter = PrivateAttr(default_factory=CallCounter)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-agent-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature}
+
+    @property
+    def counter(self) -> CallCounter:
+        return self._counter
+
+    def use_counter(self, counter: CallCounter) -> "FakeChatModel":
+        """Partage un compteur entre plusieurs modèles factices."""
+        self._counter = counter
+        return self
+
+    def _text(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        self._counter.record(prompt_kind(prompt), self.model)
+        return (self.responder or default_responder)(prompt)
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        text = self._text(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generation_time(self, text: str) -> float:
+        return self.latency + self.token_latency * max(len(tokenize(text)) - 1, 0)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        result = self._respond(messages)
+        delay = self._generation_time(result.generations[0].message.content)
+        if delay:
+            time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        result = self._respond(messages)
+        delay = self._generation_time(result.generations[0].message.content)
+        if delay:
+            await asyncio.sleep(delay)
+        return result
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for i, token in enumerate(tokenize(self._text(messages))):
+            delay = self.latency if i == 0 else self.token_latency
+            if delay:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        for i, token in enumerate(tokenize(self._text(messages))):
+            delay = self.latency if i == 0 else self.token_latency
+            if delay:
+                await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def fake_llm_factory(latency: float = 0.0, counter: Optional[CallCounter] = None,
+                     responder: Optional[Callable[[str], str]] = None,
+                     token_latency: float = 0.0) -> Callable[..., FakeChatModel]:
+    """Construit une fabrique compatible avec ``LLMRegistry.set_factory``.
+
+    Args:
+        latency: Latence simulée de chaque appel (jusqu'au premier jeton), en secondes
+        counter: Compteur partagé par tous les modèles construits
+        responder: Fonction prompt -> texte remplaçant les réponses par défaut
+        token_latency: Délai simulé entre deux jetons, en secondes
+
+    Returns:
+        Fabrique ``factory(model, temperature, **kwargs)``
+    """
+    shared = counter or CallCounter()
+
+    def factory(model: str, temperature: float, **kwargs: Any) -> FakeChatModel:
+        return FakeChatModel(
+            model=model, temperature=temperature, latency=latency, token_latency=token_latency,
+            responder=responder
+        ).use_counter(shared)
+
+    factory.counter = shared
+    return factory
+
+
+# Villes connues du serveur Open-Meteo factice: nom normalisé -> (latitude, longitude, nom)
+STUB_CITIES = {
+    "paris": (48.85341, 2.3488, "Paris"),
+    "lyon": (45.74846, 4.84671, "Lyon"),
+    "marseille": (43.29695, 5.38107, "Marseille"),
+    "toulouse": (43.60426, 1.44367, "Toulouse"),
+    "nice": (43.70313, 7.26608, "Nice"),
+    "nantes": (47.21725, -1.55336, "Nantes"),
+    "bordeaux": (44.84044, -0.5805, "Bordeaux"),
+    "lille": (50.63297, 3.05858, "Lille"),
+    "la rochelle": (46.16667, -1.15, "La Rochelle"),
+    "saint-etienne": (45.43389, 4.39, "Saint-Étienne"),
+}
+
+
+class _OpenMeteoHandler(BaseHTTPRequestHandler):
+    """Répond aux requêtes de géocodage et de prévisions comme Open-Meteo."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, pour observer la réutilisation des connexions
+    disable_nagle_algorithm = True  # En-têtes et corps sont écrits séparément: évite l'attente d'ACK retardé
+
+    def setup(self) -> None:
+        super().setup()
+        stub = self.server.stub
+        stub.record("connections")
+        if stub.connect_delay:
+            time.sleep(stub.connect_delay)  # Coût d'établissement de connexion (TCP+TLS)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if stub.delay:
+            time.sleep(stub.delay)
+
+        if stub.take_failure():
+            stub.record("failures")
+            self.send_error(503)
+            return
+
+        if url.path == "/v1/search":
+            stub.record("geocoding")
+            city = STUB_CITIES.get(params.get("name", "").strip().lower())
+            body: Any = {"generationtime_ms": 0.1}
+            if city:
+                body["results"] = [{"latitude": city[0], "longitude": city[1], "name": city[2]}]
+        elif url.path == "/v1/forecast":
+            stub.record("forecast")
+            latitudes = params.get("latitude", "").split(",")
+            longitudes = params.get("longitude", "").split(",")
+            body = [self._forecast(float(lat), float(lon)) for lat, lon in zip(latitudes, longitudes)]
+            if len(body) == 1:
+                body = body[0]
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @staticmethod
+    def _forecast(lat: float, lon: float) -> Dict[str, Any]:
+        # Valeurs déterministes dérivées des coordonnées
+        seed = int(abs(lat * 1000) + abs(lon * 1000))
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "current": {
+                "temperature_2m": round(5 + seed % 250 / 10, 1),
+                "relative_humidity_2m": 40 + seed % 50,
+                "weather_code": [0, 1, 2, 3, 61, 80][seed % 6],
+                "wind_speed_10m": round(seed % 300 / 10, 1),
+            },
+        }
+
+
+class OpenMeteoStub:
+    """Serveur HTTP local imitant les API de géocodage et de prévisions d'Open-Meteo.
+
+    Exemple::
+
+        with OpenMeteoStub(delay=0.01) as stub:
+            configure(geocoding_url=stub.url, forecast_url=stub.url)
+            ...
+            stub.counts["geocoding"], stub.counts["connections"]
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        connect_delay: float = 0.0,
+        fail_first: int = 0
+    ):
+        """Prépare le serveur.
+
+        Args:
+            delay: Latence simulée de chaque requête, en secondes
+            host: Adresse d'écoute
+            port: Port d'écoute (0 pour un port libre)
+            connect_delay: Latence simulée à l'ouverture de chaque connexion, en secondes
+            fail_first: Nombre de premières requêtes qui échouent en 503
+        """
+        self.delay = delay
+        self.connect_delay = connect_delay
+        self.fail_first = fail_first
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _OpenMeteoHandler, bind_and_activate=False)
+        self._server.request_queue_size = 1024
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, event: str) -> None:
+        with self._lock:
+            self.counts[event] += 1
+
+    def take_failure(self) -> bool:
+        """Consomme une des pannes programmées; True si la requête doit échouer."""
+        with self._lock:
+            if self.fail_first <= 0:
+                return False
+            self.fail_first -= 1
+            return True
+
+    def start(self) -> "OpenMeteoStub":
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OpenMeteoStub":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
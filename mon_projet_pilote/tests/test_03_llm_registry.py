@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from modules.llm import LLMRegistry
+
+
+def fake_factory(model, temperature, **kwargs):
+    return {"model": model, "temperature": temperature, **kwargs}
+
+
+def test_registry_construit_une_seule_fois_par_configuration():
+    """
+    Vérifie qu'une configuration n'est construite qu'une fois et que les autres appels sont des hits.
+    """
+    registry = LLMRegistry(factory=fake_factory)
+
+    first = registry.get("gemini-1.5-flash", 0.2)
+    for _ in range(5):
+        assert registry.get("gemini-1.5-flash", 0.2) is first
+
+    other = registry.get("gemini-1.5-flash", 0.7, max_tokens=64)
+    assert other is not first
+    assert registry.stats() == {"clients": 2, "hits": 5, "constructions": 2, "failures": 0}
+
+
+def test_registry_concurrence():
+    """
+    Vérifie que des appels concurrents pour la même configuration partagent un seul client.
+    """
+    calls = []
+
+    def slow_factory(model, temperature, **kwargs):
+        calls.append(model)
+        threading.Event().wait(0.05)
+        return object()
+
+    registry = LLMRegistry(factory=slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    assert registry.stats()["hits"] == 15
+
+
+def test_registry_warm_up_et_retry():
+    """
+    Vérifie le préchauffage et le retry en cas d'échec de construction.
+    """
+    failures = {"count": 1}
+
+    def flaky_factory(model, temperature, **kwargs):
+        if failures["count"]:
+            failures["count"] -= 1
+            raise RuntimeError("indisponible")
+        return object()
+
+    registry = LLMRegistry(factory=flaky_factory, retries=2, backoff=0.0)
+    assert registry.warm_up([{"model": "a"}, {"model": "b", "temperature": 0.0}]) == 2
+    assert registry.stats()["failures"] == 1
+
+    registry = LLMRegistry(factory=lambda *a, **k: (_ for _ in ()).throw(RuntimeError("ko")), retries=1, backoff=0.0)
+    with pytest.raises(RuntimeError):
+        registry.get()
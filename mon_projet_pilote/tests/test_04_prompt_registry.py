@@ -0,0 +1,34 @@
+from modules.llm import get_llm
+from modules.prompts import PROMPT_TEMPLATES, get_chain, prompt_registry
+from modules.reasoning import analyser, choisir_outil
+
+
+def test_prompts_analysés_une_seule_fois():
+    """
+    Vérifie que chaque prompt est analysé à l'import et réutilisé ensuite.
+    """
+    for name in PROMPT_TEMPLATES:
+        assert prompt_registry.get_prompt(name) is prompt_registry.get_prompt(name)
+
+
+def test_chaîne_composée_une_fois_par_llm(fake_llm):
+    """
+    Vérifie que la chaîne est composée une seule fois pour le client mutualisé.
+    """
+    chain = get_chain("analyse")
+    assert get_chain("analyse") is chain
+    assert get_chain("analyse", get_llm()) is chain
+    assert get_chain("analyse", get_llm(temperature=0.0)) is not chain
+
+
+def test_nœuds_avec_chaînes_précompilées(fake_llm):
+    """
+    Vérifie que les nœuds utilisent les chaînes précompilées avec le modèle factice.
+    """
+    state = {"question": "Quelle est la météo à Lyon?"}
+    state.update(analyser(state))
+    state.update(choisir_outil(state))
+
+    assert state["tool_name"] == "recherche_météo"
+    assert state["tool_input"] == "Lyon"
+    assert fake_llm.by_kind["extraction_ville"] == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from modules.config import configure, get_config
+from modules.llm import llm_registry
+from modules.reasoning import choisir_outil, parse_tool_selection
+from tests.fakes import default_responder, fake_llm_factory, prompt_kind
+
+
+@pytest.fixture
+def structured_mode(fake_llm):
+    previous = get_config()
+    configure(tool_selection="structured")
+    yield fake_llm
+    configure(tool_selection=previous.tool_selection)
+
+
+def test_parse_tool_selection():
+    """
+    Vérifie l'analyse et la validation de la réponse JSON du mode structuré.
+    """
+    assert parse_tool_selection('{"tool_name": "calculatrice", "tool_input": "12*7"}') == ("calculatrice", "12*7")
+    assert parse_tool_selection('```json\n{"tool_name": "recherche_météo", "tool_input": "Lyon"}\n```') == ("recherche_météo", "Lyon")
+    assert parse_tool_selection('{"tool_name": "réponse_directe", "tool_input": "ignoré"}') == ("réponse_directe", "")
+    assert parse_tool_selection('{"tool_name": "calculatrice", "tool_input": "__import__(os)"}') is None
+    assert parse_tool_selection('{"tool_name": "inconnu", "tool_input": ""}') is None
+    assert parse_tool_selection("recherche_météo") is None
+
+
+def test_mode_structuré_un_seul_appel(structured_mode):
+    """
+    Vérifie qu'en mode structuré l'outil et son entrée sont obtenus en un seul appel LLM.
+    """
+    result = choisir_outil({"question": "Combien font 12*7 ?", "thoughts": "Un calcul."})
+
+    assert result == {"tool_name": "calculatrice", "tool_input": "12*7"}
+    assert structured_mode.total == 1
+
+
+def test_mode_structuré_repli_deux_étapes(structured_mode):
+    """
+    Vérifie le repli sur la sélection en deux étapes si la réponse JSON est inexploitable.
+    """
+    def responder(prompt):
+        if prompt_kind(prompt) == "choix_outil_structuré":
+            return "recherche_météo pour Lyon"
+        return default_responder(prompt)
+
+    factory = fake_llm_factory(responder=responder, counter=structured_mode)
+    llm_registry.set_factory(factory)
+
+    result = choisir_outil({"question": "Quelle est la météo à Lyon?", "thoughts": "La météo."})
+
+    assert result == {"tool_name": "recherche_météo", "tool_input": "Lyon"}
+    assert structured_mode.by_kind["choix_outil_structuré"] == 1
+    assert structured_mode.by_kind["choix_outil"] == 1
+    assert structured_mode.by_kind["extraction_ville"] == 1
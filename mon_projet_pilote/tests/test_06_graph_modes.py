@@ -0,0 +1,45 @@
+import pytest
+
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.reasoning import analyser_et_choisir
+from tests.fakes import default_responder, fake_llm_factory, prompt_kind
+
+
+def test_mode_fusionné_même_état_avec_un_appel_de_moins(fake_llm):
+    """
+    Vérifie que le mode fusionné renseigne les mêmes champs avec un appel LLM de moins.
+    """
+    question = {"question": "Combien font 12*7 ?"}
+
+    standard = build_agent_graph(mode="standard").invoke(question)
+    standard_calls = fake_llm.total
+    fake_llm.reset()
+    fused = build_agent_graph(mode="fused").invoke(question)
+
+    for field in ("tool_name", "tool_input", "observation", "answer"):
+        assert fused[field] == standard[field]
+    assert fused["thoughts"]
+    assert standard_calls == 4
+    assert fake_llm.total == 2
+
+
+def test_nœud_fusionné_repli(fake_llm):
+    """
+    Vérifie le repli sur le choix d'outil classique si la réponse fusionnée n'est pas du JSON.
+    """
+    def responder(prompt):
+        if prompt_kind(prompt) == "analyse_et_choix":
+            return "Il faut calculer 12*7."
+        return default_responder(prompt)
+
+    llm_registry.set_factory(fake_llm_factory(responder=responder, counter=fake_llm))
+
+    result = analyser_et_choisir({"question": "Combien font 12*7 ?"})
+
+    assert result == {"thoughts": "Il faut calculer 12*7.", "tool_name": "calculatrice", "tool_input": "12*7"}
+
+
+def test_mode_inconnu():
+    with pytest.raises(ValueError):
+        build_agent_graph(mode="inconnu")
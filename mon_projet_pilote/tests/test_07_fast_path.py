@@ -0,0 +1,46 @@
+from modules.fast_path import FastPathClassifier
+from modules.graph import build_agent_graph
+
+
+def test_classifieur_voie_rapide():
+    """
+    Vérifie la reconnaissance des questions évidentes et le seuil de confiance.
+    """
+    classifier = FastPathClassifier()
+
+    calcul = classifier.classify("Combien font 12*7 ?")
+    assert (calcul.tool_name, calcul.tool_input) == ("calculatrice", "12*7")
+    météo = classifier.classify("Quelle est la météo à La Rochelle?")
+    assert (météo.tool_name, météo.tool_input) == ("recherche_météo", "La Rochelle")
+
+    assert classifier.classify("Qui a écrit Les Misérables ?") is None
+    assert classifier.classify("Compare la météo à Paris, Lyon et Marseille") is None
+    assert classifier.classify("En 2024-2025, combien d'habitants compte Lyon ?") is None
+    assert classifier.stats() == {"calculatrice": 1, "recherche_météo": 1, "llm": 2, "sous_le_seuil": 1}
+
+
+def test_faux_positifs_laissés_au_llm():
+    """
+    Vérifie que dates, numéros de téléphone et questions avec un mot inattendu ne court-circuitent pas le LLM.
+    """
+    classifier = FastPathClassifier()
+    for question in ("Quel jour le 12/05/2024 ?", "Appelle le 06-12-34-56-78",
+                     "Quel temps fait-il à Lyon demain ?", "Combien font 12*7 en binaire ?"):
+        assert classifier.classify(question) is None, question
+    assert classifier.classify("Combien font 12 - 7 - 3 ?").tool_input == "12 - 7 - 3"
+
+
+def test_graphe_voie_rapide_sans_llm(fake_llm):
+    """
+    Vérifie qu'un calcul évident est résolu sans aucun appel LLM, réponse comprise.
+    """
+    app = build_agent_graph(fast_path=True)
+
+    result = app.invoke({"question": "Combien font 12*7 ?"})
+    assert result["answer"] == "Le résultat de 12*7 est 84."
+    assert fake_llm.total == 0
+
+    # Les autres questions suivent le chemin LLM habituel
+    result = app.invoke({"question": "Qui a écrit Les Misérables ?"})
+    assert result["tool_name"] == "réponse_directe"
+    assert fake_llm.by_kind["analyse"] == 1
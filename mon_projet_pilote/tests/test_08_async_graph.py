@@ -0,0 +1,58 @@
+import asyncio
+
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.reasoning import choisir_outil
+from modules.reasoning_async import achoisir_outil
+from modules.tools import arecherche_météo
+from modules.errors import InputValidationError
+from tests.fakes import default_responder, fake_llm_factory, prompt_kind
+
+import pytest
+
+
+def test_graphe_asynchrone_même_résultat(fake_llm, open_meteo):
+    """
+    Vérifie que le graphe asynchrone produit le même état que le graphe synchrone.
+    """
+    questions = ["Quelle est la météo à Paris?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+    sync_app = build_agent_graph()
+    async_app = build_agent_graph(use_async=True)
+
+    async def run_all():
+        return await asyncio.gather(*(async_app.ainvoke({"question": q}) for q in questions))
+
+    for expected, result in zip([sync_app.invoke({"question": q}) for q in questions], asyncio.run(run_all())):
+        for field in ("tool_name", "tool_input", "observation", "answer"):
+            assert result.get(field) == expected.get(field)
+    # La seconde recherche pour Paris est servie par le cache des prévisions
+    assert open_meteo.counts["forecast"] == 1
+
+
+def test_recherche_météo_asynchrone(open_meteo):
+    """
+    Vérifie l'outil météo asynchrone, y compris la validation d'entrée.
+    """
+    assert asyncio.run(arecherche_météo("Lyon")).startswith("À Lyon, il fait")
+    assert asyncio.run(arecherche_météo("Atlantide")) == "Ville non trouvée: Atlantide"
+    with pytest.raises(InputValidationError):
+        asyncio.run(arecherche_météo("Paris; rm -rf"))
+
+
+def test_échec_llm_choix_outil_asynchrone(fake_llm):
+    """
+    Vérifie qu'une erreur LLM pendant le choix d'outil ou l'extraction est signalée
+    par ``error`` en asynchrone comme en synchrone.
+    """
+    def responder(prompt):
+        if prompt_kind(prompt) in ("choix_outil", "extraction_ville", "extraction_expression"):
+            raise RuntimeError("LLM indisponible")
+        return default_responder(prompt)
+
+    llm_registry.set_factory(fake_llm_factory(responder=responder, counter=fake_llm))
+    expected = {"tool_name": "réponse_directe", "tool_input": "", "error": True}
+
+    for question in ("Dis-moi quelque chose d'utile.", "Quelle est la météo à Lyon?", "Combien font 12*7 ?"):
+        state = {"question": question, "thoughts": "Réflexion."}
+        assert asyncio.run(achoisir_outil(state)) == expected
+        assert choisir_outil(state) == expected
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from modules import batch
+from modules.batch import BatchReport, BatchRunner, completed_indices, read_questions, run_batch
+from modules.graph import build_agent_graph
+
+QUESTIONS = ["Combien font 12*7 ?", "Calcule (3 + 4) * 2", "Qui a écrit Les Misérables ?", "Combien font 2+2 ?"]
+
+
+def _lignes(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_lot_ordonné_et_reprise(fake_llm, tmp_path):
+    """
+    Vérifie l'ordre des résultats, la reprise après une écriture interrompue et la lecture CSV.
+    """
+    source = tmp_path / "questions.jsonl"
+    source.write_text("\n".join(json.dumps({"question": q}, ensure_ascii=False) for q in QUESTIONS), encoding="utf-8")
+    output = tmp_path / "resultats.jsonl"
+    app = build_agent_graph(fast_path=True)
+
+    report = run_batch(app, str(source), str(output), concurrency=3)
+    lignes = _lignes(output)
+    assert [l["index"] for l in lignes] == [0, 1, 2, 3]
+    assert lignes[0]["answer"] == "Le résultat de 12*7 est 84."
+    assert report.processed == 4 and report.errors == 0
+
+    # Arrêt brutal simulé: deux résultats complets et une ligne tronquée
+    with open(output, encoding="utf-8") as f:
+        contenu = f.readlines()
+    output.write_text("".join(contenu[:2]) + contenu[2][:10], encoding="utf-8")
+    assert completed_indices(str(output)) == {0, 1}
+
+    report = run_batch(app, str(source), str(output), concurrency=2)
+    assert report.skipped == 2 and report.processed == 2
+    assert [l["index"] for l in _lignes(output)] == [0, 1, 2, 3]
+
+    # Lignes JSON invalides ou sans question: ignorées, numéros conservés
+    broken = tmp_path / "questions_abîmées.jsonl"
+    broken.write_text('{"question": "Combien font 2+2 ?"}\n{"question": \n{"autre": 1}\n"Combien font 3+3 ?"\n',
+                      encoding="utf-8")
+    assert list(read_questions(str(broken))) == [(0, "Combien font 2+2 ?"), (3, "Combien font 3+3 ?")]
+
+    csv_source = tmp_path / "questions.csv"
+    csv_source.write_text("id,question\n1,Combien font 2+2 ?\n2,\n", encoding="utf-8")
+    assert list(read_questions(str(csv_source))) == [(0, "Combien font 2+2 ?")]
+
+
+def test_lot_asynchrone_dès_que_prêt(fake_llm, tmp_path):
+    """
+    Vérifie le mode asynchrone sans ordre imposé: tous les résultats sont écrits.
+    """
+    output = tmp_path / "resultats.jsonl"
+    runner = BatchRunner(build_agent_graph(fast_path=True, use_async=True), concurrency=2, ordered=False)
+
+    with open(output, "w", encoding="utf-8") as out:
+        report = asyncio.run(runner.arun(enumerate(QUESTIONS), out))
+
+    assert sorted(l["index"] for l in _lignes(output)) == [0, 1, 2, 3]
+    assert report.summary()["p99_ms"] >= report.summary()["p50_ms"] > 0
+
+
+def test_latences_bornées(monkeypatch):
+    """
+    Vérifie que le bilan garde un échantillon borné de latences, avec une moyenne exacte.
+    """
+    monkeypatch.setattr(batch, "LATENCY_SAMPLE_SIZE", 100)
+    report = BatchReport()
+    for i in range(10_000):
+        report.record_latency(i / 1000)
+    summary = report.summary()
+    assert len(report.latencies) == 100 and report.latency_count == 10_000
+    assert abs(summary["mean_ms"] - 4999.5) < 1e-6
+    assert 3500 < summary["p50_ms"] < 6500 and summary["p99_ms"] > 8500
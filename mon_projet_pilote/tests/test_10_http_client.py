@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.http_client import backoff_delay, http_client
+from modules.tools import arecherche_météo, recherche_météo
+from tests.fakes import OpenMeteoStub
+
+
+@pytest.fixture
+def retry_rapide():
+    """
+    Réduit l'attente entre les tentatives HTTP pour la durée du test.
+    """
+    previous = get_config()
+    configure(http_backoff=0.01, http_backoff_jitter=0.0)
+    http_client.reset()
+    yield
+    configure(http_backoff=previous.http_backoff, http_backoff_jitter=previous.http_backoff_jitter)
+    http_client.reset()
+
+
+def test_réutilisation_des_connexions(open_meteo):
+    """
+    Vérifie que plusieurs recherches météo successives partagent une seule connexion.
+    """
+    for city in ("Paris", "Lyon", "Nice"):
+        assert recherche_météo(city).startswith(f"À {city}, il fait")
+
+    assert open_meteo.counts["geocoding"] == 3 and open_meteo.counts["forecast"] == 3
+    assert open_meteo.counts["connections"] == 1
+
+
+def test_retry_des_get(retry_rapide):
+    """
+    Vérifie que les erreurs 503 transitoires sont réessayées, en synchrone et en asynchrone.
+    """
+    previous = get_config()
+    with OpenMeteoStub(fail_first=2) as stub:
+        configure(geocoding_url=stub.url, forecast_url=stub.url)
+        try:
+            assert recherche_météo("Lyon").startswith("À Lyon, il fait")
+            assert stub.counts["failures"] == 2
+
+            stub.fail_first = 2
+            assert asyncio.run(arecherche_météo("Nantes")).startswith("À Nantes, il fait")
+            assert stub.counts["failures"] == 4
+        finally:
+            configure(geocoding_url=previous.geocoding_url, forecast_url=previous.forecast_url)
+
+
+def test_backoff_delay():
+    """
+    Vérifie la progression exponentielle, le plafond et la gigue de l'attente.
+    """
+    assert backoff_delay(1, 0.5, 0.0) == 0.5
+    assert backoff_delay(3, 0.5, 0.0) == 2.0
+    assert backoff_delay(10, 0.5, 0.0, maximum=4.0) == 4.0
+    assert 0.5 <= backoff_delay(1, 0.5, 0.1) <= 0.6
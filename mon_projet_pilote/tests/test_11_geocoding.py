@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+
+from modules.cache import MISS
+from modules.config import configure
+from modules.geocoding import geocoding_cache, normalize_city
+from modules.tools import recherche_météo
+
+
+def test_normalisation_des_noms():
+    """
+    Vérifie que les variantes de casse, d'accents et d'espaces donnent la même clé.
+    """
+    assert normalize_city("Saint-Étienne") == normalize_city("  saint  etienne ") == "saint etienne"
+    assert normalize_city("LYON") == normalize_city("lyon")
+
+
+def test_cache_mémoire_disque_et_négatif(open_meteo):
+    """
+    Vérifie qu'une ville n'est géocodée qu'une fois, y compris après redémarrage (base SQLite),
+    et que les villes introuvables sont aussi mises en cache.
+    """
+    assert recherche_météo("Lyon").startswith("À Lyon, il fait")
+    assert recherche_météo("lyon").startswith("À Lyon, il fait")
+    assert recherche_météo("Atlantide") == "Ville non trouvée: Atlantide"
+    assert recherche_météo("atlantide") == "Ville non trouvée: atlantide"
+    assert open_meteo.counts["geocoding"] == 2
+    assert geocoding_cache.stats()["negative_hits"] == 1
+
+    # Nouveau processus simulé: le cache mémoire est vide, la base SQLite est conservée
+    geocoding_cache.reset()
+    assert recherche_météo("LYON").startswith("À Lyon, il fait")
+    assert open_meteo.counts["geocoding"] == 2
+    assert geocoding_cache.stats()["disk_hits"] == 1
+
+
+def test_préchargement(open_meteo):
+    """
+    Vérifie que les principales villes préchargées ne déclenchent aucune requête de géocodage.
+    """
+    configure(geocoding_preload=True, geocoding_cache_path="")
+    geocoding_cache.reset()
+
+    assert geocoding_cache.lookup("marseille")[2] == "Marseille"
+    assert geocoding_cache.stats()["preloaded"] > 50
+    assert geocoding_cache.lookup("Ville inconnue") is MISS
+    assert recherche_météo("Bordeaux").startswith("À Bordeaux, il fait")
+    assert open_meteo.counts["geocoding"] == 0
+
+
+def test_une_connexion_pour_tous_les_threads(open_meteo, monkeypatch):
+    """
+    Vérifie que des threads éphémères partagent la connexion SQLite au lieu d'en ouvrir une chacun.
+    """
+    opened = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", lambda *args, **kwargs: opened.append(1) or connect(*args, **kwargs))
+    geocoding_cache.store("Lyon", (45.75, 4.85, "Lyon"))
+    geocoding_cache.reset()
+
+    threads = [threading.Thread(target=geocoding_cache.lookup, args=("Lyon",)) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 2  # Avant puis après reset()
+    assert geocoding_cache.stats()["disk_hits"] >= 1
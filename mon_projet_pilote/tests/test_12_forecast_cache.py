@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.cache import SingleFlight
+from modules.forecast import forecast_cache
+from modules.tools import arecherche_météo, recherche_météo
+
+
+def test_fusion_des_requêtes_concurrentes(open_meteo):
+    """
+    Vérifie que des recherches simultanées sur la même ville ne produisent qu'une requête de prévisions,
+    en synchrone comme en asynchrone, et que les suivantes sont servies par le cache.
+    """
+    open_meteo.delay = 0.2
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(recherche_météo, ["Lyon"] * 8))
+    assert len(set(results)) == 1
+    assert open_meteo.counts["forecast"] == 1
+
+    async def run_all():
+        return await asyncio.gather(*(arecherche_météo("Nice") for _ in range(8)))
+
+    assert len(set(asyncio.run(run_all()))) == 1
+    assert open_meteo.counts["forecast"] == 2
+
+    open_meteo.delay = 0.0
+    recherche_météo("Lyon")
+    stats = forecast_cache.stats()
+    assert open_meteo.counts["forecast"] == 2
+    assert stats["misses"] == 2 and stats["coalesced"] + stats["hits"] == 15
+
+
+def test_clé_arrondie(open_meteo):
+    """
+    Vérifie que des coordonnées très proches partagent la même entrée.
+    """
+    assert forecast_cache.key(45.748461, 4.846712) == forecast_cache.key(45.7512, 4.8479)
+
+
+def test_erreur_partagée_et_non_mise_en_cache():
+    """
+    Vérifie qu'une erreur est propagée à tous les appelants fusionnés et que l'appel suivant recommence.
+    """
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def échoue():
+        calls.append(1)
+        started.set()
+        release.wait()
+        raise ConnectionError("panne")
+
+    def appel():
+        try:
+            flights.do("clé", échoue)
+        except ConnectionError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(appel)
+        started.wait()
+        follower = pool.submit(appel)
+        time.sleep(0.05)  # Le second appel rejoint celui en cours
+        release.set()
+        assert leader.result() == follower.result() == "panne"
+    assert len(calls) == 1
+
+    assert flights.do("clé", lambda: 42) == (42, False)
+
+
+def test_annulation_du_premier_appelant():
+    """
+    Vérifie que l'annulation de l'appelant qui exécute l'appel n'annule pas ceux qui l'attendent:
+    l'un d'eux relance l'appel et tous reçoivent son résultat.
+    """
+    flights = SingleFlight()
+    calls = []
+
+    async def lent():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scénario():
+        leader = asyncio.create_task(flights.ado("clé", lent))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(flights.ado("clé", lent)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    cancelled, results = asyncio.run(scénario())
+    assert cancelled
+    assert sorted(results) == [(2, False), (2, True), (2, True)]
+    assert len(calls) == 2
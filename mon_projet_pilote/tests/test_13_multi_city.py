@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.errors import InputValidationError
+from modules.graph import build_agent_graph
+from modules.reasoning import entrée_météo, router
+from modules.tools import arecherche_météo_multi, recherche_météo_multi
+
+QUESTION = "Compare la météo à Paris, Lyon et Marseille"
+
+
+def test_recherche_groupée_une_seule_requête(open_meteo):
+    """
+    Vérifie qu'une recherche sur plusieurs villes ne fait qu'une requête de prévisions
+    et renvoie une observation par ville, dans l'ordre demandé.
+    """
+    observation = recherche_météo_multi(["Paris", "Atlantide", "Lyon", "Nice"])
+    lignes = observation.split("\n")
+    assert [l.split(",")[0] for l in lignes] == ["À Paris", "Ville non trouvée: Atlantide", "À Lyon", "À Nice"]
+    assert open_meteo.counts["geocoding"] == 4 and open_meteo.counts["forecast"] == 1
+
+    # Villes déjà en cache: aucune requête; une nouvelle ville: une seule requête groupée
+    assert asyncio.run(arecherche_météo_multi(["Paris", "Lyon", "Nantes"])).startswith("À Paris")
+    assert open_meteo.counts["geocoding"] == 5 and open_meteo.counts["forecast"] == 2
+
+    with pytest.raises(InputValidationError):
+        recherche_météo_multi(["Paris", "Lyon; rm -rf"])
+
+
+def test_entrée_météo_liste():
+    """
+    Vérifie la normalisation de l'entrée météo et le routage vers la recherche groupée.
+    """
+    assert entrée_météo("Paris") == "Paris"
+    assert entrée_météo("Paris, Lyon et Marseille") == ["Paris", "Lyon", "Marseille"]
+    assert entrée_météo(["Lyon", "Lyon"]) == "Lyon"
+    assert entrée_météo("Paris; 1+1") is None
+    assert router({"tool_name": "recherche_météo", "tool_input": ["Paris", "Lyon"]}) == "appeler_météo_multi"
+    assert router({"tool_name": "recherche_météo", "tool_input": "Paris"}) == "appeler_météo"
+
+
+@pytest.mark.parametrize("tool_selection", ["two_step", "structured"])
+def test_graphe_route_les_questions_multi_villes(fake_llm, open_meteo, tool_selection):
+    """
+    Vérifie que le graphe (synchrone et asynchrone) envoie une question multi-villes à la recherche groupée.
+    """
+    previous = get_config().tool_selection
+    configure(tool_selection=tool_selection)
+    try:
+        result = build_agent_graph().invoke({"question": QUESTION})
+        async_result = asyncio.run(build_agent_graph(use_async=True).ainvoke({"question": QUESTION}))
+    finally:
+        configure(tool_selection=previous)
+
+    for state in (result, async_result):
+        assert state["tool_input"] == ["Paris", "Lyon", "Marseille"]
+        assert state["observation"].count("\n") == 2
+    assert open_meteo.counts["forecast"] == 1
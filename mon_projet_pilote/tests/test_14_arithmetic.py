@@ -0,0 +1,58 @@
+import pytest
+
+from modules.arithmetic import ArithmeticEngine
+from modules.errors import ExpressionError, ExpressionLimitError
+from modules.tools import calculatrice
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("12*7", 84),
+    ("(3 + 4) * 2", 14),
+    ("1,5 * 2", 3.0),
+    ("-(5 - 12) % 4", 3),
+    ("7 // 2", 3),
+    ("2**10", 1024),
+])
+def test_même_résultat_que_eval(expression, expected):
+    """
+    Vérifie que le moteur donne les mêmes résultats que l'évaluation Python.
+    """
+    assert ArithmeticEngine().evaluate(expression) == expected == eval(expression.replace(",", "."))
+
+
+def test_constructions_refusées_et_limites():
+    """
+    Vérifie le refus des constructions non arithmétiques et des calculs démesurés.
+    """
+    engine = ArithmeticEngine(max_nodes=20)
+    for expression in ("__import__('os')", "(1).real", "[1]", "1 if 1 else 2", "True + 1"):
+        with pytest.raises(ExpressionError):
+            engine.evaluate(expression)
+    for expression in ("9**9**9", "2**5000", "1.5**9999", "+".join(["1"] * 11)):
+        with pytest.raises(ExpressionLimitError):
+            engine.evaluate(expression)
+    with pytest.raises(ZeroDivisionError):
+        engine.evaluate("1 % 0")
+    with pytest.raises(SyntaxError):
+        engine.evaluate("1 2")
+
+
+def test_cache_de_compilation():
+    """
+    Vérifie que les variantes d'espacement et de virgule partagent l'expression compilée.
+    """
+    engine = ArithmeticEngine(cache_size=2)
+    engine.evaluate("1,5 + 2")
+    engine.evaluate("  1.5  +   2 ")
+    engine.evaluate("3*3")
+    engine.evaluate("4*4")
+    assert engine.stats() == {"entries": 2, "hits": 1, "misses": 3}
+
+
+def test_calculatrice_messages():
+    """
+    Vérifie les messages de la calculatrice pour les erreurs et les limites.
+    """
+    assert calculatrice("1/0") == "Erreur: Division par zéro"
+    assert calculatrice("9**9**9") == "Erreur: Le calcul dépasse les limites autorisées"
+    assert calculatrice("(1+") == "Erreur: Syntaxe incorrecte dans l'expression mathématique"
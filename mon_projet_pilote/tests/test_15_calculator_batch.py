@@ -0,0 +1,69 @@
+import random
+
+from modules.arithmetic import ArithmeticEngine
+from modules.arithmetic_batch import BatchEvaluator, split_constants
+from modules import tools
+from modules.tools import calculatrice, calculatrice_lot
+
+TEMPLATES = ["{}*{} + {}", "({} - {}) / {}", "{} // {}", "{} % {}", "-{}**{}", "{},5 * {}", "{}**-{}", "(-{})**0.5"]
+VALUES = [0, 1, 2, 3, 7, -1, 12, 99, 2**40, 3**35, 2**53 - 1, 2**53, 2**53 + 1, 10**20]
+
+
+def test_découpage_en_forme_et_constantes():
+    """
+    Vérifie que des expressions de même structure partagent la même forme.
+    """
+    template, constants = split_constants("12*7 + 3")
+    assert constants == [12, 7, 3] and split_constants("5*2 + 1")[0] == template
+    assert split_constants("1.5e3 / .5")[1] == [1500.0, 0.5]
+    # Écritures laissées au moteur scalaire
+    for expression in ("1_000 * 2", "0x10", "abs(1)"):
+        assert split_constants(expression) == ("", [])
+
+
+def test_mêmes_résultats_que_le_moteur_scalaire():
+    """
+    Vérifie, sur un lot aléatoire, que chaque résultat (ou erreur) est celui du moteur scalaire.
+    """
+    random.seed(0)
+    expressions = []
+    for _ in range(3000):
+        template = random.choice(TEMPLATES)
+        expressions.append(template.format(*(random.choice(VALUES) for _ in range(template.count("{}")))))
+
+    engine = ArithmeticEngine()
+    evaluator = BatchEvaluator(engine, min_group=2)
+    for expression, result in zip(expressions, evaluator.evaluate(expressions)):
+        try:
+            expected = engine.evaluate(expression)
+        except Exception as e:
+            assert type(result) is type(e), expression
+        else:
+            assert type(result) is type(expected) and (result == expected or result != result), expression
+
+    stats = evaluator.stats()
+    assert stats["vectorized"] > 0 and stats["fallback"] > 0
+    assert stats["vectorized"] + stats["fallback"] + stats["scalar"] == len(expressions)
+
+
+def test_calculatrice_lot_messages_dans_l_ordre():
+    """
+    Vérifie que le calcul par lots renvoie, dans l'ordre, les messages de la calculatrice.
+    """
+    expressions = [f"{i} * 2 + 1" for i in range(20)] + ["1/0", "(1+", "01 + 1", "2 ; 3", "1" * 101, "7/2"]
+    messages = calculatrice_lot(expressions)
+    assert messages[:20] == [f"Résultat: {2 * i + 1}" for i in range(20)]
+    assert messages[20:23] == [calculatrice(expression) for expression in expressions[20:23]]
+    assert messages[23] == "Erreur: L'expression mathématique fournie n'est pas valide."
+    assert messages[24] == "Erreur: L'expression est trop longue (max 100 caractères)."
+    assert messages[25] == "Résultat: 3.5"
+
+
+def test_calculatrice_lot_erreur_inattendue(monkeypatch):
+    """
+    Vérifie qu'une erreur inattendue sur une expression donne un message d'erreur sans interrompre le lot.
+    """
+    monkeypatch.setattr(tools, "evaluate_batch", lambda expressions, engine: [84, RuntimeError("panne"), 3.5])
+    assert calculatrice_lot(["12*7", "1+1", "7/2"]) == [
+        "Résultat: 84", "Erreur: Je n'ai pas pu calculer cette expression.", "Résultat: 3.5"
+    ]
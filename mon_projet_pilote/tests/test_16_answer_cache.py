@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+
+import pytest
+
+from modules.answer_cache import answer_cache, embed, normalize_question
+from modules.config import configure, get_config
+from modules.graph import build_agent_graph
+
+
+@pytest.fixture
+def settings():
+    """
+    Applique des réglages du cache des réponses le temps d'un test.
+    """
+    previous = get_config()
+
+    def apply(**overrides):
+        configure(**overrides)
+        answer_cache.reset()
+
+    yield apply
+    configure(**{name: getattr(previous, name) for name in (
+        "answer_cache_max_bytes", "answer_cache_weather_ttl", "answer_cache_semantic_threshold"
+    )})
+
+
+def test_normalisation_des_questions():
+    """
+    Vérifie que casse, accents et ponctuation sont ignorés, mais pas les opérateurs.
+    """
+    assert normalize_question("Quelle est la MÉTÉO à Paris ?!") == "quelle est la meteo a paris"
+    assert normalize_question("Quel temps fait-il à Saint-Étienne?") == "quel temps fait il a saint etienne"
+    assert normalize_question("Combien font 1,5 * 2 ?") == "combien font 1.5 * 2"
+    assert normalize_question("2+2") != normalize_question("2*2")
+    proche = float(embed("quelle est la meteo a paris") @ embed("quelle est la meteo a paris aujourd hui"))
+    éloignée = float(embed("quelle est la meteo a paris") @ embed("combien font 12 * 7"))
+    assert proche > 0.8 > éloignée
+
+
+def test_graphe_sert_les_questions_déjà_posées(fake_llm, open_meteo, answer_store):
+    """
+    Vérifie qu'une question reformulée à la ponctuation près est servie sans LLM ni outil,
+    et que la réponse est partagée via la base (nouveau processus simulé par reset).
+    """
+    app = build_agent_graph(answer_cache=True)
+    first = app.invoke({"question": "Quelle est la météo à Paris ?"})
+    calls = fake_llm.total
+    second = app.invoke({"question": "quelle est la meteo a paris"})
+    assert second["answer"] == first["answer"] and second["cache_hit"] == "exact"
+    assert fake_llm.total == calls and open_meteo.counts["forecast"] == 1
+
+    answer_cache.reset()
+    third = app.invoke({"question": "QUELLE EST LA MÉTÉO À PARIS"})
+    assert third["answer"] == first["answer"] and fake_llm.total == calls
+    assert answer_cache.stats()["disk_hits"] == 1 and answer_cache.stats()["hit_rate"] == 1.0
+
+
+def test_durée_de_vie_par_outil_et_budget(answer_store, settings):
+    """
+    Vérifie les durées de vie selon l'outil (0: pas de cache) et l'éviction au budget en octets.
+    """
+    settings(answer_cache_weather_ttl=0.0, answer_cache_max_bytes=600)
+    météo = {"answer": "Il fait beau.", "tool_name": "recherche_météo", "tool_input": "Paris"}
+    assert not answer_cache.store("Météo à Paris ?", météo)
+    assert not answer_cache.store("12*7", {"answer": "84", "error": True})
+
+    for i in range(10):
+        assert answer_cache.store(f"Combien font {i} * 7 ?", {"answer": f"{i * 7}" * 20, "tool_name": "calculatrice"})
+    stats = answer_cache.stats()
+    assert stats["bytes"] <= 600 and stats["memory_evictions"] > 0 and stats["disk_evictions"] > 0
+    assert answer_cache.lookup("combien font 9 * 7")["answer"] == "63" * 20
+    assert answer_cache.lookup("combien font 0 * 7") is None
+
+
+def test_niveau_sémantique(answer_store, settings):
+    """
+    Vérifie qu'une question proche réutilise la réponse, sauf si la ville ou les nombres diffèrent.
+    """
+    settings(answer_cache_semantic_threshold=0.8)
+    answer_cache.store("Quelle est la météo à Paris ?",
+                       {"answer": "Il fait 18°C à Paris.", "tool_name": "recherche_météo", "tool_input": "Paris"})
+    answer_cache.store("Combien font 12 * 7 ?", {"answer": "84", "tool_name": "calculatrice", "tool_input": "12 * 7"})
+
+    answer_cache.store("Qui a écrit Les Misérables ?", {"answer": "Victor Hugo."})
+
+    hit = answer_cache.lookup("Quelle est la météo à Paris aujourd'hui ?")
+    assert hit["answer"] == "Il fait 18°C à Paris." and hit["cache_hit"] == "semantic"
+    assert answer_cache.lookup("Quelle est la météo pour Paris ?")["cache_hit"] == "semantic"
+    for question in ("Quelle est la météo à Pau ?", "Quelle est la météo à Paris et à Lyon ?",
+                     "Quelle est la météo à Parisot ?", "Quelle est la météo à Paris demain ?",
+                     "Combien font 12 * 8 ?", "Combien font 12 + 7 ?", "Qui a écrit Les Misérables 2 ?"):
+        assert answer_cache.lookup(question) is None, question
+    assert answer_cache.stats()["semantic_hits"] == 2
+
+
+def test_une_connexion_pour_tous_les_threads(answer_store, monkeypatch):
+    """
+    Vérifie que des threads éphémères partagent la connexion SQLite au lieu d'en ouvrir une chacun.
+    """
+    answer_cache.store("Combien font 12 * 7 ?", {"answer": "84", "tool_name": "calculatrice"})
+    answer_cache.reset()
+    opened = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", lambda *args, **kwargs: opened.append(1) or connect(*args, **kwargs))
+
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(answer_cache.lookup("Combien font 12 * 7 ?")))
+               for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1
+    assert all(answer["answer"] == "84" for answer in answers) and len(answers) == 50
@@ -0,0 +1,105 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.errors import LLMCacheMissError
+from modules.graph import build_agent_graph
+from modules.llm import get_llm
+from modules.llm_cache import llm_cache
+from modules.prompts import get_chain
+
+QUESTIONS = ["Quelle est la météo à Paris ?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+
+
+@pytest.fixture
+def llm_cache_mode(tmp_path):
+    """
+    Active un mode du cache LLM, avec une base propre au test.
+    """
+    previous = get_config()
+
+    def apply(mode, **overrides):
+        configure(llm_cache_mode=mode, llm_cache_path=str(tmp_path / "llm.sqlite"), **overrides)
+        llm_cache.reset()
+
+    yield apply
+    configure(
+        llm_cache_mode=previous.llm_cache_mode,
+        llm_cache_path=previous.llm_cache_path,
+        llm_cache_max_bytes=previous.llm_cache_max_bytes
+    )
+    llm_cache.reset()
+
+
+def test_mémoïsation_des_prompts_choisis(fake_llm, open_meteo, llm_cache_mode):
+    """
+    Vérifie qu'en mode memo seuls les prompts choisis sont servis depuis le cache.
+    """
+    llm_cache_mode("memo")
+    app = build_agent_graph()
+    first = app.invoke({"question": QUESTIONS[0]})
+    fake_llm.reset()
+    second = app.invoke({"question": QUESTIONS[0]})
+
+    assert second["answer"] == first["answer"]
+    assert fake_llm.by_kind["analyse"] == 0 and fake_llm.by_kind["extraction_ville"] == 0
+    assert fake_llm.by_kind["choix_outil"] == 1 and fake_llm.by_kind["réponse_finale"] == 1
+    assert llm_cache.stats()["memory_hits"] == 2
+
+    # La température fait partie de la clé
+    get_chain("analyse", get_llm(temperature=0.7)).invoke({"question": QUESTIONS[0]})
+    assert fake_llm.by_kind["analyse"] == 1
+
+
+def test_enregistrement_puis_rejeu_hors_ligne(fake_llm, open_meteo, llm_cache_mode):
+    """
+    Vérifie qu'un rejeu redonne les réponses enregistrées sans aucun appel au modèle,
+    en synchrone comme en asynchrone, et qu'un prompt inconnu lève une erreur.
+    """
+    llm_cache_mode("record")
+    app = build_agent_graph()
+    recorded = [app.invoke({"question": question})["answer"] for question in QUESTIONS]
+
+    llm_cache_mode("replay")
+    fake_llm.reset()
+    replayed = [app.invoke({"question": question})["answer"] for question in QUESTIONS]
+    async_app = build_agent_graph(use_async=True)
+    areplayed = [asyncio.run(async_app.ainvoke({"question": question}))["answer"] for question in QUESTIONS]
+
+    assert replayed == recorded == areplayed and fake_llm.total == 0
+    with pytest.raises(LLMCacheMissError):
+        get_chain("analyse").invoke({"question": "Une question jamais enregistrée"})
+
+
+def test_budget_de_la_base(fake_llm, llm_cache_mode):
+    """
+    Vérifie l'éviction des réponses les moins récemment lues au-delà du budget en octets.
+    """
+    llm_cache_mode("memo", llm_cache_max_bytes=1000)
+    for i in range(20):
+        get_chain("analyse").invoke({"question": f"Question numéro {i}"})
+    stats = llm_cache.stats()
+    assert stats["stores"] == 20 and stats["disk_evictions"] > 0 and stats["bytes"] <= 1000
+
+
+def test_une_connexion_pour_tous_les_threads(llm_cache_mode, monkeypatch):
+    """
+    Vérifie que des threads éphémères partagent la connexion SQLite au lieu d'en ouvrir une chacun.
+    """
+    llm_cache_mode("replay")
+    llm_cache.store("clé", "analyse", ("modèle", 0.0), [("human", "Bonjour")], "Réponse enregistrée")
+    llm_cache.reset()
+    opened = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", lambda *args, **kwargs: opened.append(1) or connect(*args, **kwargs))
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(llm_cache.lookup("clé"))) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1 and responses == ["Réponse enregistrée"] * 50
@@ -0,0 +1,53 @@
+import asyncio
+
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.streaming import astream_answer, stream_answer, time_to_first_token
+from tests.fakes import fake_llm_factory
+
+
+def test_jetons_de_la_réponse_finale(fake_llm, open_meteo):
+    """
+    Vérifie que seuls les jetons de la réponse finale sont diffusés, après la
+    progression des étapes précédentes, et qu'ils reconstituent la réponse d'invoke.
+    """
+    app = build_agent_graph()
+    question = "Quelle est la météo à Paris ?"
+    events = list(stream_answer(app, question))
+
+    progress = [event.node for event in events if event.kind == "progress"]
+    tokens = [event for event in events if event.kind == "token"]
+    assert progress == ["analyser", "choisir_outil", "appeler_météo", "formuler_réponse"]
+    assert len(tokens) > 1 and {event.node for event in tokens} == {"formuler_réponse"}
+    assert events.index(tokens[0]) > len(progress) - 1
+    assert "".join(event.text for event in tokens) == app.invoke({"question": question})["answer"]
+
+
+def test_réponse_sans_jetons_émise_en_bloc(fake_llm, open_meteo, answer_store):
+    """
+    Vérifie qu'une réponse servie par le cache ou par gabarit arrive d'un bloc.
+    """
+    app = build_agent_graph(fast_path=True, answer_cache=True)
+    first = list(stream_answer(app, "Qui a écrit Les Misérables ?"))
+    second = list(stream_answer(app, "Qui a écrit Les Misérables ?"))
+    calcul = list(stream_answer(app, "Combien font 12*7 ?"))
+
+    assert any(event.kind == "token" for event in first)
+    assert [(event.kind, event.node) for event in second if event.kind != "progress"] == [("answer", "consulter_cache")]
+    answers = [event for event in calcul if event.kind == "answer"]
+    assert [event.node for event in answers] == ["réponse_calcul"] and "84" in answers[0].text
+
+
+def test_premier_jeton_avant_la_fin(fake_llm):
+    """
+    Vérifie, en synchrone comme en asynchrone, que le premier jeton arrive bien avant la fin de la génération.
+    """
+    llm_registry.set_factory(fake_llm_factory(latency=0.01, token_latency=0.01))
+    question = "Qui a écrit Les Misérables ?"
+    measure = time_to_first_token(build_agent_graph(), question)
+    assert measure["tokens"] > 5 and measure["total"] - measure["ttft"] >= 0.05
+
+    async def collect():
+        return [event async for event in astream_answer(build_agent_graph(use_async=True), question)]
+    events = asyncio.run(collect())
+    assert "".join(event.text for event in events if event.kind == "token") == measure["answer"]
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.reasoning import OUTILS
+from modules.speculative import speculative_runner
+from tests.fakes import default_responder, fake_llm_factory, prompt_kind
+
+QUESTIONS = ["Quelle est la météo à Paris et Lyon ?", "Combien font 12*7 ?", "Qui a écrit Les Misérables ?"]
+
+
+@pytest.fixture
+def runner():
+    """
+    Compteurs de l'exécution spéculative remis à zéro.
+    """
+    speculative_runner.reset()
+    yield speculative_runner
+    speculative_runner.reset()
+
+
+def test_même_état_que_le_mode_standard(fake_llm, open_meteo, runner):
+    """
+    Vérifie que le mode spéculatif renseigne les mêmes champs que le mode standard,
+    au prix des extractions inutiles.
+    """
+    standard = build_agent_graph(mode="standard")
+    speculative = build_agent_graph(mode="speculative")
+    for question in QUESTIONS:
+        expected = standard.invoke({"question": question})
+        fake_llm.reset()
+        result = speculative.invoke({"question": question})
+        for field in ("thoughts", "tool_name", "tool_input", "observation", "answer"):
+            assert result.get(field) == expected.get(field)
+        assert fake_llm.total <= 5
+
+    # Une extraction pas encore démarrée peut être annulée, même en synchrone
+    stats = runner.stats()
+    assert (stats["runs"], stats["launched"], stats["used"]) == (3, 12, 8)
+    assert stats["discarded"] + stats["cancelled"] == 4
+
+
+def test_chemin_critique_une_seule_latence(open_meteo, fake_llm, runner):
+    """
+    Vérifie que l'analyse, le choix de l'outil et l'extraction ne coûtent qu'une latence LLM.
+    """
+    llm_registry.set_factory(fake_llm_factory(latency=0.05, counter=fake_llm))
+
+    def duration(mode):
+        app = build_agent_graph(mode=mode)
+        start = time.perf_counter()
+        app.invoke({"question": "Combien font 12*7 ?"})
+        return time.perf_counter() - start
+
+    # Deux latences (branches spéculatives, réponse finale) au lieu de quatre
+    assert duration("speculative") < 0.75 * duration("standard")
+
+
+def test_annulation_des_branches_inutiles(runner):
+    """
+    Vérifie qu'en asynchrone les extractions inutiles encore en cours sont annulées.
+    """
+    async def llm(prompt):
+        text = prompt.to_string()
+        if prompt_kind(text).startswith("extraction"):
+            await asyncio.sleep(1.0)
+        return AIMessage(content=default_responder(text))
+
+    start = time.perf_counter()
+    analyse, tool_name, tool_input = asyncio.run(
+        runner.arun("Qui a écrit Les Misérables ?", OUTILS, RunnableLambda(llm))
+    )
+
+    assert time.perf_counter() - start < 0.5
+    assert tool_name == "réponse_directe" and tool_input == "" and analyse.content
+    assert runner.stats()["cancelled"] == 2
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.graph import build_agent_graph
+from modules.llm import llm_registry
+from modules.prefetch import candidate_cities, weather_prefetcher
+from tests.fakes import default_responder, fake_llm_factory, prompt_kind
+
+
+@pytest.fixture
+def prefetch_settings():
+    """
+    Applique des réglages de prélecture le temps d'un test.
+    """
+    previous = get_config()
+
+    def apply(**overrides):
+        configure(**overrides)
+        weather_prefetcher.reset()
+
+    apply()
+    yield apply
+    apply(
+        weather_prefetch=previous.weather_prefetch,
+        weather_prefetch_candidates=previous.weather_prefetch_candidates
+    )
+
+
+def test_lieux_candidats():
+    """
+    Vérifie le repérage local des lieux, énumérations comprises.
+    """
+    assert candidate_cities("Quelle est la météo à Paris, Lyon et Nice ?") == ["Paris", "Lyon", "Nice"]
+    assert candidate_cities("Quel temps fait-il au Mans ?") == ["Mans"]
+    assert candidate_cities("Combien font 12*7 ?") == []
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_recherche_prélue_pendant_l_analyse(fake_llm, open_meteo, prefetch_settings, use_async):
+    """
+    Vérifie qu'en mode spéculatif la recherche météo recouvre la fin de l'analyse,
+    sans requête en double.
+    """
+    llm_registry.set_factory(fake_llm_factory(latency=0.03, token_latency=0.01, counter=fake_llm))
+    open_meteo.delay = 0.05
+
+    def run(question):
+        app = build_agent_graph(mode="speculative", use_async=use_async)
+        start = time.perf_counter()
+        result = asyncio.run(app.ainvoke({"question": question})) if use_async else app.invoke({"question": question})
+        return result, time.perf_counter() - start
+
+    prefetch_settings(weather_prefetch=False)
+    expected, without = run("Quelle est la météo à Paris ?")
+    prefetch_settings(weather_prefetch=True)
+    result, duration = run("Quelle est la météo à Lyon ?")
+
+    assert result["observation"].startswith("À Lyon, il fait")
+    assert weather_prefetcher.stats()["prefetched"] == 1 and weather_prefetcher.stats()["hits"] == 1
+    assert open_meteo.counts["geocoding"] == 2 and open_meteo.counts["forecast"] == 2
+    # Géocodage et prévisions (2 x 50 ms) masqués par l'analyse
+    assert duration < without - 0.05
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_pas_de_prélecture_inutile(fake_llm, open_meteo, prefetch_settings, use_async):
+    """
+    Vérifie qu'aucune recherche n'est prélue quand elle ne recouvrirait rien
+    (mode standard) ou sous une entrée que la validation rejette (mode spéculatif).
+    """
+    def responder(prompt):
+        if prompt_kind(prompt) == "extraction_ville":
+            return "Paris!!"
+        return default_responder(prompt)
+
+    def run(mode, question):
+        app = build_agent_graph(mode=mode, use_async=use_async)
+        return asyncio.run(app.ainvoke({"question": question})) if use_async else app.invoke({"question": question})
+
+    prefetch_settings(weather_prefetch=True)
+    assert run("standard", "Quelle est la météo à Lyon ?")["observation"].startswith("À Lyon, il fait")
+    assert weather_prefetcher.stats()["prefetched"] == 0
+
+    llm_registry.set_factory(fake_llm_factory(responder=responder, counter=fake_llm))
+    run("speculative", "Quelle est la météo à Paris ?")
+    assert weather_prefetcher.stats()["prefetched"] == 0
+    assert open_meteo.counts["geocoding"] == 1
+
+
+def test_géocodage_des_candidats(fake_llm, open_meteo, prefetch_settings):
+    """
+    Vérifie que les lieux repérés localement sont géocodés pendant l'extraction, une seule fois.
+    """
+    prefetch_settings(weather_prefetch_candidates=True)
+    result = build_agent_graph().invoke({"question": "Quelle est la météo à Paris et Lyon ?"})
+
+    assert result["tool_input"] == ["Paris", "Lyon"]
+    assert result["observation"].count("il fait") == 2
+    stats = weather_prefetcher.stats()
+    assert stats["candidates"] == 2 and stats["candidate_hits"] == 2
+    assert open_meteo.counts["geocoding"] == 2
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.graph import build_agent_graph
+from modules.model_tiers import model_tiers
+
+
+@pytest.fixture
+def model_settings():
+    """
+    Applique une configuration des modèles le temps d'un test.
+    """
+    previous = get_config()
+
+    def apply(**overrides):
+        configure(**overrides)
+        model_tiers.reset()
+
+    yield apply
+    apply(
+        llm_model=previous.llm_model,
+        llm_temperature=previous.llm_temperature,
+        llm_models=previous.llm_models,
+        llm_models_path=previous.llm_models_path
+    )
+
+
+def test_résolution_par_nœud_et_par_prompt(model_settings, tmp_path):
+    """
+    Vérifie la priorité: prompt > nœud > défaut, variables d'environnement > fichier.
+    """
+    path = tmp_path / "modèles.json"
+    path.write_text(json.dumps({
+        "default": {"model": "moyen", "temperature": 0.5},
+        "choisir_outil": "petit@0",
+        "formuler_réponse": "fichier"
+    }), encoding="utf-8")
+    model_settings(llm_models_path=str(path), llm_models="formuler_réponse=grand,extraction_expression=calcul")
+
+    assert model_tiers.spec("analyse") == ("moyen", 0.5)
+    assert model_tiers.spec("choix_outil") == ("petit", 0.0)
+    assert model_tiers.spec("extraction_ville") == ("petit", 0.0)
+    assert model_tiers.spec("extraction_expression") == ("calcul", 0.5)
+    assert model_tiers.spec("réponse_finale") == ("grand", 0.5)
+    assert {config["model"] for config in model_tiers.configs()} == {"moyen", "petit", "calcul", "grand"}
+
+    model_settings(llm_models_path="", llm_models="choisir_outils=petit")
+    with pytest.raises(ValueError, match="choisir_outils"):
+        model_tiers.spec("analyse")
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_graphe_utilise_le_modèle_de_chaque_nœud(fake_llm, open_meteo, model_settings, use_async):
+    """
+    Vérifie que le choix d'outil et l'extraction passent par le petit modèle, la réponse par le grand.
+    """
+    model_settings(llm_model="moyen", llm_models="choisir_outil=petit,formuler_réponse=grand")
+    app = build_agent_graph(use_async=use_async)
+    question = {"question": "Quelle est la météo à Lyon ?"}
+    result = asyncio.run(app.ainvoke(question)) if use_async else app.invoke(question)
+
+    assert result["observation"].startswith("À Lyon, il fait")
+    assert fake_llm.by_model == {"moyen": 1, "petit": 2, "grand": 1}
+    assert model_tiers.stats() == {"moyen": 1, "petit": 2, "grand": 1}
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from modules.config import configure, get_config
+from modules.graph import build_agent_graph
+from modules.intent import IntentModel, intent_classifier, train_intent_model
+from modules.logging_setup import shutdown_logging
+from train_intent import main as train_intent_main
+
+CITIES = ["Paris", "Lyon", "Marseille", "Rennes", "Brest", "Dijon"]
+EXPRESSIONS = ["12*7", "3 + 4", "(8-2)/3", "100 / 4", "2 ** 8"]
+DIRECT = [
+    "Qui a écrit Les Misérables ?", "Quelle est la capitale de l'Espagne ?", "Raconte-moi une blague",
+    "Explique la photosynthèse", "Qui a peint la Joconde ?", "Comment faire du pain ?",
+]
+
+# Trafic journalisé: (question, outil retenu)
+TRAFFIC = (
+    [(t.format(c), "recherche_météo") for t in ("Quelle est la météo à {} ?", "Quel temps fait-il à {} ?",
+                                                "Est-ce qu'il pleut à {} ?") for c in CITIES]
+    + [(t.format(e), "calculatrice") for t in ("Combien font {} ?", "Calcule {}", "Que vaut {} ?") for e in EXPRESSIONS]
+    + [(q, "réponse_directe") for q in DIRECT * 3]
+)
+
+
+@pytest.fixture
+def intent_model(tmp_path):
+    """
+    Entraîne un classifieur sur le trafic d'exemple, l'active le temps du test et renvoie son chemin.
+    """
+    path = str(tmp_path / "intent.npz")
+    train_intent_model(*zip(*TRAFFIC)).save(path)
+    previous = get_config()
+    configure(intent_model_path=path)
+    intent_classifier.reset()
+    yield path
+    configure(intent_model_path=previous.intent_model_path, intent_threshold=previous.intent_threshold)
+    intent_classifier.reset()
+
+
+def test_classifieur_généralise_et_se_recharge(intent_model):
+    """
+    Vérifie les prédictions sur des questions jamais vues, et le modèle rechargé depuis le disque.
+    """
+    model = IntentModel.load(intent_model)
+    assert model.predict("Quel temps fait-il à Nantes ?")[0] == "recherche_météo"
+    assert model.predict("Combien font 45 * 3 ?")[0] == "calculatrice"
+    assert model.predict("Qui a écrit Germinal ?")[0] == "réponse_directe"
+
+    assert intent_classifier.classify("Quelle est la météo à Toulouse ?") == "recherche_météo"
+    configure(intent_threshold=1.0)
+    intent_classifier.reset()
+    assert intent_classifier.classify("Quelle est la météo à Toulouse ?") is None
+    assert intent_classifier.stats() == {"local": 0, "llm": 1}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_choix_outil_sans_appel_llm(fake_llm, open_meteo, intent_model, use_async):
+    """
+    Vérifie qu'un choix d'outil sûr se passe du LLM, l'extraction restant confiée au LLM.
+    """
+    app = build_agent_graph(use_async=use_async)
+    question = {"question": "Quel temps fait-il à Nantes ?"}
+    result = asyncio.run(app.ainvoke(question)) if use_async else app.invoke(question)
+
+    assert result["tool_name"] == "recherche_météo" and result["tool_input"] == "Nantes"
+    assert fake_llm.by_kind["choix_outil"] == 0 and fake_llm.by_kind["extraction_ville"] == 1
+    assert intent_classifier.stats()["local"] == 1
+
+
+def test_cli_entraînement_et_évaluation(tmp_path, capsys):
+    """
+    Vérifie la ligne de commande sur des résultats de run_batch.py (lignes en erreur ignorées).
+    """
+    traffic = tmp_path / "resultats.jsonl"
+    with open(traffic, "w", encoding="utf-8") as f:
+        for question, tool_name in TRAFFIC:
+            f.write(json.dumps({"question": question, "tool_name": tool_name, "error": None}, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"question": "Météo à Brest ?", "tool_name": None, "error": "timeout"}) + "\n")
+    model = str(tmp_path / "intent.npz")
+
+    assert train_intent_main(["train", str(traffic), "--output", model, "--holdout", "0"]) == 0
+    assert train_intent_main(["evaluate", str(traffic), "--model", model, "--llm-latency", "0.5"]) == 0
+    shutdown_logging()
+    output = capsys.readouterr().out
+    assert f"{len(TRAFFIC)} exemples évalués" in output
+    assert "Exactitude: 100.0%" in output
@@ -0,0 +1,67 @@
+import logging
+import threading
+
+import pytest
+
+from modules.errors import logger
+from modules.logging_setup import configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """
+    Chemin d'un fichier de journal propre au test; la journalisation est arrêtée à la fin.
+    """
+    previous = logging.getLogger().level
+    yield tmp_path / "agent.log"
+    shutdown_logging()
+    logging.getLogger().setLevel(previous)
+
+
+def test_écriture_par_le_thread_d_écriture(log_file):
+    """
+    Vérifie que les messages de plusieurs threads sont tous écrits, par le thread d'écriture.
+    """
+    listener = configure_logging(level="INFO", file=str(log_file), console=False)
+    writers = []
+    original = listener.handlers[0].emit
+    listener.handlers[0].emit = lambda record: writers.append(threading.current_thread()) or original(record)
+
+    threads = [threading.Thread(target=lambda i=i: [logger.info("Question %s-%s", i, j) for j in range(50)])
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown_logging()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 200 and " - agent - INFO - Question 3-49" in "\n".join(lines)
+    assert writers and all(w not in threads and w is not threading.main_thread() for w in writers)
+
+
+def test_échantillonnage_et_formatage_paresseux(log_file):
+    """
+    Vérifie l'échantillonnage par gabarit des INFO, jamais des avertissements, et qu'un message
+    sous le niveau configuré n'est pas mis en forme.
+    """
+    class Coûteux:
+        formatted = 0
+
+        def __str__(self):
+            Coûteux.formatted += 1
+            return "coûteux"
+
+    configure_logging(level="INFO", file=str(log_file), console=False, info_sampling=0.25)
+    for i in range(100):
+        logger.info("Étape fréquente %s", i)
+        logger.debug("Détail %s", Coûteux())
+    logger.info("Étape rare")
+    for i in range(3):
+        logger.warning("Avertissement %s", i)
+    shutdown_logging()
+
+    text = log_file.read_text(encoding="utf-8")
+    assert text.count("Étape fréquente") == 25 and "Étape fréquente 0\n" in text
+    assert "Étape rare" in text and text.count("Avertissement") == 3
+    assert Coûteux.formatted == 0
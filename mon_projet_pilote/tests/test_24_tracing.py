@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from modules.batch import run_batch
+from modules.config import configure, get_config
+from modules.graph import build_agent_graph
+from modules.logging_setup import shutdown_logging
+from modules.prompts import TracedLLM, prompt_registry
+from modules.tracing import JSONLExporter, Span, tracer
+from trace_report import main as trace_report_main
+
+
+@pytest.fixture
+def tracing():
+    """
+    Active le traçage en mémoire le temps du test (un test peut passer en mode jsonl).
+    """
+    previous = get_config()
+    configure(trace_mode="memory")
+    tracer.reset()
+    prompt_registry.clear()
+    yield tracer
+    configure(trace_mode=previous.trace_mode, trace_path=previous.trace_path)
+    tracer.reset()
+    prompt_registry.clear()
+
+
+def test_traçage_désactivé_sans_enveloppe(fake_llm, open_meteo):
+    """
+    Vérifie qu'un graphe construit sans traçage n'enveloppe ni ses nœuds ni ses chaînes.
+    """
+    tracer.reset()
+    app = build_agent_graph()
+    assert app.invoke({"question": "Quelle est la météo à Lyon ?"})["tool_name"] == "recherche_météo"
+    assert app.nodes["analyser"].bound.func.__code__.co_name == "measured"  # Métriques seules, pas de span
+    assert not isinstance(prompt_registry.get_chain("analyse").last, TracedLLM)
+    assert tracer.stats() == {"mode": "off"} and tracer.collector.spans() == []
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_spans_des_nœuds_llm_et_http(fake_llm, open_meteo, tracing, use_async):
+    """
+    Vérifie l'arborescence des spans d'une question, leurs attributs et l'export OTLP.
+    """
+    app = build_agent_graph(use_async=use_async)
+    with tracing.span("question", "question"):
+        if use_async:
+            asyncio.run(app.ainvoke({"question": "Quelle est la météo à Paris ?"}))
+        else:
+            app.invoke({"question": "Quelle est la météo à Paris ?"})
+
+    spans = tracing.collector.spans()
+    by_id = {span.span_id: span for span in spans}
+    root = spans[-1]
+    assert root.kind == "question" and {span.trace_id for span in spans} == {root.trace_id}
+
+    nodes = {span.name: span for span in spans if span.kind == "node"}
+    assert set(nodes) == {"analyser", "choisir_outil", "appeler_météo", "formuler_réponse"}
+    assert all(span.parent_id == root.span_id for span in nodes.values())
+    assert nodes["choisir_outil"].attributes["tool"] == "recherche_météo"
+
+    llm = {(span.name, by_id[span.parent_id].name) for span in spans if span.kind == "llm"}
+    assert {("analyse", "analyser"), ("choix_outil", "choisir_outil"), ("réponse_finale", "formuler_réponse")} <= llm
+    assert all(span.attributes["output_tokens"] > 0 for span in spans if span.kind == "llm")
+    assert {(span.name, span.attributes["status"]) for span in spans if span.kind == "http"} == {
+        ("/v1/search", 200), ("/v1/forecast", 200)
+    }
+
+    otlp = tracing.collector.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(otlp) == len(spans) and otlp[-1]["parentSpanId"] == "" and otlp[-1]["status"] == {"code": 1}
+
+
+def test_fichier_jsonl_et_rapport(fake_llm, open_meteo, tracing, tmp_path, capsys):
+    """
+    Vérifie les spans écrits par une exécution par lots et leur agrégation par le rapport.
+    """
+    traces = tmp_path / "traces.jsonl"
+    configure(trace_mode="jsonl", trace_path=str(traces))
+    tracing.reset()
+    questions = tmp_path / "questions.jsonl"
+    questions.write_text("".join(json.dumps({"question": q}, ensure_ascii=False) + "\n" for q in (
+        "Quelle est la météo à Nice ?", "Combien font 12*7 ?", "Qui a écrit Germinal ?"
+    )), encoding="utf-8")
+    run_batch(build_agent_graph(), str(questions), str(tmp_path / "resultats.jsonl"), concurrency=2)
+    tracing.reset()  # Ferme le fichier de traces
+
+    spans = [json.loads(line) for line in traces.read_text(encoding="utf-8").splitlines()]
+    roots = [span for span in spans if span["kind"] == "question"]
+    assert sorted(span["attributes"]["index"] for span in roots) == [0, 1, 2]
+    assert all(span["parent_id"] is None for span in roots)
+    assert len({span["trace_id"] for span in spans}) == 3
+
+    assert trace_report_main([str(traces)]) == 0
+    report = capsys.readouterr().out
+    assert "Nœuds" in report and "Requêtes HTTP" in report and "p99 ms" in report
+    assert trace_report_main([str(traces), "--kind", "llm", "--by", "model"]) == 0
+    report = capsys.readouterr().out
+    assert "analyse [gemini-1.5-flash]" in report and "Nœuds" not in report
+    shutdown_logging()
+
+
+def test_fichier_jsonl_partagé_par_plusieurs_processus(tmp_path):
+    """
+    Vérifie que des processus qui ajoutent des spans au même fichier n'entremêlent jamais leurs lignes.
+    """
+    path = str(tmp_path / "traces.jsonl")
+    pids = []
+    for worker in range(4):
+        pid = os.fork()
+        if pid == 0:
+            exporter = JSONLExporter(path)
+            for i in range(2000):
+                exporter.export(Span(name=f"w{worker}", kind="node", trace_id="t", span_id=str(i),
+                                     attributes={"padding": "x" * (100 + i % 300)}))
+            exporter.close()
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        assert os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
+
+    with open(path, encoding="utf-8") as f:
+        names = [json.loads(line)["name"] for line in f]
+    assert sorted(names) == sorted(f"w{worker}" for worker in range(4) for _ in range(2000))
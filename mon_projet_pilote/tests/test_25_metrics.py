@@ -0,0 +1,112 @@
+import json
+import threading
+
+import requests
+
+from modules.batch import run_batch
+from modules.errors import handle_state_errors
+from modules.graph import build_agent_graph
+from modules.metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    exceptions_total,
+    llm_calls_total,
+    metrics,
+    node_duration,
+    node_errors_total,
+    questions_in_flight,
+    questions_total,
+    tool_calls_total,
+    tool_choices_total,
+)
+
+
+def test_registre_concurrent_et_format_prometheus():
+    """
+    Vérifie les mises à jour depuis plusieurs threads et le format d'exposition texte.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Compteur de test", ("kind",))
+    histogram = registry.histogram("test_seconds", "Durées de test", buckets=(0.1, 1.0))
+    gauge = registry.gauge("test_in_flight", "Jauge de test")
+
+    def work():
+        for i in range(1000):
+            counter.inc('a"b')
+            histogram.observe(0.05 if i % 2 else 0.5)
+            with gauge.track():
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value('a"b') == 8000 and histogram.count() == 8000 and gauge.value() == 0
+    text = registry.render()
+    assert "# TYPE test_total counter\ntest_total{kind=\"a\\\"b\"} 8000\n" in text
+    assert 'test_seconds_bucket{le="0.1"} 4000\ntest_seconds_bucket{le="1.0"} 8000\n' in text
+    assert 'test_seconds_bucket{le="+Inf"} 8000\ntest_seconds_sum 2200' in text
+    assert "# TYPE test_in_flight gauge\ntest_in_flight 0\n" in text
+
+
+
+def test_partitions_des_threads_terminés():
+    """
+    Vérifie que les valeurs des threads terminés sont conservées sans garder une partition par thread.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Compteur de test")
+    histogram = registry.histogram("test_seconds", "Durées de test", buckets=(0.1, 1.0))
+
+    def work():
+        counter.inc()
+        histogram.observe(0.5)
+
+    for _ in range(10):
+        threads = [threading.Thread(target=work) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert counter.value() == 500 and histogram.count() == 500
+    assert len(counter._shards) <= 1 and len(histogram._shards) <= 1
+    assert 'test_seconds_bucket{le="1.0"} 500\n' in registry.render()
+
+def test_métriques_du_graphe(fake_llm, open_meteo, tmp_path):
+    """
+    Vérifie les compteurs mis à jour par une exécution par lots: questions, nœuds, outils, appels LLM.
+    """
+    metrics.reset()
+    questions = tmp_path / "questions.jsonl"
+    questions.write_text("".join(json.dumps({"question": q}, ensure_ascii=False) + "\n" for q in (
+        "Quelle est la météo à Lyon ?", "Combien font 12*7 ?", "Qui a écrit Germinal ?"
+    )), encoding="utf-8")
+    run_batch(build_agent_graph(), str(questions), str(tmp_path / "resultats.jsonl"), concurrency=3)
+
+    assert questions_total.value("ok") == 3 and questions_in_flight.value() == 0
+    assert node_duration.count("analyser") == 3 and node_errors_total.value("analyser") == 0
+    assert [tool_choices_total.value(t) for t in ("recherche_météo", "calculatrice", "réponse_directe")] == [1, 1, 1]
+    assert tool_calls_total.value("recherche_météo", "ok") == 1
+    assert llm_calls_total.value("analyse", "gemini-1.5-flash", "ok") == 3
+    assert fake_llm.by_kind["analyse"] == 3
+
+
+def test_serveur_metrics_et_exceptions():
+    """
+    Vérifie l'endpoint /metrics et le comptage des exceptions interceptées par handle_state_errors.
+    """
+    @handle_state_errors
+    def nœud_en_panne(state):
+        raise RuntimeError("panne")
+
+    before = exceptions_total.value("nœud_en_panne", "RuntimeError")
+    assert nœud_en_panne({})["error"] is True
+    assert exceptions_total.value("nœud_en_panne", "RuntimeError") == before + 1
+
+    with MetricsServer() as server:
+        response = requests.get(server.url, timeout=5)
+        assert response.status_code == 200 and response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'agent_exceptions_total{function="nœud_en_panne",exception="RuntimeError"}' in response.text
+        assert requests.get(server.url.replace("/metrics", "/autre"), timeout=5).status_code == 404
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from modules.config import configure, get_config
+from modules.graph import compiled_graphs, get_agent_graph
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_imports_paresseux():
+    """
+    Vérifie que l'import du package et des modules légers ne charge ni les clients LLM et HTTP, ni graphviz.
+    """
+    code = (
+        "import json, sys\n"
+        "import modules, modules.llm, modules.errors, modules.http_client, modules.visualization\n"
+        "from modules import answer_cache, configure, metrics\n"
+        "print(json.dumps([type(answer_cache).__name__, type(metrics).__name__,\n"
+        "                  sorted(m for m in sys.modules if m.split('.')[0] in\n"
+        "                         ('langchain_google_genai', 'graphviz', 'requests', 'httpx', 'langchain_core'))]))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    # Les sous-modules homonymes ne masquent pas les objets exportés
+    assert json.loads(result.stdout) == ["AnswerCache", "MetricsRegistry", []]
+
+
+def test_graphe_compilé_une_fois(fake_llm, open_meteo):
+    """
+    Vérifie qu'un graphe demandé par plusieurs threads n'est compilé qu'une fois, et recompilé si ses réglages changent.
+    """
+    previous = get_config().metrics_enabled
+    compiled_graphs.reset()
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            graphs = list(pool.map(lambda _: get_agent_graph(), range(16)))
+        assert all(graph is graphs[0] for graph in graphs)
+        assert compiled_graphs.stats() == {"graphs": 1, "hits": 15, "builds": 1}
+        assert graphs[0].invoke({"question": "Combien font 12*7 ?"})["answer"]
+
+        assert get_agent_graph(mode="fused") is not graphs[0]
+        configure(metrics_enabled=not previous)
+        assert get_agent_graph() is not graphs[0]
+        assert compiled_graphs.stats()["builds"] == 3
+    finally:
+        configure(metrics_enabled=previous)
+        compiled_graphs.reset()
@@ -0,0 +1,74 @@
+import os
+import signal
+import threading
+import time
+
+import requests
+
+from modules.graph import get_agent_graph
+from modules.server import PreforkServer
+
+
+def ask(server, question):
+    """Pose une question sur une connexion neuve (le noyau choisit le worker qui l'accepte)."""
+    response = requests.post(f"{server.url}/ask", json={"question": question},
+                             headers={"Connection": "close"}, timeout=10)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_workers_et_cache_des_réponses_partagé(fake_llm, open_meteo, answer_store):
+    """
+    Vérifie que plusieurs workers répondent sur le même socket et partagent le cache des réponses sur disque.
+    """
+    with PreforkServer(get_agent_graph(answer_cache=True), workers=2, port=0) as server:
+        first = ask(server, "Combien font 12*7 ?")
+        assert "84" in first["answer"] and first["cache_hit"] is None
+
+        # Un autre worker sert la même question depuis la base SQLite, sans l'avoir jamais calculée
+        others = []
+        for _ in range(100):
+            record = ask(server, "Combien font 12*7 ?")
+            assert record["cache_hit"] == "exact" and record["answer"] == first["answer"]
+            if record["worker"] != first["worker"]:
+                others.append(record)
+                break
+        assert others
+
+        assert requests.post(f"{server.url}/ask", json={}, timeout=10).status_code == 400
+        assert requests.get(f"{server.url}/health", timeout=10).json()["worker"] in {first["worker"], others[0]["worker"]}
+
+        # Métriques du worker qui accepte la connexion, étiquetées par son pid
+        response = requests.get(f"{server.url}/metrics", headers={"Connection": "close"}, timeout=10)
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        series = [line for line in response.text.splitlines() if line and not line.startswith("#")]
+        workers = {line.split('worker="', 1)[1].split('"', 1)[0] for line in series}
+        assert len(workers) == 1 and int(workers.pop()) in {first["worker"], others[0]["worker"]}
+        assert any(line.startswith('agent_questions_total{worker="') and ',status="ok"}' in line for line in series)
+
+
+def test_worker_arrêté_recréé(fake_llm, open_meteo):
+    """
+    Vérifie que le parent recrée un worker tué, puis arrête proprement les workers.
+    """
+    server = PreforkServer(workers=1, port=0).start()
+    supervisor = threading.Thread(target=server.serve_forever)
+    supervisor.start()
+    try:
+        pid = requests.get(f"{server.url}/health", timeout=10).json()["worker"]
+        os.kill(pid, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                new_pid = requests.get(f"{server.url}/health", timeout=1).json()["worker"]
+                if new_pid != pid:
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.05)
+        assert new_pid != pid
+        assert "Paris" in ask(server, "Quelle est la météo à Paris ?")["answer"]
+    finally:
+        server.stop()
+        supervisor.join(timeout=10)
+    assert not supervisor.is_alive()